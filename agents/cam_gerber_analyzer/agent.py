@@ -62,7 +62,7 @@ class CamGerberAnalyzerAgent:
                             "properties": {
                                 "files": {
                                     "type": "array",
-                                    "description": "List of file objects with filename, content (base64), and file_type",
+                                    "description": "List of file objects with filename, content (base64), and file_type (used when neither Gerber X2 attributes nor the filename tell the layer)",
                                     "items": {
                                         "type": "object",
                                         "properties": {
@@ -74,14 +74,15 @@ class CamGerberAnalyzerAgent:
                                 },
                                 "project_name": {"type": "string", "description": "Project name"},
                                 "board_name": {"type": "string", "description": "Board name"},
-                                "user_id": {"type": "string", "description": "User identifier"}
+                                "user_id": {"type": "string", "description": "User identifier"},
+                                "parent_analysis_id": {"type": "integer", "description": "Analysis these files revise; only changed files need uploading, the rest are carried over"}
                             },
                             "required": ["files"]
                         }
                     },
                     {
                         "name": "detect_file_format",
-                        "description": "Automatically detect file format (Gerber vs ODB++).",
+                        "description": "Automatically detect file format (Gerber vs ODB++), and the layer type from Gerber X2 attributes where the file has them.",
                         "parameters": {
                             "type": "object",
                             "properties": {
@@ -109,7 +110,9 @@ class CamGerberAnalyzerAgent:
                             "type": "object",
                             "properties": {
                                 "archive_path": {"type": "string", "description": "Path to ODB++ archive"},
-                                "directory_path": {"type": "string", "description": "Path to ODB++ directory"}
+                                "directory_path": {"type": "string", "description": "Path to ODB++ directory"},
+                                "step": {"type": "string", "description": "Step to describe (default: the first)"},
+                                "layers": {"type": "array", "items": {"type": "string"}, "description": "Layers whose features to decode"}
                             }
                         }
                     },
@@ -158,6 +161,19 @@ class CamGerberAnalyzerAgent:
                                 "limit": {"type": "integer", "description": "Maximum number of results", "default": 10}
                             }
                         }
+                    },
+                    {
+                        "name": "compare_analyses",
+                        "description": "Compare the layers and drills of two analyses, e.g. two revisions of a board, and list the features added, removed or changed with their coordinates.",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "analysis_id_a": {"type": "integer", "description": "Analysis ID of the older revision"},
+                                "analysis_id_b": {"type": "integer", "description": "Analysis ID of the newer revision"},
+                                "max_changes": {"type": "integer", "description": "Maximum number of changes listed per layer"}
+                            },
+                            "required": ["analysis_id_a", "analysis_id_b"]
+                        }
                     }
                 ]
             )
@@ -181,7 +197,8 @@ class CamGerberAnalyzerAgent:
             "generate_design_summary": tools.generate_design_summary,
             "perform_cam_analysis": tools.perform_cam_analysis,
             "get_analysis_report": tools.get_analysis_report,
-            "get_analysis_history": tools.get_analysis_history
+            "get_analysis_history": tools.get_analysis_history,
+            "compare_analyses": tools.compare_analyses
         }
         
         if tool_name not in tool_map:
@@ -192,24 +209,43 @@ class CamGerberAnalyzerAgent:
         
         try:
             result = tool_map[tool_name](**args)
-            # Convert to expected format
-            if result.get("success"):
-                return {
-                    "ok": True,
-                    "output": result.get("message", "Success"),
-                    "data": result
-                }
-            else:
-                return {
-                    "ok": False,
-                    "error": result.get("error", "Unknown error")
-                }
+            return self._tool_result(result)
         except Exception as e:
             return {
                 "ok": False,
                 "error": str(e)
             }
     
+    async def execute_tool_async(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an agent tool without blocking the event loop.
+        
+        CAM tools mix file parsing with database access, so they run on a
+        helper thread; their database operations go through the database
+        worker thread from there.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            args: Tool arguments
+            
+        Returns:
+            Tool execution result
+        """
+        return await asyncio.to_thread(self.execute_tool, tool_name, args)
+    
+    def _tool_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a tool's return value to the expected format."""
+        if result.get("success"):
+            return {
+                "ok": True,
+                "output": result.get("message", "Success"),
+                "data": result
+            }
+        else:
+            return {
+                "ok": False,
+                "error": result.get("error", "Unknown error")
+            }
+    
     def find_function_call_parts(self, response: types.GenerateContentResponse) -> Optional[tuple]:
         """Extract function call from Gemini response.
         
@@ -312,7 +348,8 @@ class CamGerberAnalyzerAgent:
         if context and 'files' in context and context['files']:
             # Files are provided, upload them first
             user_id = context.get('user_id', 'default')
-            upload_result = tools.upload_design_files(
+            upload_result = await asyncio.to_thread(
+                tools.upload_design_files,
                 files=context['files'],
                 project_name=context.get('project_name'),
                 board_name=context.get('board_name'),
@@ -323,7 +360,7 @@ class CamGerberAnalyzerAgent:
                 analysis_id = upload_result.get('analysis_id')
                 context['analysis_id'] = analysis_id
                 # Automatically generate design summary after upload
-                summary_result = tools.generate_design_summary(analysis_id)
+                summary_result = await asyncio.to_thread(tools.generate_design_summary, analysis_id)
                 if summary_result.get('success'):
                     # Update message to include summary info
                     summary = summary_result.get('summary', {})
@@ -397,7 +434,7 @@ class CamGerberAnalyzerAgent:
             function_name, function_args = func_call
             
             # Execute tool
-            tool_result = self.execute_tool(function_name, function_args)
+            tool_result = await self.execute_tool_async(function_name, function_args)
             
             # Track function call
             function_calls.append({
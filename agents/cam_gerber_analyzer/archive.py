@@ -0,0 +1,145 @@
+"""Streaming extraction of uploaded ZIP archives.
+
+Members are copied from the archive straight to their destination files in
+blocks, on a thread pool (zlib releases the GIL while inflating), and hashed
+on the way so the layer cache never reads them again. Nothing is held in
+memory beyond one block per thread.
+
+Limits guard against zip bombs. They are checked against the sizes declared
+in the central directory before anything is written; zipfile stops every
+member at its declared size (and fails its CRC check if the data goes on),
+so the declared sizes bound what is written:
+
+- max_members: members extracted from one archive
+- max_total_mb: decompressed size of all extracted members together
+- max_ratio: decompressed over compressed size of any one member
+"""
+
+import hashlib
+import os
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .layer_cache import get_layer_cache
+
+DEFAULT_LIMITS = {
+    "max_total_mb": 2048,
+    "max_ratio": 200,
+    "max_members": 10000,
+    "max_workers": 4,
+}
+
+_COPY_BLOCK = 1 << 20
+
+# Compressed size below which the ratio limit is not applied; tiny members
+# such as empty or repetitive text files compress extremely well
+_RATIO_MIN_COMPRESSED = 1 << 10
+
+
+class ArchiveLimitError(ValueError):
+    """An archive exceeds the extraction limits."""
+
+
+@dataclass
+class ExtractedMember:
+    """One member written to disk."""
+    name: str                # name in the archive
+    path: str                # extracted file
+    size: int                # bytes written
+    sha256: str              # hex digest of the content
+
+
+class _HashingWriter:
+    """File-like destination that hashes and counts what is written to it."""
+
+    def __init__(self, f):
+        self._f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, block: bytes) -> int:
+        self.size += len(block)
+        self.digest.update(block)
+        return self._f.write(block)
+
+
+def extraction_limits() -> Dict[str, Any]:
+    """Extraction limits from AGENT_CONFIG, with defaults for missing ones."""
+    from .config import AGENT_CONFIG
+
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(AGENT_CONFIG.get("zip_extraction", {}))
+    return limits
+
+
+def check_members(infos: List[zipfile.ZipInfo], limits: Dict[str, Any]):
+    """Check the sizes declared by an archive against the limits.
+
+    Raises:
+        ArchiveLimitError: if any limit is exceeded
+    """
+    if len(infos) > limits["max_members"]:
+        raise ArchiveLimitError(f"Archive has {len(infos)} members; at most {limits['max_members']} are extracted")
+    total = sum(info.file_size for info in infos)
+    if total > limits["max_total_mb"] * 1024 * 1024:
+        raise ArchiveLimitError(
+            f"Archive decompresses to {total / 1024 / 1024:.0f} MB; the limit is {limits['max_total_mb']} MB"
+        )
+    for info in infos:
+        if info.compress_size >= _RATIO_MIN_COMPRESSED and info.file_size > info.compress_size * limits["max_ratio"]:
+            raise ArchiveLimitError(
+                f"Member {info.filename} has compression ratio {info.file_size / info.compress_size:.0f}; "
+                f"the limit is {limits['max_ratio']}"
+            )
+
+
+def extract_members(zip_ref: zipfile.ZipFile, infos: List[zipfile.ZipInfo], directory: str,
+                    limits: Optional[Dict[str, Any]] = None) -> List[ExtractedMember]:
+    """Stream archive members into a directory, in parallel.
+
+    Members are saved under their base name, so archive paths cannot escape
+    the directory; of members sharing a base name the last one is kept.
+    Written files' digests are recorded in the layer cache.
+
+    Args:
+        zip_ref: Open archive
+        infos: Members to extract
+        directory: Destination directory
+        limits: Extraction limits; by default from extraction_limits()
+
+    Returns:
+        Extracted members in archive order
+
+    Raises:
+        ArchiveLimitError: if a limit is exceeded, before anything is written
+        zipfile.BadZipFile: if a member is corrupt; files written so far are removed
+    """
+    limits = limits or extraction_limits()
+    by_name = {os.path.basename(info.filename): info for info in infos if not info.is_dir()}
+    infos = [info for name, info in by_name.items() if name]
+    check_members(infos, limits)
+    paths = [os.path.join(directory, os.path.basename(info.filename)) for info in infos]
+
+    def extract(info: zipfile.ZipInfo, path: str) -> ExtractedMember:
+        with zip_ref.open(info) as source, open(path, 'wb') as f:
+            writer = _HashingWriter(f)
+            shutil.copyfileobj(source, writer, _COPY_BLOCK)
+        return ExtractedMember(name=info.filename, path=path, size=writer.size, sha256=writer.digest.hexdigest())
+
+    workers = max(1, min(limits.get("max_workers") or 1, len(infos)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            members = list(pool.map(extract, infos, paths))
+    except Exception:
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
+        raise
+
+    cache = get_layer_cache()
+    for member in members:
+        cache.remember_digest(member.path, member.sha256)
+    return members
@@ -0,0 +1 @@
+"""Benchmarks for CAM Gerber Analyzer Agent."""
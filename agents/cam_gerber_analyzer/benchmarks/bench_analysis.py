@@ -0,0 +1,154 @@
+"""Benchmark end-to-end analysis of a 12-layer board with the layer cache.
+
+Uploads ten synthetic copper layers, two solder mask layers, a board outline
+and a drill file into a temporary database, then times the tool sequence an analysis runs
+(summary, CAM checks, design rules, per-file analysis): without the layer
+cache, serially and on a worker process per core, then with the cache cold,
+warm on disk only (a fresh process) and warm in memory. Last it times a
+revision of the board with one inner layer redrawn, which reuses the cached
+results of the other layers.
+
+The HTML report generators are left out: they write into data/reports.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_analysis [megabytes per layer]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.benchmarks.bench_tokenizer import write_layer
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.executor import available_cores
+from agents.cam_gerber_analyzer.layer_cache import get_layer_cache
+from agents.cam_gerber_analyzer.models import DesignFile
+from agents.cam_gerber_analyzer.tools.analyze_gerber_file_details import analyze_all_files
+from agents.cam_gerber_analyzer.tools.extract_design_rules import analyze_all_layers_for_design_rules
+from agents.cam_gerber_analyzer.tools.generate_design_summary import generate_design_summary
+from agents.cam_gerber_analyzer.tools.perform_cam_analysis import perform_cam_analysis
+
+LAYERS = (
+    ["copper_top"] + [f"inner_layer_{n}" for n in range(1, 9)] + ["copper_bottom"]
+    + ["solder_mask_top", "solder_mask_bottom"]
+)
+
+
+def write_drill(file_path: str, holes: int = 20000):
+    """Write a synthetic Excellon drill file."""
+    with open(file_path, 'w') as f:
+        f.write("M48\nMETRIC\nT01C0.300\nT02C0.800\n%\n")
+        for tool in (1, 2):
+            f.write(f"T0{tool}\n")
+            f.write("".join(f"X{(i * 37) % 300000}Y{(i * 53) % 200000}\n" for i in range(holes // 2)))
+        f.write("M30\n")
+
+
+def write_outline(file_path: str):
+    """Write a 300 x 200 mm board outline around the synthetic layers."""
+    with open(file_path, 'wb') as f:
+        f.write(b"%FSLAX46Y46*%\n%MOMM*%\n%ADD10C,0.100000*%\nD10*\nX0Y0D02*\n"
+                b"X305000000D01*\nY205000000D01*\nX0D01*\nY0D01*\nM02*\n")
+
+
+def create_board(directory: str, megabytes: int) -> int:
+    """Upload the synthetic board into the configured database; return the analysis ID."""
+    db = CamGerberDatabase()
+    analysis_id = db.create_analysis("benchmark", "Benchmark", "12-layer board")
+    files = [(f"{file_type}.gbr", file_type, "gerber") for file_type in LAYERS]
+    files.append(("outline.gbr", "outline", "gerber"))
+    files.append(("board.drl", "drill", "gerber"))
+    for layer_number, (filename, file_type, file_format) in enumerate(files, start=1):
+        file_path = os.path.join(directory, filename)
+        if file_type == "drill":
+            write_drill(file_path)
+        elif file_type == "outline":
+            write_outline(file_path)
+        else:
+            write_layer(file_path, megabytes, seed=layer_number)
+        db.save_design_file(DesignFile(
+            analysis_id=analysis_id,
+            filename=filename,
+            file_format=file_format,
+            file_type=file_type,
+            layer_number=layer_number,
+            file_path=file_path,
+            file_size=os.path.getsize(file_path),
+        ))
+    return analysis_id
+
+
+def create_revision(directory: str, parent_id: int, megabytes: int) -> int:
+    """Create the next revision of a board with inner_layer_3 redrawn; return its analysis ID."""
+    db = CamGerberDatabase()
+    analysis_id = db.create_analysis("benchmark", "Benchmark", "12-layer board", parent_id)
+    for design_file in db.get_design_files(parent_id):
+        if design_file.file_type == "inner_layer_3":
+            design_file.file_path = os.path.join(directory, "inner_layer_3_v2.gbr")
+            write_layer(design_file.file_path, megabytes, seed=99)
+            design_file.file_size = os.path.getsize(design_file.file_path)
+        design_file.id = None
+        design_file.analysis_id = analysis_id
+        db.save_design_file(design_file)
+    return analysis_id
+
+
+def analyze(analysis_id: int) -> float:
+    """Run the analysis tool sequence; return its wall time in seconds."""
+    start = time.perf_counter()
+    for tool in (generate_design_summary, perform_cam_analysis,
+                 analyze_all_layers_for_design_rules, analyze_all_files):
+        result = tool(analysis_id)
+        if not result.get("success"):
+            raise RuntimeError(f"{tool.__name__} failed: {result.get('error')}")
+    return time.perf_counter() - start
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    temp_dir = tempfile.mkdtemp()
+    original_database = AGENT_CONFIG["database"]
+    original_cache = AGENT_CONFIG["layer_cache"]
+    original_executor = AGENT_CONFIG["executor"]
+    try:
+        AGENT_CONFIG["database"] = dict(original_database, path=os.path.join(temp_dir, 'analyses.db'))
+        analysis_id = create_board(temp_dir, megabytes)
+        total = sum(os.path.getsize(os.path.join(temp_dir, name))
+                    for name in os.listdir(temp_dir) if not name.startswith('analyses.db'))
+        cores = available_cores()
+        print(f"{len(LAYERS)} layers + outline and drill, {total / 1e6:.1f} MB, {cores} cores\n")
+
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+        AGENT_CONFIG["executor"] = {"max_workers": 1}
+        timings = [("no cache, sequential", analyze(analysis_id))]
+        AGENT_CONFIG["executor"] = {"max_workers": None}
+        if cores > 1:
+            timings.append((f"no cache, {cores} worker processes", analyze(analysis_id)))
+
+        AGENT_CONFIG["layer_cache"] = {"path": os.path.join(temp_dir, 'layer_cache')}
+        timings.append(("cold cache", analyze(analysis_id)))
+        get_layer_cache().clear()
+        timings.append(("warm disk tier (new process)", analyze(analysis_id)))
+        timings.append(("warm memory tier", analyze(analysis_id)))
+        revision_id = create_revision(temp_dir, analysis_id, megabytes)
+        timings.append(("revision with one layer changed", analyze(revision_id)))
+
+        baseline = timings[0][1]
+        for name, seconds in timings:
+            print(f"{name:<45} {seconds * 1000:8.0f} ms  {baseline / seconds:5.1f}x")
+    finally:
+        AGENT_CONFIG["database"] = original_database
+        AGENT_CONFIG["layer_cache"] = original_cache
+        AGENT_CONFIG["executor"] = original_executor
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark reading Gerber X2 attributes from a board's worth of files.
+
+Writes synthetic copper layers with X2 file and aperture attributes and
+times read_attributes and classify_layer over all of them, against
+tokenizing one of them in full.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_attributes [files] [megabytes per file]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.benchmarks.bench_tokenizer import write_layer
+from agents.cam_gerber_analyzer.engine.attributes import classify_layer, read_attributes
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import scan_gerber
+
+
+def x2_header(layer: int, layers: int) -> bytes:
+    """File attributes of copper layer number `layer` of `layers`."""
+    side = "Top" if layer == 1 else "Bot" if layer == layers else "Inr"
+    return (b"%%TF.GenerationSoftware,Benchmark,CAD,1.0*%%\n%%TF.SameCoordinates,Original*%%\n"
+            b"%%TF.FileFunction,Copper,L%d,%s*%%\n%%TF.FilePolarity,Positive*%%\n"
+            b"%%TA.AperFunction,Conductor*%%\n%%TA.AperFunction,ViaPad*%%\n%%TD*%%\n"
+            % (layer, side.encode()))
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    temp_dir = tempfile.mkdtemp()
+    try:
+        body_path = os.path.join(temp_dir, 'body.gbr')
+        write_layer(body_path, megabytes)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        paths = []
+        for n in range(files):
+            paths.append(os.path.join(temp_dir, f'layer_{n}.gbr'))
+            with open(paths[-1], 'wb') as f:
+                f.write(x2_header(n % 16 + 1, 16) + body)
+        print(f"{files} files of {len(body) / 1e6:.1f} MB\n")
+
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            types = [classify_layer(read_attributes(path)) for path in paths]
+            best = min(best, time.perf_counter() - start)
+        assert None not in types
+
+        start = time.perf_counter()
+        scan_gerber(paths[0])
+        scan = time.perf_counter() - start
+
+        print(f"{'read and classify all files':<45} {best * 1000:8.1f} ms")
+        print(f"{'per file':<45} {best / files * 1e6:8.1f} us")
+        print(f"{'tokenize one file in full':<45} {scan * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
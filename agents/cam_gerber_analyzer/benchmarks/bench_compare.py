@@ -0,0 +1,82 @@
+"""Benchmark comparing two revisions of a synthetic multilayer board.
+
+Each layer holds rows of 0.15 mm traces ending in 0.6 mm pads. In the
+second revision one trace in a thousand is moved 0.1 mm and one pad in a
+thousand enlarged, and its D codes are renumbered. It times the comparison
+of every layer pair and of a layer with an unchanged copy of itself.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_compare [traces per layer] [layers]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.compare import diff_layers
+from agents.cam_gerber_analyzer.engine.geometry import (
+    APERTURE_DTYPE, ARC_DTYPE, PRIMITIVE_DTYPE, REGION_DTYPE, SHAPE_CIRCLE, LayerGeometry,
+)
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import DARK
+
+
+def synthetic_layer(traces: int, revised: bool) -> LayerGeometry:
+    """Traces ending in pads; the revision moves some traces and enlarges some pads."""
+    columns = max(int(np.sqrt(traces / 10)), 1)
+    n = np.arange(traces)
+    x = (n % columns) * 12.0
+    y = (n // columns) * 1.0
+    changed = revised & (n % 1000 == 0)
+
+    lines = np.zeros(traces, dtype=PRIMITIVE_DTYPE)
+    lines['polarity'] = DARK
+    lines['aperture_id'] = 20 if revised else 10
+    lines['x0'], lines['x1'] = x, x + 10.0
+    lines['y0'] = lines['y1'] = np.where(changed, y + 0.1, y)
+
+    flashes = np.zeros(traces, dtype=PRIMITIVE_DTYPE)
+    flashes['polarity'] = DARK
+    flashes['aperture_id'] = np.where(changed, 22, 21) if revised else 11
+    flashes['x0'] = flashes['x1'] = x + 10.0
+    flashes['y0'] = flashes['y1'] = y
+
+    apertures = np.zeros(3, dtype=APERTURE_DTYPE)
+    apertures['id'] = (20, 21, 22) if revised else (10, 11, 12)
+    apertures['shape'] = SHAPE_CIRCLE
+    apertures['width'] = apertures['height'] = (0.15, 0.6, 0.8)
+    return LayerGeometry(lines=lines, arcs=np.zeros(0, ARC_DTYPE), flashes=flashes,
+                         regions=np.zeros(0, REGION_DTYPE), apertures=apertures)
+
+
+def main():
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    layers = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    old, new = synthetic_layer(traces, False), synthetic_layer(traces, True)
+    print(f"{layers} layers, {layers * 2 * traces} features per revision\n")
+
+    start = time.perf_counter()
+    diffs = [diff_layers(old, new) for _ in range(layers)]
+    board = time.perf_counter() - start
+
+    start = time.perf_counter()
+    same = diff_layers(old, old)
+    unchanged = time.perf_counter() - start
+
+    print(f"{'compare board':<45} {board * 1000:8.0f} ms")
+    print(f"{'compare one unchanged layer':<45} {unchanged * 1000:8.0f} ms")
+    print()
+    diff = diffs[0]
+    print(f"{'tiles changed per layer':<45} {diff.tiles_changed:8d} / {diff.tiles}")
+    print(f"{'features moved per layer':<45} {len(diff.added):8d}")
+    print(f"{'apertures changed per layer':<45} {len(diff.aperture_changed):8d}")
+    print(f"{'unchanged layer identical':<45} {str(same.identical):>8}")
+
+
+if __name__ == '__main__':
+    main()
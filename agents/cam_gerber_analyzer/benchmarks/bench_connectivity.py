@@ -0,0 +1,90 @@
+"""Benchmark net extraction on a synthetic multilayer board.
+
+Each copper layer holds rows of 0.15 mm traces on a 1 mm pitch ending in
+0.6 mm via pads, and a 0.3 mm drill hit passes through every via, so the
+nets run through all layers. Every tenth trace is broken in two. It times
+net extraction over the whole board and the spacing check of one layer with
+the board's nets.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_connectivity [traces per layer] [layers]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.connectivity import extract_nets
+from agents.cam_gerber_analyzer.engine.drc import check_spacing
+from agents.cam_gerber_analyzer.engine.drill import DrillHoles
+from agents.cam_gerber_analyzer.engine.geometry import (
+    APERTURE_DTYPE, ARC_DTYPE, PRIMITIVE_DTYPE, REGION_DTYPE, SHAPE_CIRCLE, LayerGeometry,
+)
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import DARK
+
+
+def synthetic_layer(traces: int) -> LayerGeometry:
+    """Traces ending in via pads, every tenth cut in the middle."""
+    columns = max(int(np.sqrt(traces / 10)), 1)
+    n = np.arange(traces)
+    x = (n % columns) * 12.0
+    y = (n // columns) * 1.0
+    cut = n % 10 == 0
+
+    lines = np.zeros(traces + int(cut.sum()), dtype=PRIMITIVE_DTYPE)
+    lines['polarity'] = DARK
+    lines['aperture_id'] = 10
+    lines['x0'][:traces], lines['y0'][:traces] = x, y
+    lines['x1'][:traces], lines['y1'][:traces] = np.where(cut, x + 4.0, x + 10.0), y
+    lines['x0'][traces:], lines['x1'][traces:] = x[cut] + 6.0, x[cut] + 10.0
+    lines['y0'][traces:] = lines['y1'][traces:] = y[cut]
+
+    flashes = np.zeros(traces, dtype=PRIMITIVE_DTYPE)
+    flashes['polarity'] = DARK
+    flashes['aperture_id'] = 11
+    flashes['x0'] = flashes['x1'] = x + 10.0
+    flashes['y0'] = flashes['y1'] = y
+
+    apertures = np.zeros(2, dtype=APERTURE_DTYPE)
+    apertures['id'] = (10, 11)
+    apertures['shape'] = SHAPE_CIRCLE
+    apertures['width'] = apertures['height'] = (0.15, 0.6)
+    return LayerGeometry(lines=lines, arcs=np.zeros(0, ARC_DTYPE), flashes=flashes,
+                         regions=np.zeros(0, REGION_DTYPE), apertures=apertures)
+
+
+def main():
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 250000
+    layers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    layer = synthetic_layer(traces)
+    copper = {f"inner_layer_{k + 1}": layer for k in range(layers)}
+    drills = DrillHoles(holes=np.column_stack([layer.flashes['x0'], layer.flashes['y0'], np.ones(traces)]),
+                        tools=np.array([[1, 0.3]]))
+    features = layers * (len(layer.lines) + len(layer.flashes))
+    print(f"{layers} layers, {features} features, {traces} drill hits\n")
+
+    start = time.perf_counter()
+    nets = extract_nets(copper, [drills])
+    extract = time.perf_counter() - start
+
+    start = time.perf_counter()
+    violations = check_spacing(layer, 0.1, nets.features["inner_layer_1"])
+    spacing = time.perf_counter() - start
+
+    print(f"{'extract nets':<45} {extract * 1000:8.0f} ms")
+    print(f"{'spacing check with board nets':<45} {spacing * 1000:8.0f} ms")
+    print()
+    summary = nets.summary()
+    print(f"{'nets':<45} {summary['net_count']:8d}")
+    print(f"{'nets on several layers':<45} {summary['multilayer_nets']:8d}")
+    print(f"{'spacing violations':<45} {len(violations):8d}")
+
+
+if __name__ == '__main__':
+    main()
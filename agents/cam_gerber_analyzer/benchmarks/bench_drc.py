@@ -0,0 +1,161 @@
+"""Benchmark the design-rule checks on a synthetic dense board side.
+
+Builds the geometry arrays of a copper layer and its solder mask directly:
+rows of 0.15 mm traces on a 1 mm pitch ending in 0.6 mm via pads, with one
+drill hit per via. About one in a thousand traces, vias and mask openings
+break a rule. It then times every check, drill-to-pad registration of the
+hits on ten copper layers and the issue conversion, and saves the issues to
+a temporary database in one batch and one by one.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_drc [traces]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.drc import (
+    Board, MAX_ISSUES_PER_RULE, check_annular_rings, check_drill_sizes, check_solder_mask_clearance,
+    check_spacing, check_trace_widths, violation_issues,
+)
+from agents.cam_gerber_analyzer.engine.drill import DrillHoles
+from agents.cam_gerber_analyzer.engine.geometry import (
+    APERTURE_DTYPE, ARC_DTYPE, PRIMITIVE_DTYPE, REGION_DTYPE, SHAPE_CIRCLE, LayerGeometry,
+)
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import DARK
+from agents.cam_gerber_analyzer.engine.registration import register_drills
+from agents.cam_gerber_analyzer.models import AnalysisIssue
+
+RULES = {
+    "min_trace_width": 0.1,
+    "min_spacing": 0.1,
+    "min_annular_ring": 0.05,
+    "min_drill_size": 0.15,
+    "min_solder_mask_clearance": 0.05,
+}
+
+
+def _apertures(sizes):
+    apertures = np.zeros(len(sizes), dtype=APERTURE_DTYPE)
+    apertures['id'] = np.arange(10, 10 + len(sizes))
+    apertures['shape'] = SHAPE_CIRCLE
+    apertures['width'] = apertures['height'] = sizes
+    return apertures
+
+
+def _primitives(count):
+    primitives = np.zeros(count, dtype=PRIMITIVE_DTYPE)
+    primitives['polarity'] = DARK
+    return primitives
+
+
+def _layer(lines, flashes, apertures):
+    return LayerGeometry(lines=lines, arcs=np.zeros(0, ARC_DTYPE), flashes=flashes,
+                         regions=np.zeros(0, REGION_DTYPE), apertures=apertures)
+
+
+def synthetic_board(traces: int, seed: int = 1):
+    """Copper, mask and drills with planted violations of every rule."""
+    rng = np.random.default_rng(seed)
+    columns = max(int(np.sqrt(traces / 10)), 1)
+    n = np.arange(traces)
+    x = (n % columns) * 12.0
+    y = (n // columns) * 1.0
+    bad = np.flatnonzero(rng.random(traces) < 0.001)
+
+    # D10 0.15 mm traces, D11 0.08 mm traces; bad traces get a 0.15 mm stub of
+    # another net 0.05 mm below the trace
+    lines = _primitives(traces + len(bad))
+    lines['x0'][:traces], lines['y0'][:traces] = x, y
+    lines['x1'][:traces], lines['y1'][:traces] = x + 10.0, y
+    lines['aperture_id'] = 10
+    lines['aperture_id'][bad] = 11
+    stubs = lines[traces:]
+    stubs['x0'], stubs['x1'] = x[bad] + 2.0, x[bad] + 4.0
+    stubs['y0'] = stubs['y1'] = y[bad] - 0.2
+
+    # D12 0.6 mm via pads at the trace ends
+    flashes = _primitives(traces)
+    flashes['x0'] = flashes['x1'] = x + 10.0
+    flashes['y0'] = flashes['y1'] = y
+    flashes['aperture_id'] = 12
+    copper = _layer(lines, flashes, _apertures([0.15, 0.08, 0.6]))
+
+    # 0.3 mm drills; 0.12 mm off centre at bad traces, 0.1 mm at the next via
+    holes = np.column_stack([flashes['x0'], flashes['y0'], np.ones(traces)])
+    holes[bad, 0] += 0.12
+    holes[(bad + 1) % traces, 2] = 2
+    drills = DrillHoles(holes=holes, tools=np.array([[1, 0.3], [2, 0.1]]))
+
+    # 0.8 mm mask openings, 0.62 mm two vias after a bad trace
+    openings = flashes.copy()
+    openings['aperture_id'] = 10
+    openings['aperture_id'][(bad + 2) % traces] = 11
+    mask = _layer(_primitives(0), openings, _apertures([0.8, 0.62]))
+    return Board(copper={"copper_top": copper}, masks={"copper_top": mask}, drills={"drill": drills})
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    traces = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    board = synthetic_board(traces)
+    copper, mask, drills = board.copper["copper_top"], board.masks["copper_top"], board.drills["drill"]
+    print(f"{traces} traces, {len(copper.flashes)} pads, {len(drills.holes)} drill hits\n")
+
+    checks = [
+        ("trace width", check_trace_widths, (copper, RULES["min_trace_width"])),
+        ("copper spacing", check_spacing, (copper, RULES["min_spacing"])),
+        ("annular ring", check_annular_rings, (copper, drills, RULES["min_annular_ring"])),
+        ("drill size", check_drill_sizes, (drills, RULES["min_drill_size"])),
+        ("solder mask clearance", check_solder_mask_clearance, (copper, mask, RULES["min_solder_mask_clearance"])),
+    ]
+    violations = []
+    for name, check, args in checks:
+        found, seconds = timed(check, *args)
+        violations.append(found)
+        print(f"{name:<45} {seconds * 1000:8.0f} ms  {len(found):6d} violations")
+
+    def register_layers(layers):
+        return [register_drills(copper, drills).summary(RULES["min_annular_ring"]) for _ in range(layers)]
+
+    _, seconds = timed(register_layers, 10)
+    print(f"{'drill registration, 10 layers':<45} {seconds * 1000:8.0f} ms")
+
+    violations = np.concatenate(violations)
+    issues, seconds = timed(violation_issues, "copper_top", violations, None)
+    print(f"{'violation_issues (all)':<45} {seconds * 1000:8.0f} ms  {len(issues):6d} issues")
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db = CamGerberDatabase(os.path.join(temp_dir, 'bench.db'))
+        analysis_id = db.create_analysis("bench")
+        rows = [AnalysisIssue(analysis_id=analysis_id, **issue) for issue in issues]
+        _, batch = timed(db.save_analysis_issues, rows)
+        start = time.perf_counter()
+        for row in rows:
+            db.save_analysis_issue(row)
+        single = time.perf_counter() - start
+        print(f"{'save_analysis_issues (one batch)':<45} {batch * 1000:8.0f} ms")
+        print(f"{'save_analysis_issue (one by one)':<45} {single * 1000:8.0f} ms")
+        print(f"\nperform_cam_analysis lists at most {MAX_ISSUES_PER_RULE} issues per rule and layer")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark the Excellon decoder on a synthetic drill file.
+
+Writes a drill file with the requested number of hits spread over several
+tools, with some G85 slots, then reports single-core throughput of
+read_excellon.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_drill [hits]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.drill import read_excellon
+
+HEADER = (
+    b"M48\n; Synthetic drill file\nMETRIC,LZ,000.000\nFMAT,2\n"
+    b"T01C0.200\nT02C0.300\nT03C0.800\nT04C1.000\nT05C3.200\n%\nG90\nG05\n"
+)
+
+
+def write_drill(file_path: str, hits: int, seed: int = 1) -> int:
+    """Write a synthetic drill file with about the given number of hits; return its size."""
+    rng = random.Random(seed)
+    per_tool = hits // 5
+    with open(file_path, 'wb') as f:
+        f.write(HEADER)
+        for tool in range(1, 6):
+            f.write(b"T%02d\n" % tool)
+            lines = []
+            for _ in range(per_tool):
+                x, y = rng.randrange(300000), rng.randrange(200000)
+                if rng.random() < 0.01:
+                    lines.append(b"X%06dY%06dG85X%06dY%06d\n" % (x, y, x + 2000, y))
+                elif rng.random() < 0.3:
+                    lines.append(b"X%06d\n" % x)
+                else:
+                    lines.append(b"X%06dY%06d\n" % (x, y))
+            f.write(b"".join(lines))
+        f.write(b"M30\n")
+    return os.path.getsize(file_path)
+
+
+def main():
+    hits = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'board.drl')
+        size = write_drill(file_path, hits)
+        print(f"{size / 1e6:.1f} MB synthetic drill file\n")
+
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            drills, _ = read_excellon(file_path)
+            best = min(best, time.perf_counter() - start)
+        decoded = len(drills.holes) + len(drills.slots)
+
+        print(f"{'read_excellon':<45} {best * 1000:8.0f} ms  {decoded / 1e6 / best:6.2f} M hits/s")
+        print(f"{'hits':<45} {len(drills.holes):8d}")
+        print(f"{'slots':<45} {len(drills.slots):8d}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark building, storing and reloading array geometry of a copper layer.
+
+Reports build time and the memory the arrays hold, compared with one Python
+dict per primitive. It then times a cold and a warm layer cache lookup; the
+warm lookup memory-maps the .npy files.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_geometry [megabytes]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.benchmarks.bench_tokenizer import write_layer
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.geometry import LayerGeometry, build_geometry, load_geometries
+from agents.cam_gerber_analyzer.layer_cache import get_layer_cache
+
+
+def dict_bytes(primitives, sample: int = 100000) -> int:
+    """Estimated memory of the primitives as one Python dict each."""
+    sample = primitives[:sample]
+    tracemalloc.start()
+    objects = [dict(zip(sample.dtype.names, row)) for row in sample.tolist()]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size * len(primitives) // max(len(sample), 1)
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    temp_dir = tempfile.mkdtemp()
+    original_cache = AGENT_CONFIG["layer_cache"]
+    try:
+        file_path = os.path.join(temp_dir, 'copper_top.gbr')
+        size = write_layer(file_path, megabytes)
+        print(f"{size / 1e6:.1f} MB synthetic copper layer\n")
+
+        start = time.perf_counter()
+        geometry = build_geometry(file_path)
+        build = time.perf_counter() - start
+        primitives = sum(len(getattr(geometry, name)) for name in ('lines', 'arcs', 'flashes', 'regions'))
+        objects = sum(dict_bytes(getattr(geometry, name)) for name in ('lines', 'arcs', 'flashes', 'regions'))
+
+        AGENT_CONFIG["layer_cache"] = {"path": os.path.join(temp_dir, 'cache')}
+        start = time.perf_counter()
+        load_geometries([file_path])
+        cold = time.perf_counter() - start
+        get_layer_cache().clear()
+        start = time.perf_counter()
+        result, = load_geometries([file_path])
+        warm = time.perf_counter() - start
+        LayerGeometry.from_result(result)
+
+        print(f"{'build_geometry':<45} {build * 1000:8.0f} ms  {size / 1e6 / build:6.1f} MB/s")
+        print(f"{'primitives':<45} {primitives:8d}")
+        print(f"{'array memory':<45} {geometry.nbytes / 1e6:8.1f} MB")
+        print(f"{'as Python dicts (estimated)':<45} {objects / 1e6:8.1f} MB")
+        print(f"{'layer cache, cold (build + save)':<45} {cold * 1000:8.0f} ms")
+        print(f"{'layer cache, warm disk tier (hash + mmap)':<45} {warm * 1000:8.0f} ms")
+    finally:
+        AGENT_CONFIG["layer_cache"] = original_cache
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
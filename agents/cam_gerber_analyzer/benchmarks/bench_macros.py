@@ -0,0 +1,85 @@
+"""Benchmark macro flashes on a synthetic layer of rounded-rectangle pads.
+
+Writes a layer of KiCad RoundRect pads in a few sizes and times
+build_geometry, which evaluates each macro instance once and translates the
+templates to the flashes, against evaluating the macro once per flash
+(what an interpreter without the cache does).
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_macros [flashes]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.engine.macros import macro_template
+
+ROUND_RECT = (
+    b"%AMRoundRect*\n0 Rectangle with rounded corners*\n4,1,4,$2,$3,$4,$5,$6,$7,$8,$9,$2,$3,0*\n"
+    b"1,1,$1+$1,$2,$3*\n1,1,$1+$1,$4,$5*\n1,1,$1+$1,$6,$7*\n1,1,$1+$1,$8,$9*\n"
+    b"20,1,$1+$1,$2,$3,$4,$5,0*\n20,1,$1+$1,$4,$5,$6,$7,0*\n20,1,$1+$1,$6,$7,$8,$9,0*\n"
+    b"20,1,$1+$1,$8,$9,$2,$3,0*%\n"
+)
+
+# Pad sizes (half width, half height, corner radius) in mm
+PADS = ((0.5, 0.3, 0.1), (0.8, 0.4, 0.15), (1.2, 0.6, 0.25), (0.3, 0.9, 0.1))
+
+
+def write_layer(file_path: str, flashes: int):
+    """Write a layer of RoundRect flashes on a 2.5 mm grid."""
+    lines = [b"%FSLAX46Y46*%\n%MOMM*%\n", ROUND_RECT]
+    for code, (w, h, r) in enumerate(PADS, start=10):
+        corners = (-w + r, -h + r, w - r, -h + r, w - r, h - r, -w + r, h - r)
+        lines.append(b"%%ADD%dRoundRect,%f%s*%%\n" % (code, r, b"".join(b"X%f" % c for c in corners)))
+    columns = int(np.sqrt(flashes)) + 1
+    for n in range(flashes):
+        if n % 100 == 0:
+            lines.append(b"D%d*\n" % (10 + (n // 100) % len(PADS)))
+        lines.append(b"X%dY%dD03*\n" % ((n % columns) * 2500000, (n // columns) * 2500000))
+    lines.append(b"M02*\n")
+    with open(file_path, 'wb') as f:
+        f.write(b"".join(lines))
+
+
+def main():
+    flashes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'pads.gbr')
+        write_layer(file_path, flashes)
+        body = ROUND_RECT[len(b"%AMRoundRect*"):-2].decode()
+        params = [
+            (r,) + (-w + r, -h + r, w - r, -h + r, w - r, h - r, -w + r, h - r) for w, h, r in PADS
+        ]
+
+        macro_template.cache_clear()
+        start = time.perf_counter()
+        geometry = build_geometry(file_path)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for n in range(flashes):
+            macro_template.__wrapped__(body, params[(n // 100) % len(PADS)])
+        per_flash = time.perf_counter() - start
+
+        print(f"{flashes} macro flashes, {len(PADS)} distinct pads\n")
+        print(f"{'build geometry (templates cached)':<45} {built * 1000:8.0f} ms")
+        print(f"{'evaluate the macro per flash':<45} {per_flash * 1000:8.0f} ms")
+        print(f"{'region edges':<45} {len(geometry.regions):8d}")
+        print(f"{'templates evaluated':<45} {macro_template.cache_info().misses:8d}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark step-and-repeat panels against panels with every board drawn out.
+
+Writes one synthetic board (a ground ring around a grid of short 0.2 mm
+traces, each with a pad beside it) twice as a panel: once as a %SR block,
+once with the board's commands repeated at every step. It times building
+the geometry and the spacing checks, and compares the memory held: the %SR
+panel keeps one board and checks it once, placing copies only for the
+copper near the board's edge.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_panel [columns] [rows]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.drc import check_panel_spacing, check_spacing
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+
+# Board size and the gap between boards in mm
+BOARD = 50.0
+GAP = 2.0
+MIN_SPACING = 0.1
+
+
+def board_commands(dx: float = 0.0, dy: float = 0.0) -> bytes:
+    """One board, moved by (dx, dy) mm: a ring 0.5 mm inside its edge and 1 x 0.5 mm cells inside."""
+    um = lambda value: int(round(value * 1e6))
+    low, high = 0.5, BOARD - 0.5
+    lines = [b"D10*\nX%dY%dD02*\n" % (um(dx + low), um(dy + low))]
+    for x, y in ((high, low), (high, high), (low, high), (low, low)):
+        lines.append(b"X%dY%dD01*\n" % (um(dx + x), um(dy + y)))
+    for row in range(int((BOARD - 3) / 0.5)):
+        for column in range(int(BOARD - 3)):
+            x, y = dx + 1 + column, dy + 1 + row * 0.5
+            lines.append(b"D10*\nX%dY%dD02*\nX%dY%dD01*\nD11*\nX%dY%dD03*\n"
+                         % (um(x + 0.1), um(y), um(x + 0.4), um(y), um(x + 0.75), um(y)))
+    return b"".join(lines)
+
+
+def write_panel(file_path: str, columns: int, rows: int, step_repeat: bool) -> int:
+    """Write the panel, as a %SR block or drawn out; returns the file size."""
+    step = BOARD + GAP
+    content = [b"%FSLAX46Y46*%\n%MOMM*%\n%ADD10C,0.2*%\n%ADD11C,0.2*%\n"]
+    if step_repeat:
+        content.append(b"%%SRX%dY%dI%fJ%f*%%\n" % (columns, rows, step, step))
+        content.append(board_commands())
+        content.append(b"%SR*%\n")
+    else:
+        for row in range(rows):
+            for column in range(columns):
+                content.append(board_commands(column * step, row * step))
+    content.append(b"M02*\n")
+    content = b"".join(content)
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    return len(content)
+
+
+def timed(function, *args):
+    """Result and seconds of one call."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    columns = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    temp_dir = tempfile.mkdtemp()
+    try:
+        stepped_path = os.path.join(temp_dir, 'stepped.gbr')
+        flat_path = os.path.join(temp_dir, 'flat.gbr')
+        stepped_size = write_panel(stepped_path, columns, rows, True)
+        flat_size = write_panel(flat_path, columns, rows, False)
+        print(f"{columns} x {rows} boards; files {stepped_size / 1e6:.1f} MB "
+              f"(%SR) and {flat_size / 1e6:.1f} MB (drawn out)\n")
+
+        stepped, stepped_build = timed(build_geometry, stepped_path)
+        flat, flat_build = timed(build_geometry, flat_path)
+        board_violations, board_check = timed(check_spacing, stepped, MIN_SPACING)
+        panel_violations, panel_check = timed(check_panel_spacing, stepped, MIN_SPACING)
+        flat_violations, flat_check = timed(check_spacing, flat, MIN_SPACING)
+
+        print(f"{'':<40} {'%SR':>12} {'drawn out':>12}")
+        print(f"{'build geometry':<40} {stepped_build * 1000:9.0f} ms {flat_build * 1000:9.0f} ms")
+        print(f"{'geometry memory':<40} {stepped.nbytes / 1e6:9.2f} MB {flat.nbytes / 1e6:9.2f} MB")
+        print(f"{'primitives drawn':<40} {sum(stepped.primitive_counts().values()):12d} "
+              f"{sum(flat.primitive_counts().values()):12d}")
+        print(f"{'spacing, one board / whole panel':<40} {board_check * 1000:9.0f} ms {flat_check * 1000:9.0f} ms")
+        print(f"{'spacing between boards':<40} {panel_check * 1000:9.0f} ms")
+        print(f"{'violations':<40} {len(board_violations) + len(panel_violations):12d} "
+              f"{len(flat_violations):12d}")
+        print(f"{'panel bounds':<40} {stepped.panel_bounds == flat.bounds!s:>12}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
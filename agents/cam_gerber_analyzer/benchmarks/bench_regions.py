@@ -0,0 +1,164 @@
+"""Benchmark region arcs and polarity on a pour-heavy synthetic layer.
+
+Writes a grid of copper pours, each a G36 region with rounded (G03) corners,
+cut by a round clearance in clear polarity (%LPC) with a dark pad flashed
+back into it (%LPD), so the layer alternates polarity twice per pour. It
+times building the geometry, the NumPy arc flattening against flattening
+one arc at a time in Python, and copper area and tile rendering, and
+checks the copper area against the exact one. Ignoring the drawing order
+(all dark, then all clear) loses the pads; that area is shown too.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_regions [pours]
+"""
+
+import math
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.copper_area import copper_coverage
+from agents.cam_gerber_analyzer.engine.geometry import (
+    CHORD_TOLERANCE, ARC_STEP, LayerGeometry, _arcs, build_geometry, flatten_arcs,
+)
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import (
+    LINEAR, OP_INTERPOLATE, GerberTokenizer, iter_batches,
+)
+from agents.cam_gerber_analyzer.engine.raster import LayerRaster, Pyramid
+
+# Pour side, corner radius, clearance radius and pad diameter in mm
+PITCH = 10.0
+SIDE = 9.0
+CORNER = 1.0
+CLEARANCE = 1.5
+PAD = 1.5
+
+
+def write_layer(file_path: str, pours: int) -> int:
+    """Write a grid of pours with clearances and pads; returns the file size."""
+    columns = int(math.sqrt(pours)) or 1
+    um = lambda value: int(round(value * 1e6))
+    lines = [b"%FSLAX46Y46*%\n%MOMM*%\n%ADD10C," + b"%f" % PAD + b"*%\nG75*\n"]
+    for n in range(pours):
+        x, y = (n % columns) * PITCH, (n // columns) * PITCH
+        x1, y1 = x + SIDE, y + SIDE
+        lines.append(b"%%LPD*%%\nG36*\nX%dY%dD02*\n" % (um(x + CORNER), um(y)))
+        for (sx, sy), (ex, ey), (ci, cj) in (
+            ((x1 - CORNER, y), (x1, y + CORNER), (0, CORNER)),
+            ((x1, y1 - CORNER), (x1 - CORNER, y1), (-CORNER, 0)),
+            ((x + CORNER, y1), (x, y1 - CORNER), (0, -CORNER)),
+            ((x, y + CORNER), (x + CORNER, y), (CORNER, 0)),
+        ):
+            lines.append(b"G01X%dY%dD01*\nG03X%dY%dI%dJ%dD01*\n"
+                         % (um(sx), um(sy), um(ex), um(ey), um(ci), um(cj)))
+        cx, cy = x + SIDE / 2, y + SIDE / 2
+        lines.append(b"G37*\n%%LPC*%%\nG36*\nX%dY%dD02*\nG03X%dY%dI%dJ0D01*\nX%dY%dI%dJ0D01*\nG37*\n"
+                     % (um(cx + CLEARANCE), um(cy), um(cx - CLEARANCE), um(cy), um(-CLEARANCE),
+                        um(cx + CLEARANCE), um(cy), um(CLEARANCE)))
+        lines.append(b"%%LPD*%%\nD10*\nX%dY%dD03*\n" % (um(cx), um(cy)))
+    lines.append(b"M02*\n")
+    content = b"".join(lines)
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    return len(content)
+
+
+def region_arcs(file_path: str) -> np.ndarray:
+    """The G02/G03 edges of the layer's regions as arcs."""
+    tokenizer = GerberTokenizer()
+    parts = []
+    with open(file_path, 'rb') as f:
+        for batch in iter_batches(f, tokenizer):
+            curved = ((batch['op'] == OP_INTERPOLATE) & (batch['region'] >= 0)
+                      & (batch['interpolation'] != LINEAR))
+            parts.append(_arcs(batch[curved]))
+    return np.concatenate(parts)
+
+
+def flatten_one_by_one(arcs: np.ndarray) -> int:
+    """Flatten arcs in a Python loop with the same chord rule; returns the chord count."""
+    chords = 0
+    for x0, y0, x1, y1, _, _, cx, cy, clockwise in arcs.tolist():
+        radius = math.hypot(x0 - cx, y0 - cy)
+        start = math.atan2(y0 - cy, x0 - cx)
+        end = math.atan2(y1 - cy, x1 - cx)
+        sweep = -((start - end) % (2 * math.pi)) if clockwise else (end - start) % (2 * math.pi)
+        if (x0, y0) == (x1, y1):
+            sweep = -2 * math.pi if clockwise else 2 * math.pi
+        step = min(ARC_STEP, 2 * math.acos(max(-1.0, 1 - CHORD_TOLERANCE / radius)))
+        count = max(math.ceil(abs(sweep) / step), 1)
+        points = []
+        for k in range(count + 1):
+            angle = start + sweep * k / count
+            points.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+        chords += len(points) - 1
+    return chords
+
+
+def main():
+    pours = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'pours.gbr')
+        size = write_layer(file_path, pours)
+        print(f"{pours} pours, {size / 1e6:.1f} MB\n")
+
+        start = time.perf_counter()
+        geometry = build_geometry(file_path)
+        built = time.perf_counter() - start
+
+        arcs = region_arcs(file_path)
+        start = time.perf_counter()
+        chords = len(flatten_arcs(arcs)[0])
+        vectorized = time.perf_counter() - start
+        start = time.perf_counter()
+        flatten_one_by_one(arcs)
+        looped = time.perf_counter() - start
+
+        bounds = geometry.bounds
+        expected = pours * (SIDE ** 2 - (4 - math.pi) * CORNER ** 2
+                            - math.pi * CLEARANCE ** 2 + math.pi * (PAD / 2) ** 2)
+        start = time.perf_counter()
+        coverage = copper_coverage(geometry, bounds, pixel_mm=0.05)
+        covered = time.perf_counter() - start
+
+        # The same layer with every clear shape erased last
+        unordered = LayerGeometry(**{name: getattr(geometry, name) for name in LayerGeometry.ARRAYS
+                                     if name != 'levels'})
+        start = time.perf_counter()
+        unordered_coverage = copper_coverage(unordered, bounds, pixel_mm=0.05)
+        unordered_time = time.perf_counter() - start
+
+        raster = LayerRaster(geometry)
+        pyramid = Pyramid.covering(bounds, min_pixel_mm=0.01)
+        zoom = min(3, pyramid.max_zoom)
+        start = time.perf_counter()
+        for x in range(1 << zoom):
+            for y in range(1 << zoom):
+                raster.render_tile(pyramid, zoom, x, y)
+        tiles = time.perf_counter() - start
+
+        print(f"{'build geometry':<45} {built * 1000:8.0f} ms")
+        print(f"{'region arcs / chords':<45} {len(arcs):8d} / {chords}")
+        print(f"{'polarity levels':<45} {len(geometry.levels):8d}")
+        print(f"{'flatten arcs, NumPy':<45} {vectorized * 1000:8.1f} ms")
+        print(f"{'flatten arcs, one at a time':<45} {looped * 1000:8.1f} ms")
+        print(f"{'copper area, drawing order (0.05 mm)':<45} {covered * 1000:8.0f} ms"
+              f"  {coverage.area:10.1f} mm² (exact {expected:.1f})")
+        print(f"{'copper area, clear erased last':<45} {unordered_time * 1000:8.0f} ms"
+              f"  {unordered_coverage.area:10.1f} mm²")
+        print(f"{f'render {1 << 2 * zoom} tiles at zoom {zoom}':<45} {tiles * 1000:8.0f} ms")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
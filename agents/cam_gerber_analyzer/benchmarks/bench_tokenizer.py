@@ -0,0 +1,81 @@
+"""Benchmark the streaming RS-274X tokenizer on a synthetic copper layer.
+
+Writes a Gerber file of the requested size with traces, arcs, pad flashes and
+regions, then reports single-core throughput of scan_gerber.
+
+Usage:
+    python -m agents.cam_gerber_analyzer.benchmarks.bench_tokenizer [megabytes]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import scan_gerber, summarize
+
+HEADER = (
+    b"G04 Synthetic copper layer*\n%FSLAX46Y46*%\n%MOMM*%\n"
+    b"%ADD10C,0.150000*%\n%ADD11C,0.250000*%\n%ADD12R,1.200000X0.600000*%\n%ADD13O,1.000000X1.800000*%\n"
+    b"G01*\n"
+)
+
+
+def write_layer(file_path: str, megabytes: int, seed: int = 1) -> int:
+    """Write a synthetic layer of roughly the given size; return its size."""
+    rng = random.Random(seed)
+    target = megabytes * 1024 * 1024
+    with open(file_path, 'wb') as f:
+        f.write(HEADER)
+        written = len(HEADER)
+        while written < target:
+            lines = []
+            for _ in range(1000):
+                x, y = rng.randrange(300000000), rng.randrange(200000000)
+                kind = rng.random()
+                if kind < 0.6:
+                    lines.append(b"D10*\nX%dY%dD02*\nX%dD01*\nY%dD01*\n" % (x, y, x + 2540000, y + 1270000))
+                elif kind < 0.7:
+                    lines.append(b"G75*\nG02X%dY%dI%dJ0D01*\nG01*\n" % (x, y, rng.randrange(1000000)))
+                elif kind < 0.95:
+                    lines.append(b"D%d*\nX%dY%dD03*\n" % (rng.choice((12, 13)), x, y))
+                else:
+                    lines.append(b"G36*\nX%dY%dD02*\nX%dD01*\nY%dD01*\nX%dD01*\nG37*\n"
+                                 % (x, y, x + 5000000, y + 5000000, x))
+            chunk = b"".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+        f.write(b"M02*\n")
+    return os.path.getsize(file_path)
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, 'copper_top.gbr')
+        size = write_layer(file_path, megabytes)
+        print(f"{size / 1e6:.1f} MB synthetic copper layer\n")
+
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            tokenizer = scan_gerber(file_path)
+            best = min(best, time.perf_counter() - start)
+        summary = summarize(tokenizer)
+
+        print(f"{'scan_gerber':<45} {best * 1000:8.0f} ms  {size / 1e6 / best:6.1f} MB/s")
+        print(f"{'operations':<45} {summary['draw_commands']:8d}")
+        print(f"{'board size (mm)':<45} {summary['width']:.1f} x {summary['height']:.1f}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
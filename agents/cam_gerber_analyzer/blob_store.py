@@ -0,0 +1,229 @@
+"""Content-addressed store of uploaded design files.
+
+Customers upload the same Gerber set again and again while iterating on a
+quote. Each file is kept once per content, at <root>/<aa>/<bb>/<sha256>
+(the first two byte pairs of the digest as directories), and every
+design_files row references its blob by path and digest. Because the layer
+cache is keyed by the same digest, a re-uploaded file finds its earlier
+parse results and is not parsed again.
+
+The database keeps a reference count per blob (the blobs table): saving a
+design file takes a reference, deleting its analysis releases it. The
+garbage collector removes blobs with no references. An upload that links an
+existing blob touches it, and blobs changed within the grace period are
+never collected, so a blob cannot be removed between being linked and its
+design file being saved.
+
+Uploads are first written to a staging directory inside the store and then
+renamed into place, so a blob is either complete or absent.
+
+Delete analyses, collect garbage or report disk use from the command line:
+    python -m agents.cam_gerber_analyzer.blob_store delete <analysis_id> [...]
+    python -m agents.cam_gerber_analyzer.blob_store gc
+    python -m agents.cam_gerber_analyzer.blob_store usage
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .layer_cache import get_layer_cache
+
+DEFAULT_QUOTA_MB = 20480
+
+DEFAULT_GC_GRACE_SECONDS = 3600
+
+_STAGING = 'staging'
+
+
+class BlobStore:
+    """Directory of files named by their SHA-256."""
+
+    def __init__(self, root: str):
+        """Initialize the store.
+
+        Args:
+            root: Directory of the store, created if missing
+        """
+        self.root = os.path.abspath(root)
+        os.makedirs(os.path.join(self.root, _STAGING), exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        """Path of the blob with the given hex SHA-256."""
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    @contextmanager
+    def staging(self) -> Iterator[str]:
+        """Temporary directory for files about to be added, removed on exit."""
+        directory = tempfile.mkdtemp(dir=os.path.join(self.root, _STAGING))
+        try:
+            yield directory
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def add(self, staged_path: str, digest: str) -> Tuple[str, bool]:
+        """Move a staged file into the store, unless its content is already there.
+
+        Args:
+            staged_path: File in a staging() directory
+            digest: Hex SHA-256 of its content
+
+        Returns:
+            (blob path, True if an existing blob was linked instead)
+        """
+        path = self.path(digest)
+        if os.path.exists(path):
+            os.unlink(staged_path)
+            # Fresh modification time: protected from collection until referenced
+            os.utime(path)
+            existing = True
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(staged_path, path)
+            existing = False
+        get_layer_cache().remember_digest(path, digest)
+        return path, existing
+
+    def blobs(self) -> Iterator[Tuple[str, str]]:
+        """(digest, path) of every blob in the store."""
+        for first in os.listdir(self.root):
+            if len(first) != 2:
+                continue
+            for directory, _, filenames in os.walk(os.path.join(self.root, first)):
+                for filename in filenames:
+                    if filename.startswith(first):
+                        yield filename, os.path.join(directory, filename)
+
+    def collect_garbage(self, db=None, grace_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Remove blobs no design file references, and abandoned staging directories.
+
+        Args:
+            db: CamGerberDatabase; by default the configured one
+            grace_seconds: Age below which nothing is removed; by default from AGENT_CONFIG
+
+        Returns:
+            Dictionary with removed_blobs, freed_bytes and kept_blobs
+        """
+        from .database import CamGerberDatabase
+
+        db = db or CamGerberDatabase()
+        if grace_seconds is None:
+            grace_seconds = store_settings().get("gc_grace_seconds", DEFAULT_GC_GRACE_SECONDS)
+        cutoff = time.time() - grace_seconds
+        references = db.get_blob_references()
+
+        removed, freed, kept = [], 0, 0
+        for digest, path in list(self.blobs()):
+            stat = os.stat(path)
+            if references.get(digest, 0) > 0 or stat.st_mtime > cutoff:
+                kept += 1
+                continue
+            os.unlink(path)
+            removed.append(digest)
+            freed += stat.st_size
+        db.forget_blobs(removed)
+
+        staging = os.path.join(self.root, _STAGING)
+        for name in os.listdir(staging):
+            directory = os.path.join(staging, name)
+            if os.path.getmtime(directory) < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        return {
+            "removed_blobs": len(removed),
+            "freed_bytes": freed,
+            "kept_blobs": kept,
+        }
+
+    def usage(self, db=None, quota_mb: Optional[float] = None) -> Dict[str, Any]:
+        """Report disk use of the store against its quota.
+
+        Stored bytes are what the blobs occupy; logical bytes what the design
+        files referencing them would occupy without deduplication.
+
+        Args:
+            db: CamGerberDatabase; by default the configured one
+            quota_mb: Quota; by default from AGENT_CONFIG
+
+        Returns:
+            Usage dictionary
+        """
+        from .database import CamGerberDatabase
+
+        db = db or CamGerberDatabase()
+        if quota_mb is None:
+            quota_mb = store_settings().get("quota_mb", DEFAULT_QUOTA_MB)
+        references = db.get_blob_references()
+
+        blobs = stored = logical = unreferenced = unreferenced_bytes = 0
+        for digest, path in self.blobs():
+            size = os.path.getsize(path)
+            count = references.get(digest, 0)
+            blobs += 1
+            stored += size
+            logical += size * count
+            if count <= 0:
+                unreferenced += 1
+                unreferenced_bytes += size
+
+        quota = int(quota_mb * 1024 * 1024)
+        return {
+            "blobs": blobs,
+            "stored_bytes": stored,
+            "logical_bytes": logical,
+            "deduplicated_bytes": max(logical - (stored - unreferenced_bytes), 0),
+            "unreferenced_blobs": unreferenced,
+            "unreferenced_bytes": unreferenced_bytes,
+            "quota_bytes": quota,
+            "quota_used_percent": round(100.0 * stored / quota, 2) if quota else None,
+            "over_quota": bool(quota) and stored > quota,
+        }
+
+
+def store_settings() -> Dict[str, Any]:
+    """Upload store settings from AGENT_CONFIG."""
+    from .config import AGENT_CONFIG
+
+    return AGENT_CONFIG.get("upload_store", {})
+
+
+def get_blob_store() -> BlobStore:
+    """Get the upload store at the directory in AGENT_CONFIG."""
+    from .config import AGENT_CONFIG
+
+    root = store_settings().get("path") or os.path.join(AGENT_CONFIG["upload_directory"], "store")
+    return BlobStore(root)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a store command against the configured database and store; returns the exit status."""
+    from .database import CamGerberDatabase
+
+    argv = sys.argv[1:] if argv is None else argv
+    command, arguments = (argv[0], argv[1:]) if argv else (None, [])
+    if command == 'delete' and arguments and all(argument.isdigit() for argument in arguments):
+        db = CamGerberDatabase()
+        for analysis_id in map(int, arguments):
+            if db.get_analysis(analysis_id) is None:
+                print(f"Analysis {analysis_id} not found")
+                continue
+            print(f"Deleted analysis {analysis_id} with {db.delete_analysis(analysis_id)} design files")
+        return 0
+    if command == 'gc' and not arguments:
+        print(json.dumps(get_blob_store().collect_garbage(), indent=2))
+        return 0
+    if command == 'usage' and not arguments:
+        print(json.dumps(get_blob_store().usage(), indent=2))
+        return 0
+    print("Usage: python -m agents.cam_gerber_analyzer.blob_store delete <analysis_id> [...] | gc | usage",
+          file=sys.stderr)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
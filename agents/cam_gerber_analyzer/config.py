@@ -28,6 +28,67 @@ AGENT_CONFIG = {
         "../../data/cam_gerber_analyzer/uploads"
     ),
     "max_file_size_mb": 200,  # Larger for ODB++ archives
+
+    # ZIP uploads are streamed to disk; limits guard against zip bombs (see archive.py)
+    "zip_extraction": {
+        "max_total_mb": 2048,  # decompressed size of all extracted members
+        "max_ratio": 200,  # decompressed / compressed size of one member
+        "max_members": 10000,
+        "max_workers": 4,  # extraction threads
+    },
+
+    # Uploaded files are stored once per content (see blob_store.py)
+    "upload_store": {
+        "path": os.path.join(
+            os.path.dirname(__file__),
+            "../../data/cam_gerber_analyzer/uploads/store"
+        ),
+        "quota_mb": 20480,
+        "gc_grace_seconds": 3600,  # unreferenced blobs younger than this are kept
+    },
+    
+    # Parsed-layer cache, keyed by file content (see layer_cache.py)
+    "layer_cache": {
+        "path": os.path.join(
+            os.path.dirname(__file__),
+            "../../data/cam_gerber_analyzer/layer_cache"
+        ),
+        "max_entries": 64,
+        "max_disk_mb": 4096,  # pruned least recently used first above this
+    },
+
+    # Layer preview tiles, drawn on first request (see tiles.py)
+    "tiles": {
+        "path": os.path.join(
+            os.path.dirname(__file__),
+            "../../data/cam_gerber_analyzer/tiles"
+        ),
+        "tile_size": 256,  # pixels
+        "min_pixel_mm": 0.005,  # pixel size at the deepest zoom
+        "max_age_seconds": 86400,  # Cache-Control max-age of tile responses
+        "max_disk_mb": 1024,  # pruned least recently used first above this
+    },
+
+    # Copper area is measured on a bitmap drawn in strips (see engine/copper_area.py)
+    "copper_area": {
+        "pixel_mm": 0.025,
+        "cell_mm": 10.0,  # side of the copper density grid cells
+        "max_strip_pixels": 4194304,  # pixels drawn at once
+    },
+
+    # Revisions are compared by hashed features per tile (see engine/compare.py)
+    "compare": {
+        "tile_mm": 10.0,
+        "tolerance_mm": 0.001,  # coordinates closer than this compare equal
+        "max_drill_move_mm": 1.0,  # farther moves are reported as removed and added
+        "max_changes_listed": 200,  # per layer
+    },
+
+    # Per-layer parsing runs on a process pool (see engine/executor.py)
+    "executor": {
+        "max_workers": None,  # None = available cores, 1 = no worker processes
+        "task_timeout": 300,  # seconds per layer
+    },
     "supported_file_types": [
         # Gerber files
         ".gbr", ".ger", ".art", ".drill", ".txt", ".exc",
@@ -55,7 +116,9 @@ AGENT_CONFIG = {
         "min_spacing": 0.1,  # mm
         "min_annular_ring": 0.05,  # mm
         "min_drill_size": 0.15,  # mm
-        "min_solder_mask_clearance": 0.05  # mm
+        "min_solder_mask_clearance": 0.05,  # mm
+        "max_copper_imbalance": 20.0,  # percentage points between mirrored layers
+        "max_copper_density_deviation": 40.0  # percentage points between a grid cell and its layer
     },
     
     # System prompt
@@ -1,11 +1,26 @@
-"""Database operations for CAM Gerber Analyzer Agent."""
+"""Database operations for CAM Gerber Analyzer Agent.
+
+All SQL runs on the database's worker thread (see agents.db_worker).
+CamGerberDatabase is the blocking API for sync callers; AsyncCamGerberDatabase
+exposes the same operations as coroutines for the async agent.
+"""
 
 import sqlite3
 import os
 import json
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from .models import Analysis, DesignFile, AnalysisResult, AnalysisIssue
+from ..db_worker import get_worker
+
+
+def _default_db_path() -> str:
+    """Get the configured database path, creating its directory."""
+    from .config import AGENT_CONFIG
+
+    db_path = AGENT_CONFIG["database"]["path"]
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return db_path
 
 
 class CamGerberDatabase:
@@ -15,148 +30,28 @@ class CamGerberDatabase:
         """Initialize database connection.
         
         Args:
-            db_path: Path to SQLite database. If None, uses default development path.
+            db_path: Path to SQLite database. If None, uses the path from AGENT_CONFIG.
         """
         if db_path is None:
-            # Default to development database
-            data_dir = os.path.join(
-                os.path.dirname(__file__),
-                '../../data/cam_gerber_analyzer'
-            )
-            os.makedirs(data_dir, exist_ok=True)
-            db_path = os.path.join(data_dir, 'analyses.db')
+            db_path = _default_db_path()
         
         self.db_path = db_path
-        self._init_database()
-    
-    def _init_database(self):
-        """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Analyses table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analyses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                project_name TEXT,
-                board_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                report_path TEXT,
-                metadata_json TEXT
-            )
-        ''')
-        
-        # Design files table (Gerber and ODB++)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS design_files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                analysis_id INTEGER NOT NULL,
-                filename TEXT NOT NULL,
-                file_format TEXT NOT NULL,
-                file_type TEXT NOT NULL,
-                layer_number INTEGER,
-                file_path TEXT NOT NULL,
-                file_size INTEGER,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (analysis_id) REFERENCES analyses(id)
-            )
-        ''')
-        
-        # Analysis issues table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analysis_issues (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                analysis_id INTEGER NOT NULL,
-                issue_type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                layer_name TEXT,
-                location_x REAL,
-                location_y REAL,
-                description TEXT NOT NULL,
-                recommendation TEXT,
-                FOREIGN KEY (analysis_id) REFERENCES analyses(id)
-            )
-        ''')
-        
-        # Analysis results summary
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analysis_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                analysis_id INTEGER NOT NULL UNIQUE,
-                board_width REAL,
-                board_height REAL,
-                board_thickness REAL,
-                panel_count INTEGER DEFAULT 1,
-                boards_per_panel INTEGER DEFAULT 1,
-                total_boards INTEGER DEFAULT 1,
-                is_panelized BOOLEAN DEFAULT 0,
-                layer_count INTEGER,
-                inner_layer_count INTEGER DEFAULT 0,
-                laminate_type TEXT,
-                prepreg_spec TEXT,
-                copper_weights TEXT,
-                surface_finish TEXT,
-                total_vias INTEGER,
-                total_pads INTEGER,
-                via_types TEXT,
-                min_trace_width REAL,
-                min_spacing REAL,
-                min_drill_size REAL,
-                copper_area_percentage REAL,
-                issues_critical INTEGER DEFAULT 0,
-                issues_warning INTEGER DEFAULT 0,
-                issues_info INTEGER DEFAULT 0,
-                analysis_completed_at TIMESTAMP,
-                FOREIGN KEY (analysis_id) REFERENCES analyses(id)
-            )
-        ''')
-        
-        # Create indexes
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_analyses_user_id 
-            ON analyses(user_id)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_analyses_status 
-            ON analyses(status)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_design_files_analysis_id 
-            ON design_files(analysis_id)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_analysis_issues_analysis_id 
-            ON analysis_issues(analysis_id)
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self._worker = get_worker(db_path, init=_init_schema)
     
-    def create_analysis(self, user_id: str, project_name: str = None, board_name: str = None) -> int:
+    def create_analysis(self, user_id: str, project_name: str = None, board_name: str = None,
+                        parent_id: int = None) -> int:
         """Create a new analysis session.
         
         Args:
             user_id: User identifier
             project_name: Project name (optional)
             board_name: Board name (optional)
+            parent_id: Analysis this one is the next revision of (optional)
             
         Returns:
             Analysis ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO analyses (user_id, project_name, board_name, status)
-            VALUES (?, ?, ?, 'pending')
-        ''', (user_id, project_name, board_name))
-        
-        analysis_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return analysis_id
+        return self._worker.call(_create_analysis, user_id, project_name, board_name, parent_id)
     
     def get_analysis(self, analysis_id: int) -> Optional[Analysis]:
         """Get analysis by ID.
@@ -167,18 +62,7 @@ class CamGerberDatabase:
         Returns:
             Analysis object or None
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM analyses WHERE id = ?', (analysis_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row is None:
-            return None
-        
-        return Analysis.from_dict(dict(row))
+        return self._worker.call(_get_analysis, analysis_id)
     
     def update_analysis_status(self, analysis_id: int, status: str, report_path: str = None, metadata: dict = None):
         """Update analysis status.
@@ -189,19 +73,7 @@ class CamGerberDatabase:
             report_path: Path to report file (optional)
             metadata: Metadata dictionary (optional)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        metadata_json = json.dumps(metadata) if metadata else None
-        
-        cursor.execute('''
-            UPDATE analyses 
-            SET status = ?, report_path = ?, metadata_json = ?
-            WHERE id = ?
-        ''', (status, report_path, metadata_json, analysis_id))
-        
-        conn.commit()
-        conn.close()
+        self._worker.call(_update_analysis_status, analysis_id, status, report_path, metadata)
     
     def save_design_file(self, design_file: DesignFile) -> int:
         """Save design file record.
@@ -212,27 +84,7 @@ class CamGerberDatabase:
         Returns:
             File ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO design_files 
-            (analysis_id, filename, file_format, file_type, layer_number, file_path, file_size)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            design_file.analysis_id,
-            design_file.filename,
-            design_file.file_format,
-            design_file.file_type,
-            design_file.layer_number,
-            design_file.file_path,
-            design_file.file_size
-        ))
-        
-        file_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return file_id
+        return self._worker.call(_save_design_file, design_file)
     
     def get_design_files(self, analysis_id: int) -> List[DesignFile]:
         """Get design files for an analysis.
@@ -243,15 +95,40 @@ class CamGerberDatabase:
         Returns:
             List of DesignFile objects
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return self._worker.call(_get_design_files, analysis_id)
+    
+    def delete_analysis(self, analysis_id: int) -> int:
+        """Delete an analysis with its files, results and issues.
         
-        cursor.execute('SELECT * FROM design_files WHERE analysis_id = ?', (analysis_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        References of its files to the upload store are released; blobs left
+        without references are removed by the store's garbage collector.
         
-        return [DesignFile.from_dict(dict(row)) for row in rows]
+        Args:
+            analysis_id: Analysis ID
+            
+        Returns:
+            Number of design files deleted
+        """
+        return self._worker.call(_delete_analysis, analysis_id)
+    
+    def get_blob_references(self) -> Dict[str, int]:
+        """Get the reference count of every blob in the upload store.
+        
+        Returns:
+            Reference count by SHA-256; released blobs have 0
+        """
+        return self._worker.call(_get_blob_references)
+    
+    def forget_blobs(self, digests: List[str]) -> int:
+        """Remove the records of blobs that are still unreferenced.
+        
+        Args:
+            digests: SHA-256 of removed blobs
+            
+        Returns:
+            Number of records removed
+        """
+        return self._worker.call(_forget_blobs, digests)
     
     def save_analysis_result(self, result: AnalysisResult) -> int:
         """Save analysis result.
@@ -262,68 +139,7 @@ class CamGerberDatabase:
         Returns:
             Result ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if result exists
-        cursor.execute('SELECT id FROM analysis_results WHERE analysis_id = ?', (result.analysis_id,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing
-            cursor.execute('''
-                UPDATE analysis_results SET
-                    board_width = ?, board_height = ?, board_thickness = ?,
-                    panel_count = ?, boards_per_panel = ?, total_boards = ?, is_panelized = ?,
-                    layer_count = ?, inner_layer_count = ?,
-                    laminate_type = ?, prepreg_spec = ?, copper_weights = ?, surface_finish = ?,
-                    total_vias = ?, total_pads = ?, via_types = ?,
-                    min_trace_width = ?, min_spacing = ?, min_drill_size = ?,
-                    copper_area_percentage = ?,
-                    issues_critical = ?, issues_warning = ?, issues_info = ?,
-                    analysis_completed_at = CURRENT_TIMESTAMP
-                WHERE analysis_id = ?
-            ''', (
-                result.board_width, result.board_height, result.board_thickness,
-                result.panel_count, result.boards_per_panel, result.total_boards, 1 if result.is_panelized else 0,
-                result.layer_count, result.inner_layer_count,
-                result.laminate_type, result.prepreg_spec, result.copper_weights, result.surface_finish,
-                result.total_vias, result.total_pads, result.via_types,
-                result.min_trace_width, result.min_spacing, result.min_drill_size,
-                result.copper_area_percentage,
-                result.issues_critical, result.issues_warning, result.issues_info,
-                result.analysis_id
-            ))
-            result_id = existing[0]
-        else:
-            # Insert new
-            cursor.execute('''
-                INSERT INTO analysis_results 
-                (analysis_id, board_width, board_height, board_thickness,
-                 panel_count, boards_per_panel, total_boards, is_panelized,
-                 layer_count, inner_layer_count,
-                 laminate_type, prepreg_spec, copper_weights, surface_finish,
-                 total_vias, total_pads, via_types,
-                 min_trace_width, min_spacing, min_drill_size,
-                 copper_area_percentage,
-                 issues_critical, issues_warning, issues_info,
-                 analysis_completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (
-                result.analysis_id, result.board_width, result.board_height, result.board_thickness,
-                result.panel_count, result.boards_per_panel, result.total_boards, 1 if result.is_panelized else 0,
-                result.layer_count, result.inner_layer_count,
-                result.laminate_type, result.prepreg_spec, result.copper_weights, result.surface_finish,
-                result.total_vias, result.total_pads, result.via_types,
-                result.min_trace_width, result.min_spacing, result.min_drill_size,
-                result.copper_area_percentage,
-                result.issues_critical, result.issues_warning, result.issues_info
-            ))
-            result_id = cursor.lastrowid
-        
-        conn.commit()
-        conn.close()
-        return result_id
+        return self._worker.call(_save_analysis_result, result)
     
     def get_analysis_result(self, analysis_id: int) -> Optional[AnalysisResult]:
         """Get analysis result.
@@ -334,20 +150,7 @@ class CamGerberDatabase:
         Returns:
             AnalysisResult object or None
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM analysis_results WHERE analysis_id = ?', (analysis_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row is None:
-            return None
-        
-        data = dict(row)
-        data['is_panelized'] = bool(data['is_panelized'])
-        return AnalysisResult.from_dict(data)
+        return self._worker.call(_get_analysis_result, analysis_id)
     
     def save_analysis_issue(self, issue: AnalysisIssue) -> int:
         """Save analysis issue.
@@ -358,28 +161,32 @@ class CamGerberDatabase:
         Returns:
             Issue ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._worker.call(_save_analysis_issue, issue)
+    
+    def save_analysis_issues(self, issues: List[AnalysisIssue]) -> int:
+        """Save many analysis issues in one statement.
         
-        cursor.execute('''
-            INSERT INTO analysis_issues 
-            (analysis_id, issue_type, severity, layer_name, location_x, location_y, description, recommendation)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            issue.analysis_id,
-            issue.issue_type,
-            issue.severity,
-            issue.layer_name,
-            issue.location_x,
-            issue.location_y,
-            issue.description,
-            issue.recommendation
-        ))
+        Args:
+            issues: AnalysisIssue objects
+            
+        Returns:
+            Number of issues saved
+        """
+        return self._worker.call(_save_analysis_issues, issues)
+    
+    def replace_analysis_issues(self, analysis_id: int, issues: List[AnalysisIssue]) -> int:
+        """Replace an analysis's issues with new ones in one transaction.
         
-        issue_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return issue_id
+        Re-running an analysis keeps only the issues of the latest run.
+        
+        Args:
+            analysis_id: Analysis ID
+            issues: AnalysisIssue objects of that analysis
+            
+        Returns:
+            Number of issues saved
+        """
+        return self._worker.call(_replace_analysis_issues, analysis_id, issues)
     
     def get_analysis_issues(self, analysis_id: int) -> List[AnalysisIssue]:
         """Get analysis issues.
@@ -390,13 +197,420 @@ class CamGerberDatabase:
         Returns:
             List of AnalysisIssue objects
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return self._worker.call(_get_analysis_issues, analysis_id)
+
+
+class AsyncCamGerberDatabase:
+    """Async counterpart of CamGerberDatabase.
+    
+    Operations are queued to the same worker thread and awaited, so database
+    I/O never blocks the event loop.
+    """
+    
+    def __init__(self, db_path: str = None):
+        """Initialize database access.
         
-        cursor.execute('SELECT * FROM analysis_issues WHERE analysis_id = ? ORDER BY severity DESC, id ASC', (analysis_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        Args:
+            db_path: Path to SQLite database. If None, uses the path from AGENT_CONFIG.
+        """
+        if db_path is None:
+            db_path = _default_db_path()
         
-        return [AnalysisIssue.from_dict(dict(row)) for row in rows]
+        self.db_path = db_path
+        self._worker = get_worker(db_path, init=_init_schema)
+    
+    async def create_analysis(self, user_id: str, project_name: str = None, board_name: str = None,
+                              parent_id: int = None) -> int:
+        """Create a new analysis session. See CamGerberDatabase.create_analysis."""
+        return await self._worker.run(_create_analysis, user_id, project_name, board_name, parent_id)
+    
+    async def get_analysis(self, analysis_id: int) -> Optional[Analysis]:
+        """Get analysis by ID. See CamGerberDatabase.get_analysis."""
+        return await self._worker.run(_get_analysis, analysis_id)
+    
+    async def update_analysis_status(self, analysis_id: int, status: str, report_path: str = None, metadata: dict = None):
+        """Update analysis status. See CamGerberDatabase.update_analysis_status."""
+        await self._worker.run(_update_analysis_status, analysis_id, status, report_path, metadata)
+    
+    async def save_design_file(self, design_file: DesignFile) -> int:
+        """Save design file record. See CamGerberDatabase.save_design_file."""
+        return await self._worker.run(_save_design_file, design_file)
+    
+    async def get_design_files(self, analysis_id: int) -> List[DesignFile]:
+        """Get design files for an analysis. See CamGerberDatabase.get_design_files."""
+        return await self._worker.run(_get_design_files, analysis_id)
+    
+    async def delete_analysis(self, analysis_id: int) -> int:
+        """Delete an analysis. See CamGerberDatabase.delete_analysis."""
+        return await self._worker.run(_delete_analysis, analysis_id)
+    
+    async def get_blob_references(self) -> Dict[str, int]:
+        """Get blob reference counts. See CamGerberDatabase.get_blob_references."""
+        return await self._worker.run(_get_blob_references)
+    
+    async def forget_blobs(self, digests: List[str]) -> int:
+        """Remove unreferenced blob records. See CamGerberDatabase.forget_blobs."""
+        return await self._worker.run(_forget_blobs, digests)
+    
+    async def save_analysis_result(self, result: AnalysisResult) -> int:
+        """Save analysis result. See CamGerberDatabase.save_analysis_result."""
+        return await self._worker.run(_save_analysis_result, result)
+    
+    async def get_analysis_result(self, analysis_id: int) -> Optional[AnalysisResult]:
+        """Get analysis result. See CamGerberDatabase.get_analysis_result."""
+        return await self._worker.run(_get_analysis_result, analysis_id)
+    
+    async def save_analysis_issue(self, issue: AnalysisIssue) -> int:
+        """Save analysis issue. See CamGerberDatabase.save_analysis_issue."""
+        return await self._worker.run(_save_analysis_issue, issue)
+    
+    async def save_analysis_issues(self, issues: List[AnalysisIssue]) -> int:
+        """Save many analysis issues. See CamGerberDatabase.save_analysis_issues."""
+        return await self._worker.run(_save_analysis_issues, issues)
+    
+    async def replace_analysis_issues(self, analysis_id: int, issues: List[AnalysisIssue]) -> int:
+        """Replace an analysis's issues. See CamGerberDatabase.replace_analysis_issues."""
+        return await self._worker.run(_replace_analysis_issues, analysis_id, issues)
+    
+    async def get_analysis_issues(self, analysis_id: int) -> List[AnalysisIssue]:
+        """Get analysis issues. See CamGerberDatabase.get_analysis_issues."""
+        return await self._worker.run(_get_analysis_issues, analysis_id)
+
+
+# Operations executed on the worker thread. Each takes the worker's cursor as
+# its first argument and runs inside the worker's batch transaction.
+
+def _init_schema(cursor: sqlite3.Cursor):
+    """Initialize database schema."""
+    # Analyses table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            project_name TEXT,
+            board_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending',
+            report_path TEXT,
+            metadata_json TEXT,
+            parent_id INTEGER,
+            revision INTEGER DEFAULT 1
+        )
+    ''')
+    # Databases created before analyses were versioned lack the revision columns
+    cursor.execute('PRAGMA table_info(analyses)')
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'parent_id' not in columns:
+        cursor.execute('ALTER TABLE analyses ADD COLUMN parent_id INTEGER')
+    if 'revision' not in columns:
+        cursor.execute('ALTER TABLE analyses ADD COLUMN revision INTEGER DEFAULT 1')
+    
+    # Design files table (Gerber and ODB++)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS design_files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            file_format TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            layer_number INTEGER,
+            file_path TEXT NOT NULL,
+            file_size INTEGER,
+            sha256 TEXT,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (analysis_id) REFERENCES analyses(id)
+        )
+    ''')
+    # Databases created before the upload store lack the digest column
+    cursor.execute('PRAGMA table_info(design_files)')
+    if 'sha256' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE design_files ADD COLUMN sha256 TEXT')
+    
+    # Blobs of the content-addressed upload store, with the number of design
+    # files referencing each
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Analysis issues table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_issues (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_id INTEGER NOT NULL,
+            issue_type TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            layer_name TEXT,
+            location_x REAL,
+            location_y REAL,
+            description TEXT NOT NULL,
+            recommendation TEXT,
+            FOREIGN KEY (analysis_id) REFERENCES analyses(id)
+        )
+    ''')
+    
+    # Analysis results summary
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_id INTEGER NOT NULL UNIQUE,
+            board_width REAL,
+            board_height REAL,
+            board_thickness REAL,
+            panel_count INTEGER DEFAULT 1,
+            boards_per_panel INTEGER DEFAULT 1,
+            total_boards INTEGER DEFAULT 1,
+            is_panelized BOOLEAN DEFAULT 0,
+            layer_count INTEGER,
+            inner_layer_count INTEGER DEFAULT 0,
+            laminate_type TEXT,
+            prepreg_spec TEXT,
+            copper_weights TEXT,
+            surface_finish TEXT,
+            total_vias INTEGER,
+            total_pads INTEGER,
+            via_types TEXT,
+            min_trace_width REAL,
+            min_spacing REAL,
+            min_drill_size REAL,
+            copper_area_percentage REAL,
+            copper_balance TEXT,
+            issues_critical INTEGER DEFAULT 0,
+            issues_warning INTEGER DEFAULT 0,
+            issues_info INTEGER DEFAULT 0,
+            analysis_completed_at TIMESTAMP,
+            FOREIGN KEY (analysis_id) REFERENCES analyses(id)
+        )
+    ''')
+    # Databases created before copper balance was measured lack its column
+    cursor.execute('PRAGMA table_info(analysis_results)')
+    if 'copper_balance' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE analysis_results ADD COLUMN copper_balance TEXT')
+    
+    # Create indexes
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analyses_user_id 
+        ON analyses(user_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analyses_status 
+        ON analyses(status)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_design_files_analysis_id 
+        ON design_files(analysis_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_analysis_issues_analysis_id 
+        ON analysis_issues(analysis_id)
+    ''')
+
+
+def _create_analysis(cursor: sqlite3.Cursor, user_id: str, project_name: str, board_name: str,
+                     parent_id: Optional[int] = None) -> int:
+    revision = 1
+    if parent_id is not None:
+        cursor.execute('SELECT revision FROM analyses WHERE id = ?', (parent_id,))
+        row = cursor.fetchone()
+        revision = (row[0] or 1) + 1 if row else 1
+    cursor.execute('''
+        INSERT INTO analyses (user_id, project_name, board_name, status, parent_id, revision)
+        VALUES (?, ?, ?, 'pending', ?, ?)
+    ''', (user_id, project_name, board_name, parent_id, revision))
+    return cursor.lastrowid
+
+
+def _get_analysis(cursor: sqlite3.Cursor, analysis_id: int) -> Optional[Analysis]:
+    cursor.execute('SELECT * FROM analyses WHERE id = ?', (analysis_id,))
+    row = cursor.fetchone()
+    
+    if row is None:
+        return None
+    
+    return Analysis.from_dict(dict(row))
+
+
+def _update_analysis_status(cursor: sqlite3.Cursor, analysis_id: int, status: str, report_path: str, metadata: dict):
+    metadata_json = json.dumps(metadata) if metadata else None
+    
+    cursor.execute('''
+        UPDATE analyses 
+        SET status = ?, report_path = ?, metadata_json = ?
+        WHERE id = ?
+    ''', (status, report_path, metadata_json, analysis_id))
+
+
+def _save_design_file(cursor: sqlite3.Cursor, design_file: DesignFile) -> int:
+    cursor.execute('''
+        INSERT INTO design_files 
+        (analysis_id, filename, file_format, file_type, layer_number, file_path, file_size, sha256)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        design_file.analysis_id,
+        design_file.filename,
+        design_file.file_format,
+        design_file.file_type,
+        design_file.layer_number,
+        design_file.file_path,
+        design_file.file_size,
+        design_file.sha256
+    ))
+    file_id = cursor.lastrowid
+    if design_file.sha256:
+        cursor.execute('''
+            INSERT INTO blobs (sha256, size, ref_count) VALUES (?, ?, 1)
+            ON CONFLICT(sha256) DO UPDATE SET ref_count = ref_count + 1
+        ''', (design_file.sha256, design_file.file_size))
+    return file_id
+
+
+def _get_design_files(cursor: sqlite3.Cursor, analysis_id: int) -> List[DesignFile]:
+    cursor.execute('SELECT * FROM design_files WHERE analysis_id = ?', (analysis_id,))
+    return [DesignFile.from_dict(dict(row)) for row in cursor.fetchall()]
+
+
+def _delete_analysis(cursor: sqlite3.Cursor, analysis_id: int) -> int:
+    cursor.execute('''
+        UPDATE blobs SET ref_count = ref_count - (
+            SELECT COUNT(*) FROM design_files WHERE analysis_id = ? AND sha256 = blobs.sha256
+        )
+        WHERE sha256 IN (SELECT sha256 FROM design_files WHERE analysis_id = ?)
+    ''', (analysis_id, analysis_id))
+    cursor.execute('DELETE FROM analysis_issues WHERE analysis_id = ?', (analysis_id,))
+    cursor.execute('DELETE FROM analysis_results WHERE analysis_id = ?', (analysis_id,))
+    cursor.execute('DELETE FROM design_files WHERE analysis_id = ?', (analysis_id,))
+    deleted = cursor.rowcount
+    cursor.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
+    return deleted
+
+
+def _get_blob_references(cursor: sqlite3.Cursor) -> Dict[str, int]:
+    cursor.execute('SELECT sha256, ref_count FROM blobs')
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def _forget_blobs(cursor: sqlite3.Cursor, digests: List[str]) -> int:
+    cursor.executemany('DELETE FROM blobs WHERE sha256 = ? AND ref_count <= 0', [(d,) for d in digests])
+    return cursor.rowcount
+
+
+def _save_analysis_result(cursor: sqlite3.Cursor, result: AnalysisResult) -> int:
+    # Check if result exists
+    cursor.execute('SELECT id FROM analysis_results WHERE analysis_id = ?', (result.analysis_id,))
+    existing = cursor.fetchone()
+    
+    if existing:
+        # Update existing
+        cursor.execute('''
+            UPDATE analysis_results SET
+                board_width = ?, board_height = ?, board_thickness = ?,
+                panel_count = ?, boards_per_panel = ?, total_boards = ?, is_panelized = ?,
+                layer_count = ?, inner_layer_count = ?,
+                laminate_type = ?, prepreg_spec = ?, copper_weights = ?, surface_finish = ?,
+                total_vias = ?, total_pads = ?, via_types = ?,
+                min_trace_width = ?, min_spacing = ?, min_drill_size = ?,
+                copper_area_percentage = ?, copper_balance = ?,
+                issues_critical = ?, issues_warning = ?, issues_info = ?,
+                analysis_completed_at = CURRENT_TIMESTAMP
+            WHERE analysis_id = ?
+        ''', (
+            result.board_width, result.board_height, result.board_thickness,
+            result.panel_count, result.boards_per_panel, result.total_boards, 1 if result.is_panelized else 0,
+            result.layer_count, result.inner_layer_count,
+            result.laminate_type, result.prepreg_spec, result.copper_weights, result.surface_finish,
+            result.total_vias, result.total_pads, result.via_types,
+            result.min_trace_width, result.min_spacing, result.min_drill_size,
+            result.copper_area_percentage, result.copper_balance,
+            result.issues_critical, result.issues_warning, result.issues_info,
+            result.analysis_id
+        ))
+        result_id = existing[0]
+    else:
+        # Insert new
+        cursor.execute('''
+            INSERT INTO analysis_results 
+            (analysis_id, board_width, board_height, board_thickness,
+             panel_count, boards_per_panel, total_boards, is_panelized,
+             layer_count, inner_layer_count,
+             laminate_type, prepreg_spec, copper_weights, surface_finish,
+             total_vias, total_pads, via_types,
+             min_trace_width, min_spacing, min_drill_size,
+             copper_area_percentage, copper_balance,
+             issues_critical, issues_warning, issues_info,
+             analysis_completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (
+            result.analysis_id, result.board_width, result.board_height, result.board_thickness,
+            result.panel_count, result.boards_per_panel, result.total_boards, 1 if result.is_panelized else 0,
+            result.layer_count, result.inner_layer_count,
+            result.laminate_type, result.prepreg_spec, result.copper_weights, result.surface_finish,
+            result.total_vias, result.total_pads, result.via_types,
+            result.min_trace_width, result.min_spacing, result.min_drill_size,
+            result.copper_area_percentage, result.copper_balance,
+            result.issues_critical, result.issues_warning, result.issues_info
+        ))
+        result_id = cursor.lastrowid
+    
+    return result_id
+
+
+def _get_analysis_result(cursor: sqlite3.Cursor, analysis_id: int) -> Optional[AnalysisResult]:
+    cursor.execute('SELECT * FROM analysis_results WHERE analysis_id = ?', (analysis_id,))
+    row = cursor.fetchone()
+    
+    if row is None:
+        return None
+    
+    data = dict(row)
+    data['is_panelized'] = bool(data['is_panelized'])
+    return AnalysisResult.from_dict(data)
+
+
+def _save_analysis_issue(cursor: sqlite3.Cursor, issue: AnalysisIssue) -> int:
+    cursor.execute('''
+        INSERT INTO analysis_issues 
+        (analysis_id, issue_type, severity, layer_name, location_x, location_y, description, recommendation)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        issue.analysis_id,
+        issue.issue_type,
+        issue.severity,
+        issue.layer_name,
+        issue.location_x,
+        issue.location_y,
+        issue.description,
+        issue.recommendation
+    ))
+    return cursor.lastrowid
+
+
+def _save_analysis_issues(cursor: sqlite3.Cursor, issues: List[AnalysisIssue]) -> int:
+    cursor.executemany('''
+        INSERT INTO analysis_issues 
+        (analysis_id, issue_type, severity, layer_name, location_x, location_y, description, recommendation)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(
+        issue.analysis_id,
+        issue.issue_type,
+        issue.severity,
+        issue.layer_name,
+        issue.location_x,
+        issue.location_y,
+        issue.description,
+        issue.recommendation
+    ) for issue in issues])
+    return len(issues)
+
+
+def _replace_analysis_issues(cursor: sqlite3.Cursor, analysis_id: int, issues: List[AnalysisIssue]) -> int:
+    cursor.execute('DELETE FROM analysis_issues WHERE analysis_id = ?', (analysis_id,))
+    return _save_analysis_issues(cursor, issues)
+
 
+def _get_analysis_issues(cursor: sqlite3.Cursor, analysis_id: int) -> List[AnalysisIssue]:
+    cursor.execute('SELECT * FROM analysis_issues WHERE analysis_id = ? ORDER BY severity DESC, id ASC', (analysis_id,))
+    return [AnalysisIssue.from_dict(dict(row)) for row in cursor.fetchall()]
@@ -0,0 +1 @@
+"""CAM processing engine: file decoding and geometry used by the CAM tools."""
@@ -0,0 +1,170 @@
+"""Gerber X2 attributes from the head of a file.
+
+X2 files describe themselves: %TF.FileFunction,Copper,L2,Inr*% says which
+layer a file is, %TF.FilePolarity whether it is drawn positive or negative
+and %TF.SameCoordinates which files share one coordinate system. File
+attributes must come before the first graphics object, so only the head of
+a file is read: it is memory-mapped and searched with regular expressions
+starting with a literal, which the re module finds with a fast substring
+search, without tokenizing anything.
+
+Aperture (%TA) and object (%TO) attributes are spread through the file.
+Those in the head are indexed too, by name with their distinct values; they
+are a sample, but enough to tell a drill or profile file from its aperture
+functions.
+
+Exporters writing X1 files often keep the attributes in comments, as in
+"G04 #@! TF.FileFunction,Soldermask,Top*" or, in Excellon files,
+"; #@! TF.FileFunction,Plated,1,4,PTH"; these are read the same way.
+"""
+
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Bytes of each file searched for attributes
+HEADER_BYTES = 1 << 16
+
+# Distinct values kept per aperture or object attribute
+MAX_VALUES = 64
+
+# %TF.Name,value*%, and the same after "#@!" in a comment
+_ATTRIBUTE_RES = (
+    re.compile(rb'%T([FAO])([^,*%\r\n]*)([^*%\r\n]*)'),
+    re.compile(rb'#@! ?T([FAO])([^,*%\r\n]*)([^*%\r\n]*)'),
+)
+# Excellon files open with M48 on its own line
+_EXCELLON_RE = re.compile(rb'M48[ \t]*\r?$', re.MULTILINE)
+_GERBER_RE = re.compile(rb'%FS|%MO|G04')
+
+# Layer file types by the first field of .FileFunction and the side
+_SIDED_TYPES = {
+    ("Soldermask", "Top"): "solder_mask_top",
+    ("Soldermask", "Bot"): "solder_mask_bottom",
+    ("Legend", "Top"): "silk_top",
+    ("Legend", "Bot"): "silk_bottom",
+    ("Paste", "Top"): "paste_top",
+    ("Paste", "Bot"): "paste_bottom",
+}
+
+_DRILL_FUNCTIONS = ("Plated", "NonPlated")
+
+# .AperFunction values only drill and profile files use
+_DRILL_APERTURES = ("ViaDrill", "ComponentDrill", "MechanicalDrill", "OtherDrill", "Slot", "CastellatedDrill")
+
+
+@dataclass
+class FileAttributes:
+    """Attributes found in the head of a file."""
+    file: Dict[str, List[str]] = field(default_factory=dict)       # %TF name -> values
+    aperture: Dict[str, List[str]] = field(default_factory=dict)   # %TA name -> distinct first values
+    object: Dict[str, List[str]] = field(default_factory=dict)     # %TO name -> distinct first values
+    format: Optional[str] = None  # "gerber" or "drill" (Excellon) where the head shows it
+
+    @property
+    def x2(self) -> bool:
+        """Whether the file carries any attributes."""
+        return bool(self.file or self.aperture or self.object)
+
+    @property
+    def file_function(self) -> List[str]:
+        """Fields of .FileFunction, e.g. ["Copper", "L1", "Top"]; empty if absent."""
+        return self.file.get(".FileFunction", [])
+
+    @property
+    def polarity(self) -> Optional[str]:
+        """"Positive" or "Negative" from .FilePolarity."""
+        values = self.file.get(".FilePolarity")
+        return values[0] if values else None
+
+    @property
+    def same_coordinates(self) -> Optional[str]:
+        """Identifier of .SameCoordinates ("" when it has none), or None if absent."""
+        values = self.file.get(".SameCoordinates")
+        if values is None:
+            return None
+        return values[0] if values else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "file_function": ",".join(self.file_function) or None,
+            "polarity": self.polarity,
+            "same_coordinates": self.same_coordinates,
+            "aperture_functions": self.aperture.get(".AperFunction", []),
+            "nets": len(self.object.get(".N", [])),
+        }
+
+
+def read_attributes(file_path: str, max_bytes: int = HEADER_BYTES) -> FileAttributes:
+    """Read the attributes in the first max_bytes of a file.
+
+    Args:
+        file_path: Path to the file
+        max_bytes: Bytes searched from the start of the file
+
+    Returns:
+        FileAttributes; empty for a file without attributes
+    """
+    attributes = FileAttributes()
+    with open(file_path, 'rb') as f:
+        length = min(os.fstat(f.fileno()).st_size, max_bytes)
+        if length == 0:
+            return attributes
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as head:
+            matches = [m for pattern in _ATTRIBUTE_RES for m in pattern.finditer(head)]
+            for match in sorted(matches, key=lambda m: m.start()):
+                kind, name, values = match.groups()
+                name = name.strip().decode('utf-8', 'replace')
+                fields = [v.strip() for v in values.decode('utf-8', 'replace').split(',')[1:]]
+                if kind == b'F':
+                    attributes.file[name] = fields
+                else:
+                    index = attributes.aperture if kind == b'A' else attributes.object
+                    seen = index.setdefault(name, [])
+                    value = fields[0] if fields else ""
+                    if value not in seen and len(seen) < MAX_VALUES:
+                        seen.append(value)
+            start = head.find(b'M48', 0, 4096)
+            if start >= 0 and head[start - 1:start] in (b'', b'\n') and _EXCELLON_RE.match(head, start):
+                attributes.format = "drill"
+            elif _GERBER_RE.search(head):
+                attributes.format = "gerber"
+    return attributes
+
+
+def classify_layer(attributes: FileAttributes) -> Optional[str]:
+    """File type of a layer from its attributes.
+
+    Copper layers are copper_top, copper_bottom or inner_layer_<n> with the
+    copper layer number of .FileFunction (L2 is inner_layer_2), as files
+    named by layer number are.
+
+    Returns:
+        The file type, or None where the attributes do not tell
+    """
+    function = attributes.file_function
+    if function:
+        kind = function[0]
+        if kind == "Copper" and len(function) > 2:
+            if function[2] == "Top":
+                return "copper_top"
+            if function[2] == "Bot":
+                return "copper_bottom"
+            number = re.fullmatch(r'L(\d+)', function[1])
+            return f"inner_layer_{number.group(1)}" if number else "inner_layer"
+        side = function[1] if len(function) > 1 else ""
+        if (kind, side) in _SIDED_TYPES:
+            return _SIDED_TYPES[(kind, side)]
+        if kind in _DRILL_FUNCTIONS:
+            return "drill"
+        if kind == "Profile":
+            return "outline"
+    functions = attributes.aperture.get(".AperFunction", [])
+    if functions and all(f in _DRILL_APERTURES for f in functions):
+        return "drill"
+    if functions == ["Profile"]:
+        return "outline"
+    return None
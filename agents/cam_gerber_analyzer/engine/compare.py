@@ -0,0 +1,341 @@
+"""Geometric diff between two revisions of a layer, tile by tile.
+
+Every primitive is reduced to a 64-bit hash of its normalized form:
+coordinates rounded to the comparison quantum, line ends in a fixed order,
+region edges summed per region, and the aperture by its shape and size
+rather than its D code, which CAD tools renumber freely between
+revisions. The board is cut into square tiles, and each tile is
+summarized by the sum (modulo 2^64) and count of the hashes of the
+primitives starting in it. The sum does not depend on the primitives'
+order in the file.
+
+Two revisions are compared tile summary by tile summary; an identical tile
+costs one comparison. Only the primitives of differing tiles are diffed,
+as multisets of hashes. A primitive removed and one added with the same
+geometry but a different aperture are reported together as an aperture
+change.
+
+Drill hits are compared as (x, y, diameter). A removed hit and an added
+hit of the same diameter within max_move of it are reported as moved.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .drill import DrillHoles
+from .geometry import (
+    SHAPE_CIRCLE, SHAPE_MACRO, SHAPE_OBROUND, SHAPE_POLYGON, SHAPE_RECTANGLE, LayerGeometry,
+)
+from .spatial_index import SpatialIndex
+
+# Comparison defaults when none are configured
+DEFAULT_QUANTUM_MM = 0.001
+DEFAULT_TILE_MM = 10.0
+DEFAULT_MAX_MOVE_MM = 1.0
+
+# Primitive kinds in diffs
+KIND_NAMES = ("line", "arc", "flash", "region")
+
+_SHAPE_NAMES = {SHAPE_MACRO: "macro", SHAPE_CIRCLE: "circle", SHAPE_RECTANGLE: "rectangle",
+                SHAPE_OBROUND: "obround", SHAPE_POLYGON: "polygon"}
+
+# Quantized stand-in for NaN
+_NAN = np.int64(-(1 << 62))
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, elementwise on uint64."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _hash(*columns) -> np.ndarray:
+    """Hash integer columns row by row."""
+    h = np.full(len(columns[0]), 0x9E3779B97F4A7C15, dtype=np.uint64)
+    for column in columns:
+        h = _mix(h ^ np.asarray(column).astype(np.int64).view(np.uint64))
+    return h
+
+
+def _quantize(values, quantum: float) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        return np.where(np.isnan(values), _NAN, np.round(values / quantum)).astype(np.int64)
+
+
+@dataclass
+class LayerFeatures:
+    """Normalized primitives of one layer revision."""
+    hashes: np.ndarray       # uint64, everything compared
+    shapes: np.ndarray       # uint64, geometry without the aperture
+    tiles: np.ndarray        # int64 tile key of each primitive
+    kind: np.ndarray         # index into KIND_NAMES
+    x: np.ndarray            # where the primitive starts (mm)
+    y: np.ndarray
+    aperture: np.ndarray     # row in the aperture table, -1 for none
+
+
+def layer_features(geometry: LayerGeometry, quantum: float = DEFAULT_QUANTUM_MM,
+                   tile: float = DEFAULT_TILE_MM) -> LayerFeatures:
+    """Hash the primitives of a layer.
+
+    Args:
+        geometry: Layer geometry
+        quantum: Coordinates closer than this compare equal (mm)
+        tile: Tile side (mm)
+
+    Returns:
+        LayerFeatures
+    """
+    table = geometry.apertures
+    aperture_hashes = np.append(_hash(table['shape'], _quantize(table['width'], quantum),
+                                      _quantize(table['height'], quantum), _quantize(table['hole'], quantum),
+                                      table['vertices'], _quantize(table['rotation'], 1e-3)),
+                                np.uint64(0))
+    q = int(round(tile / quantum))
+    parts = []
+
+    def add(kind, rows, x0, y0, shape_columns):
+        aperture = geometry.aperture_rows(rows['aperture_id'])
+        shapes = _hash(np.full(len(rows), kind), *shape_columns)
+        hashes = _hash(shapes.view(np.int64), aperture_hashes[aperture].view(np.int64), rows['polarity'])
+        parts.append((hashes, shapes, x0 // q * (1 << 32) + y0 // q, np.full(len(rows), kind, dtype=np.int8),
+                      rows['x0'], rows['y0'], aperture))
+
+    lines = geometry.lines
+    qx0, qy0, qx1, qy1 = (_quantize(lines[name], quantum) for name in ('x0', 'y0', 'x1', 'y1'))
+    # Lines are the same drawn either way
+    swap = (qx1 < qx0) | ((qx1 == qx0) & (qy1 < qy0))
+    ax, ay = np.where(swap, qx1, qx0), np.where(swap, qy1, qy0)
+    bx, by = np.where(swap, qx0, qx1), np.where(swap, qy0, qy1)
+    add(0, lines, ax, ay, (ax, ay, bx, by))
+
+    arcs = geometry.arcs
+    qa = [_quantize(arcs[name], quantum) for name in ('x0', 'y0', 'x1', 'y1', 'cx', 'cy')]
+    add(1, arcs, qa[0], qa[1], qa + [arcs['clockwise']])
+
+    flashes = geometry.flashes
+    fx, fy = _quantize(flashes['x0'], quantum), _quantize(flashes['y0'], quantum)
+    add(2, flashes, fx, fy, (fx, fy))
+
+    regions = geometry.regions
+    if len(regions):
+        order = np.argsort(regions['region'], kind='stable')
+        regions = regions[order]
+        _, first = np.unique(regions['region'], return_index=True)
+        edge = _hash(*(_quantize(regions[name], quantum) for name in ('x0', 'y0', 'x1', 'y1')))
+        # Summed edges do not depend on the starting vertex
+        shapes = np.add.reduceat(edge, first)
+        rx = np.minimum.reduceat(_quantize(regions['x0'], quantum), first)
+        ry = np.minimum.reduceat(_quantize(regions['y0'], quantum), first)
+        heads = regions[first]
+        polarity_hash = _hash(np.full(len(first), 3), shapes.view(np.int64), heads['polarity'])
+        parts.append((polarity_hash, _hash(np.full(len(first), 3), shapes.view(np.int64)),
+                      rx // q * (1 << 32) + ry // q, np.full(len(first), 3, dtype=np.int8),
+                      rx * quantum, ry * quantum, np.full(len(first), -1, dtype=np.intp)))
+
+    columns = list(zip(*parts))
+    return LayerFeatures(*(np.concatenate(c) for c in columns))
+
+
+def _tile_summaries(features: LayerFeatures) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(tile keys, hash sums, counts), sorted by tile."""
+    order = np.argsort(features.tiles, kind='stable')
+    tiles = features.tiles[order]
+    keys, first, counts = np.unique(tiles, return_index=True, return_counts=True)
+    if len(keys) == 0:
+        return keys, np.empty(0, np.uint64), counts
+    return keys, np.add.reduceat(features.hashes[order], first), counts
+
+
+def _changed_tiles(a: LayerFeatures, b: LayerFeatures) -> Tuple[np.ndarray, int]:
+    """Keys of the tiles whose summaries differ, and the number of tiles."""
+    keys_a, sums_a, counts_a = _tile_summaries(a)
+    keys_b, sums_b, counts_b = _tile_summaries(b)
+    keys = np.union1d(keys_a, keys_b)
+    summary = np.zeros((len(keys), 2, 2), dtype=np.uint64)
+    summary[np.searchsorted(keys, keys_a), 0] = np.column_stack([sums_a, counts_a.astype(np.uint64)])
+    summary[np.searchsorted(keys, keys_b), 1] = np.column_stack([sums_b, counts_b.astype(np.uint64)])
+    differ = (summary[:, 0] != summary[:, 1]).any(axis=1)
+    return keys[differ], len(keys)
+
+
+def _surplus(hashes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Indices of the hashes left over after matching them one to one with other's."""
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    # Rank of each hash among its equals
+    first = np.searchsorted(sorted_hashes, sorted_hashes, side='left')
+    rank = np.arange(len(sorted_hashes)) - first
+    other = np.sort(other)
+    available = np.searchsorted(other, sorted_hashes, side='right') - np.searchsorted(other, sorted_hashes, side='left')
+    return np.sort(order[rank >= available])
+
+
+def _pairs(hashes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Index into other of an equal hash for each hash, each used once; -1 for none."""
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    rank = np.arange(len(sorted_hashes)) - np.searchsorted(sorted_hashes, sorted_hashes, side='left')
+    other_order = np.argsort(other, kind='stable')
+    sorted_other = other[other_order]
+    start = np.searchsorted(sorted_other, sorted_hashes, side='left')
+    found = rank < np.searchsorted(sorted_other, sorted_hashes, side='right') - start
+    pairs = np.full(len(hashes), -1, dtype=np.intp)
+    pairs[order[found]] = other_order[start[found] + rank[found]]
+    return pairs
+
+
+@dataclass
+class LayerDiff:
+    """Differences between two revisions of a layer."""
+    tiles: int = 0                       # tiles holding primitives in either revision
+    tiles_changed: int = 0
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    aperture_changed: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return not (self.removed or self.added or self.aperture_changed)
+
+
+def describe_aperture(geometry: LayerGeometry, row: int) -> Optional[str]:
+    """Short text of an aperture table row, e.g. 'circle 0.2'."""
+    if row < 0:
+        return None
+    aperture = geometry.apertures[row]
+    name = _SHAPE_NAMES.get(int(aperture['shape']), "unknown")
+    if np.isnan(aperture['width']):
+        return name
+    if aperture['shape'] in (SHAPE_CIRCLE, SHAPE_POLYGON):
+        return f"{name} {aperture['width']:g}"
+    return f"{name} {aperture['width']:g}x{aperture['height']:g}"
+
+
+def diff_layers(old: LayerGeometry, new: LayerGeometry, quantum: float = DEFAULT_QUANTUM_MM,
+                tile: float = DEFAULT_TILE_MM) -> LayerDiff:
+    """Compare two revisions of a layer.
+
+    Args:
+        old: Geometry of the first revision
+        new: Geometry of the second revision
+        quantum: Coordinates closer than this compare equal (mm)
+        tile: Tile side (mm)
+
+    Returns:
+        LayerDiff with the primitives removed from old, added in new and
+        drawn with another aperture, each with its kind and position
+    """
+    a, b = layer_features(old, quantum, tile), layer_features(new, quantum, tile)
+    changed, tiles = _changed_tiles(a, b)
+    diff = LayerDiff(tiles=tiles, tiles_changed=len(changed))
+    if not len(changed):
+        return diff
+
+    in_a = np.flatnonzero(np.isin(a.tiles, changed))
+    in_b = np.flatnonzero(np.isin(b.tiles, changed))
+    removed = in_a[_surplus(a.hashes[in_a], b.hashes[in_b])]
+    added = in_b[_surplus(b.hashes[in_b], a.hashes[in_a])]
+
+    # Same geometry on both sides: the aperture or polarity changed
+    partner = _pairs(a.shapes[removed], b.shapes[added])
+    paired = partner >= 0
+    partner = added[partner[paired]]
+    used = np.zeros(len(b.hashes), dtype=bool)
+    used[partner] = True
+
+    def entry(features: LayerFeatures, i: int) -> Dict[str, Any]:
+        return {"kind": KIND_NAMES[features.kind[i]], "x": round(float(features.x[i]), 4),
+                "y": round(float(features.y[i]), 4)}
+
+    for i, j in zip(removed[paired].tolist(), partner.tolist()):
+        change = entry(a, i)
+        change["old_aperture"] = describe_aperture(old, int(a.aperture[i]))
+        change["new_aperture"] = describe_aperture(new, int(b.aperture[j]))
+        diff.aperture_changed.append(change)
+    for i in removed[~paired].tolist():
+        change = entry(a, i)
+        change["aperture"] = describe_aperture(old, int(a.aperture[i]))
+        diff.removed.append(change)
+    for j in added[~used[added]].tolist():
+        change = entry(b, j)
+        change["aperture"] = describe_aperture(new, int(b.aperture[j]))
+        diff.added.append(change)
+    return diff
+
+
+@dataclass
+class DrillDiff:
+    """Differences between two revisions of a board's drill hits."""
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    moved: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return not (self.removed or self.added or self.moved)
+
+
+def _hits(drills: List[DrillHoles]) -> np.ndarray:
+    """(N, 3) x, y, diameter of the hits of known tools."""
+    hits = [np.column_stack([d.holes[:, 0], d.holes[:, 1], d.diameters()]) for d in drills]
+    hits = np.concatenate([np.empty((0, 3))] + hits)
+    return hits[~np.isnan(hits[:, 2])]
+
+
+def diff_drills(old: List[DrillHoles], new: List[DrillHoles], quantum: float = DEFAULT_QUANTUM_MM,
+                max_move: float = DEFAULT_MAX_MOVE_MM) -> DrillDiff:
+    """Compare the drill hits of two revisions.
+
+    Args:
+        old: Drill files of the first revision
+        new: Drill files of the second revision
+        quantum: Positions and diameters closer than this compare equal (mm)
+        max_move: Largest distance a hit of unchanged diameter counts as moved (mm)
+
+    Returns:
+        DrillDiff
+    """
+    a, b = _hits(old), _hits(new)
+    hash_a = _hash(*(_quantize(a[:, k], quantum) for k in range(3)))
+    hash_b = _hash(*(_quantize(b[:, k], quantum) for k in range(3)))
+    removed, added = a[_surplus(hash_a, hash_b)], b[_surplus(hash_b, hash_a)]
+
+    moved_from, moved_to, distances = [], [], []
+    for diameter in np.intersect1d(_quantize(removed[:, 2], quantum), _quantize(added[:, 2], quantum)):
+        r = np.flatnonzero(_quantize(removed[:, 2], quantum) == diameter)
+        c = np.flatnonzero(_quantize(added[:, 2], quantum) == diameter)
+        index = SpatialIndex(added[c, 0], added[c, 1], added[c, 0], added[c, 1], np.zeros(len(c)))
+        nearest, distance = index.nearest(removed[r, 0], removed[r, 1], max_move)
+        found = nearest >= 0
+        moved_from.append(r[found])
+        moved_to.append(c[nearest[found]])
+        distances.append(distance[found])
+    diff = DrillDiff()
+    if moved_from:
+        moved_from, moved_to = np.concatenate(moved_from), np.concatenate(moved_to)
+        # Closest first; each added hit takes one removed hit
+        order = np.argsort(np.concatenate(distances), kind='stable')
+        moved_from, moved_to = moved_from[order], moved_to[order]
+        _, first = np.unique(moved_to, return_index=True)
+        moved_from, moved_to = moved_from[np.sort(first)], moved_to[np.sort(first)]
+    else:
+        moved_from = moved_to = np.empty(0, np.intp)
+
+    for i, j in zip(moved_from.tolist(), moved_to.tolist()):
+        x, y, diameter = removed[i]
+        new_x, new_y, _ = added[j]
+        diff.moved.append({"x": round(x, 4), "y": round(y, 4), "new_x": round(new_x, 4), "new_y": round(new_y, 4),
+                           "diameter": round(diameter, 4), "distance": round(float(np.hypot(new_x - x, new_y - y)), 4)})
+    for rows, target, taken in ((removed, diff.removed, moved_from), (added, diff.added, moved_to)):
+        keep = np.ones(len(rows), dtype=bool)
+        keep[taken] = False
+        for x, y, diameter in rows[keep].tolist():
+            target.append({"x": round(x, 4), "y": round(y, 4), "diameter": round(diameter, 4)})
+    return diff
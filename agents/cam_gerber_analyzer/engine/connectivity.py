@@ -0,0 +1,266 @@
+"""Net connectivity of a board's copper.
+
+Every copper feature (the capsules of copper_features) and every plated
+drill hit is a node. They are joined when:
+
+- two features of a layer touch or overlap, found with the layer's spatial
+  index (pairs_within at TOUCH_TOLERANCE).
+- they are edges of the same region.
+- a feature lies inside a region without touching its outline, e.g. a via
+  in a pour. Its first end point is tested against the regions whose box
+  holds it (see points_in_regions).
+- a drill hit's barrel touches a feature, or the hit lies inside a region.
+  The hit joins the copper of every layer it passes through.
+
+The nodes are then labelled with connected_components, the vectorized
+union-find of the spatial index, and the labels renumbered to dense net
+IDs. Clear polarity is not subtracted: copper split only by a clear
+primitive stays one net.
+
+The links within each layer, the bulk of the work, depend on that layer
+alone. They are computed through a memo, so a caller keeping them from an
+earlier revision of the board only recomputes the layers that changed.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .drill import DrillHoles
+from .geometry import (
+    FEATURE_ARC, FEATURE_FLASH, FEATURE_LINE, FEATURE_REGION, LayerGeometry,
+)
+from .spatial_index import TOUCH_TOLERANCE, SpatialIndex, connected_components, group_links
+
+# Drill files whose name marks them as non-plated
+NON_PLATED = re.compile(r'npth|non[-_ ]?plated|unplated', re.IGNORECASE)
+
+# Candidate (point, edge) pairs tested at once
+_MAX_PAIRS = 1 << 22
+
+# memo(name, inputs, compute) returns compute() or a result kept from an
+# earlier call with the same name and inputs. Inputs name board layers as
+# "copper:<layer>", "mask:<copper layer>" and "drill:<file name>"; other
+# strings stand for themselves.
+Memo = Callable[[str, Tuple[str, ...], Callable[[], np.ndarray]], np.ndarray]
+
+# Geometry array of each feature kind
+_KIND_ARRAYS = {FEATURE_LINE: 'lines', FEATURE_ARC: 'arcs', FEATURE_FLASH: 'flashes', FEATURE_REGION: 'regions'}
+
+
+@dataclass
+class BoardNets:
+    """Net of every copper feature and plated drill hit of a board."""
+    features: Dict[str, np.ndarray]     # FEATURE_DTYPE per copper layer, 'net' filled in
+    hit_x: np.ndarray                   # plated drill hits (mm)
+    hit_y: np.ndarray
+    hit_nets: np.ndarray                # net per hit
+    count: int                          # nets, numbered 0 .. count - 1
+
+    def primitive_nets(self, layer_name: str, geometry: LayerGeometry) -> Dict[str, np.ndarray]:
+        """Net of every row of a layer's lines, arcs, flashes and regions.
+
+        Rows that are not copper features (clear polarity, macro flashes,
+        zero-size apertures) have net -1.
+        """
+        features = self.features[layer_name]
+        nets = {}
+        for kind, name in _KIND_ARRAYS.items():
+            rows = features[features['kind'] == kind]
+            net = np.full(len(getattr(geometry, name)), -1, dtype=np.int32)
+            net[rows['source']] = rows['net']
+            nets[name] = net
+        return nets
+
+    def summary(self) -> Dict[str, Any]:
+        """Net counts for reports."""
+        layers = [np.unique(f['net']) for f in self.features.values()]
+        copper_nets = np.concatenate([np.empty(0, np.int32)] + layers)
+        _, layer_counts = np.unique(copper_nets, return_counts=True)
+        return {
+            "net_count": self.count,
+            "multilayer_nets": int(np.count_nonzero(layer_counts > 1)),
+            "nets_per_layer": {name: len(nets) for name, nets in zip(self.features, layers)},
+            "unconnected_hits": int(np.count_nonzero(~np.isin(self.hit_nets, copper_nets))),
+        }
+
+
+def no_memo(name: str, inputs: Tuple[str, ...], compute: Callable[[], np.ndarray]) -> np.ndarray:
+    """Memo that always computes."""
+    return compute()
+
+
+def plated_drills(drills: Dict[str, DrillHoles]) -> List[DrillHoles]:
+    """Drill files that connect layers, by file name."""
+    return [holes for name, holes in drills.items() if not NON_PLATED.search(name)]
+
+
+def points_in_regions(x: np.ndarray, y: np.ndarray, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Regions holding each point, by nonzero winding number.
+
+    The edges of every region are bucketed into as many horizontal bands
+    as it has edges, so a point only counts crossings with the edges of its
+    own band.
+
+    Args:
+        x, y: Points
+        edges: FEATURE_REGION features with their region number in 'group'
+
+    Returns:
+        (point index, region number) for every point inside a region
+    """
+    edges = edges[edges['y0'] != edges['y1']]
+    if len(edges) == 0 or len(x) == 0:
+        return np.empty(0, np.intp), np.empty(0, np.int64)
+    edges = edges[np.argsort(edges['group'], kind='stable')]
+    regions, first, count = np.unique(edges['group'], return_index=True, return_counts=True)
+    region = np.repeat(np.arange(len(regions)), count)
+    e_min_y = np.minimum(edges['y0'], edges['y1'])
+    e_max_y = np.maximum(edges['y0'], edges['y1'])
+    e_min_x = np.minimum(edges['x0'], edges['x1'])
+    e_max_x = np.maximum(edges['x0'], edges['x1'])
+    bottom, top = np.minimum.reduceat(e_min_y, first), np.maximum.reduceat(e_max_y, first)
+    left, right = np.minimum.reduceat(e_min_x, first), np.maximum.reduceat(e_max_x, first)
+
+    # Candidate regions of each point by bounding box
+    boxes = SpatialIndex(left, bottom, right, top, np.zeros(len(regions)))
+    point, candidate = boxes.boxes_containing(x, y)
+
+    # Bands of every region, numbered consecutively over all regions
+    height = np.maximum((top - bottom) / count, 1e-12)
+    offset = np.cumsum(count) - count
+
+    def band(r, y_value):
+        return offset[r] + np.clip(np.floor((y_value - bottom[r]) / height[r]), 0, count[r] - 1).astype(np.int64)
+
+    lo, hi = band(region, e_min_y), band(region, e_max_y)
+    spans = hi - lo + 1
+    entry_edge = np.repeat(np.arange(len(edges)), spans)
+    entry_band = np.repeat(lo, spans) + np.arange(len(entry_edge)) - np.repeat(np.cumsum(spans) - spans, spans)
+    order = np.argsort(entry_band, kind='stable')
+    entry_edge, entry_band = entry_edge[order], entry_band[order]
+
+    inside_point, inside_region = [np.empty(0, np.intp)], [np.empty(0, np.int64)]
+    pair_band = band(candidate, y[point])
+    start = np.searchsorted(entry_band, pair_band, side='left')
+    n = np.searchsorted(entry_band, pair_band, side='right') - start
+    ends = np.cumsum(n)
+    first_pair = 0
+    while first_pair < len(n):
+        stop = max(int(np.searchsorted(ends, (ends[first_pair - 1] if first_pair else 0) + _MAX_PAIRS, 'right')),
+                   first_pair + 1)
+        m = n[first_pair:stop]
+        pair = np.repeat(np.arange(first_pair, stop), m)
+        e = entry_edge[np.repeat(start[first_pair:stop], m) + np.arange(len(pair)) - np.repeat(np.cumsum(m) - m, m)]
+        px, py = x[point[pair]], y[point[pair]]
+        x0, y0, x1, y1 = edges['x0'][e], edges['y0'][e], edges['x1'][e], edges['y1'][e]
+        # Edges crossing the ray from the point to the right, upwards +1 and downwards -1
+        spans_y = (e_min_y[e] <= py) & (py < e_max_y[e])
+        crossing = spans_y & (x0 + (py - y0) * (x1 - x0) / np.where(spans_y, y1 - y0, 1.0) > px)
+        winding = np.bincount(pair[crossing] - first_pair, weights=np.where(y1 > y0, 1.0, -1.0)[crossing],
+                              minlength=stop - first_pair)
+        inside = np.flatnonzero(winding != 0) + first_pair
+        inside_point.append(point[inside])
+        inside_region.append(regions[candidate[inside]].astype(np.int64))
+        first_pair = stop
+    return np.concatenate(inside_point), np.concatenate(inside_region)
+
+
+def _layer_links(features: np.ndarray, index: SpatialIndex) -> np.ndarray:
+    """(2, E) edges joining the features of one layer."""
+    edge_i, edge_j = [np.empty(0, np.intp)], [np.empty(0, np.intp)]
+    for i, j, _ in index.pairs_within(TOUCH_TOLERANCE):
+        edge_i.append(i)
+        edge_j.append(j)
+    group_i, group_j = group_links(features['group'])
+    edge_i.append(group_i)
+    edge_j.append(group_j)
+
+    # Features lying wholly inside a region: test their first end point,
+    # and one vertex of each region for islands inside others
+    region = features['kind'] == FEATURE_REGION
+    if region.any():
+        groups = features['group']
+        first_edge = np.flatnonzero(region)[np.unique(groups[region], return_index=True)[1]]
+        probes = np.concatenate([np.flatnonzero(~region), first_edge])
+        point, number = points_in_regions(features['x0'][probes], features['y0'][probes], features[region])
+        # Any edge of the holding region stands for it
+        holder = first_edge[np.searchsorted(groups[first_edge], number)]
+        keep = groups[probes[point]] != number
+        edge_i.append(probes[point][keep])
+        edge_j.append(holder[keep])
+    return np.array([np.concatenate(edge_i), np.concatenate(edge_j)])
+
+
+def _hit_links(features: np.ndarray, index: SpatialIndex, x: np.ndarray, y: np.ndarray,
+               drill: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(hit, feature) pairs where a drill hit's barrel meets a layer's copper."""
+    if len(x) == 0 or len(features) == 0:
+        return np.empty(0, np.intp), np.empty(0, np.intp)
+    hit, feature, distance = index.query(x, y, float(drill.max()) / 2)
+    keep = distance <= drill[hit] / 2 + TOUCH_TOLERANCE
+    hits, linked = [hit[keep]], [feature[keep]]
+
+    region = features['kind'] == FEATURE_REGION
+    if region.any():
+        groups = features['group']
+        first_edge = np.flatnonzero(region)[np.unique(groups[region], return_index=True)[1]]
+        point, number = points_in_regions(x, y, features[region])
+        hits.append(point)
+        linked.append(first_edge[np.searchsorted(groups[first_edge], number)])
+    return np.concatenate(hits), np.concatenate(linked)
+
+
+def extract_nets(copper: Dict[str, LayerGeometry], drills: Iterable[DrillHoles] = (),
+                 memo: Memo = no_memo) -> BoardNets:
+    """Trace the nets of a board.
+
+    Only real copper makes nodes: strokes of zero-size apertures, such as a
+    board outline drawn in C0, are no net (see LayerGeometry.copper_features).
+
+    Args:
+        copper: Copper layer geometry by layer name
+        drills: Plated drill files; their hits join the layers (see plated_drills)
+        memo: Memo of the links within each layer, named "layer_links"
+
+    Returns:
+        BoardNets
+    """
+    drills = list(drills)
+    diameters = [d.diameters() for d in drills]
+    known = [~np.isnan(diameter) for diameter in diameters]
+    x = np.concatenate([np.empty(0)] + [d.holes[k, 0] for d, k in zip(drills, known)])
+    y = np.concatenate([np.empty(0)] + [d.holes[k, 1] for d, k in zip(drills, known)])
+    drill = np.concatenate([np.empty(0)] + [diameter[k] for diameter, k in zip(diameters, known)])
+
+    # Hits are nodes 0 .. len(x) - 1, then the features of each layer
+    features: Dict[str, np.ndarray] = {}
+    offsets: Dict[str, int] = {}
+    edge_i, edge_j = [np.empty(0, np.intp)], [np.empty(0, np.intp)]
+    total = len(x)
+    for name, geometry in copper.items():
+        layer = geometry.copper_features()
+        index = SpatialIndex(layer['x0'], layer['y0'], layer['x1'], layer['y1'], layer['radius'])
+        links = memo("layer_links", (f"copper:{name}",), lambda: _layer_links(layer, index))
+        edge_i.append(links[0] + total)
+        edge_j.append(links[1] + total)
+        hit, feature = _hit_links(layer, index, x, y, drill)
+        edge_i.append(hit)
+        edge_j.append(feature + total)
+        features[name], offsets[name] = layer, total
+        total += len(layer)
+
+    labels = connected_components(total, np.concatenate(edge_i), np.concatenate(edge_j))
+    _, nets = np.unique(labels, return_inverse=True)
+    nets = nets.astype(np.int32)
+    for name, layer in features.items():
+        layer['net'] = nets[offsets[name]:offsets[name] + len(layer)]
+    return BoardNets(
+        features=features,
+        hit_x=x,
+        hit_y=y,
+        hit_nets=nets[:len(x)],
+        count=int(nets.max()) + 1 if total else 0,
+    )
@@ -0,0 +1,168 @@
+"""Copper area and copper balance of layers, measured on a bitmap.
+
+Each copper layer is drawn with the tile renderer (see raster.py) over the
+board extent at a fixed pixel size. The bitmap is never held whole: the
+board is drawn in horizontal strips of at most max_strip_pixels, and each
+strip is reduced to pixel counts per cell of a coarse density grid before
+the next one is drawn. A 600 x 400 mm panel at 25 um is 384 million pixels
+but only one strip of them is in memory at a time.
+
+The layer's copper area is the sum of the grid, its percentage is relative
+to the board extent. Balance issues are raised for mirrored layers of the
+stack whose coverage differs too much (bow and twist after lamination) and
+for grid cells far denser or sparser than their layer (uneven plating).
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .geometry import LayerGeometry
+from .raster import LayerRaster
+
+# Pixel and density cell sizes when none are configured
+DEFAULT_PIXEL_MM = 0.025
+DEFAULT_CELL_MM = 10.0
+
+# Pixels drawn at once
+DEFAULT_MAX_STRIP_PIXELS = 1 << 22
+
+
+@dataclass
+class CopperCoverage:
+    """Copper of one layer over a board extent."""
+    area: float              # mm²
+    percentage: float        # of the board extent
+    density: np.ndarray      # (rows, columns) copper fraction per cell, row 0 at the top
+    min_x: float             # left of the grid
+    max_y: float             # top of the grid
+    cell_size: float         # mm, the last row and column may be narrower
+
+    def cell_center(self, row: int, column: int) -> tuple:
+        """(x, y) of a grid cell's centre in mm."""
+        return (self.min_x + (column + 0.5) * self.cell_size,
+                self.max_y - (row + 0.5) * self.cell_size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary, densities as percentages."""
+        return {
+            "area_mm2": round(self.area, 2),
+            "percentage": round(self.percentage, 2),
+            "density": np.round(self.density * 100, 1).tolist(),
+        }
+
+
+def copper_coverage(geometry: LayerGeometry, bounds: Dict[str, float],
+                    pixel_mm: float = DEFAULT_PIXEL_MM, cell_mm: float = DEFAULT_CELL_MM,
+                    max_strip_pixels: int = DEFAULT_MAX_STRIP_PIXELS) -> CopperCoverage:
+    """Measure the copper of a layer strip by strip.
+
+    Args:
+        geometry: Copper layer geometry
+        bounds: Board extent, dictionary with min_x, min_y, max_x and max_y
+        pixel_mm: Pixel side in mm
+        cell_mm: Density cell side in mm, rounded to whole pixels
+        max_strip_pixels: Pixels drawn at once, which bounds memory use
+
+    Returns:
+        CopperCoverage
+    """
+    raster = LayerRaster(geometry)
+    left, top = bounds["min_x"], bounds["max_y"]
+    width = max(1, math.ceil((bounds["max_x"] - left) / pixel_mm))
+    height = max(1, math.ceil((top - bounds["min_y"]) / pixel_mm))
+    cell = max(1, round(cell_mm / pixel_mm))
+    strip = max(1, min(cell, max_strip_pixels // width))
+
+    # First pixel column of every grid column
+    column_starts = np.arange(0, width, cell)
+    counts = np.zeros((math.ceil(height / cell), len(column_starts)), dtype=np.int64)
+    for row in range(0, height, strip):
+        # Strips never straddle two grid rows
+        rows = min(strip, height - row, cell - row % cell)
+        mask = raster.render(left, top - row * pixel_mm, pixel_mm, width, rows)
+        counts[row // cell] += np.add.reduceat(np.count_nonzero(mask, axis=0), column_starts)
+
+    cell_rows = np.minimum(cell, height - np.arange(counts.shape[0]) * cell)
+    cell_columns = np.minimum(cell, width - column_starts)
+    total = int(counts.sum())
+    return CopperCoverage(
+        area=total * pixel_mm ** 2,
+        percentage=100.0 * total / (width * height),
+        density=counts / np.outer(cell_rows, cell_columns),
+        min_x=left,
+        max_y=top,
+        cell_size=cell * pixel_mm,
+    )
+
+
+def stack_order(layer_names: List[str]) -> List[str]:
+    """Copper layer names from top to bottom.
+
+    copper_top comes first and copper_bottom last; inner layers are ordered
+    by their number, with unnumbered layers after the numbered ones.
+    """
+    def position(name: str):
+        if name == "copper_top":
+            return (0, 0, name)
+        if name == "copper_bottom":
+            return (2, 0, name)
+        number = re.search(r'(\d+)', name)
+        return (1, int(number.group(1)) if number else math.inf, name)
+
+    return sorted(layer_names, key=position)
+
+
+def balance_issues(coverages: Dict[str, CopperCoverage], max_imbalance: Optional[float] = None,
+                   max_deviation: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Copper-balance issues of a board's layers.
+
+    Args:
+        coverages: CopperCoverage per copper layer name
+        max_imbalance: Largest difference in copper percentage between
+            mirrored layers of the stack (top and bottom, and so on inwards)
+        max_deviation: Largest difference in percentage points between a
+            density cell and its layer's copper percentage
+
+    Returns:
+        List of issue dictionaries
+    """
+    issues = []
+    order = stack_order(list(coverages))
+    if max_imbalance is not None:
+        for upper, lower in zip(order[:len(order) // 2], reversed(order[(len(order) + 1) // 2:])):
+            difference = abs(coverages[upper].percentage - coverages[lower].percentage)
+            if difference > max_imbalance:
+                issues.append({
+                    "issue_type": "copper_balance",
+                    "severity": "warning",
+                    "layer_name": f"{upper}/{lower}",
+                    "description": f"Copper coverage of {upper} ({coverages[upper].percentage:.1f}%) and "
+                                   f"{lower} ({coverages[lower].percentage:.1f}%) differs by {difference:.1f}%",
+                    "recommendation": "Add copper thieving or pour to the sparser layer to reduce bow and twist"
+                })
+
+    if max_deviation is not None:
+        for name in order:
+            coverage = coverages[name]
+            deviation = np.abs(coverage.density * 100 - coverage.percentage)
+            uneven = deviation > max_deviation
+            if not uneven.any():
+                continue
+            row, column = np.unravel_index(np.argmax(deviation), deviation.shape)
+            x, y = coverage.cell_center(row, column)
+            issues.append({
+                "issue_type": "copper_density",
+                "severity": "info" if uneven.sum() == 1 else "warning",
+                "layer_name": name,
+                "location_x": round(x, 4),
+                "location_y": round(y, 4),
+                "description": f"{int(uneven.sum())} of {uneven.size} {coverage.cell_size:g}mm cells differ from "
+                               f"the layer's {coverage.percentage:.1f}% copper by more than {max_deviation}%, "
+                               f"at most {deviation[row, column]:.1f}%",
+                "recommendation": "Balance the copper distribution with thieving in sparse areas"
+            })
+    return issues
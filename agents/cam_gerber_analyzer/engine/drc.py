@@ -0,0 +1,388 @@
+"""Vectorized design-rule checks over layer geometry and drill hits.
+
+Each check compares one rule from AGENT_CONFIG["cam_rules"] against every
+feature at once and returns a VIOLATION_DTYPE array: the rule, where it is
+broken (mm) and the measured value against the limit. run_drc applies every
+check to a board and violation_issues turns the result into analysis issues.
+
+Annular rings come from the drill-to-pad registration. Solder-mask clearance
+uses the capsule model of the spatial index: for an inner capsule held by an
+outer one, the margin between their edges is at least the outer radius minus
+the inner radius minus the largest distance from the inner segment's end
+points to the outer segment. For the round and obround shapes found on real boards this is
+exact; rectangle corners are rounded off, which errs on the strict side.
+
+run_drc computes every check through a memo (see connectivity.Memo), named
+after the check and its limit, with the layers it reads as inputs. Spacing
+depends on the nets of the whole board, so only its near pairs are memoized,
+and they are filtered by the current nets on every run.
+
+Layers with step-and-repeat blocks are checked as one board: each violation
+is found once, and violation_issues reports on how many boards of the panel
+it recurs (LayerGeometry.repeats). Only the spacing between boards needs the
+copies, and check_panel_spacing places just the copper near each board's edge.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .connectivity import BoardNets, Memo, extract_nets, no_memo, plated_drills
+from .drill import DrillHoles
+from .geometry import FEATURE_FLASH, LayerGeometry, arc_midpoints
+from .gerber_tokenizer import DARK
+from .registration import register_drills
+from .spatial_index import SpatialIndex, find_clearances, near_pairs, point_segment_distance
+
+VIOLATION_DTYPE = np.dtype([
+    ('rule', 'i1'),
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('measured', 'f8'),      # mm
+    ('limit', 'f8'),         # mm
+])
+
+RULE_TRACE_WIDTH = 0
+RULE_SPACING = 1
+RULE_ANNULAR_RING = 2
+RULE_DRILL_SIZE = 3
+RULE_SOLDER_MASK_CLEARANCE = 4
+RULE_PANEL_SPACING = 5
+
+# Issue type, what is measured and the recommendation per rule
+RULES = {
+    RULE_TRACE_WIDTH: ("trace_width", "Trace width", "Widen the trace to at least {limit}mm"),
+    RULE_SPACING: ("spacing", "Copper spacing", "Increase the clearance between the nets to at least {limit}mm"),
+    RULE_ANNULAR_RING: ("annular_ring", "Annular ring", "Enlarge the pad or reduce the drill to keep a {limit}mm ring"),
+    RULE_DRILL_SIZE: ("drill_size", "Drill diameter", "Use a drill of at least {limit}mm"),
+    RULE_SOLDER_MASK_CLEARANCE: ("solder_mask_clearance", "Solder mask clearance",
+                                 "Expand the mask opening to clear the pad by {limit}mm"),
+    RULE_PANEL_SPACING: ("panel_spacing", "Copper spacing between panel boards",
+                         "Increase the step-and-repeat distance to clear the boards by at least {limit}mm"),
+}
+
+# Violations saved as individual issues per rule and layer; the rest are counted
+MAX_ISSUES_PER_RULE = 100
+
+
+@dataclass
+class Board:
+    """Inputs of a design-rule check, keyed by layer name."""
+    copper: Dict[str, LayerGeometry] = field(default_factory=dict)
+    masks: Dict[str, LayerGeometry] = field(default_factory=dict)     # keyed by the copper layer they cover
+    drills: Dict[str, DrillHoles] = field(default_factory=dict)
+
+
+def _violations(rule: int, x, y, measured, limit: float) -> np.ndarray:
+    """Build a VIOLATION_DTYPE array."""
+    violations = np.empty(len(measured), dtype=VIOLATION_DTYPE)
+    violations['rule'] = rule
+    violations['x'], violations['y'] = x, y
+    violations['measured'] = measured
+    violations['limit'] = limit
+    return violations
+
+
+def check_trace_widths(geometry: LayerGeometry, min_width: float) -> np.ndarray:
+    """Lines and arcs drawn narrower than the minimum trace width.
+
+    Strokes of zero-size apertures, such as a board outline drawn in C0,
+    draw no copper and are not traces.
+
+    Args:
+        geometry: Copper layer geometry
+        min_width: Minimum trace width in mm
+
+    Returns:
+        One violation per segment, at its midpoint
+    """
+    lines = geometry.lines[geometry.lines['polarity'] == DARK]
+    arcs = geometry.arcs[geometry.arcs['polarity'] == DARK]
+    line_widths = geometry.stroke_widths(lines)
+    arc_widths = geometry.stroke_widths(arcs)
+    narrow_lines = (line_widths < min_width) & (line_widths > 0)
+    narrow_arcs = (arc_widths < min_width) & (arc_widths > 0)
+
+    lines = lines[narrow_lines]
+    arc_x, arc_y = arc_midpoints(arcs[narrow_arcs])
+    x = np.concatenate([(lines['x0'] + lines['x1']) / 2, arc_x])
+    y = np.concatenate([(lines['y0'] + lines['y1']) / 2, arc_y])
+    widths = np.concatenate([line_widths[narrow_lines], arc_widths[narrow_arcs]])
+    return _violations(RULE_TRACE_WIDTH, x, y, widths, min_width)
+
+
+def spacing_pairs(geometry: LayerGeometry, min_spacing: float) -> np.ndarray:
+    """Pairs of a layer's copper features closer than the minimum spacing, whatever their nets.
+
+    Returns:
+        PAIR_DTYPE array over the rows of geometry.copper_features()
+    """
+    features = geometry.copper_features()
+    index = SpatialIndex(features['x0'], features['y0'], features['x1'], features['y1'], features['radius'])
+    return near_pairs(index, min_spacing)
+
+
+def check_spacing(geometry: LayerGeometry, min_spacing: float,
+                  features: Optional[np.ndarray] = None, pairs: Optional[np.ndarray] = None) -> np.ndarray:
+    """Copper of different nets closer than the minimum spacing.
+
+    Args:
+        geometry: Copper layer geometry
+        min_spacing: Minimum copper-to-copper clearance in mm
+        features: The layer's copper features with their board nets (see
+            connectivity.extract_nets); by default nets are traced on the layer
+        pairs: spacing_pairs(geometry, min_spacing) if already known
+
+    Returns:
+        One violation per pair of nets, at the middle of their closest gap
+    """
+    nets = None if features is None else features['net']
+    if features is None:
+        features = geometry.copper_features()
+    index = SpatialIndex(features['x0'], features['y0'], features['x1'], features['y1'], features['radius'])
+    clearances = find_clearances(index, min_spacing, features['group'], nets, pairs)
+    closest = clearances.closest_per_net_pair()
+    closest = closest[clearances.clearance[closest] < min_spacing]
+    return _violations(RULE_SPACING, clearances.x[closest], clearances.y[closest],
+                       clearances.clearance[closest], min_spacing)
+
+
+def check_panel_spacing(geometry: LayerGeometry, min_spacing: float) -> np.ndarray:
+    """Copper of different boards of a panel closer than the minimum spacing.
+
+    Copies are placed only for the copper within min_spacing of the edge of
+    each step-and-repeat block (see LayerGeometry.panel_features); copper
+    outside the blocks, such as panel rails, is checked against every board.
+
+    Args:
+        geometry: Copper layer geometry with step-and-repeat blocks
+        min_spacing: Minimum copper-to-copper clearance in mm
+
+    Returns:
+        One violation per pair of boards, at the middle of their closest gap
+    """
+    if geometry.copies < 2:
+        return _violations(RULE_PANEL_SPACING, [], [], [], min_spacing)
+    features, boards = geometry.panel_features(geometry.copper_features(), min_spacing)
+    index = SpatialIndex(features['x0'], features['y0'], features['x1'], features['y1'], features['radius'])
+    clearances = find_clearances(index, min_spacing, nets=boards)
+    closest = clearances.closest_per_net_pair()
+    closest = closest[clearances.clearance[closest] < min_spacing]
+    return _violations(RULE_PANEL_SPACING, clearances.x[closest], clearances.y[closest],
+                       clearances.clearance[closest], min_spacing)
+
+
+def enclosure_margins(inner: np.ndarray, outer: np.ndarray, reach: np.ndarray) -> np.ndarray:
+    """Best margin by which an outer capsule encloses each inner capsule.
+
+    Args:
+        inner: FEATURE_DTYPE capsules to be enclosed
+        outer: FEATURE_DTYPE capsules that may enclose them
+        reach: Per inner capsule, how far outside an outer capsule its start
+            point may lie and still be paired with it (mm)
+
+    Returns:
+        Margin in mm per inner capsule, negative where it sticks out; NaN
+        where no outer capsule is within reach
+    """
+    margins = np.full(len(inner), np.nan)
+    if len(inner) == 0 or len(outer) == 0:
+        return margins
+    index = SpatialIndex(outer['x0'], outer['y0'], outer['x1'], outer['y1'], outer['radius'])
+    point, feature, distance = index.query(inner['x0'], inner['y0'], float(reach.max()))
+    keep = distance <= reach[point]
+    point, feature = point[keep], feature[keep]
+
+    held, holder = inner[point], outer[feature]
+    offset = np.maximum(
+        point_segment_distance(held['x0'], held['y0'], holder['x0'], holder['y0'], holder['x1'], holder['y1']),
+        point_segment_distance(held['x1'], held['y1'], holder['x0'], holder['y0'], holder['x1'], holder['y1']),
+    )
+    margin = holder['radius'] - held['radius'] - offset
+    np.fmax.at(margins, point, margin)
+    return margins
+
+
+def check_drill_sizes(drills: DrillHoles, min_drill: float) -> np.ndarray:
+    """Drill hits smaller than the minimum drill size.
+
+    Args:
+        drills: Drill hits
+        min_drill: Minimum drill diameter in mm
+
+    Returns:
+        One violation per hit
+    """
+    diameters = drills.diameters()
+    small = diameters < min_drill
+    return _violations(RULE_DRILL_SIZE, drills.holes[small, 0], drills.holes[small, 1], diameters[small], min_drill)
+
+
+def check_annular_rings(geometry: LayerGeometry, drills: DrillHoles, min_ring: float) -> np.ndarray:
+    """Drill hits whose copper ring on a layer is thinner than the minimum.
+
+    Each hit is checked against the flashed pad it is registered to (see
+    registration.py). Hits with no pad on the layer are not checked there.
+
+    Args:
+        geometry: Copper layer geometry
+        drills: Drill hits
+        min_ring: Minimum annular ring in mm
+
+    Returns:
+        One violation per hit, at the hit
+    """
+    registration = register_drills(geometry, drills)
+    thin = registration.ring < min_ring
+    return _violations(RULE_ANNULAR_RING, registration.x[thin], registration.y[thin], registration.ring[thin],
+                       min_ring)
+
+
+def check_solder_mask_clearance(copper: LayerGeometry, mask: LayerGeometry, min_clearance: float) -> np.ndarray:
+    """Pads whose solder-mask opening clears them by less than the minimum.
+
+    Pads with no opening around their centre are taken as tented on purpose
+    and not checked.
+
+    Args:
+        copper: Copper layer geometry
+        mask: Solder mask geometry of the same side; flashes are openings
+        min_clearance: Minimum mask expansion around pads in mm
+
+    Returns:
+        One violation per pad, at the pad
+    """
+    features = copper.copper_features()
+    pads = features[features['kind'] == FEATURE_FLASH]
+    openings = mask.copper_features(inscribed=True)
+    openings = openings[openings['kind'] == FEATURE_FLASH]
+
+    clearances = enclosure_margins(pads, openings, np.zeros(len(pads)))
+    tight = clearances < min_clearance
+    x = (pads['x0'][tight] + pads['x1'][tight]) / 2
+    y = (pads['y0'][tight] + pads['y1'][tight]) / 2
+    return _violations(RULE_SOLDER_MASK_CLEARANCE, x, y, clearances[tight], min_clearance)
+
+
+def run_drc(board: Board, rules: Dict[str, float], nets: Optional[BoardNets] = None,
+            memo: Memo = no_memo) -> List[Tuple[str, np.ndarray]]:
+    """Run every design-rule check on a board.
+
+    Spacing is only checked between different nets of the whole board, so
+    copper joined through vias or other layers is not reported.
+
+    Args:
+        board: Copper, solder mask and drill layers
+        rules: AGENT_CONFIG["cam_rules"]; checks whose rule is missing are skipped
+        nets: Nets of the board, traced here when needed and not given
+        memo: Memo of each check's violations
+
+    Returns:
+        List of (layer name, violations) with at least one violation each
+    """
+    results = []
+    if nets is None and rules.get("min_spacing") is not None and board.copper:
+        nets = extract_nets(board.copper, plated_drills(board.drills), memo)
+
+    def add(layer_name: str, rule: str, inputs: Tuple[str, ...], check, name: Optional[str] = None):
+        violations = memo(f"{name or rule}={rules[rule]}", inputs, check) if inputs else check()
+        if len(violations):
+            results.append((layer_name, violations))
+
+    for name, drills in board.drills.items():
+        if rules.get("min_drill_size") is not None:
+            add(name, "min_drill_size", (f"drill:{name}",),
+                lambda: check_drill_sizes(drills, rules["min_drill_size"]))
+
+    for name, geometry in board.copper.items():
+        copper = f"copper:{name}"
+        if rules.get("min_trace_width") is not None:
+            add(name, "min_trace_width", (copper,), lambda: check_trace_widths(geometry, rules["min_trace_width"]))
+        if rules.get("min_spacing") is not None:
+            pairs = memo(f"spacing_pairs={rules['min_spacing']}", (copper,),
+                         lambda: spacing_pairs(geometry, rules["min_spacing"]))
+            add(name, "min_spacing", (),
+                lambda: check_spacing(geometry, rules["min_spacing"], nets.features.get(name), pairs))
+            if geometry.copies > 1:
+                add(name, "min_spacing", (copper,), lambda: check_panel_spacing(geometry, rules["min_spacing"]),
+                    "panel_spacing")
+        if rules.get("min_annular_ring") is not None:
+            for drill_name, drills in board.drills.items():
+                add(name, "min_annular_ring", (copper, f"drill:{drill_name}"),
+                    lambda: check_annular_rings(geometry, drills, rules["min_annular_ring"]))
+        mask = board.masks.get(name)
+        if mask is not None and rules.get("min_solder_mask_clearance") is not None:
+            add(name, "min_solder_mask_clearance", (copper, f"mask:{name}"),
+                lambda: check_solder_mask_clearance(geometry, mask, rules["min_solder_mask_clearance"]))
+    return results
+
+
+def violation_boards(geometry: LayerGeometry, violations: np.ndarray) -> np.ndarray:
+    """Boards of a panel on which each of a layer's violations recurs.
+
+    Violations found on the first copy of a step-and-repeat block recur on
+    every copy; those between boards (RULE_PANEL_SPACING) occur once.
+
+    Args:
+        geometry: Layer the violations were found on
+        violations: VIOLATION_DTYPE array
+
+    Returns:
+        Boards per violation, for violation_issues
+    """
+    boards = geometry.repeats(violations['x'], violations['y'])
+    boards[violations['rule'] == RULE_PANEL_SPACING] = 1
+    return boards
+
+
+def violation_issues(layer_name: str, violations: np.ndarray,
+                     max_issues: Optional[int] = MAX_ISSUES_PER_RULE,
+                     boards: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Analysis issues for one layer's violations.
+
+    Each violation becomes an issue at its location, worst first. Beyond
+    max_issues per rule, one more issue counts the rest.
+
+    Args:
+        layer_name: Layer reported in the issues
+        violations: VIOLATION_DTYPE array from run_drc
+        max_issues: Issues with a location per rule, or None for all
+        boards: Boards of the panel on which each violation recurs (see
+            LayerGeometry.repeats); once each by default
+
+    Returns:
+        List of issue dictionaries
+    """
+    issues = []
+    if boards is None:
+        boards = np.ones(len(violations), dtype=np.int64)
+    for rule in np.unique(violations['rule']).tolist():
+        issue_type, measured_name, recommendation = RULES[rule]
+        selected = np.flatnonzero(violations['rule'] == rule)
+        selected = selected[np.argsort(violations['measured'][selected], kind='stable')]
+        rows, copies = violations[selected], boards[selected]
+        limit = float(rows['limit'][0])
+        for row, count in zip(rows[:max_issues].tolist(), copies[:max_issues].tolist()):
+            _, x, y, measured, _ = row
+            on_boards = f" on each of {count} boards" if count > 1 else ""
+            issues.append({
+                "issue_type": issue_type,
+                # Shorted nets, cut pads and covered pads are errors rather than marginal
+                "severity": "critical" if measured <= 0 else "warning",
+                "layer_name": layer_name,
+                "location_x": round(x, 4),
+                "location_y": round(y, 4),
+                "description": f"{measured_name} {measured:.3f}mm below minimum {limit}mm{on_boards}",
+                "recommendation": recommendation.format(limit=limit)
+            })
+        if max_issues is not None and len(rows) > max_issues:
+            issues.append({
+                "issue_type": issue_type,
+                "severity": "warning",
+                "layer_name": layer_name,
+                "description": f"{int(copies[max_issues:].sum())} more {measured_name.lower()} violations "
+                               f"below {limit}mm not listed",
+                "recommendation": recommendation.format(limit=limit)
+            })
+    return issues
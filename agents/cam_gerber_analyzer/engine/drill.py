@@ -0,0 +1,471 @@
+"""Excellon drill files decoded into hit, slot and route arrays.
+
+The M48 header (units, zero suppression, coordinate format, FMAT and tool
+table) is a handful of lines and is read in Python. The body is decoded in
+one pass with NumPy, like the Gerber tokenizer: every letter and the number
+after it are parsed at once, each line is a word (a G85 slot line is two),
+and the modal state - position, tool, drill or route mode, tool up/down,
+units and absolute/incremental - is resolved by repeating each setting up
+to the next one.
+
+Results are arrays in millimetres:
+
+- holes: (N, 3) x, y and tool of every drill hit
+- slots: (S, 5) x0, y0, x1, y1 and tool of every G85 slot
+- routes: (R, 6) x0, y0, x1, y1, tool and path length of every G01/G02/G03
+  move with the tool down
+- tools: (T, 2) tool number and diameter, sorted by tool
+
+Like layer geometry, they go through the layer cache under their own result
+kind.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .gerber_tokenizer import MM_PER_INCH, _PADDING, _SWAR_DIGITS, _modal, _parse_numbers
+from ..layer_cache import cached_parse_many
+
+# Result kind of drill hits in the layer cache
+CACHE_KIND = "drill_holes"
+
+# Coordinate digits (integer, decimal) when the header gives none
+DEFAULT_DIGITS = {'IN': (2, 4), 'MM': (3, 3)}
+
+# Modes of coordinate words
+_DRILL = 0
+_ROUTE_MOVE = 1
+_ROUTE_LINEAR = 2
+_ROUTE_CLOCKWISE = 3
+_ROUTE_COUNTERCLOCKWISE = 4
+_G_MODES = {0: _ROUTE_MOVE, 1: _ROUTE_LINEAR, 2: _ROUTE_CLOCKWISE, 3: _ROUTE_COUNTERCLOCKWISE,
+            5: _DRILL, 81: _DRILL}
+
+# Letter codes; other letters (F, S, R, ...) are parsed and ignored
+_X, _Y, _T, _G, _M, _C, _A, _I, _J = range(1, 10)
+_LETTER = np.zeros(256, dtype=np.uint8)
+_LETTER[ord('A'):ord('Z') + 1] = 255
+for _char, _code in zip(b'XYTGMCAIJ', (_X, _Y, _T, _G, _M, _C, _A, _I, _J)):
+    _LETTER[_char] = _code
+
+_UNITS_RE = re.compile(r'^(METRIC|INCH)((?:,[^,]*)*)$')
+_TOOL_RE = re.compile(r'^T(\d+)[^C]*C([-+]?[\d.]+)')
+_HEADER_END_RE = re.compile(rb'^(?:%|M95)$', re.M)
+_COMMENT_RE = re.compile(rb';[^\n]*')
+
+
+@dataclass
+class ExcellonFormat:
+    """Coordinate decoding set by the header and by units switches."""
+    units: str = 'IN'                       # 'IN' or 'MM'
+    zeros: str = 'TZ'                       # zeros kept: 'LZ' leading or 'TZ' trailing
+    digits: Optional[Tuple[int, int]] = None
+    version: int = 2                        # FMAT
+    incremental: bool = False               # ICI
+
+    @property
+    def mm_per_unit(self) -> float:
+        return MM_PER_INCH if self.units == 'IN' else 1.0
+
+    @property
+    def coordinate_digits(self) -> Tuple[int, int]:
+        return self.digits or DEFAULT_DIGITS[self.units]
+
+    def apply(self, line: str) -> bool:
+        """Apply a header or keyword line; returns whether it was understood."""
+        match = _UNITS_RE.match(line)
+        if match:
+            units = 'MM' if match.group(1) == 'METRIC' else 'IN'
+            if units != self.units:
+                self.units, self.digits = units, None
+            for option in match.group(2).split(',')[1:]:
+                if option in ('LZ', 'TZ'):
+                    self.zeros = option
+                elif re.fullmatch(r'0+\.0+', option):
+                    integer, decimal = option.split('.')
+                    self.digits = (len(integer), len(decimal))
+            return True
+        if line in ('M71', 'M72'):
+            return self.apply('METRIC' if line == 'M71' else 'INCH')
+        if line.startswith('FMAT,'):
+            self.version = 1 if line[5:] == '1' else 2
+            return True
+        if line.startswith('ICI'):
+            self.incremental = line != 'ICI,OFF'
+            return True
+        return False
+
+    def decode(self, text: str) -> float:
+        """One number in mm, with or without a decimal point."""
+        if '.' in text:
+            return float(text) * self.mm_per_unit
+        integer, decimal = self.coordinate_digits
+        digits = text.lstrip('+-')
+        value = int(digits) * (10 ** (integer + decimal - len(digits)) if self.zeros == 'LZ' else 1)
+        return (-value if text.startswith('-') else value) / 10 ** decimal * self.mm_per_unit
+
+    def snapshot(self) -> Tuple[float, int, int, bool]:
+        integer, decimal = self.coordinate_digits
+        return (self.mm_per_unit, integer, decimal, self.zeros == 'LZ')
+
+
+@dataclass
+class DrillHoles:
+    """Drill hits, slots, routes and tool table of one drill file."""
+    holes: np.ndarray        # (N, 3): x, y, tool
+    tools: np.ndarray        # (T, 2): tool, diameter
+    slots: Optional[np.ndarray] = None      # (S, 5): x0, y0, x1, y1, tool
+    routes: Optional[np.ndarray] = None     # (R, 6): x0, y0, x1, y1, tool, length
+
+    ARRAYS = ('holes', 'tools', 'slots', 'routes')
+
+    def __post_init__(self):
+        if self.slots is None:
+            self.slots = np.zeros((0, 5))
+        if self.routes is None:
+            self.routes = np.zeros((0, 6))
+
+    def _diameters_of(self, tools: np.ndarray) -> np.ndarray:
+        table = self.tools[:, 0]
+        if len(table) == 0:
+            return np.full(len(tools), np.nan)
+        index = np.minimum(np.searchsorted(table, tools), len(table) - 1)
+        return np.where(table[index] == tools, self.tools[index, 1], np.nan)
+
+    def diameters(self) -> np.ndarray:
+        """Diameter of each hit in mm; NaN where the tool is undefined."""
+        return self._diameters_of(self.holes[:, 2])
+
+    def tool_usage(self) -> Dict[int, Dict[str, Any]]:
+        """Per tool: diameter, hit and slot counts, and length routed by slots and routes in mm."""
+        used = np.unique(np.concatenate([self.tools[:, 0], self.holes[:, 2], self.slots[:, 4], self.routes[:, 4]]))
+        hits = np.bincount(np.searchsorted(used, self.holes[:, 2]), minlength=len(used))
+        slots = np.bincount(np.searchsorted(used, self.slots[:, 4]), minlength=len(used))
+        routed = np.bincount(np.searchsorted(used, self.routes[:, 4]), weights=self.routes[:, 5], minlength=len(used))
+        slot_lengths = np.hypot(self.slots[:, 2] - self.slots[:, 0], self.slots[:, 3] - self.slots[:, 1])
+        routed += np.bincount(np.searchsorted(used, self.slots[:, 4]), weights=slot_lengths, minlength=len(used))
+        diameters = self._diameters_of(used)
+        return {
+            int(tool): {
+                "diameter_mm": None if np.isnan(diameter) else float(diameter),
+                "hits": int(hit_count),
+                "slots": int(slot_count),
+                "routed_length_mm": float(length),
+            }
+            for tool, diameter, hit_count, slot_count, length in zip(used, diameters, hits, slots, routed)
+        }
+
+    def to_result(self) -> Dict[str, Any]:
+        """Result dictionary for the layer cache and executor."""
+        result: Dict[str, Any] = {"success": True}
+        result.update((name, getattr(self, name)) for name in self.ARRAYS)
+        return result
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> 'DrillHoles':
+        """Inverse of to_result."""
+        return cls(**{name: result[name] for name in cls.ARRAYS if name in result})
+
+
+def read_excellon(file_path: str) -> Tuple[DrillHoles, ExcellonFormat]:
+    """Decode an Excellon file.
+
+    Args:
+        file_path: Path to drill file
+
+    Returns:
+        (DrillHoles, format declared by the header)
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return decode_excellon(data)
+
+
+def read_drill_holes(file_path: str) -> DrillHoles:
+    """Decode the hits, slots and routes of an Excellon file."""
+    return read_excellon(file_path)[0]
+
+
+def decode_excellon(data: bytes) -> Tuple[DrillHoles, ExcellonFormat]:
+    """Decode Excellon bytes. See read_excellon."""
+    data = _COMMENT_RE.sub(b'', data.upper().translate(None, b' \t\r'))
+
+    # Header: from M48 to '%' or M95
+    fmt = ExcellonFormat()
+    tools: Dict[int, float] = {}
+    body_start = 0
+    if data.lstrip(b'\n').startswith(b'M48'):
+        end = _HEADER_END_RE.search(data)
+        body_start = end.end() if end else len(data)
+        for line in data[:body_start].decode('ascii', 'replace').split('\n'):
+            if not fmt.apply(line):
+                match = _TOOL_RE.match(line)
+                if match:
+                    tools[int(match.group(1))] = fmt.decode(match.group(2))
+    header = ExcellonFormat(**vars(fmt))
+
+    holes = _decode_body(data[body_start:] + b'\n', fmt, tools)
+    return holes, header
+
+
+def _decode_body(buf: bytes, fmt: ExcellonFormat, tools: Dict[int, float]) -> DrillHoles:
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    newlines = np.flatnonzero(arr == ord('\n'))
+    line_starts = np.concatenate(([0], newlines[:-1] + 1))
+    first = arr[line_starts]
+    second = arr[np.minimum(line_starts + 1, len(arr) - 1)]
+
+    # Keyword lines (METRIC, ICI, FMAT, ...) and '%' are handled in Python
+    keyword = ((_LETTER[first] > 0) & (_LETTER[second] > 0)) | (first == ord('%'))
+    keyword_lines = np.flatnonzero(keyword)
+
+    # Letters and the numbers after them, up to the next letter or line end
+    pos = np.flatnonzero(_LETTER[arr])
+    line = np.searchsorted(newlines, pos)
+    keep = ~keyword[line]
+    pos, line = pos[keep], line[keep]
+    kind = _LETTER[arr[pos]]
+    end = np.minimum(np.append(pos[1:], len(arr)), newlines[line])
+    value, raw, digits, decimal = _parse_body_numbers(buf, arr, pos + 1, end)
+
+    # Words: one per line, and a second one after G85 for the slot's end
+    slot_letter = (kind == _G) & (raw == 85) & ~decimal
+    after_slot = np.zeros(len(pos), dtype=bool)
+    if slot_letter.any():
+        last = np.searchsorted(np.flatnonzero(slot_letter), np.arange(len(pos)), side='right') - 1
+        slot_lines = line[slot_letter]
+        after_slot = (last >= 0) & (slot_lines[np.maximum(last, 0)] == line)
+    key = line * 2 + after_slot
+    new_word = np.ones(len(key), dtype=bool)
+    new_word[1:] = key[1:] != key[:-1]
+    word = np.cumsum(new_word) - 1
+    n_words = int(word[-1]) + 1 if len(word) else 0
+    word_line = line[new_word]
+
+    def events(code: int):
+        sel = kind == code
+        return word[sel], raw[sel], value[sel], digits[sel], decimal[sel]
+
+    # End of program
+    m_words, m_codes = events(_M)[:2]
+    end_words = m_words[(m_codes == 30) | (m_codes == 0)]
+    limit = int(end_words[0]) if len(end_words) else n_words
+
+    # Coordinate decoding: header state, then keyword lines and M71/M72
+    decodings = [fmt.snapshot()]
+    initial_incremental = fmt.incremental
+    incremental_words, incremental_values = [], []
+    unit_words, unit_values = [], []
+    keyword_words = np.searchsorted(word_line, keyword_lines)
+    unit_events = sorted(
+        [(int(w), buf[line_starts[k]:newlines[k]].decode('ascii', 'replace')) for k, w in zip(keyword_lines, keyword_words)]
+        + [(int(w), f"M{int(c)}") for w, c in zip(m_words, m_codes) if c in (71, 72)]
+    )
+    for event_word, text in unit_events:
+        incremental = fmt.incremental
+        if fmt.apply(text):
+            unit_words.append(event_word)
+            decodings.append(fmt.snapshot())
+            unit_values.append(len(decodings) - 1)
+            if fmt.incremental != incremental:
+                incremental_words.append(event_word)
+                incremental_values.append(fmt.incremental)
+    g_words, g_codes, _, _, g_decimal = events(_G)
+    absolute = (g_codes == 90) | (g_codes == 91)
+    incremental_events = sorted(
+        list(zip(incremental_words, incremental_values))
+        + list(zip(g_words[absolute].tolist(), (g_codes[absolute] == 91).tolist()))
+    )
+    all_words = np.arange(n_words)
+    decoding = _modal(np.asarray(unit_words, dtype=np.int64), np.asarray(unit_values, dtype=np.int64),
+                      all_words, 0)
+    scale, integer, fraction, leading = (np.array(column) for column in zip(*decodings))
+    incremental = _modal(np.array([w for w, _ in incremental_events], dtype=np.int64),
+                         np.array([v for _, v in incremental_events], dtype=bool), all_words,
+                         initial_incremental)
+
+    def millimetres(words, raw_values, numbers, ndigits, has_decimal):
+        d = decoding[words]
+        implied = raw_values.astype(np.float64)
+        implied = np.where(leading[d], implied * np.power(10.0, integer[d] + fraction[d] - ndigits), implied)
+        return np.where(has_decimal, numbers, implied / np.power(10.0, fraction[d])) * scale[d]
+
+    def dense(code: int):
+        words, raw_values, numbers, ndigits, has_decimal = events(code)
+        values = np.zeros(n_words)
+        present = np.zeros(n_words, dtype=bool)
+        values[words] = millimetres(words, raw_values, numbers, ndigits, has_decimal)
+        present[words] = True
+        return values, present
+
+    # Positions, modal and optionally incremental
+    x_values, has_x = dense(_X)
+    y_values, has_y = dense(_Y)
+    x = _positions(x_values, has_x, incremental)
+    y = _positions(y_values, has_y, incremental)
+    x_prev = np.concatenate(([0.0], x[:-1]))
+    y_prev = np.concatenate(([0.0], y[:-1]))
+
+    # Tools: selections, and definitions with C in the same word
+    t_words, t_codes = events(_T)[:2]
+    c_words, c_raw, c_values, c_digits, c_decimal = events(_C)
+    if len(c_words):
+        defined = np.searchsorted(t_words, c_words)
+        valid = (defined < len(t_words)) & (t_words[np.minimum(defined, len(t_words) - 1)] == c_words)
+        diameters = millimetres(c_words, c_raw, c_values, c_digits, c_decimal)
+        for tool, diameter in zip(t_codes[defined[valid]].tolist(), diameters[valid].tolist()):
+            tools[int(tool)] = diameter
+    tool = _modal(t_words, t_codes.astype(np.float64), all_words, 0.0)
+
+    # Drill or route mode, and the tool up or down
+    modal_g = np.isin(g_codes, list(_G_MODES)) & ~g_decimal
+    mode = _modal(g_words[modal_g], np.array([_G_MODES[c] for c in g_codes[modal_g].tolist()], dtype=np.int8),
+                  all_words, _DRILL)
+    plunge = (m_codes == 15) | (m_codes == 16) | (m_codes == 17)
+    down = _modal(m_words[plunge], m_codes[plunge] == 15, all_words, not (m_codes == 15).any())
+
+    coordinate = (has_x | has_y) & (all_words < limit)
+    slot_end = np.zeros(n_words, dtype=bool)
+    slot_end[word[slot_letter]] = True
+    slot_end &= coordinate
+    # The first half of a G85 line is the slot's start, not a hit
+    ends = np.flatnonzero(slot_end)
+    starts = ends - 1
+    slot_start = np.zeros(n_words, dtype=bool)
+    slot_start[starts[(starts >= 0) & (word_line[np.maximum(starts, 0)] == word_line[ends])]] = True
+
+    hit = coordinate & (mode == _DRILL) & ~slot_end & ~slot_start
+    cut = coordinate & (mode >= _ROUTE_LINEAR) & down & ~slot_end & ~slot_start
+    holes = np.column_stack([x[hit], y[hit], tool[hit]])
+    slots = np.column_stack([x_prev[slot_end], y_prev[slot_end], x[slot_end], y[slot_end], tool[slot_end]])
+
+    cuts = np.flatnonzero(cut)
+    length = np.hypot(x[cuts] - x_prev[cuts], y[cuts] - y_prev[cuts])
+    arcs = mode[cuts] != _ROUTE_LINEAR
+    if arcs.any():
+        arc_words = cuts[arcs]
+        radius = dense(_A)
+        i_values, has_i = dense(_I)
+        j_values, has_j = dense(_J)
+        length[arcs] = _arc_lengths(
+            x_prev[arc_words], y_prev[arc_words], x[arc_words], y[arc_words],
+            mode[arc_words] == _ROUTE_CLOCKWISE, radius[0][arc_words], radius[1][arc_words],
+            i_values[arc_words], j_values[arc_words], has_i[arc_words] | has_j[arc_words],
+        )
+    routes = np.column_stack([x_prev[cuts], y_prev[cuts], x[cuts], y[cuts], tool[cuts], length])
+
+    table = np.array(sorted(tools.items()), dtype=np.float64).reshape(-1, 2)
+    return DrillHoles(holes=holes.reshape(-1, 3), tools=table, slots=slots.reshape(-1, 5), routes=routes.reshape(-1, 6))
+
+
+def _parse_body_numbers(buf: bytes, arr: np.ndarray, start: np.ndarray, end: np.ndarray):
+    """Parse the number between each letter and the next token.
+
+    Returns:
+        (value with its decimal point applied, integer digits as written,
+        digit count, whether there was a decimal point)
+    """
+    sign = arr[np.minimum(start, len(arr) - 1)]
+    negative = (sign == ord('-')) & (start < end)
+    cursor = start + (negative | ((sign == ord('+')) & (start < end)))
+
+    dots = np.flatnonzero(arr == ord('.'))
+    d = np.searchsorted(dots, cursor)
+    dot = dots[np.minimum(d, len(dots) - 1)] if len(dots) else np.full(len(cursor), len(arr))
+    decimal = (d < len(dots)) & (dot < end)
+    integer_end = np.where(decimal, dot, end)
+    integer_digits = integer_end - cursor
+    fraction_digits = np.where(decimal, end - dot - 1, 0)
+
+    padded = _PADDING + buf
+    offset = len(_PADDING)
+    raw = _parse_numbers(padded, cursor + offset, integer_digits)
+    fraction = _parse_numbers(padded, np.where(decimal, dot + 1, cursor) + offset, fraction_digits)
+
+    # Anything but digits and one decimal point, or too many digits: parse in Python
+    non_digits = np.flatnonzero((arr - ord('0')) > 9)
+    junk = np.searchsorted(non_digits, end) - np.searchsorted(non_digits, cursor) - decimal
+    invalid = np.flatnonzero((junk > 0) | (integer_digits > _SWAR_DIGITS) | (fraction_digits > _SWAR_DIGITS))
+    value = raw + fraction / np.power(10.0, fraction_digits)
+    for k in invalid.tolist():
+        text = re.match(r'\d*(?:\.\d*)?', buf[cursor[k]:end[k]].decode('ascii', 'replace')).group(0)
+        integer_text = text.partition('.')[0]
+        raw[k] = int(integer_text or 0)
+        integer_digits[k] = len(integer_text)
+        decimal[k] = '.' in text
+        value[k] = float(text) if text.strip('.') else 0.0
+    value[negative] = -value[negative]
+    raw[negative] = -raw[negative]
+    return value, raw, integer_digits, decimal
+
+
+def _positions(values: np.ndarray, present: np.ndarray, incremental: np.ndarray) -> np.ndarray:
+    """Resolve modal coordinates: absolute ones reset, incremental ones add."""
+    steps = np.where(present & incremental, values, 0.0)
+    total = np.cumsum(steps)
+    reset = np.where(present & ~incremental, np.arange(len(values)), -1)
+    np.maximum.accumulate(reset, out=reset)
+    last = np.maximum(reset, 0)
+    return np.where(reset >= 0, values[last] - total[last], 0.0) + total
+
+
+def _arc_lengths(x0, y0, x1, y1, clockwise, radius, has_radius, i, j, has_centre) -> np.ndarray:
+    """Length of routed arcs given by radius (A) or centre offset (I, J)."""
+    chord = np.hypot(x1 - x0, y1 - y0)
+    length = chord.copy()
+
+    # A: the shorter arc of that radius through both points
+    by_radius = has_radius & (radius > 0) & (chord <= 2 * radius)
+    r = radius[by_radius]
+    length[by_radius] = 2 * r * np.arcsin(chord[by_radius] / (2 * r))
+
+    # I, J: centre relative to the start point
+    by_centre = has_centre & ~by_radius
+    cx, cy = x0[by_centre] + i[by_centre], y0[by_centre] + j[by_centre]
+    start = np.arctan2(y0[by_centre] - cy, x0[by_centre] - cx)
+    end = np.arctan2(y1[by_centre] - cy, x1[by_centre] - cx)
+    sweep = np.where(clockwise[by_centre], (start - end) % (2 * np.pi), (end - start) % (2 * np.pi))
+    sweep = np.where(sweep == 0, 2 * np.pi, sweep)
+    length[by_centre] = np.hypot(i[by_centre], j[by_centre]) * sweep
+    return length
+
+
+def drill_holes_result(file_path: str) -> Dict[str, Any]:
+    """Read a drill file's hits as a layer cache result.
+
+    Args:
+        file_path: Path to drill file
+
+    Returns:
+        DrillHoles.to_result() dictionary, or an error dictionary
+    """
+    if not os.path.exists(file_path):
+        return {
+            "success": False,
+            "error": f"File not found: {file_path}"
+        }
+    try:
+        return read_drill_holes(file_path).to_result()
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to read drill holes: {str(e)}"
+        }
+
+
+def load_drill_holes(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """Get the drill hits of several files through the layer cache.
+
+    Pass successful results to DrillHoles.from_result.
+
+    Args:
+        file_paths: Paths to drill files
+
+    Returns:
+        Result dictionaries in the order of file_paths
+    """
+    return cached_parse_many([(file_path, CACHE_KIND, drill_holes_result) for file_path in file_paths])
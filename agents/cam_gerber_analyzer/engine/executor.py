@@ -0,0 +1,200 @@
+"""Process pool running per-layer CAM work.
+
+Parsing a layer and checking it are CPU-bound and independent of the other
+layers, so the pipeline fans them out to worker processes, one task per layer.
+A task is a module-level function (so it pickles) applied to one argument; it
+should return a compact dictionary of plain values and NumPy arrays, which is
+what crosses the process boundary.
+
+Workers are started by a fork server (or spawned where there is none), never
+forked from the calling process, whose other threads (database workers, the
+web server) may hold locks at the time.
+
+Every task gets a timeout. A pool whose task timed out or whose worker died
+is replaced for later calls, and its processes are stopped once no call is
+still waiting on it, so one analysis's hung layer does not break the others
+running at the same time. A task whose worker died gives an error result.
+Tasks that never reach a worker (no processes available, an argument that
+does not pickle) run in the calling process instead, as does everything when
+only one core is available.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_TIMEOUT = 300.0
+
+
+def available_cores() -> int:
+    """Number of cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _run_task(function: Callable[[Any], Dict[str, Any]], argument: Any) -> Dict[str, Any]:
+    """Run one task, turning its exceptions into an error result."""
+    try:
+        return function(argument)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+class CamExecutor:
+    """Runs per-layer tasks on a process pool sized to the available cores."""
+
+    def __init__(self, max_workers: Optional[int] = None, task_timeout: float = DEFAULT_TASK_TIMEOUT):
+        """Initialize the executor; worker processes start on first use.
+
+        Args:
+            max_workers: Number of worker processes, or None for the available cores.
+                1 runs every task in the calling process.
+            task_timeout: Seconds each task may run in the pool
+        """
+        self.max_workers = max_workers or available_cores()
+        self.task_timeout = task_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Calls using each pool, and pools to stop once their last call returns
+        self._in_flight: Dict[ProcessPoolExecutor, int] = {}
+        self._retired: Set[ProcessPoolExecutor] = set()
+        self._lock = threading.Lock()
+
+    def map(self, function: Callable[[Any], Dict[str, Any]], arguments: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Apply a task function to every argument.
+
+        Args:
+            function: Module-level function returning a result dictionary
+            arguments: One argument per task
+
+        Returns:
+            Result dictionaries in argument order. Failed, timed-out and
+            crashed tasks give {"success": False, "error": ...}.
+        """
+        arguments = list(arguments)
+        if self.max_workers <= 1 or len(arguments) < 2:
+            return [_run_task(function, argument) for argument in arguments]
+
+        pool = None
+        try:
+            pool = self._acquire_pool()
+            futures = [pool.submit(_run_task, function, argument) for argument in arguments]
+        except (OSError, RuntimeError, BrokenProcessPool) as e:
+            logger.warning("CAM worker pool unavailable, running %d tasks sequentially: %s", len(arguments), e)
+            self._release_pool(pool, failed=True)
+            return [_run_task(function, argument) for argument in arguments]
+
+        results = []
+        failed_pool = False
+        # Tasks queue behind each other, so the n-th round of tasks may finish
+        # up to n timeouts after submission
+        start = time.monotonic()
+        slots = min(self.max_workers, len(arguments))
+        for index, (argument, future) in enumerate(zip(arguments, futures)):
+            deadline = start + self.task_timeout * (index // slots + 1)
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                future.cancel()
+                failed_pool = True
+                results.append({
+                    "success": False,
+                    "error": f"Timed out after {self.task_timeout:g} seconds"
+                })
+            except BrokenProcessPool:
+                # The worker died (killed, out of memory): not retried here,
+                # where the same would take the calling process down
+                failed_pool = True
+                results.append({
+                    "success": False,
+                    "error": "Worker process ended unexpectedly"
+                })
+            except Exception:
+                # The task never reached a worker (it did not pickle): run it here instead
+                results.append(_run_task(function, argument))
+
+        self._release_pool(pool, failed=failed_pool)
+        return results
+
+    def shutdown(self):
+        """Stop the worker processes of every pool, including ones still in use."""
+        with self._lock:
+            pools = set(self._in_flight) | self._retired | ({self._pool} if self._pool else set())
+            self._pool = None
+            self._in_flight.clear()
+            self._retired.clear()
+        for pool in pools:
+            _stop_pool(pool)
+
+    def _acquire_pool(self) -> ProcessPoolExecutor:
+        """The current pool, counted as in use until _release_pool."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_pool_context())
+            self._in_flight[self._pool] = self._in_flight.get(self._pool, 0) + 1
+            return self._pool
+
+    def _release_pool(self, pool: Optional[ProcessPoolExecutor], failed: bool = False):
+        """End a call's use of a pool; a failed pool is replaced, and stopped once no call uses it."""
+        if pool is None:
+            return
+        with self._lock:
+            if failed:
+                if self._pool is pool:
+                    self._pool = None
+                self._retired.add(pool)
+            users = self._in_flight.get(pool, 1) - 1
+            if users > 0:
+                self._in_flight[pool] = users
+                return
+            self._in_flight.pop(pool, None)
+            if pool not in self._retired:
+                return
+            self._retired.discard(pool)
+        _stop_pool(pool)
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Start method of worker processes: a fork server where available, else spawn."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Workers fork from a server that has already imported the engine
+        context.set_forkserver_preload([__package__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _stop_pool(pool: ProcessPoolExecutor):
+    """Stop a pool's workers; running tasks cannot be cancelled, so the processes are terminated."""
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors: Dict[Tuple[Optional[int], float], CamExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor() -> CamExecutor:
+    """Get the process-wide executor for the settings in AGENT_CONFIG."""
+    from ..config import AGENT_CONFIG
+
+    settings = AGENT_CONFIG.get("executor", {})
+    key = (settings.get("max_workers"), settings.get("task_timeout", DEFAULT_TASK_TIMEOUT))
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = CamExecutor(*key)
+            _executors[key] = executor
+        return executor
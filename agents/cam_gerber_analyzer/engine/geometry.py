@@ -0,0 +1,848 @@
+"""Array-backed geometry of a Gerber layer.
+
+A layer is held in a few NumPy structured arrays instead of one Python object
+per primitive. Line segments, arcs, flashes and region edges share the
+PRIMITIVE_DTYPE columns (x0, y0, x1, y1, aperture_id, polarity). Arcs add
+their centre and direction, and region edges add the region they outline.
+Flashes have x1 == x0 and y1 == y0. Aperture shapes and sizes live in their
+own table, so a primitive's width is a lookup by aperture_id. Coordinates
+are in millimetres.
+
+Arcs are kept as arcs, and flattened to chords on demand (flatten_arcs, all
+arcs at once). G02/G03 edges of G36/G37 regions are flattened while the
+batch is split, so a region is always a closed polygon of straight edges.
+
+Flashes of macro apertures keep their row in flashes, and their outline is
+added to regions as well: the macro instance's template (see macros.py),
+evaluated once per aperture, moved to every flash in one NumPy operation.
+
+Every array is in file order, and the levels table records where each run
+of one polarity (%LPD / %LPC) starts in them, so consumers can stack dark
+and clear geometry in the order the file draws it.
+
+Step-and-repeat blocks (%SR) are held once, where the file draws their
+first copy; the steps table records where each block starts in the arrays
+and its grid of copies. Counts and panel bounds are multiplied out from the
+table, per-board consumers (checks, nets, rendering) see one board, and
+only checks across boards place the copies (panel_features).
+
+The arrays are built directly from tokenizer batches. They pickle compactly
+between processes and are saved as plain .npy files, which the layer cache
+memory-maps back without copying.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .gerber_tokenizer import (
+    CHUNK_SIZE, CLOCKWISE, DARK, LINEAR, OP_FLASH, OP_INTERPOLATE,
+    GerberTokenizer, iter_batches,
+)
+from .macros import macro_template
+from ..layer_cache import cached_parse_many
+
+_PRIMITIVE_FIELDS = [
+    ('x0', 'f8'),
+    ('y0', 'f8'),
+    ('x1', 'f8'),
+    ('y1', 'f8'),
+    ('aperture_id', 'i4'),   # -1 for region edges
+    ('polarity', 'i1'),      # DARK or CLEAR
+]
+PRIMITIVE_DTYPE = np.dtype(_PRIMITIVE_FIELDS)
+ARC_DTYPE = np.dtype(_PRIMITIVE_FIELDS + [('cx', 'f8'), ('cy', 'f8'), ('clockwise', '?')])
+REGION_DTYPE = np.dtype(_PRIMITIVE_FIELDS + [('region', 'i4')])
+
+# Aperture shapes
+SHAPE_MACRO = 0
+SHAPE_CIRCLE = 1
+SHAPE_RECTANGLE = 2
+SHAPE_OBROUND = 3
+SHAPE_POLYGON = 4
+
+_SHAPES = {'C': SHAPE_CIRCLE, 'R': SHAPE_RECTANGLE, 'O': SHAPE_OBROUND, 'P': SHAPE_POLYGON}
+
+APERTURE_DTYPE = np.dtype([
+    ('id', 'i4'),
+    ('shape', 'i1'),
+    ('width', 'f8'),         # diameter of circles and polygons; NaN for macros
+    ('height', 'f8'),
+    ('hole', 'f8'),          # 0 without a hole
+    ('vertices', 'i2'),      # polygons only
+    ('rotation', 'f8'),      # polygons only, degrees
+])
+
+# Copper features: capsules for the spatial index (see spatial_index.py)
+FEATURE_DTYPE = np.dtype([
+    ('x0', 'f8'),
+    ('y0', 'f8'),
+    ('x1', 'f8'),
+    ('y1', 'f8'),
+    ('radius', 'f8'),
+    ('kind', 'i1'),          # FEATURE_LINE, FEATURE_ARC, FEATURE_FLASH or FEATURE_REGION
+    ('source', 'i4'),        # row in the geometry array of that kind
+    ('group', 'i4'),         # region number for region edges, else -1
+    ('net', 'i4'),           # board net (see connectivity.py), -1 until traced
+])
+FEATURE_LINE = 0
+FEATURE_ARC = 1
+FEATURE_FLASH = 2
+FEATURE_REGION = 3
+
+# Polarity levels: the first row of each array drawn at that polarity
+LEVEL_DTYPE = np.dtype([
+    ('polarity', 'i1'),
+    ('lines', 'i8'),
+    ('arcs', 'i8'),
+    ('flashes', 'i8'),
+    ('regions', 'i8'),
+])
+LEVEL_ARRAYS = ('lines', 'arcs', 'flashes', 'regions')
+
+# Step-and-repeat runs: the grid of copies of the rows from each first row
+# on; 1 x 1 outside %SR blocks
+STEP_DTYPE = np.dtype([
+    ('x_count', 'i4'),
+    ('y_count', 'i4'),
+    ('dx', 'f8'),            # mm between columns
+    ('dy', 'f8'),            # mm between rows
+    ('lines', 'i8'),
+    ('arcs', 'i8'),
+    ('flashes', 'i8'),
+    ('regions', 'i8'),
+])
+
+# Placement of every copy of the step-and-repeat runs
+TRANSFORM_DTYPE = np.dtype([
+    ('step', 'i4'),          # row in LayerGeometry.steps
+    ('dx', 'f8'),
+    ('dy', 'f8'),
+])
+
+# Geometry array of each feature kind
+_FEATURE_ARRAYS = {FEATURE_LINE: 'lines', FEATURE_ARC: 'arcs', FEATURE_FLASH: 'flashes', FEATURE_REGION: 'regions'}
+
+# Largest angle of one chord when arcs are flattened
+ARC_STEP = np.pi / 16
+
+# Largest distance between an arc and its chords in mm
+CHORD_TOLERANCE = 0.005
+
+# Result kind of geometry in the layer cache
+CACHE_KIND = "geometry"
+
+
+@dataclass
+class LayerGeometry:
+    """Primitives and aperture table of one layer."""
+    lines: np.ndarray        # PRIMITIVE_DTYPE
+    arcs: np.ndarray         # ARC_DTYPE
+    flashes: np.ndarray      # PRIMITIVE_DTYPE
+    regions: np.ndarray      # REGION_DTYPE, one row per edge
+    apertures: np.ndarray    # APERTURE_DTYPE, sorted by id
+    # LEVEL_DTYPE in file order; empty when unknown (all dark, then all clear)
+    levels: np.ndarray = field(default_factory=lambda: np.zeros(0, LEVEL_DTYPE))
+    # STEP_DTYPE in file order; empty without step-and-repeat
+    steps: np.ndarray = field(default_factory=lambda: np.zeros(0, STEP_DTYPE))
+
+    ARRAYS = ('lines', 'arcs', 'flashes', 'regions', 'apertures', 'levels', 'steps')
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    @property
+    def bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of primitive end points and flash centres in mm, or None if empty.
+
+        Step-and-repeat blocks count with their first copy; see panel_bounds.
+        """
+        primitives = [a for a in (self.lines, self.arcs, self.flashes, self.regions) if len(a)]
+        if not primitives:
+            return None
+        xs = [a[name] for a in primitives for name in ('x0', 'x1')]
+        ys = [a[name] for a in primitives for name in ('y0', 'y1')]
+        return {
+            "min_x": float(min(x.min() for x in xs)),
+            "min_y": float(min(y.min() for y in ys)),
+            "max_x": float(max(x.max() for x in xs)),
+            "max_y": float(max(y.max() for y in ys)),
+        }
+
+    def level_of(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Polarity level of rows of one primitive array; 0 without levels.
+
+        Args:
+            name: 'lines', 'arcs', 'flashes' or 'regions'
+            rows: Row numbers in that array
+
+        Returns:
+            Row numbers in levels
+        """
+        if not len(self.levels):
+            return np.zeros(len(rows), dtype=np.intp)
+        return np.searchsorted(self.levels[name], rows, 'right') - 1
+
+    @property
+    def copies(self) -> int:
+        """Most copies of any step-and-repeat block: the boards per panel."""
+        if not len(self.steps):
+            return 1
+        return int((self.steps['x_count'].astype(np.int64) * self.steps['y_count']).max())
+
+    def step_of(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Step-and-repeat run of rows of one primitive array; -1 without steps.
+
+        Args:
+            name: 'lines', 'arcs', 'flashes' or 'regions'
+            rows: Row numbers in that array
+
+        Returns:
+            Row numbers in steps
+        """
+        if not len(self.steps):
+            return np.full(len(rows), -1, dtype=np.intp)
+        return np.searchsorted(self.steps[name], rows, 'right') - 1
+
+    def transforms(self) -> np.ndarray:
+        """Translation of every copy of every step-and-repeat run, first copies at (0, 0).
+
+        Returns:
+            TRANSFORM_DTYPE array, runs in order and copies row by row;
+            without steps, one row for step -1
+        """
+        if not len(self.steps):
+            return np.array([(-1, 0.0, 0.0)], dtype=TRANSFORM_DTYPE)
+        x_count, y_count = self.steps['x_count'].astype(np.intp), self.steps['y_count'].astype(np.intp)
+        step = np.repeat(np.arange(len(self.steps)), x_count * y_count)
+        # Copy number within its run, then its column and row
+        copy = np.arange(len(step)) - np.repeat(np.cumsum(x_count * y_count) - x_count * y_count, x_count * y_count)
+        transforms = np.empty(len(step), TRANSFORM_DTYPE)
+        transforms['step'] = step
+        transforms['dx'] = copy % x_count[step] * self.steps['dx'][step]
+        transforms['dy'] = copy // x_count[step] * self.steps['dy'][step]
+        return transforms
+
+    def primitive_counts(self) -> Dict[str, int]:
+        """Primitives drawn per array, step-and-repeat blocks counted once per copy."""
+        counts = {}
+        for name in LEVEL_ARRAYS:
+            total = len(getattr(self, name))
+            if not len(self.steps):
+                counts[name] = total
+                continue
+            rows = np.diff(self.steps[name], append=total)
+            counts[name] = int((rows * self.steps['x_count'] * self.steps['y_count']).sum())
+        return counts
+
+    def step_extents(self) -> np.ndarray:
+        """Bounding box of the first copy of every step-and-repeat run.
+
+        Returns:
+            Array of shape (len(steps), 4) of min_x, min_y, max_x, max_y in
+            mm; NaN for runs without primitives
+        """
+        extents = np.full((len(self.steps), 4), np.nan)
+        for name in LEVEL_ARRAYS:
+            array = getattr(self, name)
+            ends = np.append(self.steps[name][1:], len(array))
+            for run, (start, end) in enumerate(zip(self.steps[name].tolist(), ends.tolist())):
+                if start == end:
+                    continue
+                rows = array[start:end]
+                low = [min(rows['x0'].min(), rows['x1'].min()), min(rows['y0'].min(), rows['y1'].min())]
+                high = [max(rows['x0'].max(), rows['x1'].max()), max(rows['y0'].max(), rows['y1'].max())]
+                extents[run, :2] = np.fmin(extents[run, :2], low)
+                extents[run, 2:] = np.fmax(extents[run, 2:], high)
+        return extents
+
+    @property
+    def board_bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of one board in mm: the first copy of the step-and-repeat blocks.
+
+        Without blocks of more than one copy, the same as bounds.
+        """
+        copies = self.steps['x_count'].astype(np.int64) * self.steps['y_count']
+        extents = self.step_extents()[copies > 1]
+        extents = extents[~np.isnan(extents[:, 0])]
+        if not len(extents):
+            return self.bounds
+        return {
+            "min_x": float(extents[:, 0].min()),
+            "min_y": float(extents[:, 1].min()),
+            "max_x": float(extents[:, 2].max()),
+            "max_y": float(extents[:, 3].max()),
+        }
+
+    @property
+    def panel_bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of every copy of the layer in mm, or None if empty.
+
+        Computed from the first copy of each step-and-repeat run and its
+        transforms, without placing the copies.
+        """
+        if not len(self.steps):
+            return self.bounds
+        transforms = self.transforms()
+        extents = self.step_extents()[transforms['step']]
+        drawn = ~np.isnan(extents[:, 0])
+        if not drawn.any():
+            return None
+        x = extents[drawn][:, [0, 2]] + transforms['dx'][drawn, None]
+        y = extents[drawn][:, [1, 3]] + transforms['dy'][drawn, None]
+        return {"min_x": float(x.min()), "min_y": float(y.min()), "max_x": float(x.max()), "max_y": float(y.max())}
+
+    def repeats(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Number of boards on which something found at each point recurs.
+
+        Points within the first copy of a step-and-repeat run recur on each
+        of its copies; points elsewhere (panel rails, or layers without
+        steps) are drawn once.
+
+        Args:
+            x, y: Points in mm
+
+        Returns:
+            Copies per point
+        """
+        repeats = np.ones(len(x), dtype=np.int64)
+        copies = self.steps['x_count'].astype(np.int64) * self.steps['y_count']
+        for (min_x, min_y, max_x, max_y), count in zip(self.step_extents().tolist(), copies.tolist()):
+            if count > 1:
+                inside = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+                repeats[inside] = np.maximum(repeats[inside], count)
+        return repeats
+
+    def panel_features(self, features: np.ndarray, margin: float):
+        """Place the copies of features near the edge of their step-and-repeat block.
+
+        Only what lies within margin of the edge of its block's first copy
+        can come near another copy, so the rest is left out. Features outside
+        the blocks are kept as they are.
+
+        Args:
+            features: FEATURE_DTYPE rows of this layer, e.g. copper_features()
+            margin: Distance from the block's edge in mm
+
+        Returns:
+            (FEATURE_DTYPE array, copy number per feature: a row in
+            transforms(), -1 outside the blocks)
+        """
+        run = np.full(len(features), -1, dtype=np.intp)
+        for kind, name in _FEATURE_ARRAYS.items():
+            selected = features['kind'] == kind
+            run[selected] = self.step_of(name, features['source'][selected])
+        copies = self.steps['x_count'].astype(np.intp) * self.steps['y_count']
+        stepped = run >= 0
+        stepped[stepped] = copies[run[stepped]] > 1
+        if not stepped.any():
+            return features, np.full(len(features), -1, dtype=np.intp)
+
+        # Extent of every block's first copy, from its features
+        radius = features['radius']
+        low_x = np.fmin(features['x0'], features['x1']) - radius
+        high_x = np.fmax(features['x0'], features['x1']) + radius
+        low_y = np.fmin(features['y0'], features['y1']) - radius
+        high_y = np.fmax(features['y0'], features['y1']) + radius
+        extent = np.empty((len(self.steps), 4))
+        extent[:, :2], extent[:, 2:] = np.inf, -np.inf
+        rows = run[stepped]
+        np.minimum.at(extent[:, 0], rows, low_x[stepped])
+        np.minimum.at(extent[:, 1], rows, low_y[stepped])
+        np.maximum.at(extent[:, 2], rows, high_x[stepped])
+        np.maximum.at(extent[:, 3], rows, high_y[stepped])
+        box = extent[np.maximum(run, 0)]
+        edge = stepped & ((low_x - box[:, 0] < margin) | (low_y - box[:, 1] < margin)
+                          | (box[:, 2] - high_x < margin) | (box[:, 3] - high_y < margin))
+
+        # Every copy of the edge features, copy by copy
+        transforms = self.transforms()
+        edge_rows = np.flatnonzero(edge)
+        order = np.argsort(run[edge_rows], kind='stable')
+        edge_rows = edge_rows[order]
+        first, last = (np.searchsorted(run[edge_rows], np.arange(len(self.steps)), side)
+                       for side in ('left', 'right'))
+        placed = [features[~stepped]]
+        copy = [np.full(int(np.count_nonzero(~stepped)), -1, dtype=np.intp)]
+        for number, (step, dx, dy) in enumerate(transforms.tolist()):
+            rows = edge_rows[first[step]:last[step]]
+            if copies[step] < 2 or not len(rows):
+                continue
+            moved = features[rows]
+            moved['x0'] += dx
+            moved['x1'] += dx
+            moved['y0'] += dy
+            moved['y1'] += dy
+            placed.append(moved)
+            copy.append(np.full(len(rows), number, dtype=np.intp))
+        return np.concatenate(placed), np.concatenate(copy)
+
+    def aperture_rows(self, aperture_ids: np.ndarray) -> np.ndarray:
+        """Aperture table rows of the given aperture IDs; -1 where undefined."""
+        ids = self.apertures['id']
+        if len(ids) == 0:
+            return np.full(len(aperture_ids), -1, dtype=np.intp)
+        index = np.minimum(np.searchsorted(ids, aperture_ids), len(ids) - 1)
+        return np.where(ids[index] == aperture_ids, index, -1)
+
+    def stroke_widths(self, primitives: np.ndarray) -> np.ndarray:
+        """Width of the copper drawn by each line or arc in mm.
+
+        The smaller side for rectangles and obrounds; NaN where the aperture is
+        undefined or a macro.
+        """
+        # Row -1 picks the trailing NaN
+        widths = np.append(np.fmin(self.apertures['width'], self.apertures['height']), np.nan)
+        return widths[self.aperture_rows(primitives['aperture_id'])]
+
+    def copper_features(self, polarity: int = DARK, inscribed: bool = False) -> np.ndarray:
+        """Primitives of one polarity as capsules for the spatial index.
+
+        Arcs are flattened (see flatten_arcs). Rectangles and
+        obrounds become a segment along their long side with half the short
+        side as radius (exact for obrounds; rectangle corners are rounded off).
+        Polygons are taken as their circumscribed circle. Macro flashes are
+        left out: their outlines are among the regions. Strokes and flashes
+        of zero-size apertures (board outlines drawn in C0) draw no image and
+        are left out too.
+
+        Args:
+            polarity: DARK or CLEAR
+            inscribed: Take polygons as their inscribed circle instead, for
+                checks where the copper must cover the whole capsule
+
+        Returns:
+            FEATURE_DTYPE array
+        """
+        parts = []
+
+        source = np.flatnonzero(self.lines['polarity'] == polarity)
+        widths = self.stroke_widths(self.lines[source])
+        source, widths = source[widths != 0], widths[widths != 0]
+        lines = self.lines[source]
+        parts.append(_features(lines['x0'], lines['y0'], lines['x1'], lines['y1'],
+                               np.nan_to_num(widths) / 2, FEATURE_LINE, source))
+
+        selected = np.flatnonzero(self.arcs['polarity'] == polarity)
+        selected = selected[self.stroke_widths(self.arcs[selected]) != 0]
+        arcs = self.arcs[selected]
+        chord, x0, y0, x1, y1 = flatten_arcs(arcs)
+        radius = np.nan_to_num(self.stroke_widths(arcs)) / 2
+        parts.append(_features(x0, y0, x1, y1, radius[chord], FEATURE_ARC, selected[chord]))
+
+        parts.append(self.pad_features(polarity, inscribed))
+
+        selected = np.flatnonzero(self.regions['polarity'] == polarity)
+        regions = self.regions[selected]
+        edges = _features(regions['x0'], regions['y0'], regions['x1'], regions['y1'], 0.0, FEATURE_REGION, selected)
+        edges['group'] = regions['region']
+        parts.append(edges)
+        return np.concatenate(parts)
+
+    def pad_features(self, polarity: int = DARK, inscribed: bool = False) -> np.ndarray:
+        """Flashes of one polarity as capsules; see copper_features.
+
+        Returns:
+            FEATURE_DTYPE array of FEATURE_FLASH rows
+        """
+        selected = np.flatnonzero(self.flashes['polarity'] == polarity)
+        # Gather fields rather than rows: the packed records are slow to copy
+        rows = self.aperture_rows(self.flashes['aperture_id'][selected])
+        table = np.append(self.apertures, np.zeros(1, APERTURE_DTYPE))
+        table['width'][-1] = table['height'][-1] = np.nan
+        width, height = table['width'][rows], table['height'][rows]
+        polygon = table['shape'][rows] == SHAPE_POLYGON
+        # Half the length of the straight part along x and y
+        half_x = np.where(polygon | (width <= height), 0.0, (width - height) / 2)
+        half_y = np.where(polygon | (height <= width), 0.0, (height - width) / 2)
+        radius = np.where(polygon, width, np.fmin(width, height)) / 2
+        if inscribed:
+            vertices = np.maximum(table['vertices'][rows], 3)
+            radius = np.where(polygon, radius * np.cos(np.pi / vertices), radius)
+        # Undefined apertures are NaN, zero-size ones draw nothing
+        known = radius > 0
+        x, y = self.flashes['x0'][selected], self.flashes['y0'][selected]
+        return _features(x - half_x, y - half_y, x + half_x, y + half_y, radius, FEATURE_FLASH, selected)[known]
+
+    def to_result(self) -> Dict[str, Any]:
+        """Result dictionary for the layer cache and executor."""
+        result: Dict[str, Any] = {"success": True}
+        result.update((name, getattr(self, name)) for name in self.ARRAYS)
+        return result
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> 'LayerGeometry':
+        """Inverse of to_result."""
+        return cls(**{name: result[name] for name in cls.ARRAYS})
+
+    def save(self, directory: str):
+        """Write every array to directory/<name>.npy."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'LayerGeometry':
+        """Read arrays written by save, memory-mapped read-only by default."""
+        mode = 'r' if mmap else None
+        return cls(**{
+            name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode, allow_pickle=False)
+            for name in cls.ARRAYS
+        })
+
+
+def aperture_table(tokenizer: GerberTokenizer) -> np.ndarray:
+    """Build the aperture table from a tokenizer's %AD definitions."""
+    table = np.zeros(len(tokenizer.apertures), dtype=APERTURE_DTYPE)
+    for row, code in zip(table, sorted(tokenizer.apertures)):
+        aperture = tokenizer.apertures[code]
+        params = aperture.params
+        shape = _SHAPES.get(aperture.shape, SHAPE_MACRO)
+        row['id'] = code
+        row['shape'] = shape
+        if shape == SHAPE_MACRO or not params:
+            row['width'] = row['height'] = np.nan
+        elif shape == SHAPE_POLYGON:
+            row['width'] = row['height'] = params[0]
+            row['vertices'] = int(params[1]) if len(params) > 1 else 0
+            row['rotation'] = params[2] if len(params) > 2 else 0.0
+            row['hole'] = params[3] if len(params) > 3 else 0.0
+        elif shape == SHAPE_CIRCLE:
+            row['width'] = row['height'] = params[0]
+            row['hole'] = params[1] if len(params) > 1 else 0.0
+        else:
+            row['width'] = params[0]
+            row['height'] = params[1] if len(params) > 1 else params[0]
+            row['hole'] = params[2] if len(params) > 2 else 0.0
+    return table
+
+
+def _features(x0, y0, x1, y1, radius, kind: int, source) -> np.ndarray:
+    """Build a FEATURE_DTYPE array."""
+    features = np.empty(len(x0), dtype=FEATURE_DTYPE)
+    features['x0'], features['y0'], features['x1'], features['y1'] = x0, y0, x1, y1
+    features['radius'] = radius
+    features['kind'] = kind
+    features['source'] = source
+    features['group'] = -1
+    features['net'] = -1
+    return features
+
+
+def _arc_angles(arcs: np.ndarray):
+    """Radius, start angle and signed sweep of arcs (counterclockwise positive)."""
+    cx, cy = arcs['cx'], arcs['cy']
+    radius = np.hypot(arcs['x0'] - cx, arcs['y0'] - cy)
+    start = np.arctan2(arcs['y0'] - cy, arcs['x0'] - cx)
+    end = np.arctan2(arcs['y1'] - cy, arcs['x1'] - cx)
+    sweep = np.where(arcs['clockwise'], -((start - end) % (2 * np.pi)), (end - start) % (2 * np.pi))
+    # Equal end points: a full circle
+    closed = (arcs['x0'] == arcs['x1']) & (arcs['y0'] == arcs['y1']) & (radius > 0)
+    sweep = np.where(closed, np.where(arcs['clockwise'], -2 * np.pi, 2 * np.pi), sweep)
+    return radius, start, sweep
+
+
+def arc_midpoints(arcs: np.ndarray):
+    """Point halfway along each arc.
+
+    Args:
+        arcs: ARC_DTYPE array
+
+    Returns:
+        (x, y)
+    """
+    radius, start, sweep = _arc_angles(arcs)
+    angle = start + sweep / 2
+    return arcs['cx'] + radius * np.cos(angle), arcs['cy'] + radius * np.sin(angle)
+
+
+def flatten_arcs(arcs: np.ndarray, step: float = ARC_STEP, tolerance: float = CHORD_TOLERANCE):
+    """Split arcs into chords of at most the given angle and chord error.
+
+    A chord spanning angle a of radius r lies r * (1 - cos(a / 2)) inside
+    the arc at most, so large arcs get more chords than the angle alone
+    would give them.
+
+    Args:
+        arcs: ARC_DTYPE array
+        step: Largest angle per chord in radians
+        tolerance: Largest distance between an arc and its chords in mm
+
+    Returns:
+        (arc index, x0, y0, x1, y1) per chord
+    """
+    cx, cy = arcs['cx'], arcs['cy']
+    radius, start, sweep = _arc_angles(arcs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bound = 2 * np.arccos(np.clip(1 - tolerance / radius, -1, 1))
+    counts = np.maximum(np.ceil(np.abs(sweep) / np.fmin(step, bound)), 1).astype(np.intp)
+    # Vertices of every arc, each computed once and shared by two chords
+    last = np.cumsum(counts + 1) - 1
+    first = last - counts
+    vertex_arc = np.repeat(np.arange(len(arcs)), counts + 1)
+    angle = start[vertex_arc] + sweep[vertex_arc] * ((np.arange(len(vertex_arc)) - first[vertex_arc])
+                                                     / counts[vertex_arc])
+    r = radius[vertex_arc]
+    x = cx[vertex_arc] + r * np.cos(angle)
+    y = cy[vertex_arc] + r * np.sin(angle)
+    # The first and last chords end exactly at the arc's end points
+    x[first], y[first] = arcs['x0'], arcs['y0']
+    x[last], y[last] = arcs['x1'], arcs['y1']
+    chord = np.ones(len(vertex_arc), dtype=bool)
+    chord[last] = False
+    index = np.flatnonzero(chord)
+    return vertex_arc[index], x[index], y[index], x[index + 1], y[index + 1]
+
+
+def _primitives(commands: np.ndarray, dtype: np.dtype, flash: bool = False) -> np.ndarray:
+    """Copy the shared columns of operations into a primitive array."""
+    out = np.empty(len(commands), dtype=dtype)
+    out['x0'] = commands['x'] if flash else commands['x0']
+    out['y0'] = commands['y'] if flash else commands['y0']
+    out['x1'] = commands['x']
+    out['y1'] = commands['y']
+    out['aperture_id'] = commands['aperture']
+    out['polarity'] = commands['polarity']
+    return out
+
+
+def _arcs(commands: np.ndarray) -> np.ndarray:
+    """Arc primitives with their centres resolved."""
+    arcs = _primitives(commands, ARC_DTYPE)
+    clockwise = commands['interpolation'] == CLOCKWISE
+    arcs['clockwise'] = clockwise
+    arcs['cx'] = commands['x0'] + commands['i']
+    arcs['cy'] = commands['y0'] + commands['j']
+
+    # Single-quadrant (G74) offsets are unsigned: the centre is the candidate
+    # equidistant from both ends with a sweep of at most 90 degrees
+    single = np.flatnonzero(~commands['multi_quadrant'])
+    if len(single):
+        rows = commands[single]
+        sx = np.array([1.0, 1.0, -1.0, -1.0])
+        sy = np.array([1.0, -1.0, 1.0, -1.0])
+        cx = rows['x0'][:, None] + np.abs(rows['i'])[:, None] * sx
+        cy = rows['y0'][:, None] + np.abs(rows['j'])[:, None] * sy
+        start = np.arctan2(rows['y0'][:, None] - cy, rows['x0'][:, None] - cx)
+        end = np.arctan2(rows['y'][:, None] - cy, rows['x'][:, None] - cx)
+        sweep = np.where(clockwise[single][:, None], start - end, end - start) % (2 * np.pi)
+        mismatch = np.abs(np.hypot(rows['x0'][:, None] - cx, rows['y0'][:, None] - cy)
+                          - np.hypot(rows['x'][:, None] - cx, rows['y'][:, None] - cy))
+        best = np.argmin(np.where(sweep <= np.pi / 2 + 1e-9, mismatch, np.inf), axis=1)
+        arcs['cx'][single] = cx[np.arange(len(single)), best]
+        arcs['cy'][single] = cy[np.arange(len(single)), best]
+    return arcs
+
+
+def split_commands(commands: np.ndarray) -> Dict[str, np.ndarray]:
+    """Split a batch of tokenizer commands into primitive arrays.
+
+    Arc edges of regions are flattened in place, so each region's edges stay
+    in outline order.
+
+    Args:
+        commands: COMMAND_DTYPE batch
+
+    Returns:
+        Dictionary with lines, arcs, flashes and regions arrays
+    """
+    return _split(commands)[0]
+
+
+def _split(commands: np.ndarray):
+    """split_commands, and the command row of every primitive in each array."""
+    op = commands['op']
+    in_region = commands['region'] >= 0
+    interpolate = op == OP_INTERPOLATE
+    draw_rows = np.flatnonzero(interpolate & ~in_region)
+    draws = commands[draw_rows]
+    linear = draws['interpolation'] == LINEAR
+
+    edge_rows = np.flatnonzero(interpolate & in_region)
+    edges = commands[edge_rows]
+    regions = _primitives(edges, REGION_DTYPE)
+    regions['aperture_id'] = -1
+    regions['region'] = edges['region']
+    curved = edges['interpolation'] != LINEAR
+    if curved.any():
+        arc, x0, y0, x1, y1 = flatten_arcs(_arcs(edges[curved]))
+        counts = np.ones(len(edges), dtype=np.intp)
+        counts[curved] = np.bincount(arc, minlength=int(np.count_nonzero(curved)))
+        regions = regions[np.repeat(np.arange(len(edges)), counts)]
+        edge_rows = np.repeat(edge_rows, counts)
+        chords = np.repeat(curved, counts)
+        regions['x0'][chords], regions['y0'][chords] = x0, y0
+        regions['x1'][chords], regions['y1'][chords] = x1, y1
+
+    flash_rows = np.flatnonzero(op == OP_FLASH)
+    arrays = {
+        "lines": _primitives(draws[linear], PRIMITIVE_DTYPE),
+        "arcs": _arcs(draws[~linear]),
+        "flashes": _primitives(commands[flash_rows], PRIMITIVE_DTYPE, flash=True),
+        "regions": regions,
+    }
+    rows = {"lines": draw_rows[linear], "arcs": draw_rows[~linear], "flashes": flash_rows, "regions": edge_rows}
+    return arrays, rows
+
+
+def build_geometry(file_path: str, chunk_size: int = CHUNK_SIZE) -> LayerGeometry:
+    """Read a Gerber file into its array geometry in one pass.
+
+    Each batch is split once; a polarity change starts a new level at the
+    first primitive of every array drawn after it, and a step-and-repeat
+    block opening or closing starts a new run in the steps table.
+
+    Args:
+        file_path: Path to Gerber file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Layer geometry
+    """
+    tokenizer = GerberTokenizer()
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in LEVEL_ARRAYS}
+    totals = dict.fromkeys(LEVEL_ARRAYS, 0)
+    levels: List[tuple] = []
+    steps: List[tuple] = []
+    # Macro regions are numbered -1, -2, ... until the G36 regions are counted
+    macro_count = 0
+    with open(file_path, 'rb') as f:
+        for batch in iter_batches(f, tokenizer, chunk_size):
+            arrays, rows = _split(batch)
+            polarity, step = batch['polarity'], batch['step']
+            cuts = np.flatnonzero((polarity[1:] != polarity[:-1]) | (step[1:] != step[:-1])) + 1
+            macros = np.empty(0, REGION_DTYPE)
+            if tokenizer.macros:
+                macros, flash = macro_regions(arrays["flashes"], tokenizer, macro_count)
+                if len(macros):
+                    macro_count = int(macros['region'].max()) + 1
+                    macros['region'] = -1 - macros['region']
+                if len(macros) and len(cuts):
+                    # Keep every outline within the level and step of its flash
+                    regions = np.concatenate([arrays["regions"], macros])
+                    rows["regions"] = np.concatenate([rows["regions"], rows["flashes"][flash]])
+                    order = np.argsort(np.searchsorted(cuts, rows["regions"], 'right'), kind='stable')
+                    arrays["regions"], rows["regions"] = regions[order], rows["regions"][order]
+                    macros = macros[:0]
+
+            # First row of every run of one polarity and step in each array
+            if len(cuts):
+                firsts = [(totals[name] + np.searchsorted(np.searchsorted(cuts, rows[name], 'right'),
+                                                          np.arange(len(cuts) + 1))).tolist()
+                          for name in LEVEL_ARRAYS]
+            else:
+                firsts = [[totals[name]] for name in LEVEL_ARRAYS]
+            starts = np.r_[0, cuts]
+            for level in zip(polarity[starts].tolist(), *firsts):
+                if not levels or levels[-1][0] != level[0]:
+                    levels.append(level)
+            for run in zip(step[starts].tolist(), *firsts):
+                if not steps or steps[-1][0] != run[0]:
+                    steps.append(run)
+            for name in LEVEL_ARRAYS:
+                parts[name].append(arrays[name])
+                totals[name] += len(arrays[name])
+            if len(macros):
+                # Outlines of a batch at one polarity follow its regions
+                parts["regions"].append(macros)
+                totals["regions"] += len(macros)
+    dtypes = {"lines": PRIMITIVE_DTYPE, "arcs": ARC_DTYPE, "flashes": PRIMITIVE_DTYPE, "regions": REGION_DTYPE}
+    arrays = {
+        name: np.concatenate(arrays) if len(arrays) > 1 else (arrays[0] if arrays else np.empty(0, dtypes[name]))
+        for name, arrays in parts.items()
+    }
+    if macro_count:
+        region = arrays["regions"]['region']
+        macro = region < 0
+        region[macro] = tokenizer.state.region_count - 1 - region[macro]
+    # Runs by their grid of copies; none unless the file has %SR blocks
+    grids = [(1, 1, 0.0, 0.0)] + [(s.x_count, s.y_count, s.dx, s.dy) for s in tokenizer.step_repeats]
+    steps = [grids[run[0] + 1] + run[1:] for run in steps] if tokenizer.step_repeats else []
+    return LayerGeometry(apertures=aperture_table(tokenizer), levels=np.array(levels, dtype=LEVEL_DTYPE),
+                         steps=np.array(steps, dtype=STEP_DTYPE), **arrays)
+
+
+def macro_regions(flashes: np.ndarray, tokenizer: GerberTokenizer, first_region: int = 0):
+    """Region edges outlining the flashes of macro apertures.
+
+    Every shape of a flash's macro becomes a region of the flash's polarity,
+    numbered on from first_region. Exposure-off primitives are already cut
+    out of the shapes (see macros.py), so they never erase the layer.
+
+    Args:
+        flashes: PRIMITIVE_DTYPE flashes
+        tokenizer: Tokenizer that has read the flashes, with its apertures and macros
+        first_region: Number of the first region
+
+    Returns:
+        (REGION_DTYPE array, row in flashes of every edge)
+    """
+    parts = [np.empty(0, REGION_DTYPE)]
+    sources = [np.empty(0, dtype=np.intp)]
+    region = first_region
+    order = np.argsort(flashes['aperture_id'], kind='stable')
+    codes = flashes['aperture_id'][order]
+    for code in np.unique(codes).tolist():
+        aperture = tokenizer.apertures.get(code)
+        body = tokenizer.macros.get(aperture.shape) if aperture else None
+        if body is None:
+            continue
+        start, end = np.searchsorted(codes, [code, code + 1])
+        template = macro_template(body, aperture.params, aperture.scale)
+        if template is None:
+            continue
+        selected = flashes[order[start:end]]
+        x, y = selected['x0'][:, None], selected['y0'][:, None]
+        shapes = template.shapes
+        edges = np.empty((len(selected), len(template.x0)), dtype=REGION_DTYPE)
+        edges['x0'], edges['y0'] = x + template.x0, y + template.y0
+        edges['x1'], edges['y1'] = x + template.x1, y + template.y1
+        edges['aperture_id'] = -1
+        edges['region'] = region + np.arange(len(selected))[:, None] * shapes + template.shape
+        edges['polarity'] = selected['polarity'][:, None]
+        parts.append(edges.reshape(-1))
+        sources.append(np.repeat(order[start:end], len(template.x0)))
+        region += len(selected) * shapes
+    return np.concatenate(parts), np.concatenate(sources)
+
+
+def geometry_result(file_path: str) -> Dict[str, Any]:
+    """Build a layer's geometry as a layer cache result.
+
+    Args:
+        file_path: Path to Gerber file
+
+    Returns:
+        LayerGeometry.to_result() dictionary, or an error dictionary
+    """
+    if not os.path.exists(file_path):
+        return {
+            "success": False,
+            "error": f"File not found: {file_path}"
+        }
+    try:
+        return build_geometry(file_path).to_result()
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to build layer geometry: {str(e)}"
+        }
+
+
+def load_geometries(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """Get the geometry of several layers through the layer cache.
+
+    Layers that are not cached are built in parallel. Pass successful results
+    to LayerGeometry.from_result.
+
+    Args:
+        file_paths: Paths to Gerber files
+
+    Returns:
+        Result dictionaries in the order of file_paths
+    """
+    return cached_parse_many([(file_path, CACHE_KIND, geometry_result) for file_path in file_paths])
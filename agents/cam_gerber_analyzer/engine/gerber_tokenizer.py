@@ -0,0 +1,798 @@
+"""Streaming RS-274X (Gerber) tokenizer.
+
+The file is read in fixed-size chunks and every chunk is decoded with NumPy
+rather than word by word in Python: tokens are found among the non-digit
+bytes, numbers are parsed eight digits at a time from little-endian words
+and modal state (position, interpolation mode, aperture, polarity, region)
+is resolved by repeating each setting up to the next one. Each chunk yields one batch of typed commands, a structured
+array with one row per D01/D02/D03 operation, in millimetres and with the
+start point of every operation filled in.
+
+Extended commands (%...%) are few and are interpreted in Python: %FS and
+%MO apply from their position onwards, %AD builds the aperture table,
+%AM keeps macro bodies for macros.py and %LP switches polarity.
+
+Step-and-repeat blocks (%SR) are not expanded: the commands of a block are
+decoded once, tagged with the block's row in the tokenizer's step_repeats
+table, and the statistics count them once per copy. Consumers place the
+copies from the table when they need them.
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .macros import macro_template
+
+# Default chunk size; memory use is bounded by a small multiple of this
+CHUNK_SIZE = 1 << 20
+
+# Operation codes (D01, D02, D03)
+OP_INTERPOLATE = 1
+OP_MOVE = 2
+OP_FLASH = 3
+
+# Interpolation modes (G01, G02, G03)
+LINEAR = 1
+CLOCKWISE = 2
+COUNTERCLOCKWISE = 3
+
+# Polarity (%LPD / %LPC)
+DARK = 1
+CLEAR = 0
+
+MM_PER_INCH = 25.4
+
+COMMAND_DTYPE = np.dtype([
+    ('op', 'i1'),
+    ('interpolation', 'i1'),
+    ('multi_quadrant', '?'),
+    ('polarity', 'i1'),
+    ('aperture', 'i4'),
+    ('region', 'i4'),        # region number for operations inside G36/G37, else -1
+    ('step', 'i4'),          # row in GerberTokenizer.step_repeats inside %SR blocks, else -1
+    ('x0', 'f8'),
+    ('y0', 'f8'),
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('i', 'f8'),
+    ('j', 'f8'),
+])
+
+# Byte classes
+_X, _Y, _I, _J, _D, _G, _M, _STAR, _PCT = range(1, 10)
+_CLASS = np.zeros(256, dtype=np.uint8)
+for _char, _cls in zip(b'XYIJDGM*%', (_X, _Y, _I, _J, _D, _G, _M, _STAR, _PCT)):
+    _CLASS[_char] = _cls
+
+# Numbers are parsed eight digits at a time, up to _SWAR_DIGITS; longer or
+# malformed ones fall back to a digit-by-digit loop that stops at _MAX_DIGITS
+_PADDING = b'0' * 16
+_SWAR_DIGITS = 16
+_MAX_DIGITS = 18
+
+_FS_RE = re.compile(r'FS([LTD]?)([AI]?).*?X(\d)(\d)Y(\d)(\d)')
+_AD_RE = re.compile(r'ADD(\d+)([^,]+)(?:,(.*))?')
+_SR_RE = re.compile(r'SR(?:X(\d+))?(?:Y(\d+))?(?:I([-+.\d]+))?(?:J([-+.\d]+))?')
+
+# Parameters of standard apertures that are lengths (converted to mm)
+_LENGTH_PARAMS = {
+    'C': (0, 1),
+    'R': (0, 1, 2),
+    'O': (0, 1, 2),
+    'P': (0, 3),
+}
+
+
+@dataclass
+class Aperture:
+    """Aperture definition from %AD."""
+    code: int
+    shape: str                      # C, R, O, P or the name of a macro
+    params: Tuple[float, ...]       # standard shapes: lengths in mm
+    scale: float = 1.0              # mm per file unit when the aperture was defined
+
+    @property
+    def size(self) -> Optional[float]:
+        """Characteristic size in mm: diameter, or the larger side of R/O."""
+        if not self.params or self.shape not in _LENGTH_PARAMS:
+            return None
+        if self.shape in ('R', 'O') and len(self.params) >= 2:
+            return max(self.params[0], self.params[1])
+        return self.params[0]
+
+
+@dataclass
+class StepRepeat:
+    """Step-and-repeat block from %SR: a grid of copies of the block's commands."""
+    x_count: int
+    y_count: int
+    dx: float                       # step between columns in mm
+    dy: float                       # step between rows in mm
+
+    @property
+    def copies(self) -> int:
+        """Number of times the block is drawn."""
+        return self.x_count * self.y_count
+
+    def offsets(self) -> np.ndarray:
+        """Translation of every copy in mm, row by row, as an array of shape (copies, 2)."""
+        column, row = np.meshgrid(np.arange(self.x_count), np.arange(self.y_count))
+        return np.stack([column.ravel() * self.dx, row.ravel() * self.dy], axis=1)
+
+
+@dataclass
+class GerberState:
+    """Graphics state carried from one chunk to the next."""
+    units: Optional[str] = None             # 'MM' or 'IN'
+    format_spec: Optional[str] = None       # raw %FS command
+    zero_omission: str = 'L'                # 'L' leading or 'T' trailing
+    incremental: bool = False
+    x_digits: Tuple[int, int] = (3, 5)      # (integer, decimal) digits
+    y_digits: Tuple[int, int] = (3, 5)
+    x: float = 0.0
+    y: float = 0.0
+    interpolation: int = LINEAR
+    multi_quadrant: bool = False
+    aperture: int = -1
+    polarity: int = DARK
+    region: int = -1
+    region_count: int = 0
+    step: int = -1                          # current %SR block, -1 outside
+    last_op: int = 0
+    ended: bool = False
+
+    @property
+    def mm_per_unit(self) -> float:
+        """Length of one file unit in millimetres (files without %MO are read as mm)."""
+        return MM_PER_INCH if self.units == 'IN' else 1.0
+
+
+@dataclass
+class GerberStats:
+    """Counts and bounds accumulated over command batches.
+
+    Primitives inside step-and-repeat blocks are counted once per copy, and
+    the bounds cover every copy; step_bounds covers the first copy of the
+    blocks only.
+    """
+    words: int = 0
+    operations: int = 0
+    lines: int = 0
+    arcs: int = 0
+    flashes: int = 0
+    moves: int = 0
+    regions: int = 0
+    region_segments: int = 0
+    min_x: float = float('inf')
+    min_y: float = float('inf')
+    max_x: float = float('-inf')
+    max_y: float = float('-inf')
+    step_min_x: float = float('inf')
+    step_min_y: float = float('inf')
+    step_max_x: float = float('-inf')
+    step_max_y: float = float('-inf')
+    apertures_used: set = field(default_factory=set)
+
+    def update(self, batch: np.ndarray, step_repeats: Sequence[StepRepeat] = ()):
+        """Add one batch of commands.
+
+        Args:
+            batch: COMMAND_DTYPE batch
+            step_repeats: The tokenizer's step-and-repeat blocks, which the
+                batch's step column refers to
+        """
+        if len(batch) == 0:
+            return
+        op = batch['op']
+        in_region = batch['region'] >= 0
+        interpolate = op == OP_INTERPOLATE
+        draw = op != OP_MOVE
+        step = batch['step']
+        stepped = bool(step_repeats) and int(step.max()) >= 0
+        if stepped:
+            # Copies of every row; the leading entry is for rows outside blocks
+            copies = np.array([1] + [s.copies for s in step_repeats])[step + 1]
+            count = lambda rows: int(copies[rows].sum())
+        else:
+            count = np.count_nonzero
+
+        interpolations = int(count(interpolate))
+        flashes = int(count(op == OP_FLASH))
+        region_segments = int(count(interpolate & in_region))
+        lines = int(count(interpolate & ~in_region & (batch['interpolation'] == LINEAR)))
+        self.operations += len(batch)
+        self.lines += lines
+        self.arcs += interpolations - region_segments - lines
+        self.flashes += flashes
+        self.moves += int(np.count_nonzero(op == OP_MOVE))
+        self.region_segments += region_segments
+
+        # Geometry covers flash points and both ends of every interpolation
+        if flashes or interpolations:
+            if stepped:
+                self._add_copies(batch, draw, interpolate, step_repeats)
+            else:
+                xs = [v for v in (batch['x'][draw], batch['x0'][interpolate]) if len(v)]
+                ys = [v for v in (batch['y'][draw], batch['y0'][interpolate]) if len(v)]
+                self.min_x = min(self.min_x, *(float(v.min()) for v in xs))
+                self.max_x = max(self.max_x, *(float(v.max()) for v in xs))
+                self.min_y = min(self.min_y, *(float(v.min()) for v in ys))
+                self.max_y = max(self.max_y, *(float(v.max()) for v in ys))
+
+        # Aperture codes are small integers (-1 when none is selected)
+        used = np.flatnonzero(np.bincount(batch['aperture'][draw & ~in_region] + 1)) - 1
+        self.apertures_used.update(used[used >= 0].tolist())
+
+    def _add_copies(self, batch: np.ndarray, draw: np.ndarray, interpolate: np.ndarray,
+                    step_repeats: Sequence[StepRepeat]):
+        """Extend the bounds by every copy of a batch's points, from the extent of the offsets."""
+        offsets = [s.offsets() for s in step_repeats]
+        # Smallest and largest offset per block; the leading row is for rows outside blocks
+        low = np.array([(0.0, 0.0)] + [o.min(axis=0).tolist() for o in offsets])
+        high = np.array([(0.0, 0.0)] + [o.max(axis=0).tolist() for o in offsets])
+        rows = np.concatenate([np.flatnonzero(draw), np.flatnonzero(interpolate)])
+        x = np.concatenate([batch['x'][draw], batch['x0'][interpolate]])
+        y = np.concatenate([batch['y'][draw], batch['y0'][interpolate]])
+        block = batch['step'][rows] + 1
+        self.min_x = min(self.min_x, float((x + low[block, 0]).min()))
+        self.max_x = max(self.max_x, float((x + high[block, 0]).max()))
+        self.min_y = min(self.min_y, float((y + low[block, 1]).min()))
+        self.max_y = max(self.max_y, float((y + high[block, 1]).max()))
+        first = block > 0
+        if first.any():
+            self.step_min_x = min(self.step_min_x, float(x[first].min()))
+            self.step_max_x = max(self.step_max_x, float(x[first].max()))
+            self.step_min_y = min(self.step_min_y, float(y[first].min()))
+            self.step_max_y = max(self.step_max_y, float(y[first].max()))
+
+    @property
+    def bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of the layer's geometry in mm, or None if empty."""
+        if self.min_x > self.max_x:
+            return None
+        return {"min_x": self.min_x, "min_y": self.min_y, "max_x": self.max_x, "max_y": self.max_y}
+
+    @property
+    def step_bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of the first copy of the step-and-repeat blocks in mm, or None without blocks."""
+        if self.step_min_x > self.step_max_x:
+            return None
+        return {"min_x": self.step_min_x, "min_y": self.step_min_y,
+                "max_x": self.step_max_x, "max_y": self.step_max_y}
+
+
+class GerberTokenizer:
+    """Incremental RS-274X decoder.
+
+    Feed raw bytes in any split; every call returns the commands completed
+    so far as a COMMAND_DTYPE array. Only the unfinished tail of the input is
+    buffered between calls.
+    """
+
+    def __init__(self):
+        self.state = GerberState()
+        self.apertures: Dict[int, Aperture] = {}
+        self.macros: Dict[str, str] = {}
+        self.step_repeats: List[StepRepeat] = []
+        self.stats = GerberStats()
+        self._pending = b''
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """Decode a chunk of input.
+
+        Args:
+            data: Next bytes of the file
+
+        Returns:
+            Commands completed by this chunk
+        """
+        return self._decode(self._pending + data.translate(None, b'\r\n'), final=False)
+
+    def close(self) -> np.ndarray:
+        """Decode whatever is left at the end of the input."""
+        return self._decode(self._pending, final=True)
+
+    def _decode(self, buf: bytes, final: bool) -> np.ndarray:
+        self._pending = b''
+        if self.state.ended or not buf:
+            return np.empty(0, COMMAND_DTYPE)
+
+        # Tokens are the letters, '*' and '%' among the non-digit bytes
+        arr = np.frombuffer(buf, dtype=np.uint8)
+        pos = np.flatnonzero((arr - ord('0')) > 9)
+        kind = _CLASS[arr[pos]]
+        other = np.empty(0, dtype=pos.dtype)
+        if not kind.all():
+            token = kind > 0
+            other = pos[~token]
+            pos, kind = pos[token], kind[token]
+
+        # Extended command blocks; an unterminated block waits for more input
+        pct = pos[kind == _PCT]
+        limit = len(buf)
+        if len(pct) % 2:
+            limit = int(pct[-1])
+            pct = pct[:-1]
+        if len(pct) or limit < len(buf):
+            inside = (np.searchsorted(pct, pos, side='right') & 1).astype(bool)
+            keep = ~inside & (kind != _PCT) & (pos < limit)
+            pos = pos[keep]
+            kind = kind[keep]
+
+        is_star = kind == _STAR
+        stars = pos[is_star]
+        n_words = len(stars)
+        cut = int(stars[-1]) + 1 if n_words else 0
+        if len(pct):
+            cut = max(cut, int(pct[-1]) + 1)
+        if not final:
+            self._pending = buf[cut:]
+        blocks = pct.reshape(-1, 2)
+        blocks = blocks[blocks[:, 1] < cut]
+
+        # Word index of every letter; letters after the last '*' belong to no
+        # complete word
+        word = np.cumsum(is_star, dtype=np.int32) - is_star
+        letter = ~is_star & (word < n_words)
+        letter_pos = pos[letter]
+        letter_kind = kind[letter]
+        word = word[letter]
+
+        # Parse the number after every letter; it runs up to the next letter
+        # or '*', so its length is known up front
+        start = letter_pos + 1
+        sign = arr[start]
+        negative = sign == ord('-')
+        cursor = start + (negative | (sign == ord('+')))
+        # A letter in a complete word is never the last token
+        digits = pos[1:][letter[:-1]] - cursor
+        value = _parse_numbers(_PADDING + buf, cursor + len(_PADDING), digits)
+        # Comment text, unsupported letters and overlong numbers: keep the
+        # leading digits
+        invalid = digits > _SWAR_DIGITS
+        if len(other):
+            invalid |= np.searchsorted(other, cursor) != np.searchsorted(other, cursor + digits)
+        if invalid.any():
+            invalid = np.flatnonzero(invalid)
+            value[invalid], digits[invalid] = _parse_prefixes(arr, cursor[invalid])
+        value[negative] = -value[negative]
+
+        # G04 comments: drop every letter of a word that starts with G04
+        first = np.ones(len(word), dtype=bool)
+        first[1:] = word[1:] != word[:-1]
+        comment = first & (letter_kind == _G) & (value == 4)
+        if comment.any():
+            is_comment = np.zeros(n_words, dtype=bool)
+            is_comment[word[comment]] = True
+            keep = ~is_comment[word]
+            word, letter_kind, value, digits = word[keep], letter_kind[keep], value[keep], digits[keep]
+
+        # One row per letter code, one column per word
+        cell = (letter_kind.astype(np.intp) - _X) * n_words + word
+        values = np.zeros((_M, n_words), dtype=np.int64)
+        present = np.zeros((_M, n_words), dtype=bool)
+        values.ravel()[cell] = value
+        present.ravel()[cell] = True
+        x_raw, y_raw, i_raw, j_raw, d_val, g_val, m_val = values
+        has_x, has_y, has_i, has_j, has_d, has_g, has_m = present
+
+        # M02 ends the file
+        end_words = np.flatnonzero(has_m & (m_val == 2))
+        word_limit = int(end_words[0]) if len(end_words) else n_words
+        self.stats.words += min(n_words, word_limit + 1)
+
+        state = self.state
+        explicit_op = has_d & (d_val >= 1) & (d_val <= 3)
+        # Coordinate data without a D code repeats the previous operation (deprecated)
+        op_words = np.flatnonzero(explicit_op)
+        implicit = np.flatnonzero((has_x | has_y | has_i | has_j) & ~has_d)
+        if len(implicit):
+            implicit_op = _modal(op_words, d_val[op_words], implicit, state.last_op)
+            implicit = implicit[implicit_op > 0]
+            is_op = explicit_op.copy()
+            is_op[implicit] = True
+            op_codes = d_val.copy()
+            op_codes[implicit] = implicit_op[implicit_op > 0]
+        else:
+            is_op, op_codes = explicit_op, d_val
+        is_op[word_limit:] = False
+        ops = np.flatnonzero(is_op)
+
+        interp_words = np.flatnonzero(has_g & (g_val >= 1) & (g_val <= 3))
+        quadrant_words = np.flatnonzero(has_g & ((g_val == 74) | (g_val == 75)))
+        aperture_words = np.flatnonzero(has_d & (d_val >= 10))
+        region_words = np.flatnonzero(has_g & ((g_val == 36) | (g_val == 37)))
+        region_starts = g_val[region_words] == 36
+        region_values = np.where(
+            region_starts, state.region_count + np.cumsum(region_starts) - 1, -1
+        )
+
+        # Soft extended commands (AD, LP, AM, ...) apply in order; FS and MO
+        # change coordinate decoding, so operations are decoded in segments
+        # between them
+        block_words = np.searchsorted(stars, blocks[:, 0]) if len(blocks) else np.empty(0, np.int64)
+        # (words, values) of the modal settings set by extended commands
+        settings: Dict[str, Tuple[List[int], List[int]]] = {'polarity': ([], []), 'step': ([], [])}
+        segments: List[Tuple[int, int, Tuple]] = []
+        segment_start = 0
+        for (open_pos, close_pos), block_word in zip(blocks.tolist(), block_words.tolist()):
+            if block_word > word_limit:
+                # After M02
+                break
+            text = buf[open_pos + 1:close_pos].decode('ascii', 'replace')
+            if text.startswith(('FS', 'MO')):
+                segments.append((segment_start, block_word, self._decoding()))
+                segment_start = block_word
+            for setting, value in self._extended(text):
+                settings[setting][0].append(block_word)
+                settings[setting][1].append(value)
+        segments.append((segment_start, word_limit, self._decoding()))
+
+        rows = np.empty(len(ops), dtype=COMMAND_DTYPE)
+        rows['op'] = op_codes[ops]
+        rows['interpolation'] = _modal(interp_words, g_val[interp_words], ops, state.interpolation)
+        rows['multi_quadrant'] = _modal(quadrant_words, g_val[quadrant_words] == 75, ops, state.multi_quadrant)
+        rows['aperture'] = _modal(aperture_words, d_val[aperture_words], ops, state.aperture)
+        rows['region'] = _modal(region_words, region_values, ops, state.region)
+        polarity_words, polarity_values = settings['polarity']
+        rows['polarity'] = _modal(
+            np.asarray(polarity_words, dtype=np.int64), np.asarray(polarity_values), ops, state.polarity
+        )
+        step_words, step_values = settings['step']
+        step_words = np.asarray(step_words, dtype=np.int64)
+        rows['step'] = _modal(step_words, np.asarray(step_values), ops, state.step)
+
+        # Digit counts only matter with trailing zero omission
+        ndigits = None
+        if any(decoding[0] == 'T' for _, _, decoding in segments):
+            coordinate = cell < 4 * n_words
+            ndigits = np.zeros((4, n_words), dtype=np.int64)
+            ndigits.ravel()[cell[coordinate]] = digits[coordinate]
+
+        x_prev, y_prev = state.x, state.y
+        for seg_start, seg_end, decoding in segments:
+            lo, hi = np.searchsorted(ops, [seg_start, seg_end])
+            if lo == hi:
+                continue
+            seg = ops[lo:hi]
+            zero_omission, incremental, x_digits, y_digits, mm = decoding
+            x_ndig, y_ndig, i_ndig, j_ndig = ndigits[:, seg] if ndigits is not None else (None,) * 4
+            xs = _scale(x_raw[seg], x_ndig, x_digits, zero_omission, mm)
+            ys = _scale(y_raw[seg], y_ndig, y_digits, zero_omission, mm)
+            x = _resolve(xs, has_x[seg], x_prev, incremental)
+            y = _resolve(ys, has_y[seg], y_prev, incremental)
+            out = rows[lo:hi]
+            out['x'] = x
+            out['y'] = y
+            out['x0'][0] = x_prev
+            out['y0'][0] = y_prev
+            out['x0'][1:] = x[:-1]
+            out['y0'][1:] = y[:-1]
+            out['i'] = np.where(has_i[seg], _scale(i_raw[seg], i_ndig, x_digits, zero_omission, mm), 0.0)
+            out['j'] = np.where(has_j[seg], _scale(j_raw[seg], j_ndig, y_digits, zero_omission, mm), 0.0)
+            x_prev, y_prev = float(x[-1]), float(y[-1])
+
+        # Carry modal state into the next chunk
+        state.x, state.y = x_prev, y_prev
+        if len(op_words):
+            state.last_op = int(d_val[op_words[-1]])
+        if len(interp_words):
+            state.interpolation = int(g_val[interp_words[-1]])
+        if len(quadrant_words):
+            state.multi_quadrant = bool(g_val[quadrant_words[-1]] == 75)
+        if len(aperture_words):
+            state.aperture = int(d_val[aperture_words[-1]])
+        if len(region_words):
+            state.region = int(region_values[-1])
+            state.region_count += int(np.count_nonzero(region_starts))
+            # A region inside a step-and-repeat block is drawn once per copy
+            started = _modal(step_words, np.asarray(step_values), region_words[region_starts], state.step)
+            copies = np.array([1] + [s.copies for s in self.step_repeats])
+            self.stats.regions += int(copies[started + 1].sum())
+        if polarity_values:
+            state.polarity = polarity_values[-1]
+        if step_values:
+            state.step = step_values[-1]
+        if word_limit < n_words:
+            state.ended = True
+            self._pending = b''
+
+        self.stats.update(rows, self.step_repeats)
+        return rows
+
+    def aperture_size(self, aperture: Aperture) -> Optional[float]:
+        """Aperture.size, and for macro apertures the larger side of the evaluated macro."""
+        body = self.macros.get(aperture.shape)
+        if body is None:
+            return aperture.size
+        template = macro_template(body, aperture.params, aperture.scale)
+        return template.size if template is not None else None
+
+    def _decoding(self) -> Tuple:
+        """Snapshot of the state that controls coordinate decoding."""
+        state = self.state
+        return (state.zero_omission, state.incremental, state.x_digits, state.y_digits, state.mm_per_unit)
+
+    def _extended(self, text: str) -> List[Tuple[str, int]]:
+        """Apply one extended command block.
+
+        Returns:
+            Modal settings changed in the block, in order, as (setting, value):
+            'polarity' from %LP and 'step' (a row in step_repeats, or -1
+            closing a block) from %SR
+        """
+        state = self.state
+        if text.startswith('AM'):
+            name, _, body = text[2:].partition('*')
+            self.macros[name] = body
+            return []
+
+        settings = []
+        for command in text.split('*'):
+            if command.startswith('FS'):
+                match = _FS_RE.match(command)
+                if match:
+                    state.format_spec = f"%{command}*%"
+                    state.zero_omission = 'T' if match.group(1) == 'T' else 'L'
+                    state.incremental = match.group(2) == 'I'
+                    state.x_digits = (int(match.group(3)), int(match.group(4)))
+                    state.y_digits = (int(match.group(5)), int(match.group(6)))
+            elif command.startswith('MO'):
+                units = command[2:].strip()
+                if units in ('MM', 'IN'):
+                    state.units = units
+            elif command.startswith('AD'):
+                aperture = _parse_aperture(command, state.mm_per_unit)
+                if aperture is not None:
+                    self.apertures[aperture.code] = aperture
+            elif command.startswith('LP'):
+                settings.append(('polarity', CLEAR if command[2:3] == 'C' else DARK))
+            elif command.startswith('SR'):
+                settings.append(('step', self._step_repeat(command)))
+        return settings
+
+    def _step_repeat(self, command: str) -> int:
+        """Open a step-and-repeat block from an %SR command.
+
+        Returns:
+            Row of the block in step_repeats, or -1 where the command closes
+            the open block (no repeats, or a single copy)
+        """
+        match = _SR_RE.match(command)
+        try:
+            x_count, y_count = int(match.group(1) or 1), int(match.group(2) or 1)
+            dx, dy = (float(match.group(k) or 0) * self.state.mm_per_unit for k in (3, 4))
+        except ValueError:
+            return -1
+        if x_count < 1 or y_count < 1 or x_count * y_count == 1:
+            return -1
+        self.step_repeats.append(StepRepeat(x_count, y_count, dx, dy))
+        return len(self.step_repeats) - 1
+
+
+def _digit_mask(count: np.ndarray) -> np.ndarray:
+    """Bits holding the last `count` bytes of a little-endian word."""
+    shift = (8 * (8 - count)).astype(np.uint64)
+    mask = np.uint64(0xFFFFFFFFFFFFFFFF) << np.minimum(shift, np.uint64(63))
+    return np.where(count > 0, mask, np.uint64(0))
+
+
+_LENGTHS = np.arange(_SWAR_DIGITS + 1)
+_LOW_MASK = _digit_mask(np.minimum(_LENGTHS, 8))
+_HIGH_MASK = _digit_mask(np.clip(_LENGTHS - 8, 0, 8))
+
+
+def _swar(words: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Parse the ASCII digits selected in each little-endian word, in place.
+
+    Bytes outside the mask read as leading zeros.
+    """
+    words &= mask
+    words &= np.uint64(0x0F0F0F0F0F0F0F0F)
+    words *= np.uint64(10 << 8 | 1)
+    words >>= np.uint64(8)
+    words &= np.uint64(0x00FF00FF00FF00FF)
+    words *= np.uint64(100 << 16 | 1)
+    words >>= np.uint64(16)
+    words &= np.uint64(0x0000FFFF0000FFFF)
+    words *= np.uint64(10000 << 32 | 1)
+    words >>= np.uint64(32)
+    return words
+
+
+def _parse_numbers(data: bytes, start: np.ndarray, length: np.ndarray) -> np.ndarray:
+    """Parse decimal digit strings, eight digits at a time.
+
+    Args:
+        data: Input bytes, with at least 16 bytes before the first number
+        start: Offset of every number in data
+        length: Number of digits in every number; longer than _SWAR_DIGITS
+            gives garbage
+
+    Returns:
+        Values of the numbers
+    """
+    words = np.ndarray((len(data) - 7,), dtype='<u8', buffer=data, strides=(1,))
+    end = start + length
+    length = np.minimum(length, _SWAR_DIGITS)
+    value = _swar(words[end - 8], _LOW_MASK[length])
+    long = length > 8
+    n_long = np.count_nonzero(long)
+    if n_long > len(length) // 4:
+        # Cheaper to parse the high words of every number than to select them
+        high = _swar(words[end - 16], _HIGH_MASK[length])
+        high *= np.uint64(10 ** 8)
+        value += high
+    elif n_long:
+        long = np.flatnonzero(long)
+        value[long] += _swar(words[end[long] - 16], _HIGH_MASK[length[long]]) * np.uint64(10 ** 8)
+    return value.view(np.int64)
+
+
+def _parse_prefixes(arr: np.ndarray, cursor: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse the digits at each cursor up to the first non-digit.
+
+    Every cursor must be followed by a non-digit before the end of arr.
+
+    Returns:
+        Values and number of digits
+    """
+    value = np.zeros(len(cursor), dtype=np.int64)
+    digits = np.zeros(len(cursor), dtype=np.int64)
+    active = np.arange(len(cursor))
+    partial = np.zeros(len(cursor), dtype=np.int64)
+    for k in range(_MAX_DIGITS + 1):
+        byte = arr[cursor] - ord('0')
+        ok = byte < 10 if k < _MAX_DIGITS else np.zeros(len(active), dtype=bool)
+        if not ok.all():
+            done = ~ok
+            value[active[done]] = partial[done]
+            digits[active[done]] = k
+            active, cursor, partial, byte = active[ok], cursor[ok], partial[ok], byte[ok]
+            if not len(active):
+                break
+        partial = partial * 10 + byte
+        cursor = cursor + 1
+    return value, digits
+
+
+def _modal(event_words: np.ndarray, event_values: np.ndarray, query_words: np.ndarray, carry) -> np.ndarray:
+    """Value of a modal setting at each query word, given the words that set it.
+
+    Both word arrays are sorted; an event applies from its own word onwards.
+    """
+    if len(event_words) == 0:
+        return np.full(len(query_words), carry)
+    # Each value (the carried one first) holds until the next event
+    first = np.searchsorted(query_words, event_words)
+    counts = np.diff(first, prepend=0, append=len(query_words))
+    return np.repeat(np.concatenate(([carry], event_values)), counts)
+
+
+def _scale(raw: np.ndarray, ndig: Optional[np.ndarray], fmt: Tuple[int, int], zero_omission: str, mm: float) -> np.ndarray:
+    """Convert raw coordinate integers to millimetres."""
+    integer, decimal = fmt
+    values = raw.astype(np.float64)
+    if zero_omission == 'T':
+        values = values * np.power(10.0, integer + decimal - ndig)
+    return values * (mm / 10.0 ** decimal)
+
+
+def _resolve(values: np.ndarray, present: np.ndarray, previous: float, incremental: bool) -> np.ndarray:
+    """Fill omitted coordinates from the current point."""
+    if incremental:
+        return previous + np.cumsum(np.where(present, values, 0.0))
+    idx = np.where(present, np.arange(len(values)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], previous)
+
+
+def _parse_aperture(command: str, mm_per_unit: float) -> Optional[Aperture]:
+    """Parse an %ADD command."""
+    match = _AD_RE.match(command)
+    if not match:
+        return None
+    code, shape, params_text = int(match.group(1)), match.group(2), match.group(3)
+    try:
+        params = [float(p) for p in params_text.split('X')] if params_text else []
+    except ValueError:
+        params = []
+    lengths = _LENGTH_PARAMS.get(shape)
+    if lengths is not None:
+        params = [p * mm_per_unit if n in lengths else p for n, p in enumerate(params)]
+    return Aperture(code=code, shape=shape, params=tuple(params), scale=mm_per_unit)
+
+
+def iter_batches(source: BinaryIO, tokenizer: GerberTokenizer, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Decode a binary stream chunk by chunk.
+
+    Args:
+        source: Binary file object
+        tokenizer: Tokenizer receiving the input; holds state, apertures and stats
+        chunk_size: Bytes read per chunk
+
+    Yields:
+        Non-empty COMMAND_DTYPE batches
+    """
+    while True:
+        data = source.read(chunk_size)
+        if not data:
+            break
+        batch = tokenizer.feed(data)
+        if len(batch):
+            yield batch
+    batch = tokenizer.close()
+    if len(batch):
+        yield batch
+
+
+def scan_gerber(file_path: str, chunk_size: int = CHUNK_SIZE) -> GerberTokenizer:
+    """Read a whole Gerber file in one pass, keeping only statistics.
+
+    Args:
+        file_path: Path to Gerber file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Tokenizer with final state, aperture table and stats
+    """
+    tokenizer = GerberTokenizer()
+    with open(file_path, 'rb') as f:
+        for _ in iter_batches(f, tokenizer, chunk_size):
+            pass
+    return tokenizer
+
+
+def summarize(tokenizer: GerberTokenizer) -> Dict[str, Any]:
+    """Describe a scanned layer with the keys parse_gerber_file reports.
+
+    Args:
+        tokenizer: Tokenizer that has consumed the whole file
+
+    Returns:
+        Dictionary of format, units, counts, apertures and bounds, and the
+        step-and-repeat blocks with the bounds of one board
+    """
+    state, stats = tokenizer.state, tokenizer.stats
+    sizes = [size for size in map(tokenizer.aperture_size, tokenizer.apertures.values()) if size is not None]
+    shapes = [a.shape for a in tokenizer.apertures.values()]
+    summary = {
+        "format": "RS-274X" if state.format_spec or state.units or tokenizer.apertures else "RS-274D",
+        "format_spec": state.format_spec,
+        "units": state.units,
+        "statements_count": stats.words,
+        "draw_commands": stats.operations,
+        "primitives_count": stats.lines + stats.arcs + stats.flashes + stats.regions,
+        "lines_count": stats.lines,
+        "arcs_count": stats.arcs,
+        "flashes_count": stats.flashes,
+        "regions_count": stats.regions,
+        "apertures_count": len(tokenizer.apertures),
+        "aperture_sizes": sorted(set(sizes))[:20],
+        "min_aperture_size": min(sizes) if sizes else None,
+        "max_aperture_size": max(sizes) if sizes else None,
+        "avg_aperture_size": sum(sizes) / len(sizes) if sizes else None,
+        "circular_apertures_count": shapes.count('C'),
+        "rectangular_apertures_count": shapes.count('R'),
+        "oval_apertures_count": shapes.count('O'),
+        "macro_apertures_count": sum(shape in tokenizer.macros for shape in shapes),
+        "width": None,
+        "height": None,
+    }
+    bounds = stats.bounds
+    if bounds:
+        summary["bounds"] = bounds
+        summary["width"] = bounds["max_x"] - bounds["min_x"]
+        summary["height"] = bounds["max_y"] - bounds["min_y"]
+    # Panels: counts and bounds above cover every copy; the board is one copy
+    summary["step_repeats"] = [asdict(s) for s in tokenizer.step_repeats]
+    summary["boards_per_panel"] = max((s.copies for s in tokenizer.step_repeats), default=1)
+    board = stats.step_bounds
+    if board:
+        summary["board_bounds"] = board
+        summary["board_width"] = board["max_x"] - board["min_x"]
+        summary["board_height"] = board["max_y"] - board["min_y"]
+    return summary
@@ -0,0 +1,413 @@
+"""Aperture macros (%AM) compiled once and evaluated once per instance.
+
+A macro body is translated into one Python function: every arithmetic
+expression becomes a Python expression over the variables $1, $2, ...
+(held in a dictionary, undefined ones reading 0), and variable definitions
+become assignments, in body order. Expressions are tokenized and checked
+before compilation, so nothing but numbers, variables and arithmetic ever
+reaches the compiler.
+
+Each distinct (macro, parameters, units) instance, which is what an %AD
+aperture using a macro defines, is evaluated into a MacroTemplate: the
+outline of every primitive as closed polygons in millimetres, relative to
+the flash point. Curves are flattened to CIRCLE_SEGMENTS chords per turn.
+Compiled macros and templates are cached, so a board with thousands of
+flashes of a few macro pads evaluates each pad once; the flashes are then
+translations of the template (see geometry.macro_regions).
+
+Exposed primitives become one shape each, of one or more loops:
+counterclockwise outlines and clockwise holes (the rings of moire
+primitives). An exposure-off primitive only cuts the macro's own image, so
+it is subtracted from the shapes of the primitives before it rather than
+kept: a cut lying inside one convex outline becomes a clockwise hole of
+it, and otherwise the outline is split into convex pieces around the cut.
+Shapes of several loops (moire rings) are left uncut.
+"""
+
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Chords of a full circle (matches geometry.ARC_STEP)
+CIRCLE_SEGMENTS = 32
+
+# Templates kept in memory
+TEMPLATE_CACHE_SIZE = 1024
+
+_TOKEN_RE = re.compile(r'\s*(?:(\d+\.?\d*|\.\d+)|\$(\d+)|([-+xX/()]))')
+_ASSIGNMENT_RE = re.compile(r'\$(\d+)\s*=(.*)', re.DOTALL)
+
+
+class MacroError(ValueError):
+    """A macro body that cannot be compiled or evaluated."""
+
+
+@dataclass
+class MacroTemplate:
+    """Outline of a macro instance, one shape per primitive."""
+    x0: np.ndarray           # edges in mm, relative to the flash point
+    y0: np.ndarray
+    x1: np.ndarray
+    y1: np.ndarray
+    shape: np.ndarray        # shape of every edge, 0 .. shapes - 1
+    shapes: int
+
+    @property
+    def size(self) -> float:
+        """Larger side of the bounding box of the shapes in mm."""
+        xs = np.concatenate([self.x0, self.x1])
+        ys = np.concatenate([self.y0, self.y1])
+        return float(max(xs.max() - xs.min(), ys.max() - ys.min()))
+
+
+def _expression(text: str) -> str:
+    """Python source of one macro expression."""
+    out = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise MacroError(f"Invalid macro expression: {text!r}")
+        number, variable, operator = match.groups()
+        if number is not None:
+            out.append(repr(float(number)))
+        elif variable is not None:
+            out.append(f"v[{int(variable)}]")
+        else:
+            out.append('*' if operator in 'xX' else operator)
+        pos = match.end()
+    if not out:
+        raise MacroError("Empty macro expression")
+    return ' '.join(out)
+
+
+@lru_cache(maxsize=256)
+def compile_macro(body: str) -> Callable[[Dict[int, float]], List[Tuple[int, Tuple[float, ...]]]]:
+    """Compile a macro body (the statements after %AM<name>*).
+
+    Returns:
+        Function of the variables returning (primitive code, values) per
+        primitive, in body order
+
+    Raises:
+        MacroError: The body has an invalid statement
+    """
+    lines = ["def evaluate(v):", "    out = []"]
+    for statement in body.split('*'):
+        statement = statement.strip()
+        if not statement or statement.startswith('0'):
+            # Empty, or a comment (primitive 0)
+            continue
+        assignment = _ASSIGNMENT_RE.fullmatch(statement)
+        if assignment:
+            lines.append(f"    v[{int(assignment.group(1))}] = {_expression(assignment.group(2))}")
+            continue
+        code, *fields = statement.split(',')
+        if not code.strip().isdigit():
+            raise MacroError(f"Invalid macro primitive: {statement!r}")
+        values = ', '.join(_expression(field) for field in fields)
+        lines.append(f"    out.append(({int(code)}, ({values}{',' if values else ''})))")
+    lines.append("    return out")
+    namespace: Dict[str, object] = {}
+    exec(compile('\n'.join(lines), '<aperture macro>', 'exec'), {'__builtins__': {}}, namespace)
+    return namespace['evaluate']
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def macro_template(body: str, params: Tuple[float, ...], scale: float = 1.0) -> Optional[MacroTemplate]:
+    """Evaluate one instance of a macro.
+
+    Args:
+        body: Macro body
+        params: Values of $1, $2, ... from %AD
+        scale: Millimetres per file unit where the aperture was defined
+
+    Returns:
+        MacroTemplate, or None for a macro that fails to compile or evaluate
+    """
+    try:
+        variables: Dict[int, float] = defaultdict(float, enumerate(params, start=1))
+        primitives = compile_macro(body)(variables)
+        shapes = _cut_shapes([shape for code, values in primitives for shape in _primitive_shapes(code, values)])
+    except (MacroError, ArithmeticError, IndexError, ValueError):
+        return None
+    x0, y0, x1, y1, shape = [], [], [], [], []
+    for number, loops in enumerate(shapes):
+        for loop in loops:
+            if len(loop) < 3:
+                continue
+            loop = np.asarray(loop, dtype=np.float64) * scale
+            x0.append(loop[:, 0])
+            y0.append(loop[:, 1])
+            x1.append(np.roll(loop[:, 0], -1))
+            y1.append(np.roll(loop[:, 1], -1))
+            shape.append(np.full(len(loop), number, dtype=np.int32))
+    if not shape:
+        return None
+    return MacroTemplate(
+        x0=np.concatenate(x0), y0=np.concatenate(y0), x1=np.concatenate(x1), y1=np.concatenate(y1),
+        shape=np.concatenate(shape), shapes=len(shapes),
+    )
+
+
+# Area below which a clipped piece is empty, in squared macro units
+_EMPTY_AREA = 1e-12
+
+# A convex piece of a shape with the clockwise holes cut inside it
+_Piece = Tuple[np.ndarray, List[np.ndarray]]
+
+
+def _cut_shapes(shapes: List[Tuple[List[np.ndarray], bool]]) -> List[List[np.ndarray]]:
+    """Loops of the exposed shapes, with every exposure-off shape subtracted from the ones before it."""
+    kept: List[List[np.ndarray]] = []
+    # Pieces of every kept shape once a cut has reached it
+    cut: List[Optional[List[_Piece]]] = []
+    for loops, exposure in shapes:
+        loops = [np.asarray(loop, dtype=np.float64) for loop in loops if len(loop) >= 3]
+        if not loops:
+            continue
+        if exposure:
+            kept.append(loops)
+            cut.append(None)
+            continue
+        for convex in (part for loop in loops for part in _convex_parts(loop)):
+            for index, pieces in enumerate(cut):
+                # Shapes with holes of their own are not cut
+                if pieces is None and len(kept[index]) == 1:
+                    if all(_area(_clip(part, convex)) <= _EMPTY_AREA for part in _convex_parts(kept[index][0])):
+                        continue
+                    pieces = [(part, []) for part in _convex_parts(kept[index][0])]
+                if pieces is not None:
+                    cut[index] = _subtract(pieces, convex)
+    return [
+        loops if pieces is None else [loop for outer, holes in pieces for loop in [outer] + [h[::-1] for h in holes]]
+        for loops, pieces in zip(kept, cut)
+    ]
+
+
+def _subtract(pieces: List[_Piece], cut: np.ndarray) -> List[_Piece]:
+    """Pieces minus a convex counterclockwise polygon."""
+    result = []
+    for outer, holes in pieces:
+        if _area(_clip(outer, cut)) <= _EMPTY_AREA:
+            result.append((outer, holes))
+        elif _inside(cut, outer) and all(_area(_clip(hole, cut)) <= _EMPTY_AREA for hole in holes):
+            result.append((outer, holes + [cut]))
+        else:
+            rest = [(part, []) for part in _difference(outer, cut)]
+            for hole in holes:
+                rest = _subtract(rest, hole)
+            result.extend(rest)
+    return result
+
+
+def _difference(polygon: np.ndarray, cut: np.ndarray) -> List[np.ndarray]:
+    """Disjoint convex pieces of a convex polygon outside a convex cut: outside one
+    edge of the cut and inside the edges before it."""
+    pieces = []
+    remaining = polygon
+    for start, end in zip(cut, np.roll(cut, -1, axis=0)):
+        outside = _clip_half(remaining, end, start)
+        if _area(outside) > _EMPTY_AREA:
+            pieces.append(outside)
+        remaining = _clip_half(remaining, start, end)
+        if _area(remaining) <= _EMPTY_AREA:
+            break
+    return pieces
+
+
+def _clip(polygon: np.ndarray, convex: np.ndarray) -> np.ndarray:
+    """Part of a polygon inside a convex counterclockwise polygon (Sutherland-Hodgman)."""
+    for start, end in zip(convex, np.roll(convex, -1, axis=0)):
+        polygon = _clip_half(polygon, start, end)
+        if len(polygon) < 3:
+            break
+    return polygon
+
+
+def _clip_half(polygon: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Part of a polygon left of the line from start to end."""
+    if len(polygon) < 3:
+        return polygon
+    side = _cross(end - start, polygon - start)
+    following = np.roll(polygon, -1, axis=0)
+    next_side = np.roll(side, -1)
+    points = []
+    for point, to, s, t in zip(polygon, following, side, next_side):
+        if s >= 0:
+            points.append(point)
+        if (s > 0 and t < 0) or (s < 0 and t > 0):
+            points.append(point + (to - point) * (s / (s - t)))
+    return np.array(points, dtype=np.float64).reshape(-1, 2)
+
+
+def _inside(polygon: np.ndarray, convex: np.ndarray) -> bool:
+    """Whether every vertex of a polygon lies within a convex counterclockwise polygon."""
+    for start, end in zip(convex, np.roll(convex, -1, axis=0)):
+        if (_cross(end - start, polygon - start) < 0).any():
+            return False
+    return True
+
+
+def _convex_parts(loop: np.ndarray) -> List[np.ndarray]:
+    """A counterclockwise loop as convex counterclockwise polygons: itself if convex, else its triangles."""
+    loop = np.asarray(loop, dtype=np.float64)
+    turns = _cross(np.roll(loop, -1, axis=0) - loop, np.roll(loop, -2, axis=0) - np.roll(loop, -1, axis=0))
+    if (turns >= 0).all():
+        return [loop]
+    # Ear clipping
+    triangles = []
+    remaining = list(loop)
+    while len(remaining) > 3:
+        for i in range(len(remaining)):
+            a, b, c = remaining[i - 1], remaining[i], remaining[(i + 1) % len(remaining)]
+            triangle = np.array([a, b, c])
+            if _cross(b - a, c - b) <= 0:
+                continue
+            others = np.array([p for p in remaining if not any(p is q for q in (a, b, c))]).reshape(-1, 2)
+            if len(others) and (np.min([_cross(q - p, others - p) for p, q in
+                                        zip(triangle, np.roll(triangle, -1, axis=0))], axis=0) > 0).any():
+                continue
+            triangles.append(triangle)
+            del remaining[i]
+            break
+        else:
+            # Degenerate (self-intersecting) loop: leave the rest whole
+            break
+    triangles.append(np.array(remaining))
+    return triangles
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """z of the cross product of a with each row of b."""
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _area(polygon: np.ndarray) -> float:
+    """Area of a polygon (shoelace); 0 for fewer than three points."""
+    if len(polygon) < 3:
+        return 0.0
+    x, y = polygon[:, 0], polygon[:, 1]
+    return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))) / 2
+
+
+def _rotate(points: np.ndarray, degrees: float) -> np.ndarray:
+    """Rotate (N, 2) points counterclockwise about the macro origin."""
+    if not degrees:
+        return points
+    angle = math.radians(degrees)
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, s], [-s, c]])
+
+
+def _circle(cx: float, cy: float, radius: float) -> np.ndarray:
+    """Counterclockwise polygon of a circle."""
+    angles = np.arange(CIRCLE_SEGMENTS) * (2 * np.pi / CIRCLE_SEGMENTS)
+    return np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+
+
+def _rectangle(x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+    """Counterclockwise polygon of an axis-aligned rectangle."""
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float64)
+
+
+def _counterclockwise(points: np.ndarray) -> np.ndarray:
+    """The polygon, reversed if it winds clockwise."""
+    x, y = points[:, 0], points[:, 1]
+    area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+    return points[::-1] if area < 0 else points
+
+
+def _primitive_shapes(code: int, v: Sequence[float]) -> List[Tuple[List[np.ndarray], bool]]:
+    """Shapes of one primitive: (loops, exposure) each; loops are (N, 2) polygons."""
+    if code == 1:
+        # Circle: exposure, diameter, centre x, centre y[, rotation]
+        exposure, diameter, cx, cy = v[:4]
+        rotation = v[4] if len(v) > 4 else 0.0
+        return [([_rotate(_circle(cx, cy, diameter / 2), rotation)], exposure != 0)]
+    if code in (2, 20):
+        # Vector line: exposure, width, start x, start y, end x, end y, rotation
+        exposure, width, xs, ys, xe, ye, rotation = v[:7]
+        length = math.hypot(xe - xs, ye - ys)
+        dx, dy = ((xe - xs) / length, (ye - ys) / length) if length else (1.0, 0.0)
+        nx, ny = -dy * width / 2, dx * width / 2
+        points = np.array([[xs - nx, ys - ny], [xe - nx, ye - ny], [xe + nx, ye + ny], [xs + nx, ys + ny]])
+        return [([_rotate(points, rotation)], exposure != 0)]
+    if code == 21:
+        # Center line: exposure, width, height, centre x, centre y, rotation
+        exposure, width, height, cx, cy, rotation = v[:6]
+        points = _rectangle(cx - width / 2, cy - height / 2, cx + width / 2, cy + height / 2)
+        return [([_rotate(points, rotation)], exposure != 0)]
+    if code == 22:
+        # Lower left line (deprecated): exposure, width, height, x, y, rotation
+        exposure, width, height, x, y, rotation = v[:6]
+        return [([_rotate(_rectangle(x, y, x + width, y + height), rotation)], exposure != 0)]
+    if code == 4:
+        # Outline: exposure, vertices, x0, y0, ... xn, yn, rotation
+        exposure, count = v[0], int(v[1])
+        points = np.asarray(v[2:4 + 2 * count], dtype=np.float64).reshape(-1, 2)[:-1]
+        rotation = v[4 + 2 * count] if len(v) > 4 + 2 * count else 0.0
+        return [([_rotate(_counterclockwise(points), rotation)], exposure != 0)]
+    if code == 5:
+        # Polygon: exposure, vertices, centre x, centre y, diameter, rotation
+        exposure, count, cx, cy, diameter = v[:5]
+        rotation = v[5] if len(v) > 5 else 0.0
+        angles = np.arange(int(count)) * (2 * np.pi / int(count))
+        points = np.column_stack([cx + diameter / 2 * np.cos(angles), cy + diameter / 2 * np.sin(angles)])
+        return [([_rotate(points, rotation)], exposure != 0)]
+    if code == 6:
+        return _moire(*v[:9])
+    if code == 7:
+        return _thermal(*v[:6])
+    # Unknown primitive: nothing drawn
+    return []
+
+
+def _moire(cx, cy, diameter, thickness, gap, rings, cross_thickness, cross_length, rotation=0.0):
+    """Rings and crosshair of a moire primitive (6), always exposed."""
+    shapes = []
+    outer = diameter / 2
+    for _ in range(int(rings)):
+        if outer <= 0:
+            break
+        inner = outer - thickness
+        loops = [_circle(cx, cy, outer)]
+        if inner > 0:
+            loops.append(_circle(cx, cy, inner)[::-1])
+        shapes.append(([_rotate(loop, rotation) for loop in loops], True))
+        outer = inner - gap
+    for width, height in ((cross_length, cross_thickness), (cross_thickness, cross_length)):
+        points = _rectangle(cx - width / 2, cy - height / 2, cx + width / 2, cy + height / 2)
+        shapes.append(([_rotate(points, rotation)], True))
+    return shapes
+
+
+def _thermal(cx, cy, outer_diameter, inner_diameter, gap, rotation=0.0):
+    """The four quarters of a thermal primitive (7), always exposed."""
+    outer, inner, half_gap = outer_diameter / 2, inner_diameter / 2, gap / 2
+    if half_gap >= outer:
+        return []
+    shapes = []
+    steps = CIRCLE_SEGMENTS // 4
+    outer_cut = math.asin(half_gap / outer)
+    for quarter in range(4):
+        base = quarter * np.pi / 2
+        arc = np.linspace(base + outer_cut, base + np.pi / 2 - outer_cut, steps + 1)
+        points = [np.column_stack([outer * np.cos(arc), outer * np.sin(arc)])]
+        if half_gap < inner:
+            inner_cut = math.asin(half_gap / inner)
+            arc = np.linspace(base + np.pi / 2 - inner_cut, base + inner_cut, steps + 1)
+            points.append(np.column_stack([inner * np.cos(arc), inner * np.sin(arc)]))
+        else:
+            # The gap is wider than the hole: the quarter ends in a corner
+            corner = _rotate(np.array([[half_gap, half_gap]]), math.degrees(base))
+            points.append(corner)
+        loop = np.concatenate(points) + (cx, cy)
+        shapes.append(([_rotate(loop, rotation)], True))
+    return shapes
@@ -0,0 +1,593 @@
+"""ODB++ jobs read straight from their archive.
+
+An ODB++ job is a directory tree, usually shipped as a .tgz or .zip. Instead
+of extracting it, OdbJob indexes the archive's members once (through the
+layer cache, so once per archive content) and reads only the members asked
+for:
+
+- ZIP members are opened directly
+- a tar archive can only be read front to back, so the wanted members are
+  collected in one streaming pass that stops after the last of them
+- a job already unpacked into a directory is read file by file
+
+Of the job, matrix/matrix (steps and layer stack) and the features files of
+step profiles and layers are decoded. Features files, plain or compressed
+(.z or .gz), become the LayerGeometry used for Gerber layers:
+
+- lines, arcs and pads keep their symbol as aperture. Symbol n is aperture
+  2n, and 2n + 1 is the same symbol turned a quarter; pads at other angles
+  use the unturned one.
+- surfaces become region edges, one region per contour. Holes get the
+  opposite polarity, and arc edges are flattened.
+- text and barcodes are not read.
+
+Layer geometry, with the names of the features file's symbol index, goes
+through the layer cache under a result kind per step and layer.
+"""
+
+import gzip
+import os
+import re
+import tarfile
+import zipfile
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .geometry import (
+    APERTURE_DTYPE, ARC_DTYPE, PRIMITIVE_DTYPE, REGION_DTYPE, SHAPE_CIRCLE, SHAPE_MACRO, SHAPE_OBROUND,
+    SHAPE_POLYGON, SHAPE_RECTANGLE, LayerGeometry, flatten_arcs,
+)
+from .gerber_tokenizer import CLEAR, DARK, MM_PER_INCH
+from ..layer_cache import cached_parse, cached_parse_many
+
+# Result kind of archive indexes in the layer cache
+INDEX_KIND = "odb_index"
+
+MATRIX = 'matrix/matrix'
+
+# Suffixes of compressed members, tried after the plain name
+_COMPRESSED = ('.z', '.gz')
+
+# Symbol sizes are in mils in inch files and microns in metric ones
+_SYMBOL_MM = {'I': MM_PER_INCH / 1000, 'M': 0.001}
+
+_NUMBER = r'(\d+(?:\.\d*)?|\.\d+)'
+_ROUND = re.compile(rf'r{_NUMBER}')
+_SQUARE = re.compile(rf's{_NUMBER}')
+_RECT = re.compile(rf'rect{_NUMBER}x{_NUMBER}(?:x[rc].*)?')
+_OVAL = re.compile(rf'oval{_NUMBER}x{_NUMBER}')
+_DIAMOND = re.compile(rf'di{_NUMBER}x{_NUMBER}')
+_OCTAGON = re.compile(rf'oct{_NUMBER}x{_NUMBER}x{_NUMBER}')
+_DONUT = re.compile(rf'donut_r{_NUMBER}x{_NUMBER}')
+
+_BLOCK = re.compile(r'(\w+)\s*\{(.*?)\}', re.DOTALL)
+
+
+class OdbJob:
+    """An ODB++ job in an archive or directory, read member by member."""
+
+    def __init__(self, path: str, index: Dict[str, Any]):
+        """Initialize from an index built by index_members.
+
+        Args:
+            path: Archive or directory
+            index: Result of index_members(path)
+        """
+        self.path = path
+        self.format = index["format"]
+        # Member names by lower-case path relative to the job root
+        self.members: Dict[str, str] = index["members"]
+
+    @classmethod
+    def open(cls, path: str) -> 'OdbJob':
+        """Open a job, with its index from the layer cache.
+
+        Raises:
+            ValueError: if path is not an ODB++ archive or directory
+        """
+        index = cached_parse(path, INDEX_KIND, odb_index_result)
+        if not index.get("success"):
+            raise ValueError(index.get("error", f"Cannot read ODB++ job: {path}"))
+        return cls(path, index)
+
+    @property
+    def steps(self) -> List[str]:
+        """Names of the job's steps, sorted."""
+        return sorted({key.split('/')[1] for key in self.members if key.startswith('steps/') and key.count('/') > 1})
+
+    def layers(self, step: str) -> List[str]:
+        """Names of the layers of a step that have features, sorted."""
+        prefix = f'steps/{step}/layers/'
+        return sorted({
+            key[len(prefix):].split('/')[0] for key in self.members
+            if key.startswith(prefix) and key.split('/')[-1].startswith('features')
+        })
+
+    def find(self, relative: str) -> Optional[str]:
+        """Index key of a member, plain or compressed, or None if missing."""
+        relative = relative.lower()
+        for key in (relative,) + tuple(relative + suffix for suffix in _COMPRESSED):
+            if key in self.members:
+                return key
+        return None
+
+    def read(self, *relatives: str) -> Dict[str, bytes]:
+        """Read members, decompressed.
+
+        Args:
+            relatives: Paths relative to the job root, without compression suffix
+
+        Returns:
+            Content by requested path; missing members are left out
+        """
+        wanted = {}
+        for relative in relatives:
+            key = self.find(relative)
+            if key is not None:
+                wanted[self.members[key]] = (relative, key)
+        raw: Dict[str, bytes] = {}
+        if self.format == 'zip':
+            with zipfile.ZipFile(self.path) as zip_ref:
+                for name in wanted:
+                    raw[name] = zip_ref.read(name)
+        elif self.format == 'tar':
+            with tarfile.open(self.path, 'r|*') as tar:
+                for info in tar:
+                    if info.name in wanted and info.isfile():
+                        raw[info.name] = tar.extractfile(info).read()
+                        if len(raw) == len(wanted):
+                            break
+        else:
+            for name in wanted:
+                with open(os.path.join(self.path, name), 'rb') as f:
+                    raw[name] = f.read()
+        return {wanted[name][0]: decompress(wanted[name][1], data) for name, data in raw.items()}
+
+    def features(self, step: str, layer: Optional[str] = None) -> Optional[LayerGeometry]:
+        """Decode the features of a layer, or of the step profile if layer is None.
+
+        Returns:
+            Layer geometry, or None if the job has no such features file
+        """
+        relative = features_path(step, layer)
+        data = self.read(relative).get(relative)
+        return decode_features(data) if data is not None else None
+
+
+def features_path(step: str, layer: Optional[str] = None) -> str:
+    """Path of a layer's features file, or of the step profile if layer is None."""
+    if layer is None:
+        return f'steps/{step}/profile'
+    return f'steps/{step}/layers/{layer}/features'
+
+
+def decompress(name: str, data: bytes) -> bytes:
+    """Decompress a member by its name's suffix; other members are returned as they are."""
+    if name.endswith('.z'):
+        return uncompress_z(data)
+    if name.endswith('.gz'):
+        return gzip.decompress(data)
+    return data
+
+
+def uncompress_z(data: bytes) -> bytes:
+    """Decompress Unix compress (.Z, LZW) data.
+
+    Codes are read least significant bit first, from 9 bits wide up to the
+    header's maximum. Codes come in groups of eight; on a width change or a
+    clear code the rest of the group is padding.
+
+    Raises:
+        ValueError: if the data is not valid compress output
+    """
+    if len(data) < 3 or data[0] != 0x1F or data[1] != 0x9D:
+        raise ValueError("Not compress (.Z) data")
+    max_bits = data[2] & 0x1F
+    block_mode = bool(data[2] & 0x80)
+    if not 9 <= max_bits <= 16:
+        raise ValueError(f"Unsupported compress code width: {max_bits}")
+    max_entries = 1 << max_bits
+
+    table: List[bytes] = [bytes((i,)) for i in range(256)] + [b''] * (max_entries - 256)
+    free = 257 if block_mode else 256
+    bits = 9
+    max_code = (1 << bits) - 1
+    mask = max_code
+    position = group = 24
+    total = len(data) * 8
+    padded = data + b'\0\0'
+    out = bytearray()
+    previous = None
+
+    def aligned(position: int) -> int:
+        # End of the current group of eight codes
+        span = bits * 8
+        return group + -(-(position - group) // span) * span
+
+    while True:
+        if free > max_code:
+            position = group = aligned(position)
+            bits += 1
+            max_code = max_entries if bits == max_bits else (1 << bits) - 1
+            mask = (1 << bits) - 1
+        if position + bits > total:
+            break
+        byte = position >> 3
+        code = (int.from_bytes(padded[byte:byte + 3], 'little') >> (position & 7)) & mask
+        position += bits
+
+        if previous is None:
+            if code > 255:
+                raise ValueError("Corrupt compress data")
+            previous = table[code]
+            out += previous
+            continue
+        if code == 256 and block_mode:
+            free = 256
+            position = group = aligned(position)
+            bits = 9
+            max_code = mask = (1 << bits) - 1
+            continue
+        if code < free:
+            entry = table[code]
+        elif code == free:
+            entry = previous + previous[:1]
+        else:
+            raise ValueError("Corrupt compress data")
+        out += entry
+        if free < max_entries:
+            table[free] = previous + entry[:1]
+            free += 1
+        previous = entry
+    return bytes(out)
+
+
+def index_members(path: str) -> Dict[str, Any]:
+    """Index the files of an ODB++ archive or directory.
+
+    The job root is the directory holding matrix/matrix, or else the one
+    directory all members share.
+
+    Returns:
+        Dictionary with format ('zip', 'tar' or 'directory'), root and
+        members (name by lower-case path relative to the root)
+
+    Raises:
+        ValueError: if path is neither a directory nor a ZIP or tar archive
+    """
+    if os.path.isdir(path):
+        fmt = 'directory'
+        names = [
+            os.path.relpath(os.path.join(directory, filename), path).replace(os.sep, '/')
+            for directory, _, filenames in os.walk(path) for filename in filenames
+        ]
+    elif zipfile.is_zipfile(path):
+        fmt = 'zip'
+        with zipfile.ZipFile(path) as zip_ref:
+            names = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
+    elif tarfile.is_tarfile(path):
+        fmt = 'tar'
+        with tarfile.open(path, 'r|*') as tar:
+            names = [info.name for info in tar if info.isfile()]
+    else:
+        raise ValueError(f"Not a ZIP or tar archive: {path}")
+
+    root = _job_root(names)
+    members = {name[len(root):].lower(): name for name in names if name.startswith(root)}
+    return {"success": True, "format": fmt, "root": root, "members": members}
+
+
+def _job_root(names: List[str]) -> str:
+    """Prefix of member names up to the job's top directory."""
+    roots = [
+        name[:-len(MATRIX)] for name in names
+        if name.lower().endswith(MATRIX) and (len(name) == len(MATRIX) or name[-len(MATRIX) - 1] == '/')
+    ]
+    if roots:
+        return min(roots, key=len)
+    tops = {name.split('/')[0] for name in names}
+    if len(tops) == 1 and all('/' in name for name in names):
+        return tops.pop() + '/'
+    return ''
+
+
+def odb_index_result(path: str) -> Dict[str, Any]:
+    """Index an ODB++ archive as a layer cache result.
+
+    Args:
+        path: Archive or directory
+
+    Returns:
+        index_members() dictionary, or an error dictionary
+    """
+    if not os.path.exists(path):
+        return {
+            "success": False,
+            "error": f"File not found: {path}"
+        }
+    try:
+        return index_members(path)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to index ODB++ archive: {str(e)}"
+        }
+
+
+def decode_matrix(data: bytes) -> Dict[str, List[Dict[str, Any]]]:
+    """Decode matrix/matrix.
+
+    Returns:
+        Dictionary with steps (name, col) sorted by column and layers (name,
+        row, type, context, polarity) sorted by row; names in lower case
+    """
+    steps, layers = [], []
+    for block, body in _BLOCK.findall(data.decode('latin-1')):
+        fields = {}
+        for line in body.splitlines():
+            key, _, value = line.strip().partition('=')
+            fields[key.strip().upper()] = value.strip()
+        if block.upper() == 'STEP':
+            steps.append({"name": fields.get('NAME', '').lower(), "col": _int(fields.get('COL'))})
+        elif block.upper() == 'LAYER':
+            layers.append({
+                "name": fields.get('NAME', '').lower(),
+                "row": _int(fields.get('ROW')),
+                "type": fields.get('TYPE', '').lower(),
+                "context": fields.get('CONTEXT', '').lower(),
+                "polarity": fields.get('POLARITY', 'POSITIVE').lower(),
+            })
+    steps.sort(key=lambda step: step["col"])
+    layers.sort(key=lambda layer: layer["row"])
+    return {"steps": steps, "layers": layers}
+
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def symbol_aperture(name: str, mm_per_unit: float) -> Tuple[int, float, float, float, int, float]:
+    """Aperture of a standard ODB++ symbol.
+
+    Args:
+        name: Symbol name, such as r100 or rect200x100
+        mm_per_unit: Millimetres per symbol unit (mil or micron)
+
+    Returns:
+        (shape, width, height, hole, vertices, rotation) as in APERTURE_DTYPE
+    """
+    name = name.lower()
+    match = _ROUND.fullmatch(name)
+    if match:
+        d = float(match.group(1)) * mm_per_unit
+        return SHAPE_CIRCLE, d, d, 0.0, 0, 0.0
+    match = _SQUARE.fullmatch(name)
+    if match:
+        s = float(match.group(1)) * mm_per_unit
+        return SHAPE_RECTANGLE, s, s, 0.0, 0, 0.0
+    match = _RECT.fullmatch(name) or _OVAL.fullmatch(name)
+    if match:
+        w, h = (float(v) * mm_per_unit for v in match.groups())
+        return (SHAPE_OBROUND if name.startswith('oval') else SHAPE_RECTANGLE), w, h, 0.0, 0, 0.0
+    match = _DONUT.fullmatch(name)
+    if match:
+        outer, inner = (float(v) * mm_per_unit for v in match.groups())
+        return SHAPE_CIRCLE, outer, outer, inner, 0, 0.0
+    match = _DIAMOND.fullmatch(name)
+    if match and match.group(1) == match.group(2):
+        d = float(match.group(1)) * mm_per_unit
+        return SHAPE_POLYGON, d, d, 0.0, 4, 0.0
+    match = _OCTAGON.fullmatch(name)
+    if match and match.group(1) == match.group(2):
+        # Circumscribed diameter of a regular octagon this wide
+        d = float(match.group(1)) * mm_per_unit / np.cos(np.pi / 8)
+        return SHAPE_POLYGON, d, d, 0.0, 8, 22.5
+    return SHAPE_MACRO, np.nan, np.nan, 0.0, 0, 0.0
+
+
+def _apertures(symbols: Dict[int, Tuple[str, float]]) -> np.ndarray:
+    """Aperture table of a symbol table: every symbol unturned and turned a quarter."""
+    table = np.zeros(2 * len(symbols), dtype=APERTURE_DTYPE)
+    for row, number in enumerate(sorted(symbols)):
+        shape, width, height, hole, vertices, rotation = symbol_aperture(*symbols[number])
+        table[2 * row] = (2 * number, shape, width, height, hole, vertices, rotation)
+        table[2 * row + 1] = (2 * number + 1, shape, height, width, hole, vertices, rotation + 90.0)
+    return table
+
+
+def _pad_turned(fields: List[str], at: int) -> bool:
+    """Whether a pad's orientation fields turn its symbol a quarter."""
+    orientation = int(fields[at])
+    angle = float(fields[at + 1]) if orientation >= 8 and len(fields) > at + 1 else 90.0 * (orientation % 4)
+    return angle % 180.0 == 90.0
+
+
+def decode_features(data: bytes) -> LayerGeometry:
+    """Decode an ODB++ features file into layer geometry in millimetres.
+
+    Args:
+        data: Content of the features (or profile) file, decompressed
+
+    Returns:
+        Layer geometry
+    """
+    mm_per_unit = MM_PER_INCH
+    symbol_unit = 'I'
+    symbols: Dict[int, Tuple[str, Optional[str]]] = {}
+    lines: List[tuple] = []
+    arcs: List[tuple] = []
+    pads: List[tuple] = []
+    edges: List[tuple] = []
+    edge_arcs: List[tuple] = []
+    arc_regions: List[int] = []
+    region = -1
+    surface = contour = DARK
+    x = y = start_x = start_y = 0.0
+
+    for line in data.decode('latin-1').splitlines():
+        fields = line.split(';', 1)[0].split()
+        if not fields:
+            continue
+        code = fields[0]
+        if code == 'L':
+            lines.append((float(fields[1]), float(fields[2]), float(fields[3]), float(fields[4]),
+                          2 * int(fields[5]), DARK if fields[6] == 'P' else CLEAR))
+        elif code == 'P':
+            # A symbol of -1 is followed by a resize factor, then polarity, D code and orientation
+            at = 5 if fields[3] == '-1' else 4
+            px, py = float(fields[1]), float(fields[2])
+            turned = len(fields) > at + 2 and _pad_turned(fields, at + 2)
+            pads.append((px, py, px, py, 2 * int(fields[3]) + turned, DARK if fields[at] == 'P' else CLEAR))
+        elif code == 'A':
+            arcs.append((float(fields[1]), float(fields[2]), float(fields[3]), float(fields[4]),
+                         2 * int(fields[7]), DARK if fields[8] == 'P' else CLEAR,
+                         float(fields[5]), float(fields[6]), fields[10].upper() == 'Y'))
+        elif code == 'S':
+            surface = DARK if fields[1] == 'P' else CLEAR
+        elif code == 'OB':
+            region += 1
+            x = start_x = float(fields[1])
+            y = start_y = float(fields[2])
+            island = len(fields) < 4 or fields[3].upper() == 'I'
+            contour = surface if island else DARK + CLEAR - surface
+        elif code == 'OS':
+            nx, ny = float(fields[1]), float(fields[2])
+            edges.append((x, y, nx, ny, -1, contour, region))
+            x, y = nx, ny
+        elif code == 'OC':
+            nx, ny = float(fields[1]), float(fields[2])
+            edge_arcs.append((x, y, nx, ny, -1, contour, float(fields[3]), float(fields[4]),
+                              fields[5].upper() == 'Y'))
+            arc_regions.append(region)
+            x, y = nx, ny
+        elif code == 'OE':
+            if (x, y) != (start_x, start_y):
+                edges.append((x, y, start_x, start_y, -1, contour, region))
+        elif code.startswith('$'):
+            unit = fields[2].upper() if len(fields) > 2 else None
+            symbols[int(code[1:])] = (fields[1], unit)
+        elif code.startswith('UNITS='):
+            mm_per_unit, symbol_unit = _units(code[6:])
+        elif code == 'U' and len(fields) > 1:
+            mm_per_unit, symbol_unit = _units(fields[1])
+
+    geometry = LayerGeometry(
+        lines=np.array(lines, dtype=PRIMITIVE_DTYPE),
+        arcs=np.array(arcs, dtype=ARC_DTYPE),
+        flashes=np.array(pads, dtype=PRIMITIVE_DTYPE),
+        regions=_regions(edges, edge_arcs, arc_regions),
+        apertures=_apertures({
+            number: (name, _SYMBOL_MM[unit or symbol_unit]) for number, (name, unit) in symbols.items()
+        }),
+    )
+    if mm_per_unit != 1.0:
+        for name in ('lines', 'arcs', 'flashes', 'regions'):
+            array = getattr(geometry, name)
+            for column in ('x0', 'y0', 'x1', 'y1', 'cx', 'cy'):
+                if column in array.dtype.names:
+                    array[column] *= mm_per_unit
+    return geometry
+
+
+def feature_symbols(data: bytes) -> List[str]:
+    """Distinct symbols of a features file's symbol index ($n lines), with their unit if given.
+
+    Args:
+        data: Content of the features file, decompressed
+
+    Returns:
+        Sorted symbol names, such as "r10" or "oval30x60 M"
+    """
+    index = re.findall(rb'^\$\d+[ \t]+([^;\r\n]+)', data, re.M)
+    return sorted({' '.join(entry.decode('latin-1').split()) for entry in index})
+
+
+def _units(value: str) -> Tuple[float, str]:
+    """Coordinate scale and symbol unit of a UNITS value."""
+    if value.strip().upper() == 'MM':
+        return 1.0, 'M'
+    return MM_PER_INCH, 'I'
+
+
+def _regions(edges: List[tuple], edge_arcs: List[tuple], arc_regions: List[int]) -> np.ndarray:
+    """Region edges of straight and (flattened) curved contour segments."""
+    regions = np.array(edges, dtype=REGION_DTYPE)
+    if not edge_arcs:
+        return regions
+    curves = np.array(edge_arcs, dtype=ARC_DTYPE)
+    arc, x0, y0, x1, y1 = flatten_arcs(curves)
+    chords = np.empty(len(arc), dtype=REGION_DTYPE)
+    chords['x0'], chords['y0'], chords['x1'], chords['y1'] = x0, y0, x1, y1
+    chords['aperture_id'] = -1
+    chords['polarity'] = curves['polarity'][arc]
+    chords['region'] = np.asarray(arc_regions, dtype=np.int32)[arc]
+    merged = np.concatenate([regions, chords])
+    return merged[np.argsort(merged['region'], kind='stable')]
+
+
+def geometry_kind(step: str, layer: Optional[str] = None) -> str:
+    """Layer cache result kind of a layer's (or the step profile's) geometry."""
+    name = re.sub(r'[^\w.+-]', '_', f"{step}-{layer if layer is not None else 'profile'}")
+    return f"odb_geometry-{name}"
+
+
+def odb_geometry_result(path: str, step: str, layer: Optional[str] = None) -> Dict[str, Any]:
+    """Decode a layer of an ODB++ job as a layer cache result.
+
+    Args:
+        path: Archive or directory
+        step: Step name
+        layer: Layer name, or None for the step profile
+
+    Returns:
+        LayerGeometry.to_result() dictionary with the symbols of the features
+        file's symbol index, or an error dictionary
+    """
+    if not os.path.exists(path):
+        return {
+            "success": False,
+            "error": f"File not found: {path}"
+        }
+    relative = features_path(step, layer)
+    try:
+        data = OdbJob.open(path).read(relative).get(relative)
+        if data is not None:
+            geometry = decode_features(data)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to read ODB++ features: {str(e)}"
+        }
+    if data is None:
+        return {
+            "success": False,
+            "error": f"No features file {relative} in {path}"
+        }
+    result = geometry.to_result()
+    result["symbols"] = feature_symbols(data)
+    return result
+
+
+def load_odb_geometries(path: str, step: str, layers: Iterable[Optional[str]]) -> List[Dict[str, Any]]:
+    """Get the geometry of several layers of an ODB++ job through the layer cache.
+
+    Layers that are not cached are decoded in parallel. Pass successful
+    results to LayerGeometry.from_result.
+
+    Args:
+        path: Archive or directory
+        step: Step name
+        layers: Layer names; None for the step profile
+
+    Returns:
+        Result dictionaries in the order of layers
+    """
+    return cached_parse_many([
+        (path, geometry_kind(step, layer), partial(odb_geometry_result, step=step, layer=layer))
+        for layer in layers
+    ])
@@ -0,0 +1,471 @@
+"""Raster previews of layer geometry as a pyramid of PNG tiles.
+
+Tiles are drawn straight from the LayerGeometry arrays with NumPy, without
+a drawing library, by scanline. On every pixel row:
+
+- strokes and pads are the capsules of copper_features (arcs flattened,
+  rectangle corners rounded; macro pads are drawn as their regions). A
+  capsule's span on the row through the pixel centres is computed exactly,
+  and adds +1 at its first column and -1 after its last.
+- each region edge adds -1 going up or +1 going down at the column where
+  it crosses the row, which is +1 inside a counterclockwise region. Regions
+  are turned counterclockwise first, so overlapping regions add up rather
+  than cancel.
+
+A running sum along the row then counts the shapes covering each pixel.
+Pixel work is one bincount and one cumulative sum per window, whatever the
+number of shapes.
+
+Polarity is applied in file order: the layer's levels (runs of %LPD or
+%LPC, see geometry.py) become passes, each drawn over the bounding box of
+its shapes and added to or erased from the image, so a dark pour over an
+earlier clearance covers it again. Passes whose boxes do not overlap an
+earlier pass of the other polarity are drawn together, so a layer that
+switches polarity for every pad still takes a few passes.
+Features thinner than a pixel are widened to one pixel, so they stay
+visible when zoomed out.
+
+Step-and-repeat blocks are prepared once, as their first copy: every pass
+is split by step-and-repeat run, and each copy of a run draws the run's
+shapes again through a window shifted by the copy's translation (see
+LayerGeometry.transforms), so a panel costs no more memory than one board.
+
+The pyramid is square: zoom z splits its extent into 2^z x 2^z tiles of
+TILE_SIZE pixels, with tile (0, 0) at the top left. Tiles are 1-bit palette
+PNGs, transparent where the layer is empty.
+"""
+
+import hashlib
+import math
+import struct
+import zlib
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .geometry import FEATURE_ARC, FEATURE_FLASH, FEATURE_LINE, FEATURE_REGION, LayerGeometry
+from .gerber_tokenizer import CLEAR, DARK
+from .spatial_index import SpatialIndex
+
+TILE_SIZE = 256
+
+# Bump whenever rendering changes, to invalidate cached tiles
+RENDER_VERSION = 4
+
+# Smallest pixel of the deepest zoom when none is configured
+DEFAULT_MIN_PIXEL_MM = 0.005
+
+# Capsule rows spanned at once
+_MAX_ROWS = 1 << 21
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@dataclass(frozen=True)
+class Pyramid:
+    """Square extent in millimetres split into tiles at every zoom."""
+    min_x: float
+    min_y: float
+    size: float              # side of the extent
+    max_zoom: int
+    tile_size: int = TILE_SIZE
+
+    @classmethod
+    def covering(cls, bounds: Dict[str, float], min_pixel_mm: float = DEFAULT_MIN_PIXEL_MM,
+                 tile_size: int = TILE_SIZE, margin: float = 0.02) -> 'Pyramid':
+        """Pyramid centred on a bounding box, deep enough to reach the given pixel size.
+
+        Args:
+            bounds: Dictionary with min_x, min_y, max_x and max_y
+            min_pixel_mm: Pixel size the deepest zoom reaches
+            tile_size: Tile side in pixels
+            margin: Extra space around the box, as a fraction of its larger side
+        """
+        width = bounds["max_x"] - bounds["min_x"]
+        height = bounds["max_y"] - bounds["min_y"]
+        size = max(width, height, tile_size * min_pixel_mm) * (1 + 2 * margin)
+        max_zoom = max(0, math.ceil(math.log2(size / (tile_size * min_pixel_mm))))
+        return cls(
+            min_x=(bounds["min_x"] + bounds["max_x"] - size) / 2,
+            min_y=(bounds["min_y"] + bounds["max_y"] - size) / 2,
+            size=size,
+            max_zoom=max_zoom,
+            tile_size=tile_size,
+        )
+
+    @property
+    def key(self) -> str:
+        """Short digest identifying the pyramid and renderer, for tile caches."""
+        text = repr((self.min_x, self.min_y, self.size, self.max_zoom, self.tile_size, RENDER_VERSION))
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    def contains(self, z: int, x: int, y: int) -> bool:
+        """Whether a tile exists."""
+        return 0 <= z <= self.max_zoom and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+    def pixel_size(self, z: int) -> float:
+        """Pixel side in millimetres at a zoom."""
+        return self.size / (self.tile_size << z)
+
+    def tile_origin(self, z: int, x: int, y: int) -> Tuple[float, float]:
+        """(left, top) of a tile in millimetres."""
+        span = self.size / (1 << z)
+        return self.min_x + x * span, self.min_y + self.size - y * span
+
+
+class LayerRaster:
+    """Geometry of one layer prepared for drawing tiles."""
+
+    def __init__(self, geometry: LayerGeometry):
+        """Extract capsules and region edges, grouped into polarity passes.
+
+        Args:
+            geometry: Layer geometry
+        """
+        capsules, capsule_pass, capsule_run = _capsules(geometry)
+        edges, edge_pass, edge_region, edge_run = _edges(geometry)
+        # Shapes: every capsule, then every region, with its box and pass
+        # (pass 2 * level + 1 holds the clear geometry of a level)
+        regions = np.max(edge_region, initial=-1) + 1
+        region_pass = np.zeros(regions, dtype=np.intp)
+        region_pass[edge_region] = edge_pass
+        radius = capsules['radius']
+        boxes = np.concatenate([
+            np.column_stack([capsules['min_x'] - radius, capsules['max_x'] + radius,
+                             capsules['min_y'] - radius, capsules['max_y'] + radius]),
+            _extent(edges, edge_region, regions),
+        ])
+        depth = _stacking_depth(boxes, np.concatenate([capsule_pass, region_pass]))
+        depths, group = np.unique(depth, return_inverse=True)
+        self.polarity = np.where(depths & 1, CLEAR, DARK)
+        # Shapes are grouped by pass and step-and-repeat run: group * runs + run
+        transforms = geometry.transforms()
+        self.runs = max(len(geometry.steps), 1)
+        self.copy_run = np.maximum(transforms['step'], 0).astype(np.intp)
+        self.copy_offset = np.column_stack([transforms['dx'], transforms['dy']])
+        groups = len(depths) * self.runs
+        self.capsules = _grouped(capsules, group[:len(capsule_pass)] * self.runs + capsule_run, groups)
+        self.edges = _grouped(edges, group[len(capsule_pass):][edge_region] * self.runs + edge_run, groups)
+        # Bounding box of the first copy of every group, over which it is drawn
+        capsule_extent = _extent(self.capsules, self.capsules['group'], groups)
+        edge_extent = _extent(self.edges, self.edges['group'], groups)
+        self.extent = np.fmin(capsule_extent, edge_extent)
+        self.extent[:, 1::2] = np.fmax(capsule_extent, edge_extent)[:, 1::2]
+
+    def render(self, left: float, top: float, pixel: float, width: int, height: int) -> np.ndarray:
+        """Draw a window of the layer.
+
+        Args:
+            left: X of the window's left edge in mm
+            top: Y of the window's top edge in mm
+            pixel: Pixel side in mm
+            width: Columns
+            height: Rows
+
+        Returns:
+            Boolean (height, width) array, row 0 at the top
+        """
+        mask = np.zeros((height, width), dtype=bool)
+        # Pixels around every pass of every copy (features are widened to
+        # half a pixel); edges left of a window still count at its first column
+        extent = self.extent.reshape(len(self.polarity), self.runs, 4)[:, self.copy_run]
+        dx, dy = self.copy_offset[:, 0], self.copy_offset[:, 1]
+        with np.errstate(invalid='ignore'):
+            c_lo = np.maximum(np.floor((extent[..., 0] + dx - left) / pixel) - 1, 0)
+            c_hi = np.minimum(np.ceil((extent[..., 1] + dx - left) / pixel) + 1, width)
+            r_lo = np.maximum(np.floor((top - extent[..., 3] - dy) / pixel) - 1, 0)
+            r_hi = np.minimum(np.ceil((top - extent[..., 2] - dy) / pixel) + 1, height)
+            visible = (c_lo < c_hi) & (r_lo < r_hi)
+        drawn = False
+        # Passes in order, every copy of a pass before the next
+        for g, copy in zip(*(index.tolist() for index in np.nonzero(visible))):
+            clear = self.polarity[g] == CLEAR
+            if clear and not drawn:
+                continue
+            c0, c1 = int(c_lo[g, copy]), int(c_hi[g, copy])
+            r0, r1 = int(r_lo[g, copy]), int(r_hi[g, copy])
+            # The copy is its run's first copy seen through a shifted window
+            shapes = g * self.runs + self.copy_run[copy]
+            cover = _draw(_slice(self.capsules, shapes), _slice(self.edges, shapes),
+                          left - dx[copy] + c0 * pixel, top - dy[copy] - r0 * pixel, pixel, c1 - c0, r1 - r0)
+            window = mask[r0:r1, c0:c1]
+            if clear:
+                window &= ~cover
+            else:
+                window |= cover
+                drawn = True
+        return mask
+
+    def render_tile(self, pyramid: Pyramid, z: int, x: int, y: int) -> np.ndarray:
+        """Draw one tile of a pyramid."""
+        left, top = pyramid.tile_origin(z, x, y)
+        return self.render(left, top, pyramid.pixel_size(z), pyramid.tile_size, pyramid.tile_size)
+
+
+_LEVEL_ARRAY = {FEATURE_LINE: 'lines', FEATURE_ARC: 'arcs', FEATURE_FLASH: 'flashes', FEATURE_REGION: 'regions'}
+
+
+def _capsules(geometry: LayerGeometry) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+    """Stroke and pad capsules of both polarities as separate columns, their passes and runs."""
+    parts, passes, runs = [], [], []
+    for polarity in (DARK, CLEAR):
+        features = geometry.copper_features(polarity)
+        features = features[features['kind'] != FEATURE_REGION]
+        level = np.zeros(len(features), dtype=np.intp)
+        run = np.zeros(len(features), dtype=np.intp)
+        for kind, name in _LEVEL_ARRAY.items():
+            rows = features['kind'] == kind
+            level[rows] = geometry.level_of(name, features['source'][rows])
+            run[rows] = np.maximum(geometry.step_of(name, features['source'][rows]), 0)
+        parts.append(features)
+        passes.append(2 * level + (polarity == CLEAR))
+        runs.append(run)
+    features = np.concatenate(parts)
+    columns = {name: np.ascontiguousarray(features[name]) for name in ('x0', 'y0', 'x1', 'y1', 'radius')}
+    columns['min_x'] = np.minimum(columns['x0'], columns['x1'])
+    columns['max_x'] = np.maximum(columns['x0'], columns['x1'])
+    columns['min_y'] = np.minimum(columns['y0'], columns['y1'])
+    columns['max_y'] = np.maximum(columns['y0'], columns['y1'])
+    return columns, np.concatenate(passes), np.concatenate(runs)
+
+
+def _edges(geometry: LayerGeometry) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray]:
+    """Non-horizontal region edges with winding directions, their passes, regions (0, 1, ...) and runs."""
+    regions = geometry.regions
+    x0, y0, x1, y1 = (np.asarray(regions[name], dtype=np.float64) for name in ('x0', 'y0', 'x1', 'y1'))
+    # Signed area of each region (shoelace); clockwise regions are reversed
+    ids, region = np.unique(regions['region'], return_inverse=True)
+    area = np.bincount(region, weights=x0 * y1 - x1 * y0, minlength=len(ids))
+    orientation = np.where(area < 0, -1, 1)[region]
+    crossing = np.flatnonzero(y0 != y1)
+    direction = np.where(y1 > y0, -1, 1) * orientation
+    passes = 2 * geometry.level_of('regions', crossing) + (regions['polarity'][crossing] == CLEAR)
+    runs = np.maximum(geometry.step_of('regions', crossing), 0)
+    return {
+        'x0': x0[crossing], 'y0': y0[crossing], 'x1': x1[crossing], 'y1': y1[crossing],
+        'min_x': np.minimum(x0, x1)[crossing],
+        'max_x': np.maximum(x0, x1)[crossing],
+        'min_y': np.minimum(y0, y1)[crossing],
+        'max_y': np.maximum(y0, y1)[crossing],
+        'direction': direction[crossing].astype(np.int32),
+    }, passes, np.unique(region[crossing], return_inverse=True)[1].reshape(-1), runs
+
+
+def _extent(columns: Dict[str, np.ndarray], group: np.ndarray, groups: int) -> np.ndarray:
+    """(min_x, max_x, min_y, max_y) of every group of capsules or edges; NaN where empty."""
+    extent = np.full((groups, 4), np.nan)
+    reach = columns.get('radius', 0.0)
+    for axis, (name, ufunc, sign) in enumerate((('min_x', np.fmin, -1), ('max_x', np.fmax, 1),
+                                                 ('min_y', np.fmin, -1), ('max_y', np.fmax, 1))):
+        bound = np.full(groups, np.nan)
+        ufunc.at(bound, group, columns[name] + sign * reach)
+        extent[:, axis] = bound
+    return extent
+
+
+def _stacking_depth(boxes: np.ndarray, passes: np.ndarray) -> np.ndarray:
+    """Depth at which to draw each shape; even depths are dark, odd clear.
+
+    A shape must be drawn after the shapes of the other polarity in earlier
+    passes that overlap it, and nothing else: a union of dark shapes, or of
+    clear ones, does not depend on their order. Passes are taken in file
+    order, and each shape gets the lowest depth of its polarity above those
+    shapes, so shapes that do not overlap share a depth however often the
+    layer switches polarity.
+
+    Args:
+        boxes: (min_x, max_x, min_y, max_y) of every shape
+        passes: Pass of every shape; odd passes are clear
+    """
+    clear = (passes & 1).astype(bool)
+    depth = clear.astype(np.intp)
+    dark = np.flatnonzero(~clear)
+    light = np.flatnonzero(clear)
+    # Dark shapes after a clear one are the only ones to reorder
+    if not len(light) or not np.any(passes[dark] > passes[light].min()):
+        return depth
+    index = SpatialIndex(boxes[dark, 0], boxes[dark, 2], boxes[dark, 1], boxes[dark, 3], 0.0)
+    query, match = index.boxes_intersecting(boxes[light, 0], boxes[light, 2], boxes[light, 1], boxes[light, 3])
+    a, b = light[query], dark[match]
+    later = np.where(passes[a] > passes[b], a, b)
+    earlier = np.where(passes[a] > passes[b], b, a)
+    order = np.argsort(passes[later], kind='stable')
+    later, earlier = later[order], earlier[order]
+    # Pairs grouped by the later shape's pass, whose depth they settle
+    cuts = np.flatnonzero(np.diff(passes[later])) + 1
+    need = np.zeros(len(boxes), dtype=np.intp)
+    for start, end in zip(np.r_[0, cuts].tolist(), np.r_[cuts, len(later)].tolist()):
+        shapes = later[start:end]
+        np.maximum.at(need, shapes, depth[earlier[start:end]] + 1)
+        depth[shapes] = need[shapes] + ((need[shapes] & 1) != clear[shapes])
+    return depth
+
+
+def _grouped(columns: Dict[str, np.ndarray], group: np.ndarray, groups: int) -> Dict[str, np.ndarray]:
+    """Columns sorted by group, with the first row of every group under 'start'."""
+    order = np.argsort(group, kind='stable')
+    grouped = {name: column[order] for name, column in columns.items()}
+    grouped['group'] = group[order]
+    grouped['start'] = np.searchsorted(grouped['group'], np.arange(groups + 1))
+    return grouped
+
+
+def _slice(columns: Dict[str, np.ndarray], group: int) -> Dict[str, np.ndarray]:
+    """Columns of one group (views)."""
+    start, end = columns['start'][group], columns['start'][group + 1]
+    return {name: column[start:end] for name, column in columns.items() if name != 'start'}
+
+
+def _draw(capsules: Dict[str, np.ndarray], edges: Dict[str, np.ndarray], left: float, top: float,
+          pixel: float, width: int, height: int) -> np.ndarray:
+    """Pixels whose centres lie within any capsule or region (scanline).
+
+    On every pixel row, a capsule adds +1 at the first and -1 after the last
+    column of its span, and a region edge adds its direction after the
+    column where it crosses. The running sum along the row then counts the
+    capsules and regions covering each pixel; regions are counterclockwise,
+    so their winding numbers are never negative.
+    """
+    counts = np.zeros(height * (width + 1))
+    for index, weight in chain(_span_events(capsules, left, top, pixel, width, height),
+                               _edge_events(edges, left, top, pixel, width, height)):
+        counts += np.bincount(index, weights=weight, minlength=len(counts))
+    return np.cumsum(counts.reshape(height, width + 1), axis=1)[:, :width] > 0.5
+
+
+def _span_events(capsules: Dict[str, np.ndarray], left: float, top: float, pixel: float,
+                 width: int, height: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(index, weight) batches of the capsules' row spans for _draw."""
+    radius = np.maximum(capsules['radius'], pixel / 2)
+    # Pixel rows whose centre lies within each capsule's vertical extent
+    r_lo = np.maximum(np.ceil((top - capsules['max_y'] - radius) / pixel - 0.5), 0)
+    r_hi = np.minimum(np.floor((top - capsules['min_y'] + radius) / pixel - 0.5), height - 1)
+    visible = np.flatnonzero((r_lo <= r_hi)
+                             & (capsules['max_x'] + radius >= left)
+                             & (capsules['min_x'] - radius <= left + width * pixel))
+    rows = (r_hi - r_lo + 1)[visible].astype(np.int64)
+    ends = np.cumsum(rows)
+    start = 0
+    while start < len(visible):
+        # Capsules whose rows fit in one batch (always at least one)
+        stop = max(int(np.searchsorted(ends, (ends[start - 1] if start else 0) + _MAX_ROWS, 'right')), start + 1)
+        n = rows[start:stop]
+        f = np.repeat(visible[start:stop], n)
+        row = r_lo[f].astype(np.int64) + np.arange(len(f)) - np.repeat(np.cumsum(n) - n, n)
+        x_min, x_max = _capsule_spans(capsules['x0'][f], capsules['y0'][f], capsules['x1'][f],
+                                      capsules['y1'][f], radius[f], top - (row + 0.5) * pixel)
+        # Columns whose centre is within the span
+        c_lo = np.clip(np.ceil((x_min - left) / pixel - 0.5), 0, width)
+        c_hi = np.clip(np.floor((x_max - left) / pixel - 0.5) + 1, 0, width)
+        spans = c_lo < c_hi
+        row = row[spans] * (width + 1)
+        yield (np.concatenate((row + c_lo[spans].astype(np.int64), row + c_hi[spans].astype(np.int64))),
+               np.repeat((1.0, -1.0), len(row)))
+        start = stop
+
+
+def _capsule_spans(x0, y0, x1, y1, radius, y) -> Tuple[np.ndarray, np.ndarray]:
+    """x interval of each capsule on a horizontal line, empty where min > max.
+
+    A capsule is convex, so its interval runs from the leftmost to the
+    rightmost point of its end discs and of its body, the band within the
+    radius of the segment between the perpendiculars at its ends.
+    """
+    dx, dy = x1 - x0, y1 - y0
+    length = np.hypot(dx, dy)
+    s = y - y0
+    x_min = np.full(len(y), np.inf)
+    x_max = np.full(len(y), -np.inf)
+    for cx, cy in ((x0, y0), (x1, y1)):
+        half = np.sqrt(np.maximum(radius ** 2 - (y - cy) ** 2, 0))
+        inside = np.abs(y - cy) <= radius
+        x_min = np.where(inside, np.minimum(x_min, cx - half), x_min)
+        x_max = np.where(inside, np.maximum(x_max, cx + half), x_max)
+
+    # Body: |u*dy - s*dx| <= radius*length and 0 <= u*dx + s*dy <= length², u = x - x0
+    lo_a, hi_a = _linear_range(dy, s * dx - radius * length, s * dx + radius * length)
+    lo_b, hi_b = _linear_range(dx, -s * dy, length ** 2 - s * dy)
+    lo, hi = x0 + np.maximum(lo_a, lo_b), x0 + np.minimum(hi_a, hi_b)
+    body = (lo <= hi) & (length > 0)
+    x_min = np.where(body, np.minimum(x_min, lo), x_min)
+    x_max = np.where(body, np.maximum(x_max, hi), x_max)
+    return x_min, x_max
+
+
+def _linear_range(a, lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+    """Range of u with lo <= u*a <= hi."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u_lo = np.where(a > 0, lo / a, hi / a)
+        u_hi = np.where(a > 0, hi / a, lo / a)
+    unbounded = (lo <= 0) & (hi >= 0)
+    u_lo = np.where(a == 0, np.where(unbounded, -np.inf, np.inf), u_lo)
+    u_hi = np.where(a == 0, np.where(unbounded, np.inf, -np.inf), u_hi)
+    return u_lo, u_hi
+
+
+def _edge_events(edges: Dict[str, np.ndarray], left: float, top: float, pixel: float,
+                 width: int, height: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(index, weight) of the region edges' row crossings for _draw."""
+    # Pixel rows whose centre y lies in [min_y, max_y) of each edge
+    r_lo = np.maximum(np.floor((top - edges['max_y']) / pixel - 0.5) + 1, 0)
+    r_hi = np.minimum(np.floor((top - edges['min_y']) / pixel - 0.5), height - 1)
+    # Edges right of the window cross no pixel centre left of them
+    selected = np.flatnonzero((r_lo <= r_hi) & (edges['min_x'] <= left + width * pixel))
+    if not len(selected):
+        return
+
+    n = (r_hi - r_lo + 1)[selected].astype(np.int64)
+    e = np.repeat(selected, n)
+    row = r_lo[e].astype(np.int64) + np.arange(len(e)) - np.repeat(np.cumsum(n) - n, n)
+    y = top - (row + 0.5) * pixel
+    x0, y0 = edges['x0'][e], edges['y0'][e]
+    x = x0 + (y - y0) * (edges['x1'][e] - x0) / (edges['y1'][e] - y0)
+    # The crossing counts for pixels whose centre is to its right
+    col = np.clip(np.floor((x - left) / pixel - 0.5) + 1, 0, width).astype(np.int64)
+    yield row * (width + 1) + col, edges['direction'][e].astype(np.float64)
+
+
+def encode_png(mask: np.ndarray, color: Tuple[int, int, int]) -> bytes:
+    """Encode a boolean image as a 1-bit palette PNG.
+
+    Args:
+        mask: Boolean (height, width) array
+        color: RGB of set pixels; the others are transparent
+
+    Returns:
+        PNG file content
+    """
+    height, width = mask.shape
+    rows = np.packbits(mask, axis=1)
+    # Filter type 0 (none) before every row
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows]).tobytes()
+    return b''.join((
+        _PNG_SIGNATURE,
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 1, 3, 0, 0, 0)),
+        _png_chunk(b'PLTE', bytes((0, 0, 0)) + bytes(color)),
+        _png_chunk(b'tRNS', bytes((0, 255))),
+        _png_chunk(b'IDAT', zlib.compress(raw, 6)),
+        _png_chunk(b'IEND', b''),
+    ))
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def layer_color(file_type: Optional[str]) -> Tuple[int, int, int]:
+    """Preview colour of a layer by its file type."""
+    name = (file_type or '').lower()
+    if 'mask' in name or 'stop' in name:
+        return (0, 128, 64)
+    if 'silk' in name:
+        return (235, 235, 235)
+    if 'paste' in name:
+        return (150, 150, 160)
+    if 'outline' in name or 'routing' in name or 'profile' in name:
+        return (230, 200, 40)
+    if 'copper' in name or 'elec' in name or 'inner' in name or 'signal' in name:
+        return (200, 120, 50)
+    return (80, 150, 220)
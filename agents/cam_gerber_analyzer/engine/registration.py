@@ -0,0 +1,182 @@
+"""Drill-to-pad registration on copper layers.
+
+Every drill hit is matched to the flashed pad that best holds it: of the pads
+within the hit's radius, the one its centre lies deepest in, found with a
+point query on the spatial index. Pads are capsules as in the
+spatial index (polygons by their inscribed circle), so the annular ring of a
+hit is the pad radius minus the drill radius minus the distance from the
+drill centre to the pad's centre segment. The ring is negative where the
+drill breaks out of the pad.
+
+Breakout risk is the share of the registration allowance a hit uses: its
+offset from the pad centre divided by the offset at which the drill would
+touch the pad edge. 0 is a centred hit, 1 a zero ring and above 1 a
+breakout.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .drill import DrillHoles
+from .geometry import LayerGeometry
+from .spatial_index import SpatialIndex
+
+# Upper edges of the annular ring histogram bins (mm); the last bin is open
+RING_BINS_MM = (0.0, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3)
+
+# Ring percentiles reported per layer
+RING_PERCENTILES = (1, 5, 50, 95)
+
+# Worst hits reported with their coordinates per layer
+MAX_OFFENDERS = 20
+
+
+@dataclass
+class DrillRegistration:
+    """Drill hits of known diameter matched to the pads of one layer."""
+    x: np.ndarray            # hit centres (mm)
+    y: np.ndarray
+    drill: np.ndarray        # drill diameters (mm)
+    pad: np.ndarray          # row in geometry.flashes, -1 where no pad holds the hit
+    pad_radius: np.ndarray   # NaN where unmatched
+    offset: np.ndarray       # drill centre to pad centre segment (mm); NaN where unmatched
+    ring: np.ndarray         # annular ring (mm); NaN where unmatched
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def matched(self) -> np.ndarray:
+        """Whether each hit has a pad on the layer."""
+        return self.pad >= 0
+
+    @property
+    def breakout(self) -> np.ndarray:
+        """Whether each hit breaks out of its pad."""
+        return self.ring < 0
+
+    @property
+    def breakout_risk(self) -> np.ndarray:
+        """Offset over the offset that leaves a zero ring; NaN where unmatched."""
+        allowance = self.pad_radius - self.drill / 2
+        # A drill wider than its pad breaks out wherever it lands
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(allowance > 0, self.offset / allowance, np.where(self.matched, np.inf, np.nan))
+
+    def summary(self, min_ring: Optional[float] = None, max_offenders: int = MAX_OFFENDERS) -> Dict[str, Any]:
+        """Annular ring statistics and the worst hits.
+
+        Args:
+            min_ring: Minimum annular ring in mm; hits below it are offenders.
+                Without it only breakouts are offenders.
+            max_offenders: Offending hits listed with coordinates, worst first
+
+        Returns:
+            Dictionary of counts, minimum, distribution and offenders
+        """
+        matched = self.matched
+        rings = self.ring[matched]
+        limit = 0.0 if min_ring is None else min_ring
+        offending = np.flatnonzero(matched & (self.ring < limit))
+        worst = offending[np.argsort(self.ring[offending], kind='stable')][:max_offenders]
+
+        edges = np.array((-np.inf,) + RING_BINS_MM + (np.inf,))
+        counts = np.histogram(rings, bins=edges)[0] if len(rings) else np.zeros(len(edges) - 1, dtype=int)
+        labels = [f"<{RING_BINS_MM[0]}"] + [f"{low}-{high}" for low, high in zip(RING_BINS_MM, RING_BINS_MM[1:])] \
+            + [f">={RING_BINS_MM[-1]}"]
+
+        return {
+            "hits": len(self),
+            "registered_hits": int(matched.sum()),
+            "unregistered_hits": int((~matched).sum()),
+            "min_annular_ring_mm": round(float(rings.min()), 4) if len(rings) else None,
+            "ring_percentiles_mm": {
+                f"p{p}": round(float(v), 4) for p, v in zip(RING_PERCENTILES, np.percentile(rings, RING_PERCENTILES))
+            } if len(rings) else {},
+            "ring_histogram": dict(zip(labels, counts.tolist())),
+            "max_offset_mm": round(float(self.offset[matched].max()), 4) if len(rings) else None,
+            "breakouts": int(self.breakout.sum()),
+            "below_minimum": len(offending),
+            "min_annular_ring_rule_mm": min_ring,
+            "offenders": [
+                {
+                    "x": round(x, 4),
+                    "y": round(y, 4),
+                    "drill_mm": round(drill, 4),
+                    "annular_ring_mm": round(ring, 4),
+                    "offset_mm": round(offset, 4),
+                    "breakout_risk": round(r, 3) if np.isfinite(r) else None,
+                }
+                for x, y, drill, ring, offset, r in zip(
+                    self.x[worst].tolist(), self.y[worst].tolist(), self.drill[worst].tolist(),
+                    self.ring[worst].tolist(), self.offset[worst].tolist(), self.breakout_risk[worst].tolist(),
+                )
+            ],
+        }
+
+
+def _unmatched(x: np.ndarray, y: np.ndarray, drill: np.ndarray) -> DrillRegistration:
+    """Registration of hits with no pad."""
+    nan = np.full(len(x), np.nan)
+    return DrillRegistration(x=x, y=y, drill=drill, pad=np.full(len(x), -1, dtype=np.intp),
+                             pad_radius=nan, offset=nan.copy(), ring=nan.copy())
+
+
+def register_drills(geometry: LayerGeometry, *drills: DrillHoles) -> DrillRegistration:
+    """Match drill hits to the flashed pads of a copper layer.
+
+    Hits of undefined tools are left out. A hit is matched when its drill
+    touches a pad; hits with no pad within their radius are unmatched.
+
+    Args:
+        geometry: Copper layer geometry
+        drills: Drill hits of one or more drill files
+
+    Returns:
+        DrillRegistration, one entry per hit of known diameter, in file order
+    """
+    diameters = [d.diameters() for d in drills]
+    known = [~np.isnan(diameter) for diameter in diameters]
+    x = np.concatenate([np.empty(0)] + [d.holes[k, 0] for d, k in zip(drills, known)])
+    y = np.concatenate([np.empty(0)] + [d.holes[k, 1] for d, k in zip(drills, known)])
+    drill = np.concatenate([np.empty(0)] + [diameter[k] for diameter, k in zip(diameters, known)])
+
+    pads = geometry.pad_features(inscribed=True)
+    if len(pads) == 0 or len(x) == 0:
+        return _unmatched(x, y, drill)
+
+    # Pads grown by the largest drill radius hold every hit centre that may
+    # match them, so each hit is a point query on a single grid cell
+    reach = float(drill.max()) / 2
+    grown = pads['radius'] + reach
+    size = np.maximum(pads['x1'] - pads['x0'], pads['y1'] - pads['y0']) + 2 * grown
+    index = SpatialIndex(pads['x0'], pads['y0'], pads['x1'], pads['y1'], grown,
+                         cell_size=float(np.percentile(size, 75)))
+    hit, feature, distance = index.query(x, y, 0.0)
+    # Distance from the centre to the pad edge, negative inside
+    distance += reach
+    keep = distance <= drill[hit] / 2
+    hit, feature, distance = hit[keep], feature[keep], distance[keep]
+
+    # Of overlapping pads, the one the centre lies deepest in
+    order = np.lexsort((distance, hit))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = hit[order][1:] != hit[order][:-1]
+    best = order[first]
+    matched = np.zeros(len(x), dtype=bool)
+    matched[hit[best]] = True
+    nearest = np.zeros(len(x), dtype=np.intp)
+    nearest[hit[best]] = feature[best]
+    depth = np.full(len(x), np.nan)
+    depth[hit[best]] = distance[best]
+
+    pad_radius = np.where(matched, pads['radius'][nearest], np.nan)
+    return DrillRegistration(
+        x=x, y=y, drill=drill,
+        pad=np.where(matched, pads['source'][nearest], -1),
+        pad_radius=pad_radius,
+        offset=depth + pad_radius,
+        ring=-depth - drill / 2,
+    )
@@ -0,0 +1,522 @@
+"""Uniform-grid spatial index over copper features.
+
+Every feature is a capsule: the segment from (x0, y0) to (x1, y1) swept by a
+disc of the given radius. A trace is its centre line with half the stroke
+width, a round pad a zero-length segment, and a region edge a segment of
+radius 0. Distances between features are copper-to-copper clearances, and
+they are negative where the copper overlaps.
+
+The index assigns each feature's bounding box to the grid cells it covers and
+keeps the entries sorted by cell. A query covers the cells of its box, reads
+their entries with searchsorted and keeps each candidate pair once: in the
+cell holding the lower-left corner of the two boxes' intersection. All-pairs
+queries join each cell with itself instead. Building the index and answering
+all-pairs queries cost a sort, O(n log n), plus work proportional to the
+candidate pairs. Queries are processed in blocks, so memory stays bounded on
+layers with millions of segments.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Clearances at or below this (mm) count as touching copper
+TOUCH_TOLERANCE = 1e-6
+
+# Feature pairs and their clearance, as near_pairs returns them
+PAIR_DTYPE = np.dtype([
+    ('i', 'i8'),
+    ('j', 'i8'),
+    ('clearance', 'f8'),     # mm
+])
+
+# Queries processed per block
+_BLOCK = 1 << 16
+
+# Upper bound on grid cells along one axis
+_MAX_CELLS = 1 << 20
+
+# pairs_within cuts segments longer than this many cells into pieces
+_PIECE_CELLS = 4
+
+
+def point_segment_distance(px, py, x0, y0, x1, y1) -> np.ndarray:
+    """Distance from points to segments, elementwise."""
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.where(length2 > 0, ((px - x0) * dx + (py - y0) * dy) / length2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+
+def segment_closest_points(ax0, ay0, ax1, ay1, bx0, by0, bx1, by1):
+    """Closest points between segment pairs, elementwise.
+
+    Zero-length segments are handled as points.
+
+    Returns:
+        (distance, x on a, y on a, x on b, y on b)
+    """
+    d1x, d1y = ax1 - ax0, ay1 - ay0
+    d2x, d2y = bx1 - bx0, by1 - by0
+    rx, ry = ax0 - bx0, ay0 - by0
+    a = d1x * d1x + d1y * d1y
+    e = d2x * d2x + d2y * d2y
+    b = d1x * d2x + d1y * d2y
+    c = d1x * rx + d1y * ry
+    f = d2x * rx + d2y * ry
+    a_point = a <= 1e-18
+    e_point = e <= 1e-18
+    safe_a = np.where(a_point, 1.0, a)
+    safe_e = np.where(e_point, 1.0, e)
+    denom = a * e - b * b
+
+    # Closest point of the infinite lines, clamped to the first segment
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = np.where(denom > 1e-18 * np.maximum(a * e, 1e-300), (b * f - c * e) / denom, 0.0)
+    s = np.clip(s, 0.0, 1.0)
+    t = (b * s + f) / safe_e
+    # Clamp t and recompute s for the clamped end
+    s = np.where(t < 0, np.clip(-c / safe_a, 0.0, 1.0), np.where(t > 1, np.clip((b - c) / safe_a, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    # Degenerate segments
+    s = np.where(a_point, 0.0, np.where(e_point, np.clip(-c / safe_a, 0.0, 1.0), s))
+    t = np.where(e_point, 0.0, np.where(a_point, np.clip(f / safe_e, 0.0, 1.0), t))
+
+    pax, pay = ax0 + d1x * s, ay0 + d1y * s
+    pbx, pby = bx0 + d2x * t, by0 + d2y * t
+    return np.hypot(pax - pbx, pay - pby), pax, pay, pbx, pby
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Label the connected components of a graph given as edge arrays.
+
+    Returns:
+        Label per node: the smallest node index of its component
+    """
+    labels = np.arange(n)
+    i = np.asarray(i, dtype=np.intp)
+    j = np.asarray(j, dtype=np.intp)
+    while len(i):
+        li, lj = labels[i], labels[j]
+        differ = li != lj
+        if not differ.any():
+            break
+        i, j, li, lj = i[differ], j[differ], li[differ], lj[differ]
+        # Hook the larger root under the smaller, then compress paths
+        np.minimum.at(labels, np.maximum(li, lj), np.minimum(li, lj))
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+    return labels
+
+
+class SpatialIndex:
+    """Uniform grid over capsule features."""
+
+    def __init__(self, x0, y0, x1, y1, radius, cell_size: Optional[float] = None):
+        """Build the index.
+
+        Args:
+            x0, y0, x1, y1: Segment end points of every feature
+            radius: Half width of every feature
+            cell_size: Grid pitch; by default from the typical feature size
+        """
+        self.x0, self.y0, self.x1, self.y1, self.radius = (
+            np.ascontiguousarray(v, dtype=np.float64) for v in (x0, y0, x1, y1, radius)
+        )
+        self.min_x = np.minimum(self.x0, self.x1) - self.radius
+        self.min_y = np.minimum(self.y0, self.y1) - self.radius
+        self.max_x = np.maximum(self.x0, self.x1) + self.radius
+        self.max_y = np.maximum(self.y0, self.y1) + self.radius
+        n = len(self.x0)
+        if n:
+            self.origin = (float(self.min_x.min()), float(self.min_y.min()))
+            self.extent = (float(self.max_x.max()) - self.origin[0], float(self.max_y.max()) - self.origin[1])
+        else:
+            self.origin = self.extent = (0.0, 0.0)
+
+        if cell_size is None:
+            cell_size = self._default_cell_size()
+        self.cell_size = max(cell_size, max(self.extent) / _MAX_CELLS, 1e-9)
+        # Cells -1 and n - 1 along each axis collect everything outside the features
+        self._nx = int(self.extent[0] / self.cell_size) + 2
+        self._ny = int(self.extent[1] / self.cell_size) + 2
+
+        features = np.arange(n)
+        cells, owners = self._cover(self.min_x, self.min_y, self.max_x, self.max_y, features)
+        order = np.argsort(cells, kind='stable')
+        self._cells = cells[order]
+        self._features = owners[order]
+
+    def __len__(self) -> int:
+        return len(self.x0)
+
+    def _default_cell_size(self) -> float:
+        """Cell pitch close to the typical feature size, and not below the mean spacing."""
+        if len(self.x0) == 0:
+            return 1.0
+        size = np.maximum(self.max_x - self.min_x, self.max_y - self.min_y)
+        typical = float(np.percentile(size, 75))
+        spread = float(np.sqrt(max(self.extent[0] * self.extent[1], 1e-12) / len(self.x0)))
+        return max(typical, spread, 1e-6)
+
+    def _cell_range(self, min_x, min_y, max_x, max_y):
+        inv = 1.0 / self.cell_size
+        ox, oy = self.origin
+        return (
+            np.clip(np.floor((min_x - ox) * inv), -1, self._nx - 1).astype(np.int64),
+            np.clip(np.floor((min_y - oy) * inv), -1, self._ny - 1).astype(np.int64),
+            np.clip(np.floor((max_x - ox) * inv), -1, self._nx - 1).astype(np.int64),
+            np.clip(np.floor((max_y - oy) * inv), -1, self._ny - 1).astype(np.int64),
+        )
+
+    def _cell_id(self, column, row):
+        return (column + 1) * (self._ny + 1) + (row + 1)
+
+    def _cover(self, min_x, min_y, max_x, max_y, owners) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell IDs covered by each box, with the box's owner."""
+        cx0, cy0, cx1, cy1 = self._cell_range(min_x, min_y, max_x, max_y)
+        rows_per_box = cy1 - cy0 + 1
+        counts = (cx1 - cx0 + 1) * rows_per_box
+        box = np.repeat(np.arange(len(counts)), counts)
+        offset = np.arange(len(box)) - np.repeat(np.cumsum(counts) - counts, counts)
+        column = cx0[box] + offset // rows_per_box[box]
+        row = cy0[box] + offset % rows_per_box[box]
+        return self._cell_id(column, row), owners[box]
+
+    def _candidates(self, min_x, min_y, max_x, max_y) -> Tuple[np.ndarray, np.ndarray]:
+        """Each (query, feature) pair whose boxes intersect, once.
+
+        Args:
+            min_x, min_y, max_x, max_y: Query boxes
+
+        Returns:
+            (query index, feature index)
+        """
+        cells, queries = self._cover(min_x, min_y, max_x, max_y, np.arange(len(min_x)))
+        start = np.searchsorted(self._cells, cells, side='left')
+        end = np.searchsorted(self._cells, cells, side='right')
+        counts = end - start
+        entry_cell = np.repeat(cells, counts)
+        query = np.repeat(queries, counts)
+        entry = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(start, counts)
+        feature = self._features[entry]
+
+        # Boxes must intersect ...
+        ix0 = np.maximum(min_x[query], self.min_x[feature])
+        iy0 = np.maximum(min_y[query], self.min_y[feature])
+        keep = (ix0 <= np.minimum(max_x[query], self.max_x[feature])) & \
+               (iy0 <= np.minimum(max_y[query], self.max_y[feature]))
+        # ... and each pair is kept in one cell only
+        column, row, _, _ = self._cell_range(ix0, iy0, ix0, iy0)
+        keep &= self._cell_id(column, row) == entry_cell
+        return query[keep], feature[keep]
+
+    def boxes_containing(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """Features whose bounding box holds each point.
+
+        Args:
+            x, y: Query points
+
+        Returns:
+            (point index, feature index) for every match
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        points, features = [np.empty(0, np.intp)], [np.empty(0, np.intp)]
+        for first in range(0, len(x), _BLOCK):
+            bx, by = x[first:first + _BLOCK], y[first:first + _BLOCK]
+            point, feature = self._candidates(bx, by, bx, by)
+            points.append(point + first)
+            features.append(feature)
+        return np.concatenate(points), np.concatenate(features)
+
+    def boxes_intersecting(self, min_x, min_y, max_x, max_y) -> Tuple[np.ndarray, np.ndarray]:
+        """Features whose bounding box intersects each query box.
+
+        Args:
+            min_x, min_y, max_x, max_y: Query boxes
+
+        Returns:
+            (box index, feature index) for every match
+        """
+        bounds = [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (min_x, min_y, max_x, max_y)]
+        boxes, features = [np.empty(0, np.intp)], [np.empty(0, np.intp)]
+        for first in range(0, len(bounds[0]), _BLOCK):
+            box, feature = self._candidates(*(v[first:first + _BLOCK] for v in bounds))
+            boxes.append(box + first)
+            features.append(feature)
+        return np.concatenate(boxes), np.concatenate(features)
+
+    def query(self, x, y, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Features within a distance of points.
+
+        Args:
+            x, y: Query points
+            radius: Search distance from the points to the features' copper
+
+        Returns:
+            (point index, feature index, distance) for every match
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        points, features, distances = [], [], []
+        for first in range(0, len(x), _BLOCK):
+            bx, by = x[first:first + _BLOCK], y[first:first + _BLOCK]
+            point, feature = self._candidates(bx - radius, by - radius, bx + radius, by + radius)
+            distance = point_segment_distance(
+                bx[point], by[point], self.x0[feature], self.y0[feature], self.x1[feature], self.y1[feature]
+            ) - self.radius[feature]
+            keep = distance <= radius
+            points.append(point[keep] + first)
+            features.append(feature[keep])
+            distances.append(distance[keep])
+        if not points:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)
+        return np.concatenate(points), np.concatenate(features), np.concatenate(distances)
+
+    def nearest(self, x, y, max_distance: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest feature to each point.
+
+        Args:
+            x, y: Query points
+            max_distance: Largest distance searched
+
+        Returns:
+            (feature index, distance); -1 and inf where nothing is within max_distance
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        best = np.full(len(x), -1, dtype=np.intp)
+        best_distance = np.full(len(x), np.inf)
+        if len(self) == 0:
+            return best, best_distance
+
+        # Beyond this radius every feature is a candidate
+        ox, oy = self.origin
+        far = np.hypot(np.maximum(np.abs(x - ox), np.abs(x - ox - self.extent[0])),
+                       np.maximum(np.abs(y - oy), np.abs(y - oy - self.extent[1])))
+        pending = np.arange(len(x))
+        radius = self.cell_size
+        while len(pending):
+            radius = min(radius, max_distance)
+            point, feature, distance = self.query(x[pending], y[pending], radius)
+            if len(point):
+                order = np.lexsort((distance, point))
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = point[order][1:] != point[order][:-1]
+                found = pending[point[order][first]]
+                best[found] = feature[order][first]
+                best_distance[found] = distance[order][first]
+            # A match within the radius is the nearest one
+            pending = pending[(best_distance[pending] > radius) & (radius < np.minimum(far[pending], max_distance))]
+            radius *= 2
+        return best, best_distance
+
+    def _pieces(self) -> Tuple[np.ndarray, ...]:
+        """Features with long segments cut into pieces of about _PIECE_CELLS cells.
+
+        Returns:
+            (x0, y0, x1, y1, radius, owner) per piece; the pieces of uncut
+            features come first, in feature order, with their own index
+        """
+        length = np.hypot(self.x1 - self.x0, self.y1 - self.y0)
+        count = np.maximum(np.ceil(length / (_PIECE_CELLS * self.cell_size)), 1).astype(np.int64)
+        cut = np.flatnonzero(count > 1)
+        owner = np.concatenate([np.arange(len(self)), np.repeat(cut, count[cut] - 1)])
+        # Piece k of n runs from k / n to (k + 1) / n along its segment; an
+        # uncut feature's slot holds the cut one's first piece
+        k = np.concatenate([np.zeros(len(self)), np.arange(int((count[cut] - 1).sum()))
+                            - np.repeat(np.cumsum(count[cut] - 1) - (count[cut] - 1), count[cut] - 1) + 1])
+        n = count[owner]
+        t0, t1 = k / n, (k + 1) / n
+        dx, dy = self.x1[owner] - self.x0[owner], self.y1[owner] - self.y0[owner]
+        return (self.x0[owner] + t0 * dx, self.y0[owner] + t0 * dy, self.x0[owner] + t1 * dx,
+                self.y0[owner] + t1 * dy, self.radius[owner], owner)
+
+    def pairs_within(self, distance: float) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """All feature pairs whose clearance is at most a distance.
+
+        The boxes, grown by half the distance, are assigned to the cells
+        they cover, and each cell is joined with itself: every two of its
+        entries are a candidate pair, kept in the cell holding the lower-left
+        corner of their grown boxes' intersection. Unlike point queries
+        this reads no other cells, so it needs no searchsorted.
+
+        Segments much longer than a cell are joined as pieces, since the
+        box of a long diagonal covers cells its copper is far from, and
+        crowds them.
+
+        Args:
+            distance: Largest clearance reported
+
+        Yields:
+            Blocks of (i, j, clearance) with i < j, each pair once
+        """
+        half = distance / 2
+        x0, y0, x1, y1, radius, piece_owner = self._pieces()
+        cut = np.zeros(len(self), dtype=bool)
+        cut[piece_owner[len(self):]] = True
+        min_x, min_y = np.minimum(x0, x1) - radius - half, np.minimum(y0, y1) - radius - half
+        max_x, max_y = np.maximum(x0, x1) + radius + half, np.maximum(y0, y1) + radius + half
+        cells, owners = self._cover(min_x, min_y, max_x, max_y, np.arange(len(x0)))
+        # Stable, so the owners within a cell stay in increasing order
+        order = np.argsort(cells, kind='stable')
+        cells, owners = cells[order], owners[order]
+        # Boxes in entry order, so blocks read them sequentially
+        box_x0, box_y0 = min_x[owners], min_y[owners]
+        box_x1, box_y1 = max_x[owners], max_y[owners]
+        owners = piece_owner[owners]
+
+        # Entry p pairs with the entries after it in its cell
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+        lengths = np.diff(np.r_[starts, len(cells)])
+        counts = np.repeat(starts + lengths, lengths) - np.arange(len(cells)) - 1
+        ends = np.cumsum(counts)
+        # Pairs with a cut feature may be found by several of its pieces
+        repeated_i, repeated_j = [np.empty(0, np.intp)], [np.empty(0, np.intp)]
+        first = 0
+        while first < len(counts):
+            stop = max(int(np.searchsorted(ends, (ends[first - 1] if first else 0) + _BLOCK * 16, 'right')), first + 1)
+            n = counts[first:stop]
+            p = np.repeat(np.arange(first, stop), n)
+            q = p + 1 + np.arange(len(p)) - np.repeat(np.cumsum(n) - n, n)
+            ix0 = np.maximum(box_x0[p], box_x0[q])
+            iy0 = np.maximum(box_y0[p], box_y0[q])
+            keep = (ix0 <= np.minimum(box_x1[p], box_x1[q])) & (iy0 <= np.minimum(box_y1[p], box_y1[q]))
+            p, q, ix0, iy0 = p[keep], q[keep], ix0[keep], iy0[keep]
+            column, row, _, _ = self._cell_range(ix0, iy0, ix0, iy0)
+            keep = self._cell_id(column, row) == cells[p]
+            i, j = owners[p[keep]], owners[q[keep]]
+            i, j = np.minimum(i, j), np.maximum(i, j)
+            repeated = cut[i] | cut[j]
+            repeated_i.append(i[repeated])
+            repeated_j.append(j[repeated])
+            i, j = i[~repeated], j[~repeated]
+            clearance = self.clearance(i, j)
+            keep = clearance <= distance
+            yield i[keep], j[keep], clearance[keep]
+            first = stop
+
+        pairs = np.sort(np.concatenate(repeated_i) * len(self) + np.concatenate(repeated_j))
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+        i, j = pairs // len(self), pairs % len(self)
+        i, j = i[i != j], j[i != j]
+        clearance = self.clearance(i, j)
+        keep = clearance <= distance
+        yield i[keep], j[keep], clearance[keep]
+
+    def clearance(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Copper clearance between feature pairs."""
+        distance = segment_closest_points(
+            self.x0[i], self.y0[i], self.x1[i], self.y1[i],
+            self.x0[j], self.y0[j], self.x1[j], self.y1[j],
+        )[0]
+        return distance - self.radius[i] - self.radius[j]
+
+    def closest_points(self, i: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Midpoint of the gap between feature pairs."""
+        distance, ax, ay, bx, by = segment_closest_points(
+            self.x0[i], self.y0[i], self.x1[i], self.y1[i],
+            self.x0[j], self.y0[j], self.x1[j], self.y1[j],
+        )
+        # Position along the centre-line connection where the gap's middle lies
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (self.radius[i] + (distance - self.radius[i] - self.radius[j]) / 2) / distance
+        t = np.where(distance > 0, t, 0.5)
+        return ax + t * (bx - ax), ay + t * (by - ay)
+
+
+@dataclass
+class Clearances:
+    """Gaps between copper of different nets, sorted by clearance."""
+    i: np.ndarray            # feature indices
+    j: np.ndarray
+    clearance: np.ndarray    # mm
+    x: np.ndarray            # gap midpoints
+    y: np.ndarray
+    nets: np.ndarray         # net label per feature
+
+    @property
+    def minimum(self) -> Optional[float]:
+        """Smallest clearance, or None if no gap was within the search distance."""
+        return float(self.clearance[0]) if len(self.clearance) else None
+
+    def closest_per_net_pair(self) -> np.ndarray:
+        """Indices of the closest gap between each pair of nets, smallest first."""
+        net_i, net_j = self.nets[self.i], self.nets[self.j]
+        pairs = np.stack([np.minimum(net_i, net_j), np.maximum(net_i, net_j)], axis=1)
+        # Rows are sorted by clearance, so the first of each pair is its closest gap
+        _, first = np.unique(pairs, axis=0, return_index=True)
+        return np.sort(first)
+
+
+def group_links(groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Edges chaining the features of each group, for connected_components.
+
+    Args:
+        groups: Group per feature, -1 for none
+
+    Returns:
+        (i, j) feature indices
+    """
+    grouped = np.flatnonzero(groups >= 0)
+    order = grouped[np.argsort(groups[grouped], kind='stable')]
+    same = groups[order][1:] == groups[order][:-1]
+    return order[:-1][same], order[1:][same]
+
+
+def near_pairs(index: SpatialIndex, max_distance: float) -> np.ndarray:
+    """All feature pairs of an index within a clearance, as one PAIR_DTYPE array."""
+    blocks = list(index.pairs_within(max_distance))
+    pairs = np.zeros(sum(len(b[0]) for b in blocks), dtype=PAIR_DTYPE)
+    if blocks:
+        pairs['i'] = np.concatenate([b[0] for b in blocks])
+        pairs['j'] = np.concatenate([b[1] for b in blocks])
+        pairs['clearance'] = np.concatenate([b[2] for b in blocks])
+    return pairs
+
+
+def find_clearances(index: SpatialIndex, max_distance: float, groups: Optional[np.ndarray] = None,
+                    nets: Optional[np.ndarray] = None, pairs: Optional[np.ndarray] = None) -> Clearances:
+    """Find the clearances between copper of different nets.
+
+    Without nets, they are traced on the layer itself: touching or
+    overlapping features are connected, as are features sharing a group
+    (e.g. the edges of one region).
+
+    Args:
+        index: Spatial index of the layer's copper features
+        max_distance: Largest clearance reported (mm)
+        groups: Optional group per feature, -1 for none
+        nets: Optional net per feature, e.g. traced over the whole board (see connectivity.py)
+        pairs: near_pairs(index, max_distance) if already known
+
+    Returns:
+        Clearances of different-net pairs within max_distance
+    """
+    if pairs is None:
+        pairs = near_pairs(index, max_distance)
+    i, j, clearance = pairs['i'].astype(np.intp), pairs['j'].astype(np.intp), pairs['clearance']
+
+    if nets is None:
+        touching = clearance <= TOUCH_TOLERANCE
+        edge_i, edge_j = [i[touching]], [j[touching]]
+        if groups is not None:
+            group_i, group_j = group_links(groups)
+            edge_i.append(group_i)
+            edge_j.append(group_j)
+        nets = connected_components(len(index), np.concatenate(edge_i), np.concatenate(edge_j))
+
+    gap = nets[i] != nets[j]
+    i, j, clearance = i[gap], j[gap], clearance[gap]
+    order = np.argsort(clearance, kind='stable')
+    i, j, clearance = i[order], j[order], clearance[order]
+    x, y = index.closest_points(i, j)
+    return Clearances(i=i, j=j, clearance=clearance, x=x, y=y, nets=nets)
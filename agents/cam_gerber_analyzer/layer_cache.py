@@ -0,0 +1,431 @@
+"""Content-addressed cache of parsed design files.
+
+A single analysis runs the summary, CAM checks, design-rule extraction and
+report generators, and each of them parses the same layers. Every parser goes
+through this cache instead, keyed by the SHA-256 of the file content, the kind
+of parse and PARSER_VERSION:
+
+- memory: a bounded LRU of results, shared by all tools in the process
+- disk: one directory per result. NumPy array values are saved as .npy files
+  and memory-mapped read-only when loaded, so large geometry is never copied;
+  everything else is stored in result.json. The first save of a process
+  removes entries of other versions, and once the tier grows past
+  max_disk_mb the entries least recently saved or loaded are removed until
+  it is below PRUNE_TO of that.
+
+Results computed from parsed files, such as design-rule checks, go through
+the same cache with cached_derived, keyed by the digests of their input
+files and their parameters. A revision of a board that changes one layer
+then recomputes only what depends on that layer.
+
+Bump PARSER_VERSION whenever a parser's output changes, and DERIVED_VERSION
+whenever a derived result's does.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .engine.executor import get_executor
+
+PARSER_VERSION = 8
+DERIVED_VERSION = 2
+
+DEFAULT_CACHE_SIZE = 64
+
+# Share of max_disk_mb the disk tier is pruned down to
+PRUNE_TO = 0.9
+
+_RESULT_FILE = 'result.json'
+_TEMP_PREFIX = '.tmp-'
+# Age after which an unfinished entry is abandoned
+_TEMP_GRACE_SECONDS = 3600
+_HASH_BLOCK = 1 << 20
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 of a file's content, as hex."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _identity(file_path: str) -> Tuple[str, int, int]:
+    """Path, size and modification time of a file; a digest is valid while they hold."""
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+class LayerCache:
+    """Two-tier cache of parse results keyed by file content.
+
+    Results are dictionaries whose values are JSON-compatible or NumPy arrays.
+    Only successful parses are cached.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = DEFAULT_CACHE_SIZE,
+                 max_disk_mb: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory of the disk tier, or None for memory only
+            max_entries: Maximum number of results kept in memory
+            max_disk_mb: Size of the disk tier above which it is pruned, or None for no limit
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024) if max_disk_mb else None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Digests of files already hashed, by (path, size, mtime)
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        # Bytes on disk as of the last prune plus what was saved since; None before the first
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def key(self, file_path: str, kind: str) -> str:
+        """Cache key of a file's parse of the given kind."""
+        identity = _identity(file_path)
+        with self._lock:
+            digest = self._digests.get(identity)
+        if digest is None:
+            digest = file_digest(file_path)
+            self._remember(identity, digest)
+        return f"{digest}-{kind}-v{PARSER_VERSION}"
+
+    def remember_digest(self, file_path: str, digest: str):
+        """Record the SHA-256 of a file just written, so key() need not read it again."""
+        self._remember(_identity(file_path), digest)
+
+    def _remember(self, identity: Tuple[str, int, int], digest: str):
+        with self._lock:
+            if len(self._digests) >= 4 * self.max_entries + 64:
+                self._digests.clear()
+            self._digests[identity] = digest
+
+    def get_or_parse(self, file_path: str, kind: str, parser: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Get the cached result of parsing a file, parsing it on a miss.
+
+        Args:
+            file_path: Path to the file
+            kind: Name of the parse; different parsers of one file use different kinds
+            parser: Function parsing file_path into a result dictionary
+
+        Returns:
+            Result dictionary; callers may modify it (array values are read-only)
+        """
+        key = self.key(file_path, kind)
+        result = self.lookup(key)
+        if result is None:
+            result = self.store(key, parser(file_path))
+        return result
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the result stored under a key, or None on a miss."""
+        result = self._get_memory(key)
+        if result is None:
+            result = self._load(key)
+            if result is None:
+                return None
+            self._put_memory(key, result)
+        return _copy(result)
+
+    def store(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a parse result under a key if it succeeded.
+
+        Returns:
+            The result as a later lookup will return it
+        """
+        if not result.get("success"):
+            return result
+        encoded, arrays = _encode(result)
+        # Hits from either tier see the same (JSON) types
+        result = _decode(encoded, arrays)
+        self._put_memory(key, result)
+        self._save(key, encoded, arrays)
+        return _copy(result)
+
+    def prune(self, max_bytes: Optional[int] = None) -> Dict[str, int]:
+        """Remove disk entries of other versions, then the least recently used ones over max_bytes.
+
+        Entries are used when saved or loaded from disk; their directory's
+        modification time records it.
+
+        Args:
+            max_bytes: Size to prune the disk tier down to; by default max_disk_mb, None for no limit
+
+        Returns:
+            Dictionary with removed_entries, freed_bytes and kept_bytes
+        """
+        if self.directory is None or not os.path.isdir(self.directory):
+            return {"removed_entries": 0, "freed_bytes": 0, "kept_bytes": 0}
+        if max_bytes is None:
+            max_bytes = self.max_disk_bytes
+        entries, abandoned = [], []
+        cutoff = time.time() - _TEMP_GRACE_SECONDS
+        for shard in os.listdir(self.directory):
+            shard_path = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                path = os.path.join(shard_path, name)
+                if not name.startswith(_TEMP_PREFIX):
+                    entries.append(path)
+                elif _modified(path) < cutoff:
+                    abandoned.append(path)
+        for path in abandoned:
+            shutil.rmtree(path, ignore_errors=True)
+        result = prune_directories(entries, max_bytes, lambda path: is_current_key(os.path.basename(path)))
+        with self._lock:
+            self._disk_bytes = result["kept_bytes"]
+        return result
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def _put_memory(self, key: str, result: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, _RESULT_FILE), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(path, f'{n}.npy'), mmap_mode='r', allow_pickle=False)
+                for n, name in enumerate(entry["arrays"])
+            }
+            result = entry["values"]
+            result.update(arrays)
+            # Recently used: the last to be pruned
+            os.utime(path)
+            return result
+        except (OSError, ValueError, KeyError):
+            # Missing or unreadable entry: parse again
+            return None
+
+    def _save(self, key: str, values: str, arrays: Dict[str, np.ndarray]):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write under a temporary name so readers never see a partial entry
+            temp_path = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=_TEMP_PREFIX)
+            for n, array in enumerate(arrays.values()):
+                np.save(os.path.join(temp_path, f'{n}.npy'), array, allow_pickle=False)
+            with open(os.path.join(temp_path, _RESULT_FILE), 'w', encoding='utf-8') as f:
+                f.write(f'{{"arrays": {json.dumps(list(arrays))}, "values": {values}}}')
+            os.rename(temp_path, path)
+            size = _tree_size(path)
+        except OSError:
+            # The disk tier is best effort; another process may have saved it first
+            if temp_path is not None:
+                shutil.rmtree(temp_path, ignore_errors=True)
+            return
+        with self._lock:
+            first = self._disk_bytes is None
+            if not first:
+                self._disk_bytes += size
+            over = self.max_disk_bytes is not None and not first and self._disk_bytes > self.max_disk_bytes
+        if first or over:
+            self.prune(int(self.max_disk_bytes * PRUNE_TO) if self.max_disk_bytes is not None else None)
+
+
+def is_current_key(key: str) -> bool:
+    """Whether a cache key was made by this PARSER_VERSION (and DERIVED_VERSION)."""
+    return key.endswith(f"-v{PARSER_VERSION}") or key.endswith(f"-derived-v{PARSER_VERSION}.{DERIVED_VERSION}")
+
+
+def prune_directories(paths: Iterable[str], max_bytes: Optional[int],
+                      current: Callable[[str], bool]) -> Dict[str, int]:
+    """Remove directories that are not current, then the least recently modified ones over max_bytes.
+
+    Args:
+        paths: Entry directories
+        max_bytes: Total size to prune down to, or None for no limit
+        current: Whether an entry directory is still valid
+
+    Returns:
+        Dictionary with removed_entries, freed_bytes and kept_bytes
+    """
+    removed = freed = 0
+    kept: List[Tuple[float, int, str]] = []
+    for path in paths:
+        try:
+            size, modified = _tree_size(path), _modified(path)
+        except OSError:
+            continue
+        if current(path):
+            kept.append((modified, size, path))
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+        freed += size
+    total = sum(size for _, size, _ in kept)
+    if max_bytes is not None and total > max_bytes:
+        for _, size, path in sorted(kept):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+            freed += size
+            total -= size
+            if total <= max_bytes:
+                break
+    return {"removed_entries": removed, "freed_bytes": freed, "kept_bytes": total}
+
+
+def _tree_size(path: str) -> int:
+    """Bytes of the files under a directory."""
+    return sum(entry.stat().st_size if entry.is_file() else _tree_size(entry.path) for entry in os.scandir(path))
+
+
+def _modified(path: str) -> float:
+    """Modification time of a file or directory."""
+    return os.stat(path).st_mtime
+
+
+def _encode(result: Dict[str, Any]) -> Tuple[str, Dict[str, np.ndarray]]:
+    """Split a result into its JSON-encoded values and its arrays."""
+    arrays = {name: value for name, value in result.items() if isinstance(value, np.ndarray)}
+    plain = {name: value for name, value in result.items() if name not in arrays}
+    return json.dumps(plain), arrays
+
+
+def _decode(values: str, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Inverse of _encode."""
+    result = json.loads(values)
+    result.update(arrays)
+    return result
+
+
+def _copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached result; arrays are shared but read-only."""
+    copied = {}
+    for name, value in result.items():
+        if isinstance(value, np.ndarray):
+            value = value.view()
+            value.flags.writeable = False
+            copied[name] = value
+        else:
+            copied[name] = copy.deepcopy(value)
+    return copied
+
+
+_caches: Dict[Optional[str], LayerCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_layer_cache() -> LayerCache:
+    """Get the process-wide layer cache for the directory in AGENT_CONFIG."""
+    from .config import AGENT_CONFIG
+
+    settings = AGENT_CONFIG.get("layer_cache", {})
+    directory = settings.get("path")
+    key = os.path.abspath(directory) if directory else None
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = LayerCache(key, settings.get("max_entries", DEFAULT_CACHE_SIZE), settings.get("max_disk_mb"))
+            _caches[key] = cache
+        return cache
+
+
+def cached_parse(file_path: str, kind: str, parser: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse a file through the process-wide layer cache.
+
+    Args:
+        file_path: Path to the file
+        kind: Name of the parse
+        parser: Function parsing file_path into a result dictionary
+
+    Returns:
+        Result dictionary
+    """
+    return cached_parse_many([(file_path, kind, parser)])[0]
+
+
+def cached_parse_many(requests: List[Tuple[str, str, Callable[[str], Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """Parse several files through the layer cache, misses in parallel.
+
+    Cache misses are parsed on the CAM executor's worker processes, so parsers
+    must be module-level functions.
+
+    Args:
+        requests: (file_path, kind, parser) per file
+
+    Returns:
+        Result dictionaries in request order
+    """
+    cache = get_layer_cache()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    keys: List[Optional[str]] = [None] * len(requests)
+    for index, (file_path, kind, _) in enumerate(requests):
+        # Missing files go straight to the parser, which reports them
+        if os.path.isfile(file_path):
+            keys[index] = cache.key(file_path, kind)
+            results[index] = cache.lookup(keys[index])
+
+    misses = [index for index, result in enumerate(results) if result is None]
+    parsed = get_executor().map(_run_parser, [(requests[index][2], requests[index][0]) for index in misses])
+    for index, result in zip(misses, parsed):
+        results[index] = cache.store(keys[index], result) if keys[index] else result
+    return results
+
+
+def cached_derived(kind: str, inputs: Sequence[Any],
+                   compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Get a result computed from parsed files through the layer cache.
+
+    Args:
+        kind: Name of the computation
+        inputs: JSON-compatible values the result depends on, e.g. file digests and rule limits
+        compute: Function computing the result dictionary on a miss
+
+    Returns:
+        (result, whether it came from the cache)
+    """
+    cache = get_layer_cache()
+    digest = hashlib.sha256(json.dumps([kind, list(inputs)]).encode('utf-8')).hexdigest()
+    key = f"{digest}-derived-v{PARSER_VERSION}.{DERIVED_VERSION}"
+    result = cache.lookup(key)
+    if result is not None:
+        return result, True
+    return cache.store(key, compute()), False
+
+
+def _run_parser(task: Tuple[Callable[[str], Dict[str, Any]], str]) -> Dict[str, Any]:
+    """Executor task parsing one file."""
+    parser, file_path = task
+    return parser(file_path)
@@ -16,6 +16,8 @@ class Analysis:
     status: str = "pending"  # pending, processing, completed, failed
     report_path: Optional[str] = None
     metadata_json: Optional[str] = None
+    parent_id: Optional[int] = None  # analysis this one is a revision of
+    revision: int = 1
     
     def to_dict(self, include_personal: bool = True) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -27,7 +29,9 @@ class Analysis:
             "created_at": self.created_at,
             "status": self.status,
             "report_path": self.report_path,
-            "metadata": self.metadata_json
+            "metadata": self.metadata_json,
+            "parent_id": self.parent_id,
+            "revision": self.revision
         }
     
     @classmethod
@@ -41,7 +45,9 @@ class Analysis:
             created_at=data.get("created_at"),
             status=data.get("status", "pending"),
             report_path=data.get("report_path"),
-            metadata_json=data.get("metadata_json")
+            metadata_json=data.get("metadata_json"),
+            parent_id=data.get("parent_id"),
+            revision=data.get("revision") or 1
         )
 
 
@@ -56,6 +62,7 @@ class DesignFile:
     layer_number: Optional[int] = None
     file_path: str = ""
     file_size: int = 0
+    sha256: Optional[str] = None  # content digest; set for files in the upload store
     uploaded_at: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -69,6 +76,7 @@ class DesignFile:
             "layer_number": self.layer_number,
             "file_path": self.file_path,
             "file_size": self.file_size,
+            "sha256": self.sha256,
             "uploaded_at": self.uploaded_at
         }
     
@@ -84,6 +92,7 @@ class DesignFile:
             layer_number=data.get("layer_number"),
             file_path=data.get("file_path", ""),
             file_size=data.get("file_size", 0),
+            sha256=data.get("sha256"),
             uploaded_at=data.get("uploaded_at")
         )
 
@@ -118,6 +127,7 @@ class AnalysisResult:
     min_spacing: Optional[float] = None
     min_drill_size: Optional[float] = None
     copper_area_percentage: Optional[float] = None
+    copper_balance: Optional[str] = None  # JSON string
     # Analysis results
     issues_critical: int = 0
     issues_warning: int = 0
@@ -149,6 +159,7 @@ class AnalysisResult:
             "min_spacing": self.min_spacing,
             "min_drill_size": self.min_drill_size,
             "copper_area_percentage": self.copper_area_percentage,
+            "copper_balance": self.copper_balance,
             "issues_critical": self.issues_critical,
             "issues_warning": self.issues_warning,
             "issues_info": self.issues_info,
@@ -181,6 +192,7 @@ class AnalysisResult:
             min_spacing=data.get("min_spacing"),
             min_drill_size=data.get("min_drill_size"),
             copper_area_percentage=data.get("copper_area_percentage"),
+            copper_balance=data.get("copper_balance"),
             issues_critical=data.get("issues_critical", 0),
             issues_warning=data.get("issues_warning", 0),
             issues_info=data.get("issues_info", 0),
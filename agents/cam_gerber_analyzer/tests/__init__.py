@@ -0,0 +1 @@
+"""Tests for CAM Gerber Analyzer Agent."""
@@ -0,0 +1,88 @@
+"""Correctness tests for streaming ZIP extraction and its limits."""
+
+import unittest
+import os
+import sys
+import io
+import hashlib
+import tempfile
+import shutil
+import zipfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.archive import DEFAULT_LIMITS, ArchiveLimitError, extract_members
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.layer_cache import get_layer_cache
+
+COPPER = b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.100000*%\nD10*\nX0Y0D02*\nX1000000Y0D01*\nM02*\n"
+DRILL = b"M48\nMETRIC\nT1C0.300\n%\nT1\nX1.0Y1.0\nM30\n"
+
+
+def make_zip(members) -> zipfile.ZipFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for name, content in members:
+            zip_ref.writestr(name, content)
+    return zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
+
+
+class TestExtractMembers(unittest.TestCase):
+    """Test members are streamed to disk, hashed and bounded."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 8}
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_extract_and_hash(self):
+        """Test contents, digests, base names and that the layer cache knows the digests."""
+        zip_ref = make_zip([('gerbers/copper_top.gbr', COPPER), ('../../drill.exc', DRILL), ('docs/', b'')])
+        members = extract_members(zip_ref, zip_ref.infolist(), self.temp_dir)
+
+        self.assertEqual([m.name for m in members], ['gerbers/copper_top.gbr', '../../drill.exc'])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['copper_top.gbr', 'drill.exc'])
+        for member, content in zip(members, (COPPER, DRILL)):
+            with open(member.path, 'rb') as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(member.size, len(content))
+            self.assertEqual(member.sha256, hashlib.sha256(content).hexdigest())
+            self.assertTrue(get_layer_cache().key(member.path, "geometry").startswith(member.sha256))
+
+    def test_total_size_limit(self):
+        zip_ref = make_zip([('a.gbr', b'0' * 600000), ('b.gbr', b'1' * 600000)])
+        limits = dict(DEFAULT_LIMITS, max_total_mb=1)
+        with self.assertRaises(ArchiveLimitError):
+            extract_members(zip_ref, zip_ref.infolist(), self.temp_dir, limits)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_ratio_limit(self):
+        zip_ref = make_zip([('bomb.gbr', b'\0' * (20 * 1024 * 1024))])
+        with self.assertRaises(ArchiveLimitError):
+            extract_members(zip_ref, zip_ref.infolist(), self.temp_dir)
+
+    def test_member_count_limit(self):
+        zip_ref = make_zip([(f'{n}.gbr', COPPER) for n in range(5)])
+        with self.assertRaises(ArchiveLimitError):
+            extract_members(zip_ref, zip_ref.infolist(), self.temp_dir, dict(DEFAULT_LIMITS, max_members=4))
+
+    def test_declared_size_is_enforced(self):
+        """Test a member inflating past the size its header declares is stopped and removed."""
+        zip_ref = make_zip([('copper_top.gbr', COPPER * 100)])
+        info = zip_ref.infolist()[0]
+        info.file_size = len(COPPER)
+        with self.assertRaises(zipfile.BadZipFile):
+            extract_members(zip_ref, [info], self.temp_dir)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
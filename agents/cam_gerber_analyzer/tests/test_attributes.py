@@ -0,0 +1,166 @@
+"""Tests for reading Gerber X2 attributes and classifying layers by them."""
+
+import unittest
+import os
+import sys
+import base64
+import tempfile
+import shutil
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.attributes import FileAttributes, classify_layer, read_attributes
+from agents.cam_gerber_analyzer.tools.detect_file_format import detect_file_format
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+INNER = b"""G04 Inner signal layer*
+%TF.GenerationSoftware,Example,CAD,1.0*%
+%TF.SameCoordinates,Board-1*%
+%TF.FileFunction,Copper,L3,Inr,Signal*%
+%TF.FilePolarity,Positive*%
+%FSLAX46Y46*%
+%MOMM*%
+%TA.AperFunction,Conductor*%
+%ADD10C,0.150000*%
+%TA.AperFunction,ViaPad*%
+%ADD11C,0.600000*%
+%TD*%
+%TO.N,GND*%
+D10*
+X0Y0D02*
+X1000000Y0D01*
+%TO.N,VCC*%
+X0Y1000000D02*
+X1000000Y1000000D01*
+%TD*%
+M02*
+"""
+
+# X1 file from an exporter keeping the attributes in comments
+MASK = b"G04 #@! TF.SameCoordinates,Board-1*\nG04 #@! TF.FileFunction,Soldermask,Bot*\n" \
+       b"G04 #@! TF.FilePolarity,Negative*\n%FSLAX46Y46*%\n%MOMM*%\nM02*\n"
+
+DRILL = b"M48\n; #@! TF.FileFunction,NonPlated,1,4,NPTH\nMETRIC\nT1C3.000\n%\nT1\nX1.0Y1.0\nM30\n"
+
+PLAIN = b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.100000*%\nD10*\nX0Y0D02*\nX1000000Y0D01*\nM02*\n"
+
+
+class TestAttributes(unittest.TestCase):
+    """Test the header reader and the layer classification."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        file_path = os.path.join(self.temp_dir, name)
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        return file_path
+
+    def test_read_attributes(self):
+        """Test file, aperture and object attributes are indexed."""
+        attributes = read_attributes(self.write('inner.gbr', INNER))
+        self.assertEqual(attributes.file_function, ["Copper", "L3", "Inr", "Signal"])
+        self.assertEqual(attributes.polarity, "Positive")
+        self.assertEqual(attributes.same_coordinates, "Board-1")
+        self.assertEqual(attributes.aperture[".AperFunction"], ["Conductor", "ViaPad"])
+        self.assertEqual(attributes.object[".N"], ["GND", "VCC"])
+        self.assertEqual(attributes.format, "gerber")
+        self.assertEqual(classify_layer(attributes), "inner_layer_3")
+
+        mask = read_attributes(self.write('copper.gbr', MASK))
+        self.assertEqual((classify_layer(mask), mask.polarity), ("solder_mask_bottom", "Negative"))
+        drill = read_attributes(self.write('board.txt', DRILL))
+        self.assertEqual((classify_layer(drill), drill.format), ("drill", "drill"))
+
+        plain = read_attributes(self.write('plain.gbr', PLAIN))
+        self.assertFalse(plain.x2)
+        self.assertIsNone(classify_layer(plain))
+        self.assertFalse(read_attributes(self.write('empty.gbr', b'')).x2)
+
+        # The head only: attributes past max_bytes are not read
+        self.assertEqual(read_attributes(self.write('late.gbr', PLAIN + INNER), max_bytes=len(PLAIN)).file, {})
+
+    def test_classify_layer(self):
+        """Test file functions map onto the agent's layer types."""
+        cases = {
+            ("Copper", "L1", "Top"): "copper_top",
+            ("Copper", "L6", "Bot", "Mixed"): "copper_bottom",
+            ("Soldermask", "Top"): "solder_mask_top",
+            ("Legend", "Bot"): "silk_bottom",
+            ("Paste", "Top"): "paste_top",
+            ("Plated", "1", "6", "PTH", "Drill"): "drill",
+            ("Profile", "NP"): "outline",
+            ("AssemblyDrawing", "Top"): None,
+        }
+        for function, file_type in cases.items():
+            self.assertEqual(classify_layer(FileAttributes(file={".FileFunction": list(function)})), file_type)
+        # Without a file function, by the aperture functions
+        self.assertEqual(classify_layer(FileAttributes(aperture={".AperFunction": ["ViaDrill", "Slot"]})), "drill")
+        self.assertIsNone(classify_layer(FileAttributes(aperture={".AperFunction": ["ViaDrill", "SMDPad"]})))
+
+    def test_detect_file_format(self):
+        """Test detect_file_format reports the layer of an X2 file."""
+        result = detect_file_format(self.write('layer3.bin', INNER))
+        self.assertTrue(result["success"])
+        self.assertEqual((result["format_type"], result["file_type"]), ("gerber", "inner_layer_3"))
+        self.assertEqual(result["attributes"]["nets"], 2)
+
+
+class TestAttributeUpload(unittest.TestCase):
+    """Test uploads classify layers by attributes before filenames."""
+
+    def setUp(self):
+        """Point the agent at a temporary database and store."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["upload_store"] = self.original_store
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_upload_classification(self):
+        """Test misleading names and given types yield to the attributes."""
+        files = [
+            {"filename": "top_copper.gbr", "content": base64.b64encode(MASK).decode(), "file_type": "copper_top"},
+            {"filename": "board-NPTH.txt", "content": base64.b64encode(DRILL).decode(), "file_type": "other"},
+            {"filename": "l3.gbr", "content": base64.b64encode(INNER.replace(b"Board-1", b"Board-2")).decode()},
+            {"filename": "plain.gbr", "content": base64.b64encode(PLAIN).decode(), "file_type": "copper_top"},
+            {"filename": "bottom_copper.gbr", "content": base64.b64encode(PLAIN).decode()},
+        ]
+        result = upload_design_files(files)
+        self.assertTrue(result["success"], result.get("error"))
+        uploaded = {f["filename"]: f for f in result["uploaded_files"]}
+        self.assertEqual(uploaded["top_copper.gbr"]["classified_by"], "attributes")
+        self.assertEqual(uploaded["plain.gbr"]["classified_by"], "given")
+        self.assertEqual(uploaded["bottom_copper.gbr"]["classified_by"], "filename")
+        self.assertEqual(uploaded["l3.gbr"]["attributes"]["same_coordinates"], "Board-2")
+        self.assertEqual(len(result["warnings"]), 1)
+
+        stored = {df.filename: (df.file_type, df.file_format)
+                  for df in CamGerberDatabase().get_design_files(result["analysis_id"])}
+        self.assertEqual(stored, {
+            "top_copper.gbr": ("solder_mask_bottom", "gerber"),
+            "board-NPTH.txt": ("drill", "drill"),
+            "l3.gbr": ("inner_layer_3", "gerber"),
+            "plain.gbr": ("copper_top", "gerber"),
+            "bottom_copper.gbr": ("copper_bottom", "gerber"),
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
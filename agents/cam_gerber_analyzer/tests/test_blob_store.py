@@ -0,0 +1,148 @@
+"""Correctness tests for the content-addressed upload store."""
+
+import unittest
+import os
+import sys
+import io
+import base64
+import contextlib
+import hashlib
+import sqlite3
+import tempfile
+import shutil
+import zipfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.blob_store import get_blob_store, main
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.layer_cache import get_layer_cache
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+COPPER = b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.100000*%\nD10*\nX0Y0D02*\nX1000000Y0D01*\nM02*\n"
+DRILL = b"M48\nMETRIC\nT1C0.300\n%\nT1\nX1.0Y1.0\nM30\n"
+
+
+def zip_upload(members) -> dict:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for name, content in members:
+            zip_ref.writestr(name, content)
+    return {"filename": "gerbers.zip", "content": base64.b64encode(buffer.getvalue()).decode()}
+
+
+class TestBlobStore(unittest.TestCase):
+    """Test uploads are stored once per content, counted and collected."""
+
+    def setUp(self):
+        """Point the agent at a temporary database, store and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 8}
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+        self.db = CamGerberDatabase()
+        self.store = get_blob_store()
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["upload_store"] = self.original_store
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_deduplicated_upload(self):
+        """Test a re-upload links the stored blobs, whichever way it arrives."""
+        first = upload_design_files([zip_upload([('copper_top.gbr', COPPER), ('drill.exc', DRILL)])])
+        self.assertTrue(first["success"], first.get("error"))
+        self.assertEqual(first["deduplicated_files"], 0)
+
+        second = upload_design_files([
+            {"filename": "top.gbr", "content": base64.b64encode(COPPER).decode(), "file_type": "copper_top"},
+        ])
+        self.assertTrue(second["success"], second.get("error"))
+        self.assertTrue(second["uploaded_files"][0]["deduplicated"])
+
+        digest = hashlib.sha256(COPPER).hexdigest()
+        paths = {f.file_path for a in (first, second) for f in self.db.get_design_files(a["analysis_id"])
+                 if f.sha256 == digest}
+        self.assertEqual(paths, {self.store.path(digest)})
+        self.assertEqual(len(list(self.store.blobs())), 2)
+        self.assertEqual(self.db.get_blob_references()[digest], 2)
+        self.assertEqual(os.listdir(os.path.join(self.store.root, 'staging')), [])
+        # Parse results of the blob are found by its content
+        self.assertTrue(get_layer_cache().key(self.store.path(digest), "geometry").startswith(digest))
+
+        usage = self.store.usage(quota_mb=1)
+        self.assertEqual(usage["stored_bytes"], len(COPPER) + len(DRILL))
+        self.assertEqual(usage["logical_bytes"], 2 * len(COPPER) + len(DRILL))
+        self.assertEqual(usage["deduplicated_bytes"], len(COPPER))
+        self.assertFalse(usage["over_quota"])
+
+    def test_garbage_collection(self):
+        """Test only blobs whose every reference is gone are removed."""
+        first = upload_design_files([zip_upload([('copper_top.gbr', COPPER), ('drill.exc', DRILL)])])
+        second = upload_design_files([zip_upload([('copper_top.gbr', COPPER)])])
+
+        self.assertEqual(self.db.delete_analysis(first["analysis_id"]), 2)
+        self.assertIsNone(self.db.get_analysis(first["analysis_id"]))
+        references = self.db.get_blob_references()
+        self.assertEqual(references[hashlib.sha256(COPPER).hexdigest()], 1)
+        self.assertEqual(references[hashlib.sha256(DRILL).hexdigest()], 0)
+        self.assertEqual(self.store.usage()["unreferenced_blobs"], 1)
+
+        # Fresh blobs are within the grace period
+        self.assertEqual(self.store.collect_garbage()["removed_blobs"], 0)
+        result = self.store.collect_garbage(grace_seconds=-1)
+        self.assertEqual((result["removed_blobs"], result["freed_bytes"]), (1, len(DRILL)))
+        self.assertEqual([digest for digest, _ in self.store.blobs()], [hashlib.sha256(COPPER).hexdigest()])
+        self.assertNotIn(hashlib.sha256(DRILL).hexdigest(), self.db.get_blob_references())
+
+        remaining = self.db.get_design_files(second["analysis_id"])
+        self.assertTrue(os.path.exists(remaining[0].file_path))
+
+    def test_command_line(self):
+        """Test analyses are deleted, blobs collected and usage reported from the command line."""
+        first = upload_design_files([zip_upload([('copper_top.gbr', COPPER), ('drill.exc', DRILL)])])
+        AGENT_CONFIG["upload_store"]["gc_grace_seconds"] = -1
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(['delete', str(first["analysis_id"]), '999']), 0)
+            self.assertEqual(main(['gc']), 0)
+            self.assertEqual(main(['usage']), 0)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[:2], [f"Deleted analysis {first['analysis_id']} with 2 design files",
+                                     "Analysis 999 not found"])
+        self.assertIn('"removed_blobs": 2', output.getvalue())
+        self.assertEqual(list(self.store.blobs()), [])
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(['delete', 'all']), 2)
+            self.assertEqual(main([]), 2)
+
+    def test_schema_migration(self):
+        """Test databases created before the store gain the digest column."""
+        path = os.path.join(self.temp_dir, 'old.db')
+        conn = sqlite3.connect(path)
+        conn.execute('''CREATE TABLE design_files (id INTEGER PRIMARY KEY AUTOINCREMENT, analysis_id INTEGER NOT NULL,
+                        filename TEXT NOT NULL, file_format TEXT NOT NULL, file_type TEXT NOT NULL,
+                        layer_number INTEGER, file_path TEXT NOT NULL, file_size INTEGER,
+                        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        conn.commit()
+        conn.close()
+
+        CamGerberDatabase(path).get_design_files(1)
+        conn = sqlite3.connect(path)
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(design_files)')]
+        conn.close()
+        self.assertIn('sha256', columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""Correctness tests for comparing two analyses."""
+
+import unittest
+import os
+import sys
+import base64
+import io
+import tempfile
+import zipfile
+import shutil
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.compare import diff_layers, layer_features
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.tools.compare_analyses import compare_analyses
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+# Revision A: two traces, two pads and a pour
+TOP_A = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+%ADD11C,1.0000*%
+D10*
+X0Y0D02*
+X100000Y0D01*
+X0Y50000D02*
+X100000Y50000D01*
+D11*
+X100000Y0D03*
+X100000Y50000D03*
+G36*
+X200000Y0D02*
+X300000Y0D01*
+X300000Y100000D01*
+X200000Y100000D01*
+X200000Y0D01*
+G37*
+M02*
+"""
+
+# Revision B: D codes renumbered, the traces drawn the other way round and
+# in another order, the second trace moved, a pad enlarged and the pour
+# started from another corner
+TOP_B = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD20C,1.0000*%
+%ADD21C,0.2000*%
+%ADD22C,1.2000*%
+D21*
+X0Y60000D02*
+X100000Y60000D01*
+X100000Y0D02*
+X0Y0D01*
+D20*
+X100000Y0D03*
+D22*
+X100000Y50000D03*
+G36*
+X300000Y100000D02*
+X200000Y100000D01*
+X200000Y0D01*
+X300000Y0D01*
+X300000Y100000D01*
+G37*
+M02*
+"""
+
+BOTTOM = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+D10*
+X0Y0D02*
+X0Y100000D01*
+M02*
+"""
+
+DRILL_A = b"""M48
+METRIC
+T1C0.300
+T2C0.800
+%
+T1
+X10.0Y0.0
+X10.0Y5.0
+T2
+X50.0Y50.0
+M30
+"""
+
+# A 0.3 mm hit moved 0.2 mm, and a 0.8 mm hit added
+DRILL_B = b"""M48
+METRIC
+T1C0.300
+T2C0.800
+%
+T1
+X10.0Y0.0
+X10.2Y5.0
+T2
+X50.0Y50.0
+X60.0Y50.0
+M30
+"""
+
+
+class TestLayerDiff(unittest.TestCase):
+    """Test primitives are compared independent of D codes and drawing order."""
+
+    def setUp(self):
+        """Write both revisions to a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = {}
+        for name, content in (('a', TOP_A), ('b', TOP_B)):
+            self.paths[name] = os.path.join(self.temp_dir, f'{name}.gbr')
+            with open(self.paths[name], 'wb') as f:
+                f.write(content)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_identical(self):
+        """Test a layer compared with itself has no changed tiles."""
+        geometry = build_geometry(self.paths['a'])
+        diff = diff_layers(geometry, geometry)
+        self.assertTrue(diff.identical)
+        self.assertEqual(diff.tiles_changed, 0)
+        self.assertGreater(diff.tiles, 1)
+        # The pour is one feature
+        self.assertEqual(len(layer_features(geometry).hashes), 5)
+
+    def test_changes(self):
+        """Test moved traces and enlarged pads are found with their positions."""
+        diff = diff_layers(build_geometry(self.paths['a']), build_geometry(self.paths['b']), tile=5.0)
+        self.assertEqual(diff.removed, [{"kind": "line", "x": 0.0, "y": 5.0, "aperture": "circle 0.2"}])
+        self.assertEqual(diff.added, [{"kind": "line", "x": 0.0, "y": 6.0, "aperture": "circle 0.2"}])
+        self.assertEqual(diff.aperture_changed, [{"kind": "flash", "x": 10.0, "y": 5.0,
+                                                  "old_aperture": "circle 1", "new_aperture": "circle 1.2"}])
+        # Only the tiles of the moved trace and the pad differ
+        self.assertEqual(diff.tiles_changed, 2)
+
+
+class TestCompareAnalyses(unittest.TestCase):
+    """Test the tool compares two uploaded revisions."""
+
+    def setUp(self):
+        """Point the agent at a temporary database, store and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 8}
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["upload_store"] = self.original_store
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def upload(self, top, drill):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zip_ref:
+            for name, content in (("copper_top.gbr", top), ("copper_bottom.gbr", BOTTOM), ("drill.exc", drill)):
+                zip_ref.writestr(name, content)
+        upload = upload_design_files([{"filename": "gerbers.zip",
+                                       "content": base64.b64encode(buffer.getvalue()).decode()}])
+        self.assertTrue(upload["success"], upload.get("error"))
+        return upload["analysis_id"]
+
+    def test_compare(self):
+        """Test layer and drill changes are counted and listed."""
+        a, b = self.upload(TOP_A, DRILL_A), self.upload(TOP_B, DRILL_B)
+        result = compare_analyses(a, b)
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertFalse(result["identical"])
+        self.assertEqual(result["layers"]["copper_bottom"], {"status": "identical"})
+        top = result["layers"]["copper_top"]
+        self.assertEqual((top["status"], top["added"], top["removed"], top["aperture_changed"]),
+                         ("changed", 1, 1, 1))
+        self.assertEqual(result["drills"], {"added": 1, "removed": 0, "moved": 1})
+        moved = [c for c in result["changes"] if c["change"] == "drill_moved"]
+        self.assertEqual((moved[0]["x"], moved[0]["new_x"], moved[0]["distance"]), (10.0, 10.2, 0.2))
+        added = [c for c in result["changes"] if c["change"] == "drill_added"]
+        self.assertEqual(added, [{"x": 60.0, "y": 50.0, "diameter": 0.8, "change": "drill_added"}])
+
+        same = compare_analyses(a, a)
+        self.assertTrue(same["identical"])
+        self.assertEqual(same["changes"], [])
+        self.assertFalse(compare_analyses(a, 999)["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
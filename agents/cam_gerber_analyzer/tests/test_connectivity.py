@@ -0,0 +1,167 @@
+"""Correctness tests for the board net extraction."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.connectivity import extract_nets, plated_drills, points_in_regions
+from agents.cam_gerber_analyzer.engine.drc import check_spacing
+from agents.cam_gerber_analyzer.engine.drill import read_drill_holes
+from agents.cam_gerber_analyzer.engine.geometry import FEATURE_REGION, build_geometry
+
+# Top layer:
+# - trace A along y = 0 to a 1 mm pad at (6, 0), and trace C down from it
+# - trace B 0.05 mm above A, turning up to a 1 mm pad at (6, 3)
+# - an unconnected trace D at y = 10
+# - a 10 x 10 mm pour at x = 20 with a pad in its middle
+TOP = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+%ADD11C,1.0000*%
+D10*
+X0Y0D02*
+X60000Y0D01*
+X0Y2500D02*
+X40000Y2500D01*
+Y30000D01*
+X60000D01*
+X60000Y0D02*
+Y-30000D01*
+X0Y100000D02*
+X50000D01*
+D11*
+X60000Y0D03*
+X60000Y30000D03*
+G36*
+X200000Y0D02*
+X300000Y0D01*
+X300000Y100000D01*
+X200000Y100000D01*
+X200000Y0D01*
+G37*
+X250000Y50000D03*
+M02*
+"""
+
+# Bottom layer: pads under the top pads at x = 6, joined by a trace
+BOTTOM = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+%ADD11C,1.0000*%
+D11*
+X60000Y0D03*
+X60000Y30000D03*
+D10*
+X60000Y0D02*
+X60000Y30000D01*
+M02*
+"""
+
+# Plated hits in the pads at x = 6 and in the pour
+DRILL = b"""M48
+METRIC
+T1C0.300
+%
+T1
+X6.0Y0.0
+X6.0Y3.0
+X22.0Y2.0
+M30
+"""
+
+
+class TestConnectivity(unittest.TestCase):
+    """Test nets join touching copper, pours and layers through vias."""
+
+    def setUp(self):
+        """Write the layers to a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = {}
+        for name, content in (('top', TOP), ('bottom', BOTTOM), ('drill', DRILL)):
+            self.paths[name] = os.path.join(self.temp_dir, f'{name}.gbr')
+            with open(self.paths[name], 'wb') as f:
+                f.write(content)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_layer_nets(self):
+        """Test touching features share a net and separate ones do not."""
+        top = build_geometry(self.paths['top'])
+        nets = extract_nets({"copper_top": top})
+        lines = nets.primitive_nets("copper_top", top)['lines']
+        a, b, c, d = lines[0], lines[1], lines[4], lines[5]
+        self.assertEqual(a, c)
+        self.assertTrue((lines[1:4] == b).all())
+        self.assertEqual(len({a, b, d}), 3)
+        flashes = nets.primitive_nets("copper_top", top)['flashes']
+        self.assertEqual((flashes[0], flashes[1]), (a, b))
+        # The pad in the pour joins it without touching its outline
+        regions = nets.primitive_nets("copper_top", top)['regions']
+        self.assertEqual(flashes[2], regions[0])
+        self.assertTrue((regions == regions[0]).all())
+
+    def test_vias_join_layers(self):
+        """Test plated hits join the copper of every layer they pass."""
+        top, bottom = build_geometry(self.paths['top']), build_geometry(self.paths['bottom'])
+        drills = read_drill_holes(self.paths['drill'])
+        separate = extract_nets({"copper_top": top, "copper_bottom": bottom})
+        joined = extract_nets({"copper_top": top, "copper_bottom": bottom}, [drills])
+        a, b = (separate.primitive_nets("copper_top", top)['lines'][i] for i in (0, 1))
+        self.assertNotEqual(a, b)
+        lines = joined.primitive_nets("copper_top", top)['lines']
+        self.assertEqual(lines[0], lines[1])
+        self.assertEqual((separate.count, joined.count), (5, 3))
+        # The hit in the pour takes its net
+        pour = joined.primitive_nets("copper_top", top)['regions'][0]
+        self.assertEqual(joined.hit_nets[2], pour)
+        self.assertEqual(joined.summary()["unconnected_hits"], 0)
+        self.assertEqual(plated_drills({"board-NPTH.drl": drills, "board-PTH.drl": drills}), [drills])
+
+    def test_spacing_with_board_nets(self):
+        """Test gaps between copper joined on another layer are not violations."""
+        top, bottom = build_geometry(self.paths['top']), build_geometry(self.paths['bottom'])
+        self.assertEqual(len(check_spacing(top, 0.1)), 1)
+        nets = extract_nets({"copper_top": top, "copper_bottom": bottom}, [read_drill_holes(self.paths['drill'])])
+        self.assertEqual(len(check_spacing(top, 0.1, nets.features["copper_top"])), 0)
+
+    def test_zero_size_outline_is_no_net(self):
+        """Test an outline drawn in C0 adds no nets and no spacing violations."""
+        outline = (b"%ADD12C,0.0000*%\nD12*\nX-10000Y-40000D02*\nX310000Y-40000D01*\n"
+                   b"X310000Y110000D01*\nX-10000Y110000D01*\nX-10000Y-40000D01*\nM02*\n")
+        with open(self.paths['top'], 'wb') as f:
+            f.write(TOP.replace(b"M02*\n", outline))
+        top = build_geometry(self.paths['top'])
+        nets = extract_nets({"copper_top": top})
+        self.assertEqual(nets.count, 4)
+        self.assertTrue((nets.primitive_nets("copper_top", top)['lines'][-4:] == -1).all())
+        self.assertEqual(len(check_spacing(top, 0.1, nets.features["copper_top"])), 1)
+
+    def test_points_in_regions(self):
+        """Test nonzero winding in a concave region of either orientation."""
+        top = build_geometry(self.paths['top'])
+        edges = top.copper_features()
+        edges = edges[edges['kind'] == FEATURE_REGION]
+        # An L-shaped region, clockwise, as region 7
+        corners = np.array([(0, 0), (0, 4), (2, 4), (2, 2), (4, 2), (4, 0)], dtype=float)
+        l_shape = np.zeros(6, dtype=edges.dtype)
+        l_shape['x0'], l_shape['y0'] = corners[:, 0], corners[:, 1]
+        l_shape['x1'], l_shape['y1'] = np.roll(corners, -1, axis=0).T
+        l_shape['kind'], l_shape['group'] = FEATURE_REGION, 7
+        x = np.array([1.0, 3.0, 3.0, 25.0, 35.0])
+        y = np.array([3.0, 1.0, 3.0, 5.0, 5.0])
+        point, region = points_in_regions(x, y, np.concatenate([edges, l_shape]))
+        self.assertEqual(sorted(zip(point.tolist(), region.tolist())), [(0, 7), (1, 7), (3, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Correctness tests for the copper area and balance measurement."""
+
+import unittest
+import os
+import sys
+import base64
+import json
+import math
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.copper_area import balance_issues, copper_coverage, stack_order
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.tools.perform_cam_analysis import perform_cam_analysis
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+# 10 mm square pour with a clear 2 mm hole, and a 1 mm trace along y = 15
+COPPER = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,1.0000*%
+G01*
+G36*
+X0Y0D02*
+X100000Y0D01*
+X100000Y100000D01*
+X0Y100000D01*
+X0Y0D01*
+G37*
+%LPC*%
+G36*
+X40000Y40000D02*
+X60000Y40000D01*
+X60000Y60000D01*
+X40000Y60000D01*
+X40000Y40000D01*
+G37*
+%LPD*%
+D10*
+X20000Y150000D02*
+X120000Y150000D01*
+M02*
+"""
+
+# Board outline 20 x 20 mm
+OUTLINE = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.1000*%
+D10*
+X0Y0D02*
+X200000Y0D01*
+X200000Y200000D01*
+X0Y200000D01*
+X0Y0D01*
+M02*
+"""
+
+BOARD = {"min_x": 0.0, "min_y": 0.0, "max_x": 20.0, "max_y": 20.0}
+POUR_AREA = 100 - 4
+TRACE_AREA = 10 + math.pi * 0.5 ** 2
+
+
+class TestCopperArea(unittest.TestCase):
+    """Test copper is measured strip by strip with clear polarity."""
+
+    def setUp(self):
+        """Create temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        path = os.path.join(self.temp_dir, 'copper_top.gbr')
+        with open(path, 'wb') as f:
+            f.write(COPPER)
+        self.geometry = build_geometry(path)
+
+    def tearDown(self):
+        """Remove temporary files."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_area(self):
+        """Test pours, holes and traces add up to the drawn area."""
+        coverage = copper_coverage(self.geometry, BOARD, pixel_mm=0.01, cell_mm=10.0)
+        self.assertAlmostEqual(coverage.area, POUR_AREA + TRACE_AREA, delta=0.05)
+        self.assertAlmostEqual(coverage.percentage, 100 * (POUR_AREA + TRACE_AREA) / 400, delta=0.02)
+        # Row 0 is the top of the board: the trace above, the pour below left
+        self.assertEqual(coverage.density.shape, (2, 2))
+        np.testing.assert_allclose(coverage.density[1], [0.96, 0.0], atol=1e-3)
+        self.assertGreater(coverage.density[0, 0], 0.05)
+        self.assertEqual(coverage.cell_center(1, 0), (5.0, 5.0))
+
+    def test_strips(self):
+        """Test the strip height does not change the result."""
+        whole = copper_coverage(self.geometry, BOARD, pixel_mm=0.05, cell_mm=5.0)
+        strips = copper_coverage(self.geometry, BOARD, pixel_mm=0.05, cell_mm=5.0, max_strip_pixels=1000)
+        self.assertEqual(whole.area, strips.area)
+        np.testing.assert_array_equal(whole.density, strips.density)
+        # Cells that do not divide the board are measured over their own pixels
+        partial = copper_coverage(self.geometry, BOARD, pixel_mm=0.05, cell_mm=15.0)
+        self.assertEqual(partial.density.shape, (2, 2))
+        self.assertAlmostEqual(partial.area, whole.area)
+        self.assertLessEqual(partial.density.max(), 1.0)
+
+    def test_balance(self):
+        """Test mirrored layers and uneven cells are reported."""
+        top = copper_coverage(self.geometry, BOARD, pixel_mm=0.05, cell_mm=10.0)
+        empty = copper_coverage(build_geometry(os.path.join(self.temp_dir, 'copper_top.gbr')),
+                                {"min_x": 100.0, "min_y": 100.0, "max_x": 120.0, "max_y": 120.0},
+                                pixel_mm=0.05, cell_mm=10.0)
+        coverages = {"copper_bottom": empty, "inner_layer_2": top, "copper_top": top}
+        self.assertEqual(stack_order(list(coverages)), ["copper_top", "inner_layer_2", "copper_bottom"])
+
+        issues = balance_issues(coverages, max_imbalance=10.0)
+        self.assertEqual([i["layer_name"] for i in issues], ["copper_top/copper_bottom"])
+        self.assertEqual(balance_issues(coverages, max_imbalance=30.0), [])
+
+        density = balance_issues(coverages, max_deviation=40.0)
+        self.assertEqual({i["layer_name"] for i in density}, {"copper_top", "inner_layer_2"})
+        self.assertEqual((density[0]["location_x"], density[0]["location_y"]), (5.0, 5.0))
+
+
+class TestCopperAnalysis(unittest.TestCase):
+    """Test the analysis stores copper area and balance."""
+
+    def setUp(self):
+        """Point the agent at a temporary database, store and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        self.original_area = AGENT_CONFIG["copper_area"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 8}
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+        AGENT_CONFIG["copper_area"] = dict(self.original_area, pixel_mm=0.05)
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["upload_store"] = self.original_store
+        AGENT_CONFIG["copper_area"] = self.original_area
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_analysis_result(self):
+        """Test copper percentage and density grids are saved with the result."""
+        upload = upload_design_files([
+            {"filename": name, "content": base64.b64encode(content).decode(), "file_type": file_type}
+            for name, content, file_type in (("top.gbr", COPPER, "copper_top"),
+                                             ("outline.gbr", OUTLINE, "outline"))
+        ])
+        self.assertTrue(upload["success"], upload.get("error"))
+
+        analysis = perform_cam_analysis(upload["analysis_id"])
+        self.assertTrue(analysis["success"], analysis.get("error"))
+        expected = 100 * (POUR_AREA + TRACE_AREA) / 400
+        self.assertAlmostEqual(analysis["copper_layers"]["copper_top"], expected, delta=0.2)
+
+        result = CamGerberDatabase().get_analysis_result(upload["analysis_id"])
+        self.assertAlmostEqual(result.copper_area_percentage, expected, delta=0.2)
+        balance = json.loads(result.copper_balance)
+        self.assertEqual(balance["cell_mm"], 10.0)
+        self.assertEqual(len(balance["layers"]["copper_top"]["density"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+"""Correctness tests for the design-rule checks on a synthetic board."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.drc import (
+    Board, RULE_ANNULAR_RING, RULE_DRILL_SIZE, RULE_PANEL_SPACING, RULE_SOLDER_MASK_CLEARANCE, RULE_SPACING,
+    RULE_TRACE_WIDTH, check_annular_rings, check_drill_sizes, check_panel_spacing, check_solder_mask_clearance,
+    check_spacing, check_trace_widths, run_drc, violation_boards, violation_issues,
+)
+from agents.cam_gerber_analyzer.engine.drill import read_drill_holes
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.models import AnalysisResult, DesignFile
+from agents.cam_gerber_analyzer.tools.generate_design_summary import generate_design_summary
+from agents.cam_gerber_analyzer.tools.perform_cam_analysis import perform_cam_analysis
+
+RULES = {
+    "min_trace_width": 0.1,
+    "min_spacing": 0.1,
+    "min_annular_ring": 0.05,
+    "min_drill_size": 0.15,
+    "min_solder_mask_clearance": 0.05,
+}
+
+# One violation of each rule:
+# - a 0.08 mm trace along y = 0
+# - two 0.2 mm traces 0.08 mm apart at y = 5 and y = 5.28
+# - 0.6 mm pads at x = 20; the hit in the pad at y = 5 is 0.12 mm off centre
+#   (0.03 mm ring) and the hit in the pad at y = 10 is a 0.1 mm drill
+# - mask openings clear the pad at y = 0 by 0.1 mm and the one at y = 5 by
+#   0.01 mm; the pad at y = 10 is tented
+COPPER = b"""%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.080000*%
+%ADD11C,0.200000*%
+%ADD12C,0.600000*%
+D10*
+X0Y0D02*
+X10000000Y0D01*
+D11*
+X0Y5000000D02*
+X10000000Y5000000D01*
+X0Y5280000D02*
+X10000000Y5280000D01*
+D12*
+X20000000Y0D03*
+X20000000Y5000000D03*
+X20000000Y10000000D03*
+M02*
+"""
+
+MASK = b"""%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.800000*%
+%ADD11C,0.620000*%
+D10*
+X20000000Y0D03*
+D11*
+X20000000Y5000000D03*
+M02*
+"""
+
+DRILL = b"""M48
+METRIC
+T1C0.300
+T2C0.100
+%
+T1
+X20.000Y0.000
+X20.120Y5.000
+X30.000Y30.000
+T2
+X20.000Y10.000
+M30
+"""
+
+
+# Two boards side by side, each a 0.2 mm trace along y = 0 and a 0.08 mm trace
+# along y = 2, stepped 10.25 mm: the wide traces' ends are 0.05 mm apart
+PANEL = b"""%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.200000*%
+%ADD11C,0.080000*%
+%SRX2Y1I10.250000J0*%
+D10*
+X0Y0D02*
+X10000000Y0D01*
+D11*
+X0Y2000000D02*
+X10000000Y2000000D01*
+%SR*%
+M02*
+"""
+
+
+class TestDesignRuleChecks(unittest.TestCase):
+    """Test each check finds exactly the planted violation."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = {}
+        for name, content in (('copper_top.gbr', COPPER), ('mask_top.gbr', MASK), ('drill.drl', DRILL)):
+            self.paths[name] = os.path.join(self.temp_dir, name)
+            with open(self.paths[name], 'wb') as f:
+                f.write(content)
+        self.copper = build_geometry(self.paths['copper_top.gbr'])
+        self.mask = build_geometry(self.paths['mask_top.gbr'])
+        self.drills = read_drill_holes(self.paths['drill.drl'])
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def assertViolation(self, violations, x, y, measured):
+        self.assertEqual(len(violations), 1)
+        np.testing.assert_allclose([violations['x'][0], violations['y'][0], violations['measured'][0]],
+                                   [x, y, measured], atol=1e-9)
+
+    def test_drill_holes(self):
+        """Test hits carry modal coordinates and their tool's diameter."""
+        np.testing.assert_allclose(self.drills.holes[:, 2], [1, 1, 1, 2])
+        np.testing.assert_allclose(self.drills.diameters(), [0.3, 0.3, 0.3, 0.1])
+
+    def test_trace_width(self):
+        self.assertViolation(check_trace_widths(self.copper, 0.1), 5.0, 0.0, 0.08)
+
+    def test_spacing(self):
+        violations = check_spacing(self.copper, 0.1)
+        self.assertEqual(len(violations), 1)
+        self.assertAlmostEqual(violations['y'][0], 5.14)
+        self.assertAlmostEqual(violations['measured'][0], 0.08)
+
+    def test_zero_size_outline(self):
+        """Test a board outline drawn in C0 on a copper layer is neither a trace nor copper."""
+        outline = (b"%ADD13C,0.000000*%\nD13*\nX-1000000Y-1000000D02*\nX21000000Y-1000000D01*\n"
+                   b"X21000000Y11000000D01*\nX-1000000Y11000000D01*\nX-1000000Y-1000000D01*\nM02*\n")
+        path = os.path.join(self.temp_dir, 'outlined.gbr')
+        with open(path, 'wb') as f:
+            f.write(COPPER.replace(b"M02*\n", outline))
+        copper = build_geometry(path)
+        self.assertEqual(len(copper.lines), 3 + 4)
+        self.assertEqual(len(copper.copper_features()), len(self.copper.copper_features()))
+        self.assertViolation(check_trace_widths(copper, 0.1), 5.0, 0.0, 0.08)
+        self.assertEqual(len(check_spacing(copper, 0.1)), 1)
+
+    def test_annular_ring(self):
+        """Test the off-centre hit is reported and the hit without a pad is not."""
+        self.assertViolation(check_annular_rings(self.copper, self.drills, 0.05), 20.12, 5.0, 0.03)
+
+    def test_drill_size(self):
+        self.assertViolation(check_drill_sizes(self.drills, 0.15), 20.0, 10.0, 0.1)
+
+    def test_solder_mask_clearance(self):
+        """Test the tight opening is reported and the tented pad is not."""
+        self.assertViolation(check_solder_mask_clearance(self.copper, self.mask, 0.05), 20.0, 5.0, 0.01)
+
+    def test_run_drc(self):
+        """Test the board check runs every rule and skips rules not configured."""
+        board = Board(copper={"copper_top": self.copper}, masks={"copper_top": self.mask},
+                      drills={"drill.drl": self.drills})
+        results = run_drc(board, RULES)
+        rules = sorted(int(rule) for _, violations in results for rule in violations['rule'])
+        self.assertEqual(rules, sorted([RULE_TRACE_WIDTH, RULE_SPACING, RULE_ANNULAR_RING,
+                                        RULE_DRILL_SIZE, RULE_SOLDER_MASK_CLEARANCE]))
+        self.assertEqual({name for name, _ in results}, {"copper_top", "drill.drl"})
+
+        results = run_drc(board, {"min_drill_size": 0.15})
+        self.assertEqual([name for name, _ in results], ["drill.drl"])
+
+    def test_violation_issues(self):
+        """Test issues carry locations, worst first, with the rest counted."""
+        violations = np.concatenate([check_trace_widths(self.copper, 0.1)] * 3)
+        violations['measured'] = [0.09, 0.0, 0.05]
+        issues = violation_issues("copper_top", violations, max_issues=2)
+        self.assertEqual(len(issues), 3)
+        self.assertEqual(issues[0]["severity"], "critical")
+        self.assertEqual(issues[1]["description"], "Trace width 0.050mm below minimum 0.1mm")
+        self.assertEqual((issues[1]["location_x"], issues[1]["location_y"]), (5.0, 0.0))
+        self.assertEqual(issues[2]["description"], "1 more trace width violations below 0.1mm not listed")
+        self.assertNotIn("location_x", issues[2])
+
+    def test_panel(self):
+        """Test a panel's boards are checked once, and against each other at their edges."""
+        path = os.path.join(self.temp_dir, 'panel.gbr')
+        with open(path, 'wb') as f:
+            f.write(PANEL)
+        panel = build_geometry(path)
+        self.assertViolation(check_panel_spacing(panel, 0.1), 10.125, 0.0, 0.05)
+        self.assertEqual(len(check_panel_spacing(self.copper, 0.1)), 0)
+
+        results = run_drc(Board(copper={"copper_top": panel}), {"min_trace_width": 0.1, "min_spacing": 0.1})
+        violations = np.concatenate([violations for _, violations in results])
+        self.assertEqual(sorted(violations['rule'].tolist()), [RULE_TRACE_WIDTH, RULE_PANEL_SPACING])
+        issues = violation_issues("copper_top", violations, boards=violation_boards(panel, violations))
+        self.assertEqual([issue["description"] for issue in issues], [
+            "Trace width 0.080mm below minimum 0.1mm on each of 2 boards",
+            "Copper spacing between panel boards 0.050mm below minimum 0.1mm",
+        ])
+
+
+class TestPerformCamAnalysis(unittest.TestCase):
+    """Test the CAM analysis tools save DRC violations and panelization."""
+
+    def setUp(self):
+        """Point the agent at a temporary database and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_rules = AGENT_CONFIG["cam_rules"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+        AGENT_CONFIG["cam_rules"] = RULES
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["cam_rules"] = self.original_rules
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_issues_saved_with_locations(self):
+        db = CamGerberDatabase()
+        analysis_id = db.create_analysis("tester", "Synthetic board")
+        for filename, content, file_format, file_type in (
+            ('copper_top.gbr', COPPER, "gerber", "copper_top"),
+            ('mask_top.gbr', MASK, "gerber", "solder_mask_top"),
+            ('drill.drl', DRILL, "drill", "drill"),
+        ):
+            path = os.path.join(self.temp_dir, filename)
+            with open(path, 'wb') as f:
+                f.write(content)
+            db.save_design_file(DesignFile(analysis_id=analysis_id, filename=filename, file_format=file_format,
+                                           file_type=file_type, file_path=path, file_size=len(content)))
+
+        result = perform_cam_analysis(analysis_id)
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertEqual(result["issues_found"], 5)
+        self.assertGreater(result["nets"]["net_count"], 0)
+
+        issues = db.get_analysis_issues(analysis_id)
+        self.assertEqual(sorted(issue.issue_type for issue in issues),
+                         ["annular_ring", "drill_size", "solder_mask_clearance", "spacing", "trace_width"])
+        ring, = [issue for issue in issues if issue.issue_type == "annular_ring"]
+        self.assertEqual((ring.layer_name, ring.location_x, ring.location_y), ("copper_top", 20.12, 5.0))
+        drill, = [issue for issue in issues if issue.issue_type == "drill_size"]
+        self.assertEqual(drill.layer_name, "drill.drl")
+
+    def test_panelization_from_step_repeat(self):
+        """Test the design summary counts the boards of a stepped panel and sizes one board."""
+        db = CamGerberDatabase()
+        analysis_id = db.create_analysis("tester", "Synthetic panel")
+        path = os.path.join(self.temp_dir, 'panel.gbr')
+        with open(path, 'wb') as f:
+            f.write(PANEL)
+        db.save_design_file(DesignFile(analysis_id=analysis_id, filename='panel.gbr', file_format="gerber",
+                                       file_type="copper_top", file_path=path, file_size=len(PANEL)))
+        # Stored by the CAM analysis before the summary
+        db.save_analysis_result(AnalysisResult(analysis_id=analysis_id, copper_area_percentage=12.5,
+                                               issues_critical=3, issues_warning=1, panel_count=5))
+
+        result = generate_design_summary(analysis_id)
+        self.assertTrue(result["success"], result.get("error"))
+        summary = result["summary"]
+        # The panel count is not in the files; the stored one is kept
+        self.assertEqual((summary["panel_count"], summary["boards_per_panel"], summary["total_boards"],
+                          summary["is_panelized"]), (5, 2, 10, True))
+        self.assertAlmostEqual(summary["board_width"], 10.0)
+        result = db.get_analysis_result(analysis_id)
+        self.assertEqual((result.panel_count, result.boards_per_panel, result.total_boards, result.is_panelized),
+                         (5, 2, 10, True))
+        self.assertEqual((result.copper_area_percentage, result.issues_critical, result.issues_warning),
+                         (12.5, 3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
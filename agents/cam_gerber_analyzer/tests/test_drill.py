@@ -0,0 +1,136 @@
+"""Correctness tests for the Excellon decoder."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.drill import decode_excellon
+from agents.cam_gerber_analyzer.tools.parse_drill_file import parse_drill_file
+
+# Inch, leading zeros kept, with a G85 slot and a routed outline
+ROUTED = b"""M48
+; generated for the tests
+INCH,LZ,00.0000
+FMAT,2
+T01C0.0200
+T02F100S50C0.0400
+%
+G90
+G05
+T01
+X010000Y020000
+Y030000
+X-01Y02
+T02
+X020000Y020000G85X030000Y020000
+G00X0Y0
+M15
+G01X010000
+G03X0Y010000I-010000J0
+M16
+G05
+T3C0.5
+X1.5Y1.5
+M30
+X9Y9
+"""
+
+
+class TestDecodeExcellon(unittest.TestCase):
+    """Test header decoding and the modal body state machine."""
+
+    def test_header(self):
+        _, header = decode_excellon(ROUTED)
+        self.assertEqual((header.units, header.zeros, header.coordinate_digits, header.version),
+                         ('IN', 'LZ', (2, 4), 2))
+
+    def test_hits_modal_coordinates_and_tools(self):
+        """Test omitted coordinates carry over, tools switch and M30 ends the program."""
+        holes, _ = decode_excellon(ROUTED)
+        np.testing.assert_allclose(holes.holes, [
+            [25.4, 50.8, 1],
+            [25.4, 76.2, 1],
+            [-25.4, 50.8, 1],
+            [38.1, 38.1, 3],
+        ])
+        np.testing.assert_allclose(holes.tools, [[1, 0.508], [2, 1.016], [3, 12.7]])
+
+    def test_slot_and_routes(self):
+        """Test G85 gives a slot and only moves with the tool down are routed."""
+        holes, _ = decode_excellon(ROUTED)
+        np.testing.assert_allclose(holes.slots, [[50.8, 50.8, 76.2, 50.8, 2]])
+        np.testing.assert_allclose(holes.routes[:, :5], [[0, 0, 25.4, 0, 2], [25.4, 0, 0, 25.4, 2]])
+        np.testing.assert_allclose(holes.routes[:, 5], [25.4, 25.4 * np.pi / 2])
+
+        usage = holes.tool_usage()
+        self.assertEqual((usage[1]["hits"], usage[2]["hits"], usage[2]["slots"]), (3, 0, 1))
+        self.assertAlmostEqual(usage[2]["routed_length_mm"], 25.4 + 25.4 + 25.4 * np.pi / 2)
+
+    def test_zero_suppression(self):
+        """Test integer coordinates under each zero mode and format."""
+        cases = [
+            (b"METRIC,TZ\n", b"X1234Y-50", (1.234, -0.05)),
+            (b"METRIC,LZ\n", b"X1234Y-50", (123.4, -500.0)),
+            (b"METRIC,LZ,000.00\n", b"X1234Y-05", (123.4, -50.0)),
+            (b"INCH,TZ\n", b"X5000Y1.5", (12.7, 38.1)),
+            (b"INCH\n", b"X5000Y1.5", (12.7, 38.1)),
+        ]
+        for header, hit, expected in cases:
+            with self.subTest(header=header, hit=hit):
+                holes, _ = decode_excellon(b"M48\n" + header + b"T1C0.3\n%\nT1\n" + hit + b"\nM30\n")
+                np.testing.assert_allclose(holes.holes[:, :2], [expected])
+
+    def test_units_switch_and_incremental(self):
+        """Test M71 in the body and incremental G91 moves."""
+        holes, _ = decode_excellon(b"M48\nINCH\nT1C0.01\n%\nT1\nX1.0Y1.0\nM71\nX10.0Y0\nG91\nX1.0\nY-2.0\nM30\n")
+        np.testing.assert_allclose(holes.holes[:, :2], [[25.4, 25.4], [10, 0], [11, 0], [11, -2]])
+        self.assertAlmostEqual(holes.tools[0, 1], 0.254)
+
+    def test_body_without_header(self):
+        holes, header = decode_excellon(b"T1C0.3\nX1.0Y2.0\nX3.0\n")
+        self.assertEqual(header.units, 'IN')
+        np.testing.assert_allclose(holes.holes, [[25.4, 50.8, 1], [76.2, 50.8, 1]])
+
+
+class TestParseDrillFile(unittest.TestCase):
+    """Test the drill summary built on the decoder."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+        self.path = os.path.join(self.temp_dir, 'board.drl')
+        with open(self.path, 'wb') as f:
+            f.write(ROUTED)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_summary(self):
+        result = parse_drill_file(self.path)
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertEqual(result["units"], "IN")
+        self.assertEqual(result["tools"], {"01": 0.02, "02": 0.04, "03": 0.5})
+        self.assertEqual(result["total_holes"], 4)
+        self.assertEqual(result["holes_by_tool"], {"01": 3, "02": 0, "03": 1})
+        self.assertEqual(result["slots_by_tool"], {"02": 1})
+        self.assertEqual(result["hole_sizes_mm"], [0.508, 1.016, 12.7])
+        self.assertEqual(result["hole_counts_by_size"], {"0.508": 3, "12.7": 1})
+        self.assertEqual((result["min_hole_size_mm"], result["max_hole_size_mm"]), (0.508, 12.7))
+        self.assertAlmostEqual(result["routed_length_mm"], 25.4 * 2 + 25.4 * np.pi / 2, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Unit tests for the per-layer CAM executor."""
+
+import unittest
+import os
+import sys
+import threading
+import time
+import tempfile
+import shutil
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.executor import CamExecutor
+from agents.cam_gerber_analyzer.tools.parse_gerber_file import parse_gerber_file, parse_gerber_files
+
+
+def square(value):
+    return {"success": True, "value": value * value, "pid": os.getpid()}
+
+
+def fail_on_three(value):
+    if value == 3:
+        raise ValueError("bad layer")
+    return {"success": True, "value": value}
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return {"success": True, "value": seconds, "pid": os.getpid()}
+
+
+class TestCamExecutor(unittest.TestCase):
+    """Test cases for the CAM executor."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.executor = CamExecutor(max_workers=2, task_timeout=30)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.executor.shutdown()
+
+    def test_results_keep_order(self):
+        """Test tasks run in worker processes and results come back in order."""
+        results = self.executor.map(square, range(6))
+        self.assertEqual([result["value"] for result in results], [0, 1, 4, 9, 16, 25])
+        self.assertNotIn(os.getpid(), {result["pid"] for result in results})
+
+    def test_task_errors_become_results(self):
+        """Test a failing task does not affect the others."""
+        results = self.executor.map(fail_on_three, range(5))
+        self.assertEqual(results[3], {"success": False, "error": "bad layer"})
+        self.assertEqual([result.get("value") for result in results], [0, 1, 2, None, 4])
+
+    def test_timeout(self):
+        """Test a hung task times out and the pool recovers."""
+        executor = CamExecutor(max_workers=2, task_timeout=2)
+        try:
+            start = time.monotonic()
+            results = executor.map(sleep_for, [10, 0])
+            self.assertLess(time.monotonic() - start, 8)
+            self.assertFalse(results[0]["success"])
+            self.assertIn("Timed out", results[0]["error"])
+            self.assertEqual(results[1]["value"], 0)
+
+            self.assertEqual(executor.map(square, [2, 3])[1]["value"], 9)
+        finally:
+            executor.shutdown()
+
+    def test_timeout_spares_concurrent_calls(self):
+        """Test a call timing out does not stop the workers of another call still running."""
+        executor = CamExecutor(max_workers=4, task_timeout=2)
+        try:
+            # Workers started, so the calls below time from now
+            executor.map(square, range(4))
+            results = {}
+            hung = threading.Thread(target=lambda: results.update(hung=executor.map(sleep_for, [10, 0])))
+            hung.start()
+            time.sleep(1)
+            # Still running when the other call times out
+            results["other"] = executor.map(sleep_for, [1.5, 0])
+            hung.join()
+            self.assertIn("Timed out", results["hung"][0]["error"])
+            self.assertEqual([result.get("value") for result in results["other"]], [1.5, 0])
+            # Both finished in the workers rather than being run again here
+            self.assertNotIn(os.getpid(), {result["pid"] for result in results["other"]})
+        finally:
+            executor.shutdown()
+
+    def test_sequential_fallback(self):
+        """Test tasks that cannot be sent to workers run in this process."""
+        offset = 10
+        results = self.executor.map(lambda value: {"success": True, "value": value + offset}, [1, 2])
+        self.assertEqual([result["value"] for result in results], [11, 12])
+
+        results = CamExecutor(max_workers=1).map(square, [1, 2])
+        self.assertEqual({result["pid"] for result in results}, {os.getpid()})
+
+    def test_parse_gerber_files_matches_serial_parse(self):
+        """Test parallel tool parsing returns what one-by-one parsing does."""
+        temp_dir = tempfile.mkdtemp()
+        original_cache = AGENT_CONFIG["layer_cache"]
+        original_executor = AGENT_CONFIG["executor"]
+        try:
+            layers = []
+            for n in range(4):
+                path = os.path.join(temp_dir, f'layer{n}.gbr')
+                with open(path, 'wb') as f:
+                    f.write(b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.2*%\nD10*\nX0Y0D02*\n")
+                    f.write(b"X%dY1000000D01*\nM02*\n" % ((n + 1) * 1000000))
+                layers.append((path, f"inner_layer_{n + 1}"))
+            layers.append((os.path.join(temp_dir, 'missing.gbr'), "copper_top"))
+
+            AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+            AGENT_CONFIG["executor"] = {"max_workers": 2}
+            results = parse_gerber_files(layers)
+
+            self.assertEqual([result.get("width") for result in results], [1.0, 2.0, 3.0, 4.0, None])
+            self.assertIn("File not found", results[4]["error"])
+            for (path, file_type), result in zip(layers, results):
+                self.assertEqual(result, parse_gerber_file(path, file_type))
+        finally:
+            AGENT_CONFIG["layer_cache"] = original_cache
+            AGENT_CONFIG["executor"] = original_executor
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
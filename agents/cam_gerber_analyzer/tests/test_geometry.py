@@ -0,0 +1,251 @@
+"""Unit tests for the array-backed layer geometry."""
+
+import unittest
+import os
+import pickle
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.geometry import (
+    CHORD_TOLERANCE, FEATURE_LINE, LayerGeometry, build_geometry, load_geometries,
+    SHAPE_CIRCLE, SHAPE_RECTANGLE, SHAPE_POLYGON, SHAPE_MACRO,
+)
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import DARK, CLEAR
+from agents.cam_gerber_analyzer.engine.drc import check_trace_widths
+
+LAYER = b"""%FSLAX24Y24*%
+%MOMM*%
+%AMTHERMAL*7,0,0,1.0,0.8,0.1,0*%
+%ADD10C,0.0500*%
+%ADD11R,1.0000X0.6000X0.3000*%
+%ADD12P,1.5X6X30*%
+%ADD13THERMAL*%
+%ADD14C,0.2000*%
+D10*
+X0Y0D02*
+X100000Y0D01*
+D14*
+Y50000D01*
+G75*
+G03X0Y50000I-50000J0D01*
+G74*
+G02X50000Y100000I50000J0D01*
+D11*
+X200000Y200000D03*
+%LPC*%
+X210000Y200000D03*
+%LPD*%
+G01*
+G36*
+X0Y0D02*
+X10000Y0D01*
+X10000Y10000D01*
+X0Y0D01*
+G37*
+M02*
+"""
+
+# A 10 mm disc of two G03 half circles, and a 4 mm square in clear polarity
+ROUND_REGION = b"""%FSLAX24Y24*%
+%MOMM*%
+G75*
+G36*
+X50000Y0D02*
+G03X-50000Y0I-50000J0D01*
+X50000Y0I50000J0D01*
+G37*
+%LPC*%
+G01*
+G36*
+X-20000Y-20000D02*
+X20000Y-20000D01*
+X20000Y20000D01*
+X-20000Y20000D01*
+X-20000Y-20000D01*
+G37*
+M02*
+"""
+
+
+# A 3 x 2 panel of one board (a trace, a region and a pad) between rail flashes
+PANEL = b"""%FSLAX46Y46*%
+%MOMM*%
+%ADD10C,0.5*%
+D10*
+X-5000000Y-5000000D03*
+%SRX3Y2I30.0J20.0*%
+X0Y0D02*
+X10000000Y0D01*
+G36*
+X0Y1000000D02*
+X5000000Y1000000D01*
+X5000000Y5000000D01*
+X0Y1000000D01*
+G37*
+X1000000Y1000000D03*
+%SR*%
+X100000000Y0D03*
+M02*
+"""
+
+
+class TestLayerGeometry(unittest.TestCase):
+    """Test cases for the layer geometry."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'top.gbr')
+        with open(self.file_path, 'wb') as f:
+            f.write(LAYER)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_primitives(self):
+        """Test operations are split into lines, arcs, flashes and region edges."""
+        geometry = build_geometry(self.file_path)
+
+        lines = geometry.lines
+        self.assertEqual(len(lines), 2)
+        np.testing.assert_allclose([lines['x0'][0], lines['x1'][0], lines['y1'][1]], [0, 10, 5])
+        self.assertEqual(list(lines['aperture_id']), [10, 14])
+
+        arcs = geometry.arcs
+        self.assertEqual(len(arcs), 2)
+        np.testing.assert_allclose([arcs['cx'][0], arcs['cy'][0]], [5, 5])
+        self.assertFalse(arcs['clockwise'][0])
+        # Single-quadrant: the unsigned offset is resolved to the centre (5, 5)
+        np.testing.assert_allclose([arcs['cx'][1], arcs['cy'][1]], [5, 5])
+        self.assertTrue(arcs['clockwise'][1])
+
+        flashes = geometry.flashes
+        np.testing.assert_allclose(flashes['x0'], flashes['x1'])
+        self.assertEqual(list(flashes['polarity']), [DARK, CLEAR])
+
+        regions = geometry.regions
+        self.assertEqual(len(regions), 3)
+        self.assertEqual(set(regions['region']), {0})
+        self.assertEqual(set(regions['aperture_id']), {-1})
+
+        self.assertEqual(geometry.bounds, {"min_x": 0.0, "min_y": 0.0, "max_x": 21.0, "max_y": 20.0})
+
+        # %LPD, %LPC, %LPD: the clear flash is a level of its own
+        self.assertEqual(geometry.levels.tolist(), [(DARK, 0, 0, 0, 0), (CLEAR, 2, 2, 1, 0), (DARK, 2, 2, 2, 0)])
+        self.assertEqual(list(geometry.level_of('flashes', np.arange(2))), [0, 1])
+
+    def test_step_repeat(self):
+        """Test a %SR block is held once with the grid of its copies."""
+        with open(self.file_path, 'wb') as f:
+            f.write(PANEL)
+        geometry = build_geometry(self.file_path)
+        self.assertEqual((len(geometry.lines), len(geometry.flashes), len(geometry.regions)), (1, 3, 3))
+        self.assertEqual(geometry.steps.tolist(), [(1, 1, 0.0, 0.0, 0, 0, 0, 0), (3, 2, 30.0, 20.0, 0, 0, 1, 0),
+                                                   (1, 1, 0.0, 0.0, 1, 0, 2, 3)])
+        self.assertEqual(list(geometry.step_of('flashes', np.arange(3))), [0, 1, 2])
+        self.assertEqual(geometry.copies, 6)
+        self.assertEqual(geometry.primitive_counts(), {"lines": 6, "arcs": 0, "flashes": 8, "regions": 18})
+
+        transforms = geometry.transforms()
+        self.assertEqual(transforms['step'].tolist(), [0, 1, 1, 1, 1, 1, 1, 2])
+        self.assertEqual(transforms[[3, 4]].tolist(), [(1, 60.0, 0.0), (1, 0.0, 20.0)])
+
+        self.assertEqual(geometry.board_bounds, {"min_x": 0.0, "min_y": 0.0, "max_x": 10.0, "max_y": 5.0})
+        self.assertEqual(geometry.panel_bounds, {"min_x": -5.0, "min_y": -5.0, "max_x": 100.0, "max_y": 25.0})
+        self.assertEqual(geometry.repeats(np.array([5.0, 35.0, -5.0]), np.array([1.0, 1.0, -5.0])).tolist(),
+                         [6, 1, 1])
+
+        # Copies of the copper near the board's edge: the trace and the
+        # region edges, but not the pad 1 mm inside; the rail flashes as they are
+        features = geometry.copper_features()
+        placed, copy = geometry.panel_features(features, 0.3)
+        self.assertEqual(len(placed), 2 + 6 * 4)
+        self.assertEqual(sorted(set(copy.tolist())), [-1, 1, 2, 3, 4, 5, 6])
+        trace = placed[(placed['kind'] == FEATURE_LINE) & (copy == 6)]
+        np.testing.assert_allclose([trace['x0'][0], trace['y0'][0]], [60.0, 20.0])
+
+    def test_region_arcs(self):
+        """Test arc edges of regions are flattened within the chord tolerance."""
+        file_path = os.path.join(self.temp_dir, 'round.gbr')
+        with open(file_path, 'wb') as f:
+            f.write(ROUND_REGION)
+        geometry = build_geometry(file_path)
+        regions = geometry.regions
+        disc = regions[regions['region'] == 0]
+        self.assertGreater(len(disc), 32)
+        # A closed outline in order, every vertex on the circle
+        np.testing.assert_allclose(disc['x1'], np.roll(disc['x0'], -1), atol=1e-12)
+        np.testing.assert_allclose(disc['y1'], np.roll(disc['y0'], -1), atol=1e-12)
+        np.testing.assert_allclose(np.hypot(disc['x0'], disc['y0']), 5.0)
+        # Chord midpoints lie within the tolerance of the circle
+        middle = np.hypot((disc['x0'] + disc['x1']) / 2, (disc['y0'] + disc['y1']) / 2)
+        self.assertLessEqual(float((5.0 - middle).max()), CHORD_TOLERANCE)
+        area = np.sum(disc['x0'] * disc['y1'] - disc['x1'] * disc['y0']) / 2
+        self.assertAlmostEqual(area, np.pi * 25, delta=2 * np.pi * 5 * CHORD_TOLERANCE)
+
+        self.assertEqual(list(regions['polarity'][regions['region'] == 1]), [CLEAR] * 4)
+        self.assertEqual(list(geometry.levels['polarity']), [DARK, CLEAR])
+
+    def test_aperture_table(self):
+        """Test apertures are tabulated and widths are looked up by ID."""
+        geometry = build_geometry(self.file_path)
+        apertures = geometry.apertures
+        self.assertEqual(list(apertures['id']), [10, 11, 12, 13, 14])
+        self.assertEqual(list(apertures['shape']),
+                         [SHAPE_CIRCLE, SHAPE_RECTANGLE, SHAPE_POLYGON, SHAPE_MACRO, SHAPE_CIRCLE])
+        rectangle = apertures[1]
+        np.testing.assert_allclose([rectangle['width'], rectangle['height'], rectangle['hole']], [1.0, 0.6, 0.3])
+        self.assertEqual(apertures[2]['vertices'], 6)
+
+        np.testing.assert_allclose(geometry.stroke_widths(geometry.lines), [0.05, 0.2])
+        primitives = np.zeros(3, dtype=geometry.lines.dtype)
+        primitives['aperture_id'] = [11, 13, 99]
+        np.testing.assert_allclose(geometry.stroke_widths(primitives), [0.6, np.nan, np.nan])
+
+    def test_serialization(self):
+        """Test geometry saves to .npy, memory-maps back and pickles."""
+        geometry = build_geometry(self.file_path)
+        directory = os.path.join(self.temp_dir, 'geometry')
+        geometry.save(directory)
+
+        loaded = LayerGeometry.load(directory)
+        self.assertIsInstance(loaded.lines, np.memmap)
+        for name in LayerGeometry.ARRAYS:
+            # Byte comparison: macro apertures have NaN sizes
+            self.assertEqual(getattr(loaded, name).tobytes(), getattr(geometry, name).tobytes())
+
+        restored = pickle.loads(pickle.dumps(geometry.to_result()))
+        np.testing.assert_array_equal(LayerGeometry.from_result(restored).arcs, geometry.arcs)
+
+    def test_cached_geometry_and_trace_check(self):
+        """Test the layer cache returns memory-mapped geometry that checks consume."""
+        original_settings = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": os.path.join(self.temp_dir, 'cache'), "max_entries": 0}
+        try:
+            first, = load_geometries([self.file_path])
+            second, = load_geometries([self.file_path])
+        finally:
+            AGENT_CONFIG["layer_cache"] = original_settings
+        self.assertTrue(first["success"])
+        self.assertIsInstance(second["lines"], np.memmap)
+        geometry = LayerGeometry.from_result(second)
+        np.testing.assert_array_equal(geometry.lines, build_geometry(self.file_path).lines)
+
+        violations = check_trace_widths(geometry, 0.1)
+        self.assertEqual(len(violations), 1)
+        np.testing.assert_allclose([violations['x'][0], violations['measured'][0]], [5.0, 0.05])
+        self.assertEqual(len(check_trace_widths(geometry, 0.05)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
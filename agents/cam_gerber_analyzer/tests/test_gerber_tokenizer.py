@@ -0,0 +1,188 @@
+"""Unit tests for the streaming RS-274X tokenizer."""
+
+import io
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import (
+    GerberTokenizer, iter_batches, scan_gerber, summarize,
+    OP_INTERPOLATE, OP_MOVE, OP_FLASH, COUNTERCLOCKWISE, DARK, CLEAR,
+)
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.tools import parse_gerber_file
+
+SAMPLE = b"""G04 Comment with coordinates X999999Y999999*
+%FSLAX24Y24*%
+%MOIN*%
+%ADD10C,0.0100*%
+%ADD11R,0.0600X0.0400*%
+G01*
+D10*
+X0Y0D02*
+X10000Y0D01*
+Y10000D01*
+X0D01*
+G75*
+G03X5000Y15000I5000J0D01*
+D11*
+X20000Y20000D03*
+%LPC*%
+X21000Y20000D03*
+%LPD*%
+G36*
+X1000Y1000D02*
+X2000Y1000D01*
+X2000Y2000D01*
+X1000Y1000D01*
+G37*
+M02*
+X99999Y99999D03*
+"""
+
+# A 3 x 2 panel of one board (a trace, a pad and a region) with a fiducial
+# on the rail before it and a tooling hole flash after it
+PANEL = b"""%FSLAX46Y46*%
+%MOMM*%
+%ADD10C,0.5*%
+D10*
+X-5000000Y-5000000D03*
+%SRX3Y2I30.0J20.0*%
+X0Y0D02*
+X10000000Y0D01*
+G36*
+X0Y1000000D02*
+X5000000Y1000000D01*
+X5000000Y5000000D01*
+X0Y1000000D01*
+G37*
+X1000000Y1000000D03*
+%SR*%
+X100000000Y0D03*
+M02*
+"""
+
+
+def decode(data: bytes, chunk_size: int = 1 << 22):
+    """Decode bytes in chunks of the given size."""
+    tokenizer = GerberTokenizer()
+    batches = list(iter_batches(io.BytesIO(data), tokenizer, chunk_size))
+    return np.concatenate(batches), tokenizer
+
+
+class TestGerberTokenizer(unittest.TestCase):
+    """Test cases for the Gerber tokenizer."""
+
+    def test_commands_and_modal_state(self):
+        """Test operations carry start points, modes, apertures and polarity."""
+        commands, _ = decode(SAMPLE)
+        self.assertEqual(list(commands['op']), [OP_MOVE] + [OP_INTERPOLATE] * 4 + [OP_FLASH] * 2
+                         + [OP_MOVE] + [OP_INTERPOLATE] * 3)
+
+        # Coordinates are converted from inches; omitted ones keep their value
+        np.testing.assert_allclose(commands['x'][:4], [0.0, 25.4, 25.4, 0.0])
+        np.testing.assert_allclose(commands['y'][:4], [0.0, 0.0, 25.4, 25.4])
+        np.testing.assert_allclose(commands['x0'][1:4], commands['x'][:3])
+
+        arc = commands[4]
+        self.assertEqual(arc['interpolation'], COUNTERCLOCKWISE)
+        self.assertTrue(arc['multi_quadrant'])
+        self.assertAlmostEqual(arc['i'], 12.7)
+
+        self.assertEqual(list(commands['aperture'][4:7]), [10, 11, 11])
+        self.assertEqual(list(commands['polarity'][5:8]), [DARK, CLEAR, DARK])
+        self.assertEqual(list(commands['region'][7:]), [0] * 4)
+        self.assertEqual(list(commands['region'][:7]), [-1] * 7)
+
+    def test_chunk_size_does_not_change_result(self):
+        """Test any split of the input decodes to the same commands."""
+        reference, tokenizer = decode(SAMPLE)
+        expected = summarize(tokenizer)
+        for chunk_size in (1, 2, 3, 7, 64):
+            commands, tokenizer = decode(SAMPLE, chunk_size)
+            np.testing.assert_array_equal(commands, reference)
+            self.assertEqual(summarize(tokenizer), expected)
+
+    def test_summary_counts_whole_file(self):
+        """Test counts and bounds stop at M02 and ignore comments."""
+        _, tokenizer = decode(SAMPLE)
+        summary = summarize(tokenizer)
+        self.assertEqual(summary['units'], 'IN')
+        self.assertEqual(summary['draw_commands'], 11)
+        self.assertEqual(summary['lines_count'], 3)
+        self.assertEqual(summary['arcs_count'], 1)
+        self.assertEqual(summary['flashes_count'], 2)
+        self.assertEqual(summary['regions_count'], 1)
+        self.assertEqual(summary['circular_apertures_count'], 1)
+        self.assertEqual(summary['rectangular_apertures_count'], 1)
+        self.assertAlmostEqual(summary['width'], 53.34)
+        self.assertAlmostEqual(summary['height'], 50.8)
+
+    def test_step_repeat(self):
+        """Test %SR blocks are decoded once and counted per copy."""
+        commands, tokenizer = decode(PANEL)
+        self.assertEqual(commands['step'].tolist(), [-1, 0, 0, 0, 0, 0, 0, 0, -1])
+        self.assertEqual(len(tokenizer.step_repeats), 1)
+        self.assertEqual(tokenizer.step_repeats[0].copies, 6)
+        np.testing.assert_allclose(tokenizer.step_repeats[0].offsets()[[1, 3]], [[30, 0], [0, 20]])
+
+        summary = summarize(tokenizer)
+        self.assertEqual(summary['lines_count'], 6)
+        self.assertEqual(summary['flashes_count'], 6 + 2)
+        self.assertEqual(summary['regions_count'], 6)
+        self.assertEqual(summary['boards_per_panel'], 6)
+        self.assertEqual(summary['bounds'], {"min_x": -5.0, "min_y": -5.0, "max_x": 100.0, "max_y": 25.0})
+        self.assertEqual(summary['board_bounds'], {"min_x": 0.0, "min_y": 0.0, "max_x": 10.0, "max_y": 5.0})
+        for chunk_size in (1, 7, 64):
+            self.assertEqual(summarize(decode(PANEL, chunk_size)[1]), summary)
+
+        # Without %SR there is one board and no board bounds
+        summary = summarize(decode(SAMPLE)[1])
+        self.assertEqual((summary['boards_per_panel'], summary['step_repeats']), (1, []))
+        self.assertNotIn('board_bounds', summary)
+
+    def test_trailing_zero_omission_and_incremental(self):
+        """Test %FST numbers are left-aligned and %FSI coordinates accumulate."""
+        commands, _ = decode(b"%FSTAX24Y24*%%MOMM*%%ADD10C,0.1*%D10*X1Y25D02*X15D01*M02*")
+        np.testing.assert_allclose(commands['x'], [10.0, 15.0])
+        np.testing.assert_allclose(commands['y'], [25.0, 25.0])
+
+        commands, _ = decode(b"%FSLIX24Y24*%%MOMM*%%ADD10C,0.1*%D10*X10000Y0D02*X10000D01*Y-5000D01*M02*")
+        np.testing.assert_allclose(commands['x'], [1.0, 2.0, 2.0])
+        np.testing.assert_allclose(commands['y'], [0.0, 0.0, -0.5])
+
+    def test_parse_gerber_file_reads_whole_file(self):
+        """Test the tool reports dimensions from coordinates past the first 10 KB."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(temp_dir, 'top.gbr')
+            with open(file_path, 'wb') as f:
+                f.write(b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.2*%\nD10*\nX0Y0D02*\n")
+                f.write(b"".join(b"X%dY%dD01*\n" % (i * 1000, i * 500) for i in range(5000)))
+                f.write(b"M02*\n")
+
+            self.assertEqual(summarize(scan_gerber(file_path, chunk_size=4096))['draw_commands'], 5001)
+
+            original_settings = AGENT_CONFIG["layer_cache"]
+            AGENT_CONFIG["layer_cache"] = {"path": os.path.join(temp_dir, 'cache')}
+            try:
+                result = parse_gerber_file(file_path, "copper_top")
+            finally:
+                AGENT_CONFIG["layer_cache"] = original_settings
+            self.assertTrue(result["success"])
+            self.assertAlmostEqual(result["width"], 4.999)
+            self.assertAlmostEqual(result["height"], 2.4995)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
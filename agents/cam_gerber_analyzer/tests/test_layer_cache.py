@@ -0,0 +1,179 @@
+"""Unit tests for the parsed-layer cache."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.layer_cache import PARSER_VERSION, LayerCache, get_layer_cache
+from agents.cam_gerber_analyzer.tools import parse_gerber_file
+from agents.cam_gerber_analyzer.tools.parse_drill_file import parse_drill_file
+
+LAYER = b"%FSLAX26Y26*%\n%MOMM*%\n%ADD10C,0.2*%\nD10*\nX0Y0D02*\nX5000000Y2000000D01*\nM02*\n"
+DRILL = b"M48\nMETRIC\nT01C0.300\n%\nT01\nX1000Y1000\nX2000Y1000\nM30\n"
+
+
+class CountingParser:
+    """Parser stub that records how often it runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, file_path):
+        self.calls += 1
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        return {
+            "success": True,
+            "size": len(content),
+            "sizes": {1: 0.1},
+            "points": np.arange(6, dtype=np.float64).reshape(3, 2),
+        }
+
+
+class TestLayerCache(unittest.TestCase):
+    """Test cases for the parsed-layer cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.original_settings = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": self.cache_dir, "max_entries": 8}
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        AGENT_CONFIG["layer_cache"] = self.original_settings
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_memory_and_disk_tiers(self):
+        """Test results are parsed once and survive a new process."""
+        path = self.write('top.gbr', LAYER)
+        parser = CountingParser()
+        cache = LayerCache(self.cache_dir)
+
+        first = cache.get_or_parse(path, "test", parser)
+        first["size"] = -1
+        second = cache.get_or_parse(path, "test", parser)
+        self.assertEqual(parser.calls, 1)
+        self.assertEqual(second["size"], len(LAYER))
+        # JSON types on every hit, and shared arrays are read-only
+        self.assertEqual(second["sizes"], {"1": 0.1})
+        self.assertFalse(second["points"].flags.writeable)
+
+        restarted = LayerCache(self.cache_dir)
+        third = restarted.get_or_parse(path, "test", parser)
+        self.assertEqual(parser.calls, 1)
+        self.assertEqual(third["sizes"], second["sizes"])
+        np.testing.assert_array_equal(third["points"], second["points"])
+
+    def test_key_follows_content(self):
+        """Test copies share an entry and edits invalidate it."""
+        path = self.write('top.gbr', LAYER)
+        copy_path = self.write('copy.gbr', LAYER)
+        parser = CountingParser()
+        cache = LayerCache(self.cache_dir)
+
+        cache.get_or_parse(path, "test", parser)
+        cache.get_or_parse(copy_path, "test", parser)
+        self.assertEqual(parser.calls, 1)
+
+        # A different kind of parse is a different entry
+        cache.get_or_parse(path, "other", parser)
+        self.assertEqual(parser.calls, 2)
+
+        with open(path, 'ab') as f:
+            f.write(b"G04 edited*\n")
+        self.assertEqual(cache.get_or_parse(path, "test", parser)["size"], len(LAYER) + 12)
+        self.assertEqual(parser.calls, 3)
+
+    def test_failures_are_not_cached(self):
+        """Test failed parses run again next time."""
+        path = self.write('bad.gbr', b"")
+        calls = []
+
+        def failing(file_path):
+            calls.append(file_path)
+            return {"success": False, "error": "broken"}
+
+        cache = LayerCache(None)
+        self.assertFalse(cache.get_or_parse(path, "test", failing)["success"])
+        self.assertFalse(cache.get_or_parse(path, "test", failing)["success"])
+        self.assertEqual(len(calls), 2)
+
+    def test_disk_tier_is_pruned(self):
+        """Test old versions go first, then the least recently used entries over max_disk_mb."""
+        parser = CountingParser()
+        stale = os.path.join(self.cache_dir, 'ab', f'ab{"0" * 62}-test-v{PARSER_VERSION - 1}')
+        abandoned = os.path.join(self.cache_dir, 'ab', '.tmp-abandoned')
+        for path in (stale, abandoned):
+            os.makedirs(path)
+        os.utime(abandoned, (0, 0))
+
+        cache = LayerCache(self.cache_dir, max_entries=0)
+        paths = [self.write(f'{n}.gbr', LAYER + b"G04 %d*\n" % n) for n in range(3)]
+        cache.get_or_parse(paths[0], "test", parser)
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(abandoned))
+
+        entry = cache._path(cache.key(paths[0], "test"))
+        size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+        for n, path in enumerate(paths[1:], 1):
+            cache.get_or_parse(path, "test", parser)
+            os.utime(cache._path(cache.key(path, "test")), (n * 10, n * 10))
+        os.utime(entry, (0, 0))
+        # Loading the first entry makes it the most recently used
+        cache.get_or_parse(paths[0], "test", parser)
+        self.assertEqual(parser.calls, 3)
+
+        result = cache.prune(2 * size)
+        self.assertEqual(result["removed_entries"], 1)
+        self.assertFalse(os.path.exists(cache._path(cache.key(paths[1], "test"))))
+        self.assertTrue(os.path.exists(entry))
+        self.assertLessEqual(result["kept_bytes"], 2 * size)
+
+        # Saving past max_disk_mb prunes without being asked
+        limited = LayerCache(self.cache_dir, max_entries=0, max_disk_mb=2.5 * size / 1024 / 1024)
+        limited.get_or_parse(self.write('3.gbr', LAYER + b"G04 3*\n"), "test", parser)
+        limited.get_or_parse(self.write('4.gbr', LAYER + b"G04 4*\n"), "test", parser)
+        entries = [root for root, _, files in os.walk(self.cache_dir) if 'result.json' in files]
+        self.assertEqual(len(entries), 2)
+
+    def test_tools_share_the_cache(self):
+        """Test parse tools go through the configured cache."""
+        gerber_path = self.write('top.gbr', LAYER)
+        drill_path = self.write('board.drl', DRILL)
+
+        first = parse_gerber_file(gerber_path, "copper_top")
+        second = parse_gerber_file(gerber_path, "copper_bottom")
+        self.assertTrue(first["success"])
+        self.assertEqual(second["file_type"], "copper_bottom")
+        self.assertAlmostEqual(second["width"], 5.0)
+        self.assertEqual(len(get_layer_cache()._entries), 1)
+
+        drill = parse_drill_file(drill_path)
+        self.assertEqual(drill["total_holes"], 2)
+        self.assertEqual(drill["file_path"], drill_path)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(self.cache_dir)), 2)
+
+        missing = parse_gerber_file(os.path.join(self.temp_dir, 'missing.gbr'))
+        self.assertFalse(missing["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
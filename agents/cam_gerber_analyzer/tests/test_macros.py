@@ -0,0 +1,184 @@
+"""Correctness tests for aperture macro compilation and macro flashes."""
+
+import unittest
+import os
+import sys
+import math
+import tempfile
+import shutil
+from collections import defaultdict
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.engine.copper_area import copper_coverage
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import CLEAR, DARK, scan_gerber, summarize
+from agents.cam_gerber_analyzer.engine.macros import compile_macro, macro_template
+
+# KiCad's rounded rectangle: a polygon body, corner circles and edge lines
+ROUND_RECT = """0 Rectangle with rounded corners*
+4,1,4,$2,$3,$4,$5,$6,$7,$8,$9,$2,$3,0*
+1,1,$1+$1,$2,$3*
+1,1,$1+$1,$4,$5*
+1,1,$1+$1,$6,$7*
+1,1,$1+$1,$8,$9*
+20,1,$1+$1,$2,$3,$4,$5,0*
+20,1,$1+$1,$4,$5,$6,$7,0*
+20,1,$1+$1,$6,$7,$8,$9,0*
+20,1,$1+$1,$8,$9,$2,$3,0*"""
+
+# 2.5 x 1.6 mm rounded rectangles (0.25 mm corners) defined in inches, and
+# 2 mm donuts cut by an exposure-off hole, one flashed clear
+LAYER = b"""%FSLAX46Y46*%
+%MOIN*%
+%AMRoundRect*
+""" + ROUND_RECT.replace("*\n", "*\r\n").encode() + b"""%
+%AMDONUT*
+$3=$1x0.5*
+1,1,$1,0,0*
+1,0,$2,0,0,$3*%
+%ADD10RoundRect,0.009843X-0.039370X-0.021654X0.039370X-0.021654X0.039370X0.021654X-0.039370X0.021654X0*%
+%ADD11DONUT,0.078740X0.039370*%
+D10*
+X0Y0D03*
+X1000000Y0D03*
+X2000000Y0D03*
+D11*
+X0Y1000000D03*
+%LPC*%
+X1000000Y1000000D03*
+M02*
+"""
+
+# A 10 mm square pour with the 2 mm donut flashed at its centre
+POUR = b"""%FSLAX46Y46*%
+%MOMM*%
+%AMDONUT*
+1,1,2,0,0*
+1,0,1,0,0*%
+%ADD10DONUT*%
+G36*
+X-5000000Y-5000000D02*
+G01*
+X5000000Y-5000000D01*
+X5000000Y5000000D01*
+X-5000000Y5000000D01*
+X-5000000Y-5000000D01*
+G37*
+D10*
+X0Y0D03*
+M02*
+"""
+
+
+def polygon_area(x0, y0, x1, y1):
+    """Signed area enclosed by edges (shoelace)."""
+    return float(np.sum(x0 * y1 - x1 * y0) / 2)
+
+
+class TestMacros(unittest.TestCase):
+    """Test cases for compiled aperture macros."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_expressions(self):
+        """Test arithmetic, x as multiplication, assignments and undefined variables."""
+        evaluate = compile_macro("$4=($1+$2)x2-$3/4*1,1,$4,-$1,$7*5,1,6,0,0,2x$1,30*")
+        primitives = evaluate(defaultdict(float, {1: 1.0, 2: 2.0, 3: 8.0}))
+        self.assertEqual(primitives, [(1, (1.0, 4.0, -1.0, 0.0)), (5, (1.0, 6.0, 0.0, 0.0, 2.0, 30.0))])
+
+        # Anything but arithmetic is rejected, and the template is None
+        self.assertIsNone(macro_template("1,1,__import__('os'),0,0*", ()))
+        self.assertIsNone(macro_template("1,1,$1/$2,0,0*", (1.0, 0.0)))
+
+    def test_templates(self):
+        """Test primitive outlines and the template cache."""
+        params = (0.25, -1.0, -0.55, 1.0, -0.55, 1.0, 0.55, -1.0, 0.55)
+        template = macro_template(ROUND_RECT, params)
+        self.assertIs(macro_template(ROUND_RECT, params), template)
+        self.assertEqual(template.shapes, 9)
+        self.assertAlmostEqual(template.size, 2.5)
+
+        # Every circle and outline is counterclockwise
+        for shape in range(9):
+            edges = template.shape == shape
+            self.assertGreater(polygon_area(template.x0[edges], template.y0[edges],
+                                            template.x1[edges], template.y1[edges]), 0)
+
+        # Thermal: four quarters of the ring outside a 0.2 mm cross
+        thermal = macro_template("7,0,0,2,1,0.2,0*", ())
+        self.assertEqual(thermal.shapes, 4)
+        area = polygon_area(thermal.x0, thermal.y0, thermal.x1, thermal.y1)
+        self.assertAlmostEqual(area, math.pi * 0.75 - 4 * 0.2 * 0.5, delta=0.02)
+
+        # Rotation turns the whole macro about its origin
+        rotated = macro_template("21,1,2,1,1,0,90*", ())
+        self.assertAlmostEqual(float(np.ptp(rotated.x0)), 1.0)
+        self.assertAlmostEqual(float(np.ptp(rotated.y0)), 2.0)
+
+    def test_macro_flashes(self):
+        """Test macro flashes become translated regions of the template."""
+        file_path = os.path.join(self.temp_dir, 'macros.gbr')
+        with open(file_path, 'wb') as f:
+            f.write(LAYER)
+        geometry = build_geometry(file_path)
+        self.assertEqual(len(geometry.flashes), 5)
+
+        regions = geometry.regions
+        # Three rounded rectangles of 9 primitives and two donuts, each one ring
+        self.assertEqual(len(np.unique(regions['region'])), 3 * 9 + 2)
+        pad = regions[regions['region'] < 9]
+        np.testing.assert_allclose([pad['x0'].min(), pad['x0'].max(), pad['y0'].min(), pad['y0'].max()],
+                                   [-1.25, 1.25, -0.8, 0.8], atol=1e-4)
+        second = regions[(regions['region'] >= 9) & (regions['region'] < 18)]
+        np.testing.assert_allclose(second['x0'], pad['x0'] + 25.4)
+        # The hole is cut out of each donut, which keeps its flash's polarity
+        donut = regions[regions['region'] >= 27]
+        self.assertEqual(sorted(set(zip(donut['region'].tolist(), donut['polarity'].tolist()))),
+                         [(27, DARK), (28, CLEAR)])
+
+        # Copper: three rounded rectangles and one donut
+        coverage = copper_coverage(geometry, {"min_x": -2, "min_y": -2, "max_x": 53, "max_y": 27},
+                                   pixel_mm=0.01, cell_mm=1.0)
+        expected = 3 * (2.5 * 1.6 - (4 - math.pi) * 0.25 ** 2) + math.pi * (1.0 ** 2 - 0.5 ** 2)
+        self.assertAlmostEqual(coverage.area, expected, delta=0.05)
+
+        summary = summarize(scan_gerber(file_path))
+        self.assertEqual(summary["macro_apertures_count"], 2)
+        self.assertAlmostEqual(summary["max_aperture_size"], 2.5, places=3)
+
+    def test_exposure_off_cuts_only_the_macro(self):
+        """Test a donut's hole does not erase the pour it is flashed on."""
+        file_path = os.path.join(self.temp_dir, 'pour.gbr')
+        with open(file_path, 'wb') as f:
+            f.write(POUR)
+        geometry = build_geometry(file_path)
+        self.assertTrue((geometry.regions['polarity'] == DARK).all())
+        coverage = copper_coverage(geometry, {"min_x": -6, "min_y": -6, "max_x": 6, "max_y": 6},
+                                   pixel_mm=0.01, cell_mm=1.0)
+        self.assertAlmostEqual(coverage.area, 100.0, delta=0.05)
+
+        # Cuts reaching past one outline split it; the area is the outline's less the cut
+        notched = macro_template("21,1,2,2,0,0,0*1,0,1,1,1*", ())
+        self.assertEqual(notched.shapes, 1)
+        # A quarter of the 1 mm cut, a 32-gon
+        polygon = 32 / 2 * 0.5 ** 2 * math.sin(2 * math.pi / 32) / 4
+        self.assertAlmostEqual(polygon_area(notched.x0, notched.y0, notched.x1, notched.y1), 4 - polygon, places=6)
+        crossed = macro_template("1,1,2,0,0*21,0,1.6,0.2,0,0,0*21,0,0.2,1.6,0,0,0*", ())
+        disc = 32 / 2 * math.sin(2 * math.pi / 32)
+        self.assertAlmostEqual(polygon_area(crossed.x0, crossed.y0, crossed.x1, crossed.y1),
+                               disc - (2 * 1.6 * 0.2 - 0.2 * 0.2), places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
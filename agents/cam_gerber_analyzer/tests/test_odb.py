@@ -0,0 +1,277 @@
+"""Correctness tests for the lazy ODB++ reader."""
+
+import unittest
+import os
+import sys
+import io
+import tarfile
+import tempfile
+import shutil
+import zipfile
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.geometry import SHAPE_CIRCLE, SHAPE_OBROUND, SHAPE_RECTANGLE
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import CLEAR, DARK
+from agents.cam_gerber_analyzer.engine.odb import (
+    OdbJob, decode_features, decode_matrix, feature_symbols, load_odb_geometries, uncompress_z,
+)
+from agents.cam_gerber_analyzer.tools.parse_odbp_file import parse_odbp_file
+
+MATRIX = b"""STEP {
+   COL=1
+   NAME=PCB
+}
+LAYER {
+   ROW=2
+   CONTEXT=BOARD
+   TYPE=SIGNAL
+   NAME=BOTTOM
+   POLARITY=POSITIVE
+}
+LAYER {
+   ROW=1
+   CONTEXT=BOARD
+   TYPE=SIGNAL
+   NAME=TOP
+   POLARITY=POSITIVE
+}
+LAYER {
+   ROW=3
+   CONTEXT=MISC
+   TYPE=DOCUMENT
+   NAME=NOTES
+}
+"""
+
+PROFILE = b"""UNITS=MM
+#
+S P 0
+OB 0 0 I
+OS 50 0
+OS 50 30
+OS 0 30
+OE
+SE
+"""
+
+# Inch units: symbol sizes in mils
+TOP = b"""UNITS=INCH
+$0 r10
+$1 rect40x20
+$2 oval30x60 M
+#
+@0 .smd
+L 0 0 1 0 0 P 0 ;0
+P 1 1 1 P 0 0
+P 2 1 1 N 0 1
+P 3 1 -1 2 P 0 8 270.0
+P 4 1 2 P 0 0
+A 1 0 0 1 0 0 0 P 0 N
+T 1 1 standard P 0 0.1 0.1 1 'REF' 1
+S P 0
+OB 0 0 I
+OS 1 0
+OC 0 1 0 0 N
+OE
+OB 0.1 0.1 H
+OS 0.2 0.1
+OS 0.2 0.2
+OE
+SE
+"""
+
+# Enough lines that compressed codes widen past 9 bits
+BOTTOM = b"UNITS=MM\n$0 r100\n" + b"".join(
+    b"L %d 0 %d 5 0 P 0\n" % (n, n) for n in range(400)
+)
+
+
+def compress_z(data: bytes) -> bytes:
+    """Unix compress (16 bit codes, no clear codes), for fixtures."""
+    table = {bytes((i,)): i for i in range(256)}
+    codes, word = [], b''
+    for byte in data:
+        candidate = word + bytes((byte,))
+        if candidate in table:
+            word = candidate
+            continue
+        codes.append(table[word])
+        if len(table) + 1 < 1 << 16:
+            table[candidate] = len(table) + 1
+        word = bytes((byte,))
+    if word:
+        codes.append(table[word])
+    bits, group, position, value = 9, 0, 0, 0
+    for count, code in enumerate(codes):
+        if count and 256 + count > (1 << bits) - 1 and bits < 16:
+            span = bits * 8
+            position = group = group + -(-(position - group) // span) * span
+            bits += 1
+        value |= code << position
+        position += bits
+    return b'\x1f\x9d\x90' + value.to_bytes((position + 7) // 8, 'little')
+
+
+JOB = {
+    'matrix/matrix': MATRIX,
+    'steps/pcb/profile': PROFILE,
+    'steps/pcb/layers/top/features': TOP,
+    'steps/pcb/layers/bottom/features.Z': compress_z(BOTTOM),
+    'steps/pcb/stephdr': b'UNITS=MM\n',
+}
+
+
+class TestDecoders(unittest.TestCase):
+    """Test the member decoders."""
+
+    def test_uncompress_z(self):
+        for data in (b'', b'a', b'abababababababab' * 200, BOTTOM):
+            self.assertEqual(uncompress_z(compress_z(data)), data)
+        with self.assertRaises(ValueError):
+            uncompress_z(b'plain text')
+
+    def test_matrix(self):
+        matrix = decode_matrix(MATRIX)
+        self.assertEqual(matrix["steps"], [{"name": "pcb", "col": 1}])
+        self.assertEqual([layer["name"] for layer in matrix["layers"]], ["top", "bottom", "notes"])
+        self.assertEqual(matrix["layers"][0]["type"], "signal")
+        self.assertEqual(matrix["layers"][2]["polarity"], "positive")
+
+    def test_features(self):
+        """Test inch coordinates and mil symbols become millimetres."""
+        geometry = decode_features(TOP)
+        np.testing.assert_allclose(geometry.lines[['x0', 'y0', 'x1', 'y1']].tolist(), [(0, 0, 25.4, 0)])
+        self.assertEqual(geometry.lines['aperture_id'][0], 0)
+        self.assertEqual(feature_symbols(TOP), ["oval30x60 M", "r10", "rect40x20"])
+
+        # Pads: plain, negative and quarter-turned, a resized standard symbol, a metric symbol
+        np.testing.assert_allclose(geometry.flashes['x0'], [25.4, 50.8, 76.2, 101.6])
+        self.assertEqual(geometry.flashes['aperture_id'].tolist(), [2, 3, -1, 4])
+        self.assertEqual(geometry.flashes['polarity'].tolist(), [DARK, CLEAR, DARK, DARK])
+
+        apertures = {row['id']: row for row in geometry.apertures}
+        self.assertEqual(apertures[0]['shape'], SHAPE_CIRCLE)
+        self.assertAlmostEqual(apertures[0]['width'], 0.254)
+        self.assertEqual(apertures[2]['shape'], SHAPE_RECTANGLE)
+        self.assertAlmostEqual(apertures[2]['width'], 1.016)
+        self.assertAlmostEqual(apertures[3]['width'], 0.508)
+        self.assertEqual(apertures[4]['shape'], SHAPE_OBROUND)
+        self.assertAlmostEqual(apertures[4]['height'], 0.06)
+
+        arc = geometry.arcs[0]
+        self.assertEqual((arc['cx'], arc['cy'], bool(arc['clockwise'])), (0.0, 0.0, False))
+        self.assertAlmostEqual(arc['y1'], 25.4)
+
+    def test_surfaces(self):
+        """Test contours become closed regions, holes clear and arc edges flattened."""
+        regions = decode_features(TOP).regions
+        self.assertEqual(sorted(set(regions['region'].tolist())), [0, 1])
+        island, hole = regions[regions['region'] == 0], regions[regions['region'] == 1]
+        self.assertTrue((island['polarity'] == DARK).all())
+        self.assertTrue((hole['polarity'] == CLEAR).all())
+        self.assertEqual(len(hole), 3)
+        self.assertGreater(len(island), 3)
+        # The quarter circle's chords stay on its radius
+        radius = np.hypot(island['x1'], island['y1'])
+        self.assertTrue(np.any(np.isclose(radius, 25.4) & (island['x1'] > 0) & (island['y1'] > 0)))
+
+    def test_profile_bounds(self):
+        self.assertEqual(decode_features(PROFILE).bounds, {"min_x": 0.0, "min_y": 0.0, "max_x": 50.0, "max_y": 30.0})
+
+
+class TestOdbJob(unittest.TestCase):
+    """Test archives are indexed and read member by member, in every container."""
+
+    def setUp(self):
+        """Write the job as a tgz, a zip and a directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 16}
+        self.paths = {}
+
+        self.paths['tar'] = os.path.join(self.temp_dir, 'job.tgz')
+        with tarfile.open(self.paths['tar'], 'w:gz') as tar:
+            for name, content in JOB.items():
+                info = tarfile.TarInfo('board/' + name)
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+
+        self.paths['zip'] = os.path.join(self.temp_dir, 'job.zip')
+        with zipfile.ZipFile(self.paths['zip'], 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+            for name, content in JOB.items():
+                zip_ref.writestr('exports/board/' + name, content)
+
+        self.paths['directory'] = os.path.join(self.temp_dir, 'board')
+        for name, content in JOB.items():
+            path = os.path.join(self.paths['directory'], *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_index_and_read(self):
+        for fmt, path in self.paths.items():
+            job = OdbJob.open(path)
+            self.assertEqual(job.format, fmt)
+            self.assertEqual(sorted(job.members), sorted(name.lower() for name in JOB))
+            self.assertEqual(job.steps, ['pcb'])
+            self.assertEqual(job.layers('pcb'), ['bottom', 'top'])
+
+            contents = job.read('matrix/matrix', 'steps/pcb/layers/bottom/features', 'steps/pcb/missing')
+            self.assertEqual(contents, {'matrix/matrix': MATRIX, 'steps/pcb/layers/bottom/features': BOTTOM})
+            self.assertEqual(len(job.features('pcb', 'bottom').lines), 400)
+            self.assertIsNone(job.features('pcb', 'missing'))
+
+    def test_nothing_is_extracted(self):
+        before = sorted(os.listdir(self.temp_dir))
+        parse_odbp_file(archive_path=self.paths['tar'], layers=['top'])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), before)
+
+    def test_not_an_archive(self):
+        path = os.path.join(self.temp_dir, 'notes.txt')
+        with open(path, 'wb') as f:
+            f.write(b'not an archive')
+        with self.assertRaises(ValueError):
+            OdbJob.open(path)
+
+    def test_cached_geometry(self):
+        first = load_odb_geometries(self.paths['zip'], 'pcb', ['top', 'bottom', None])
+        self.assertTrue(all(result["success"] for result in first))
+        second = load_odb_geometries(self.paths['zip'], 'pcb', ['top'])[0]
+        np.testing.assert_array_equal(second["flashes"], first[0]["flashes"])
+        self.assertFalse(load_odb_geometries(self.paths['zip'], 'pcb', ['missing'])[0]["success"])
+
+    def test_parse_odbp_file(self):
+        for key, path in self.paths.items():
+            if key == 'directory':
+                result = parse_odbp_file(directory_path=path, layers=['TOP', 'bottom', 'missing'])
+            else:
+                result = parse_odbp_file(archive_path=path, layers=['TOP', 'bottom', 'missing'])
+            self.assertTrue(result["success"], result.get("error"))
+            self.assertEqual(result["file_count"], len(JOB))
+            self.assertEqual(result["structure"], {"has_steps": True, "has_matrix": True, "has_layers": True})
+            self.assertEqual((result["step"], result["steps"]), ("pcb", ["pcb"]))
+            self.assertEqual((result["board_width"], result["board_height"]), (50.0, 30.0))
+            self.assertEqual(result["copper_layer_count"], 2)
+            self.assertEqual(result["layer_features"]["TOP"]["pads"], 4)
+            self.assertEqual(result["layer_features"]["TOP"]["symbols"], 3)
+            self.assertEqual(result["layer_features"]["bottom"]["symbols"], 1)
+            self.assertEqual(result["layer_features"]["bottom"]["lines"], 400)
+            self.assertIn("error", result["layer_features"]["missing"])
+
+        self.assertFalse(parse_odbp_file(archive_path=self.paths['tar'], step='panel')["success"])
+        self.assertFalse(parse_odbp_file()["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,318 @@
+"""Correctness tests for the tiled layer previews."""
+
+import unittest
+import os
+import sys
+import base64
+import struct
+import tempfile
+import shutil
+import zlib
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.engine.gerber_tokenizer import CLEAR, DARK
+from agents.cam_gerber_analyzer.engine.raster import LayerRaster, Pyramid, encode_png, layer_color
+from agents.cam_gerber_analyzer import tiles
+from agents.cam_gerber_analyzer.tiles import describe_layers, get_layer_tile, prune_tiles
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+# 10 mm square (counterclockwise) with a clear 4 mm square hole, and a
+# clockwise 2 mm square beside it
+REGIONS = b"""%FSLAX24Y24*%
+%MOMM*%
+G01*
+G36*
+X0Y0D02*
+X100000Y0D01*
+X100000Y100000D01*
+X0Y100000D01*
+X0Y0D01*
+G37*
+%LPC*%
+G36*
+X30000Y30000D02*
+X70000Y30000D01*
+X70000Y70000D01*
+X30000Y70000D01*
+X30000Y30000D01*
+G37*
+%LPD*%
+G36*
+X120000Y0D02*
+X120000Y20000D01*
+X140000Y20000D01*
+X140000Y0D01*
+X120000Y0D01*
+G37*
+M02*
+"""
+
+# 10 mm square, a clear 6 mm square over it, and a dark 2 mm square and
+# trace drawn over the clearance
+STACKED = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+G01*
+G36*
+X0Y0D02*
+X100000Y0D01*
+X100000Y100000D01*
+X0Y100000D01*
+X0Y0D01*
+G37*
+%LPC*%
+G36*
+X20000Y20000D02*
+X80000Y20000D01*
+X80000Y80000D01*
+X20000Y80000D01*
+X20000Y20000D01*
+G37*
+%LPD*%
+G36*
+X40000Y40000D02*
+X60000Y40000D01*
+X60000Y60000D01*
+X40000Y60000D01*
+X40000Y40000D01*
+G37*
+D10*
+X30000Y25000D02*
+X30000Y75000D01*
+M02*
+"""
+
+# 10 mm trace 1 mm wide
+TRACE = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,1.0000*%
+D10*
+X0Y0D02*
+X100000Y0D01*
+M02*
+"""
+
+# The trace stepped twice, 12 mm apart, and a 1 mm rail below drawn once
+PANEL = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,1.0000*%
+%SRX2Y1I12.0J0*%
+D10*
+X0Y0D02*
+X100000Y0D01*
+%SR*%
+X0Y-30000D02*
+X220000Y-30000D01*
+M02*
+"""
+
+
+def decode_png(data: bytes) -> np.ndarray:
+    """Boolean image of a 1-bit PNG written by encode_png."""
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks, offset = {}, 8
+    while offset < len(data):
+        length, tag = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks[tag] = chunks.get(tag, b'') + data[offset + 8:offset + 8 + length]
+        offset += length + 12
+    width, height = struct.unpack('>II', chunks[b'IHDR'][:8])
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, -1)
+    return np.unpackbits(rows[:, 1:], axis=1)[:, :width].astype(bool)
+
+
+class TestRaster(unittest.TestCase):
+    """Test layer geometry is drawn to the right pixels."""
+
+    def setUp(self):
+        """Create temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove temporary files."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def raster(self, content: bytes) -> LayerRaster:
+        path = os.path.join(self.temp_dir, 'layer.gbr')
+        with open(path, 'wb') as f:
+            f.write(content)
+        return LayerRaster(build_geometry(path))
+
+    def test_region_fill(self):
+        """Test regions of either winding are filled and clear holes erased."""
+        # 0.1 mm pixels over x -1..15, y -1..11
+        mask = self.raster(REGIONS).render(-1.0, 11.0, 0.1, 160, 120)
+        self.assertEqual(int(mask.sum()), 100 * 100 - 40 * 40 + 20 * 20)
+        self.assertTrue(mask[60, 15])          # (0.55, 4.95) in the square
+        self.assertFalse(mask[60, 60])         # (5.05, 4.95) in the hole
+        self.assertFalse(mask[115, 140])       # (13.05, -0.55) below it
+        self.assertTrue(mask[105, 140])        # (13.05, 0.45) in the clockwise square
+
+    def test_polarity_order(self):
+        """Test dark geometry after a clear level is drawn over the clearance."""
+        raster = self.raster(STACKED)
+        mask = raster.render(-1.0, 11.0, 0.1, 120, 120)
+        self.assertFalse(mask[60, 35])         # (2.55, 4.95) in the clearance
+        self.assertTrue(mask[60, 60])          # (5.05, 4.95) in the square over it
+        self.assertTrue(mask[60, 40])          # (3.05, 4.95) on the trace
+        self.assertTrue(mask[60, 15])          # (0.55, 4.95) in the pour
+        # Pour less clearance, plus the square and the 0.2 mm trace (2 columns,
+        # 52 rows with its caps)
+        self.assertEqual(int(mask.sum()), 100 * 100 - 60 * 60 + 20 * 20 + 2 * 52)
+        self.assertEqual(list(raster.polarity), [DARK, CLEAR, DARK])
+        # A window inside the clearance draws the same pixels
+        np.testing.assert_array_equal(raster.render(2.0, 8.0, 0.1, 50, 50), mask[30:80, 30:80])
+
+    def test_stroke(self):
+        """Test a trace covers its capsule and thin features stay visible."""
+        raster = self.raster(TRACE)
+        mask = raster.render(-1.0, 1.0, 0.1, 120, 20)
+        # Rows of pixel centres within 0.5 mm of the trace, round caps
+        self.assertEqual(mask[:, 60].sum(), 10)
+        self.assertTrue(mask[10, 6])           # (-0.35, -0.05) in the start cap
+        self.assertFalse(mask[2, 6])           # (-0.35, 0.75)
+        # At 2 mm pixels the trace still covers its row
+        coarse = raster.render(-2.0, 2.0, 2.0, 8, 2)
+        self.assertTrue(coarse[0, 1:6].all() or coarse[1, 1:6].all())
+
+    def test_step_and_repeat(self):
+        """Test every copy of a step-and-repeat block is drawn, and the rest once."""
+        path = os.path.join(self.temp_dir, 'panel.gbr')
+        with open(path, 'wb') as f:
+            f.write(PANEL)
+        geometry = build_geometry(path)
+        raster = LayerRaster(geometry)
+        mask = raster.render(-1.0, 1.0, 0.1, 240, 50)
+        # Both traces (x 0..10 and 12..22), nothing between them
+        self.assertEqual(mask[:20, 60].sum(), 10)
+        self.assertEqual(mask[:20, 180].sum(), 10)
+        self.assertFalse(mask[:20, 120].any())
+        # The rail once, under both boards
+        self.assertTrue(mask[40, 10:230].all())
+
+        # The whole panel fits the pyramid's first tile
+        pyramid = Pyramid.covering(geometry.panel_bounds, min_pixel_mm=0.1, margin=0)
+        tile = raster.render_tile(pyramid, 0, 0, 0)
+        columns = np.flatnonzero(tile.any(axis=0))
+        self.assertAlmostEqual((columns[-1] - columns[0] + 1) * pyramid.pixel_size(0), 23.0, delta=0.2)
+
+    def test_pyramid(self):
+        """Test zooms split a square extent covering the bounds."""
+        pyramid = Pyramid.covering({"min_x": 0, "min_y": 0, "max_x": 40, "max_y": 10},
+                                   min_pixel_mm=0.01, tile_size=256, margin=0)
+        self.assertEqual((pyramid.min_x, pyramid.min_y, pyramid.size), (0, -15, 40))
+        self.assertEqual(pyramid.max_zoom, 4)
+        self.assertAlmostEqual(pyramid.pixel_size(4), 40 / 4096)
+        self.assertEqual(pyramid.tile_origin(1, 1, 1), (20, 5))
+        self.assertTrue(pyramid.contains(4, 15, 15))
+        self.assertFalse(pyramid.contains(4, 16, 0))
+        self.assertFalse(pyramid.contains(5, 0, 0))
+
+    def test_png_round_trip(self):
+        """Test PNG encoding keeps every pixel."""
+        mask = np.random.default_rng(1).random((37, 29)) > 0.5
+        np.testing.assert_array_equal(decode_png(encode_png(mask, (200, 120, 50))), mask)
+
+
+class TestLayerTiles(unittest.TestCase):
+    """Test tiles of an analysis are served and cached."""
+
+    def setUp(self):
+        """Point the agent at a temporary database, store and caches."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        self.original_tiles = AGENT_CONFIG["tiles"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 8}
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+        AGENT_CONFIG["tiles"] = dict(self.original_tiles, path=os.path.join(self.temp_dir, 'tiles'))
+        # Analysis IDs restart with each database
+        tiles._analyses.clear()
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["upload_store"] = self.original_store
+        AGENT_CONFIG["tiles"] = self.original_tiles
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_tiles(self):
+        """Test a tile is drawn once, saved and looked up by layer."""
+        upload = upload_design_files([
+            {"filename": "top.gbr", "content": base64.b64encode(REGIONS).decode(), "file_type": "copper_top"},
+        ])
+        self.assertTrue(upload["success"], upload.get("error"))
+        analysis_id = upload["analysis_id"]
+
+        layers = describe_layers(analysis_id)
+        self.assertTrue(layers["success"], layers.get("error"))
+        self.assertEqual(layers["layers"][0]["file_type"], "copper_top")
+        extent = layers["extent"]
+        self.assertLessEqual(extent["min_x"], 0)
+        self.assertGreaterEqual(extent["max_x"], 14)
+
+        tile = get_layer_tile(analysis_id, "copper_top", 0, 0, 0)
+        mask = decode_png(tile.data)
+        self.assertEqual(mask.shape, (256, 256))
+        self.assertTrue(mask.any() and not mask.all())
+        cached = [os.path.join(root, name) for root, _, names in os.walk(AGENT_CONFIG["tiles"]["path"])
+                  for name in names]
+        self.assertEqual(len(cached), 1)
+        self.assertTrue(cached[0].endswith(os.path.join('0', '0', '0.png')))
+
+        again = get_layer_tile(analysis_id, str(layers["layers"][0]["id"]), 0, 0, 0)
+        self.assertEqual((again.data, again.etag), (tile.data, tile.etag))
+
+        with self.assertRaises(LookupError):
+            get_layer_tile(analysis_id, "copper_top", 0, 1, 0)
+        with self.assertRaises(LookupError):
+            get_layer_tile(analysis_id, "silkscreen_top", 0, 0, 0)
+
+    def test_tiles_are_pruned(self):
+        """Test tiles of old versions go first, then the least recently used variants."""
+        upload = upload_design_files([
+            {"filename": "top.gbr", "content": base64.b64encode(REGIONS).decode(), "file_type": "copper_top"},
+            {"filename": "bottom.gbr", "content": base64.b64encode(b"G04 bottom*\n" + REGIONS).decode(),
+             "file_type": "copper_bottom"},
+        ])
+        analysis_id = upload["analysis_id"]
+        top = get_layer_tile(analysis_id, "copper_top", 0, 0, 0)
+        get_layer_tile(analysis_id, "copper_bottom", 0, 0, 0)
+
+        tiles_dir = AGENT_CONFIG["tiles"]["path"]
+        layers = sorted(os.listdir(tiles_dir))
+        variants = [os.path.join(tiles_dir, layer, name) for layer in layers
+                    for name in os.listdir(os.path.join(tiles_dir, layer))]
+        self.assertEqual(len(variants), 2)
+        stale = [os.path.join(tiles_dir, layers[0], 'ffff-000000-r0', '0', '0'),
+                 os.path.join(tiles_dir, 'ab-geometry-v0', 'ffff-000000-r0', '0', '0')]
+        for path in stale:
+            os.makedirs(path)
+        result = prune_tiles()
+        self.assertEqual(result["removed_entries"], 2)
+        self.assertEqual(sorted(os.listdir(tiles_dir)), layers)
+
+        # Reading a tile keeps its variant
+        for variant in variants:
+            os.utime(variant, (0, 0))
+        get_layer_tile(analysis_id, "copper_top", 0, 0, 0)
+        result = prune_tiles(max_bytes=len(top.data))
+        self.assertEqual(result["removed_entries"], 1)
+        self.assertEqual(result["kept_bytes"], len(top.data))
+        kept = [variant for variant in variants if os.path.exists(variant)]
+        self.assertEqual(len(kept), 1)
+        self.assertIn('%02x%02x%02x' % layer_color("copper_top"), kept[0])
+        self.assertEqual(get_layer_tile(analysis_id, "copper_top", 0, 0, 0).data, top.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
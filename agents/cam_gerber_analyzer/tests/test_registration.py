@@ -0,0 +1,142 @@
+"""Correctness tests for drill-to-pad registration."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.engine.drill import read_drill_holes
+from agents.cam_gerber_analyzer.engine.geometry import build_geometry
+from agents.cam_gerber_analyzer.engine.registration import register_drills
+from agents.cam_gerber_analyzer.models import DesignFile
+from agents.cam_gerber_analyzer.tools.extract_design_rules import analyze_all_layers_for_design_rules
+
+# 0.6 mm round pads at x = 0, 2, 4 and 6, and a 1.0 x 2.0 mm obround at x = 10
+COPPER = b"""%FSLAX26Y26*%
+%MOMM*%
+%ADD10C,0.600000*%
+%ADD11O,1.000000X2.000000*%
+D10*
+X0Y0D03*
+X2000000Y0D03*
+X4000000Y0D03*
+X6000000Y0D03*
+D11*
+X10000000Y0D03*
+M02*
+"""
+
+# 0.3 mm hits: centred, 0.1 mm off, 0.2 mm off (breakout), 0.4 mm off the
+# last round pad (touching its edge only), 0.4 mm along the obround, and
+# one with no pad
+DRILL = b"""M48
+METRIC
+T1C0.300
+%
+T1
+X0.000Y0.000
+X2.100Y0.000
+X4.000Y0.200
+X6.400Y0.000
+X10.000Y0.400
+X20.000Y20.000
+M30
+"""
+
+
+class TestRegisterDrills(unittest.TestCase):
+    """Test hits are matched to their pads with the right ring."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = {}
+        for name, content in (('copper_top.gbr', COPPER), ('drill.drl', DRILL)):
+            self.paths[name] = os.path.join(self.temp_dir, name)
+            with open(self.paths[name], 'wb') as f:
+                f.write(content)
+        self.registration = register_drills(build_geometry(self.paths['copper_top.gbr']),
+                                            read_drill_holes(self.paths['drill.drl']))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_rings(self):
+        np.testing.assert_array_equal(self.registration.pad, [0, 1, 2, 3, 4, -1])
+        np.testing.assert_allclose(self.registration.ring, [0.15, 0.05, -0.05, -0.25, 0.35, np.nan], atol=1e-9)
+        np.testing.assert_allclose(self.registration.offset[:5], [0.0, 0.1, 0.2, 0.4, 0.0], atol=1e-9)
+        np.testing.assert_allclose(self.registration.breakout_risk[:5], [0.0, 2 / 3, 4 / 3, 8 / 3, 0.0], atol=1e-9)
+        np.testing.assert_array_equal(self.registration.breakout, [False, False, True, True, False, False])
+
+    def test_summary(self):
+        """Test the minimum, distribution and offenders, worst first."""
+        summary = self.registration.summary(min_ring=0.1)
+        self.assertEqual((summary["hits"], summary["registered_hits"], summary["unregistered_hits"]), (6, 5, 1))
+        self.assertEqual(summary["min_annular_ring_mm"], -0.25)
+        self.assertEqual((summary["breakouts"], summary["below_minimum"]), (2, 3))
+        self.assertEqual(sum(summary["ring_histogram"].values()), 5)
+        self.assertEqual(summary["ring_histogram"]["<0.0"], 2)
+        self.assertEqual([(o["x"], o["y"]) for o in summary["offenders"]], [(6.4, 0.0), (4.0, 0.2), (2.1, 0.0)])
+
+        self.assertEqual(self.registration.summary()["below_minimum"], 2)
+        self.assertEqual(len(self.registration.summary(max_offenders=1)["offenders"]), 1)
+
+    def test_several_drill_files(self):
+        """Test the hits of several files are registered together, in file order."""
+        drills = read_drill_holes(self.paths['drill.drl'])
+        both = register_drills(build_geometry(self.paths['copper_top.gbr']), drills, drills)
+        self.assertEqual(len(both), 12)
+        np.testing.assert_array_equal(both.pad, np.tile(self.registration.pad, 2))
+
+
+class TestAnalyzeAllLayers(unittest.TestCase):
+    """Test the design rules report measured annular rings."""
+
+    def setUp(self):
+        """Point the agent at a temporary database and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_measured_annular_ring(self):
+        db = CamGerberDatabase()
+        analysis_id = db.create_analysis("tester", "Registration")
+        for filename, content, file_format, file_type in (
+            ('copper_top.gbr', COPPER, "gerber", "elec_top"),
+            ('drill.drl', DRILL, "drill", "drill"),
+        ):
+            path = os.path.join(self.temp_dir, filename)
+            with open(path, 'wb') as f:
+                f.write(content)
+            db.save_design_file(DesignFile(analysis_id=analysis_id, filename=filename, file_format=file_format,
+                                           file_type=file_type, file_path=path, file_size=len(content)))
+
+        result = analyze_all_layers_for_design_rules(analysis_id)
+        self.assertTrue(result["success"], result.get("error"))
+        self.assertTrue(result["annular_ring_measured"])
+        self.assertEqual(result["min_annular_ring_mm"], -0.25)
+        self.assertEqual(result["drill_breakouts"], 2)
+        registration = result["layer_results"]["elec_top"]["drill_registration"]
+        self.assertEqual(registration["offenders"][0]["x"], 6.4)
+
+
+if __name__ == '__main__':
+    unittest.main()
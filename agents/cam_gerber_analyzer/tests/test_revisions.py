@@ -0,0 +1,159 @@
+"""Tests for analysis revisions and incremental re-analysis."""
+
+import unittest
+import os
+import sys
+import base64
+import io
+import tempfile
+import zipfile
+import shutil
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+from agents.cam_gerber_analyzer.tools.perform_cam_analysis import perform_cam_analysis
+from agents.cam_gerber_analyzer.tools.upload_design_files import upload_design_files
+
+# Two traces 0.05 mm apart ending in pads over the drill hits
+TOP = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+%ADD11C,1.0000*%
+D10*
+X0Y0D02*
+X60000Y0D01*
+X0Y2500D02*
+X40000Y2500D01*
+Y30000D01*
+X60000D01*
+D11*
+X60000Y0D03*
+X60000Y30000D03*
+M02*
+"""
+
+BOTTOM = b"""%FSLAX24Y24*%
+%MOMM*%
+%ADD10C,0.2000*%
+%ADD11C,1.0000*%
+D11*
+X60000Y0D03*
+X60000Y30000D03*
+D10*
+X10000Y10000D02*
+X50000Y10000D01*
+M02*
+"""
+
+# The bottom trace redrawn with a 0.05 mm aperture
+BOTTOM_FIXED = BOTTOM.replace(b"%ADD10C,0.2000*%", b"%ADD10C,0.0500*%")
+
+DRILL = b"""M48
+METRIC
+T1C0.300
+%
+T1
+X6.0Y0.0
+X6.0Y3.0
+M30
+"""
+
+
+def encode(name: str, content: bytes, file_type: str) -> dict:
+    return {"filename": name, "content": base64.b64encode(content).decode(), "file_type": file_type}
+
+
+def board_zip() -> dict:
+    """The first revision as an archive, so the drill file is read as one."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_ref:
+        for name, content in (("copper_top.gbr", TOP), ("copper_bottom.gbr", BOTTOM), ("drill.exc", DRILL)):
+            zip_ref.writestr(name, content)
+    return encode("board.zip", buffer.getvalue(), "other")
+
+
+class TestRevisions(unittest.TestCase):
+    """Test revisions carry unchanged files over and reuse their results."""
+
+    def setUp(self):
+        """Point the agent at a temporary database, store and cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        self.original_store = AGENT_CONFIG["upload_store"]
+        AGENT_CONFIG["database"]["path"] = os.path.join(self.temp_dir, 'cam.db')
+        AGENT_CONFIG["layer_cache"] = {"path": os.path.join(self.temp_dir, 'cache'), "max_entries": 8}
+        AGENT_CONFIG["upload_store"] = dict(self.original_store, path=os.path.join(self.temp_dir, 'store'))
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        AGENT_CONFIG["upload_store"] = self.original_store
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_revision_upload(self):
+        """Test a revision replaces the uploaded layers and keeps the others."""
+        first = upload_design_files([board_zip()], project_name="Rev test")
+        self.assertTrue(first["success"], first.get("error"))
+        second = upload_design_files([encode("bottom_v2.gbr", BOTTOM_FIXED, "copper_bottom")],
+                                     parent_analysis_id=first["analysis_id"])
+        self.assertTrue(second["success"], second.get("error"))
+        self.assertEqual(sorted(second["carried_files"]), ["copper_top.gbr", "drill.exc"])
+
+        db = CamGerberDatabase()
+        analysis = db.get_analysis(second["analysis_id"])
+        self.assertEqual((analysis.parent_id, analysis.revision, analysis.project_name),
+                         (first["analysis_id"], 2, "Rev test"))
+        files = {df.filename: df for df in db.get_design_files(second["analysis_id"])}
+        self.assertEqual(sorted(files), ["bottom_v2.gbr", "copper_top.gbr", "drill.exc"])
+        # Carried files reference the stored blobs again
+        self.assertEqual(db.get_blob_references()[files["copper_top.gbr"].sha256], 2)
+        self.assertFalse(upload_design_files([], parent_analysis_id=999)["success"])
+
+    def test_replacement_keeps_type(self):
+        """Test a file replacing one by name, uploaded without a type, takes the replaced file's type."""
+        first = upload_design_files([encode("layer1.gbr", TOP, "copper_top"),
+                                     encode("layer2.gbr", BOTTOM, "copper_bottom")])
+        self.assertTrue(first["success"], first.get("error"))
+        replacement = {"filename": "layer2.gbr", "content": base64.b64encode(BOTTOM_FIXED).decode()}
+        second = upload_design_files([replacement], parent_analysis_id=first["analysis_id"])
+        self.assertTrue(second["success"], second.get("error"))
+        uploaded, = second["uploaded_files"]
+        self.assertEqual((uploaded["file_type"], uploaded["classified_by"]), ("copper_bottom", "parent"))
+        self.assertEqual(second["carried_files"], ["layer1.gbr"])
+
+    def test_incremental_analysis(self):
+        """Test a one-layer revision recomputes only that layer's results."""
+        first = upload_design_files([board_zip()])
+        full = perform_cam_analysis(first["analysis_id"])
+        self.assertTrue(full["success"], full.get("error"))
+        self.assertEqual(full["reused_results"], 0)
+        self.assertEqual(full["computed_results"], 11)
+
+        second = upload_design_files([encode("bottom_v2.gbr", BOTTOM_FIXED, "copper_bottom")],
+                                     parent_analysis_id=first["analysis_id"])
+        revised = perform_cam_analysis(second["analysis_id"])
+        self.assertTrue(revised["success"], revised.get("error"))
+        # Net links, trace width, spacing, annular rings and coverage of the bottom layer
+        self.assertEqual((revised["reused_results"], revised["computed_results"]), (6, 5))
+        self.assertEqual({i["issue_type"] for i in revised["issues"] if i["layer_name"] == "copper_bottom"},
+                         {"trace_width"})
+
+        # The same issues as a full run
+        recomputed = perform_cam_analysis(second["analysis_id"], {"incremental": False})
+        self.assertEqual(recomputed["computed_results"], 0)
+        self.assertEqual(recomputed["issues"], revised["issues"])
+        self.assertEqual(recomputed["copper_layers"], revised["copper_layers"])
+        self.assertEqual(recomputed["nets"], revised["nets"])
+        # Re-running replaces the issues saved by the earlier runs
+        issues = CamGerberDatabase().get_analysis_issues(second["analysis_id"])
+        self.assertEqual(len(issues), recomputed["issues_found"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Unit tests for the spatial index and minimum-spacing check."""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.engine.spatial_index import (
+    SpatialIndex, connected_components, find_clearances, segment_closest_points,
+)
+from agents.cam_gerber_analyzer.tools.extract_design_rules import extract_trace_widths_and_spacing
+
+
+def random_segments(n, seed=0):
+    """Short random traces on a 20 x 20 mm board."""
+    rng = np.random.default_rng(seed)
+    x0 = rng.uniform(0, 20, n)
+    y0 = rng.uniform(0, 20, n)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    length = rng.uniform(0, 2, n)
+    radius = rng.uniform(0.01, 0.1, n)
+    return x0, y0, x0 + length * np.cos(angle), y0 + length * np.sin(angle), radius
+
+
+def brute_force_clearances(x0, y0, x1, y1, radius):
+    """Clearance matrix of every pair of capsules."""
+    i, j = np.triu_indices(len(x0), 1)
+    distance = segment_closest_points(x0[i], y0[i], x1[i], y1[i], x0[j], y0[j], x1[j], y1[j])[0]
+    return i, j, distance - radius[i] - radius[j]
+
+
+class TestSpatialIndex(unittest.TestCase):
+    """Test cases for the spatial index."""
+
+    def test_pairs_within_matches_brute_force(self):
+        """Test the grid finds exactly the pairs a full comparison does."""
+        segments = random_segments(400)
+        i, j, clearance = brute_force_clearances(*segments)
+        for cell_size in (None, 0.3, 5.0):
+            index = SpatialIndex(*segments, cell_size=cell_size)
+            blocks = list(index.pairs_within(0.5))
+            found = np.concatenate([b[0] * len(index) + b[1] for b in blocks])
+            self.assertEqual(len(found), len(set(found.tolist())))
+            expected = clearance <= 0.5
+            self.assertEqual(set(found.tolist()), set((i[expected] * len(index) + j[expected]).tolist()))
+            np.testing.assert_allclose(np.sort(np.concatenate([b[2] for b in blocks])), np.sort(clearance[expected]))
+
+    def test_pairs_within_long_segments(self):
+        """Test segments crossing the board are joined piece by piece, each pair once."""
+        rng = np.random.default_rng(3)
+        short = random_segments(400, seed=4)
+        long = (rng.uniform(0, 20, 20), rng.uniform(0, 20, 20), rng.uniform(0, 20, 20), rng.uniform(0, 20, 20),
+                np.full(20, 0.05))
+        segments = [np.concatenate([a, b]) for a, b in zip(short, long)]
+        i, j, clearance = brute_force_clearances(*segments)
+        index = SpatialIndex(*segments)
+        blocks = list(index.pairs_within(0.2))
+        found = np.concatenate([b[0] * len(index) + b[1] for b in blocks])
+        self.assertEqual(len(found), len(set(found.tolist())))
+        expected = clearance <= 0.2
+        self.assertEqual(set(found.tolist()), set((i[expected] * len(index) + j[expected]).tolist()))
+
+    def test_nearest_matches_brute_force(self):
+        """Test nearest-feature queries."""
+        x0, y0, x1, y1, radius = random_segments(300, seed=1)
+        index = SpatialIndex(x0, y0, x1, y1, radius)
+        rng = np.random.default_rng(2)
+        px, py = rng.uniform(-5, 25, 200), rng.uniform(-5, 25, 200)
+
+        feature, distance = index.nearest(px, py)
+        gaps = segment_closest_points(px[:, None], py[:, None], px[:, None], py[:, None],
+                                      x0, y0, x1, y1)[0] - radius
+        np.testing.assert_allclose(distance, gaps.min(axis=1))
+        np.testing.assert_allclose(gaps[np.arange(len(px)), feature], distance)
+
+        feature, distance = index.nearest(np.array([100.0]), np.array([100.0]), max_distance=1.0)
+        self.assertEqual(feature[0], -1)
+        self.assertTrue(np.isinf(distance[0]))
+
+    def test_boxes_intersecting_matches_brute_force(self):
+        """Test box queries find every feature box they overlap, once."""
+        segments = random_segments(300, seed=5)
+        index = SpatialIndex(*segments)
+        rng = np.random.default_rng(6)
+        min_x, min_y = rng.uniform(-2, 20, 100), rng.uniform(-2, 20, 100)
+        max_x, max_y = min_x + rng.uniform(0, 4, 100), min_y + rng.uniform(0, 4, 100)
+
+        box, feature = index.boxes_intersecting(min_x, min_y, max_x, max_y)
+        overlap = ((min_x[:, None] <= index.max_x) & (max_x[:, None] >= index.min_x)
+                   & (min_y[:, None] <= index.max_y) & (max_y[:, None] >= index.min_y))
+        found = box * len(index) + feature
+        self.assertEqual(len(found), len(set(found.tolist())))
+        self.assertEqual(set(found.tolist()), set(np.flatnonzero(overlap.ravel()).tolist()))
+
+    def test_connected_components(self):
+        """Test edges join features into components labelled by their smallest member."""
+        labels = connected_components(7, np.array([5, 1, 2]), np.array([6, 2, 3]))
+        self.assertEqual(list(labels), [0, 1, 1, 1, 4, 5, 5])
+
+    def test_clearances_between_nets(self):
+        """Test touching copper forms one net and only different nets are reported."""
+        # Two traces meeting at (5, 0) and a third 0.3 mm above, edge to edge 0.1 mm
+        x0 = np.array([0.0, 5.0, 0.0])
+        y0 = np.array([0.0, 0.0, 0.3])
+        x1 = np.array([5.0, 10.0, 10.0])
+        y1 = np.array([0.0, 0.0, 0.3])
+        index = SpatialIndex(x0, y0, x1, y1, np.full(3, 0.1))
+        clearances = find_clearances(index, 1.0)
+
+        self.assertEqual(clearances.nets[0], clearances.nets[1])
+        self.assertNotEqual(clearances.nets[0], clearances.nets[2])
+        self.assertEqual(len(clearances.clearance), 2)
+        self.assertAlmostEqual(clearances.minimum, 0.1)
+        self.assertTrue(np.allclose(clearances.y, 0.15))
+
+        # Sharing a group connects the features without touching
+        clearances = find_clearances(index, 1.0, groups=np.array([0, 0, 0]))
+        self.assertIsNone(clearances.minimum)
+
+
+class TestMinimumSpacing(unittest.TestCase):
+    """Test cases for the minimum-spacing check in extract_design_rules."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = AGENT_CONFIG["layer_cache"]
+        AGENT_CONFIG["layer_cache"] = {"path": None, "max_entries": 0}
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        AGENT_CONFIG["layer_cache"] = self.original_cache
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_known_gap(self):
+        """Test the spacing is the real gap and not a coordinate distance."""
+        # 0.2 mm traces on a 0.45 mm pitch (0.25 mm gap), a pad on the first
+        # trace and one pad 0.12 mm from the end of the last trace
+        layer = [b"%FSLAX26Y26*%", b"%MOMM*%", b"%ADD10C,0.200000*%", b"%ADD11C,1.000000*%", b"D10*"]
+        for n in range(20):
+            layer.append(b"X0Y%dD02*" % (n * 450000))
+            layer.append(b"X20000000Y%dD01*" % (n * 450000))
+        layer += [b"X10000000Y0D03*", b"D11*", b"X20720000Y8550000D03*", b"M02*"]
+        file_path = os.path.join(self.temp_dir, 'copper_top.gbr')
+        with open(file_path, 'wb') as f:
+            f.write(b"\n".join(layer))
+
+        result = extract_trace_widths_and_spacing(file_path)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["trace_width_mm"], 0.2)
+        self.assertEqual(result["min_spacing_mm"], 0.12)
+        locations = result["min_spacing_locations"]
+        self.assertEqual(locations[0], {"x": 20.16, "y": 8.55, "clearance_mm": 0.12})
+        # The pad also passes the end of the trace below it, then trace-to-trace gaps follow
+        self.assertEqual([location["clearance_mm"] for location in locations[1:4]], [0.249, 0.25, 0.25])
+        self.assertEqual(len(locations), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
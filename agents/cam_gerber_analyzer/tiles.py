@@ -0,0 +1,274 @@
+"""Tiled raster previews of an analysis's Gerber layers.
+
+All Gerber layers of an analysis share one pyramid (see engine/raster.py)
+covering the union of their panel bounds (every step-and-repeat copy), so
+their tiles overlay. A tile is drawn on its first request and saved as
+
+    <tiles path>/<layer key>/<pyramid key>-<colour>-r<RENDER_VERSION>/<z>/<x>/<y>.png
+
+The layer key is the layer cache key of the layer's geometry (content hash
+and parser version), so the same file uploaded to several analyses shares
+its tiles while the pyramids match. Like the layer cache's disk tier, the
+first tile saved by a process removes the tiles of other parser and render
+versions, and once the tiles pass max_disk_mb the variants (pyramid and
+colour of a layer) least recently used are removed. Prepared layers and
+analysis pyramids are kept in small in-process LRUs.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import CamGerberDatabase
+from .engine.geometry import CACHE_KIND, LayerGeometry, load_geometries
+from .engine.raster import (DEFAULT_MIN_PIXEL_MM, RENDER_VERSION, TILE_SIZE, LayerRaster, Pyramid, encode_png,
+                            layer_color)
+from .layer_cache import PRUNE_TO, get_layer_cache, is_current_key, prune_directories
+from .models import DesignFile
+
+# Prepared layers and analyses kept in memory
+_MAX_RASTERS = 8
+_MAX_ANALYSES = 32
+
+
+@dataclass
+class Tile:
+    """One encoded tile."""
+    data: bytes              # PNG
+    etag: str                # quoted entity tag, stable while the layer and pyramid are
+
+
+@dataclass
+class _AnalysisTiles:
+    """Pyramid and Gerber layers of one analysis."""
+    pyramid: Pyramid
+    layers: List[Tuple[DesignFile, str]]    # design file and its layer key
+
+
+_analyses: "OrderedDict[int, _AnalysisTiles]" = OrderedDict()
+_rasters: "OrderedDict[str, LayerRaster]" = OrderedDict()
+_lock = threading.Lock()
+# Bytes of saved tiles as of the last prune plus what was saved since; None before the first
+_tile_bytes: Optional[int] = None
+
+
+def tile_settings() -> Dict[str, Any]:
+    """Tile settings from AGENT_CONFIG."""
+    from .config import AGENT_CONFIG
+
+    return AGENT_CONFIG.get("tiles", {})
+
+
+def _remember(cache: OrderedDict, key, value, limit: int):
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+
+def _recall(cache: OrderedDict, key):
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _analysis_tiles(analysis_id: int) -> _AnalysisTiles:
+    """Pyramid and layers of an analysis, from memory or built from its files.
+
+    Raises:
+        LookupError: if the analysis has no Gerber layer with geometry
+    """
+    tiles = _recall(_analyses, analysis_id)
+    if tiles is not None:
+        return tiles
+
+    files = [df for df in CamGerberDatabase().get_design_files(analysis_id) if df.file_format == "gerber"]
+    results = load_geometries([df.file_path for df in files])
+    layers, bounds = [], []
+    for df, result in zip(files, results):
+        if not result.get("success"):
+            continue
+        box = LayerGeometry.from_result(result).panel_bounds
+        if box is None:
+            continue
+        layers.append((df, get_layer_cache().key(df.file_path, CACHE_KIND)))
+        bounds.append(box)
+    if not layers:
+        raise LookupError(f"Analysis {analysis_id} has no Gerber layers to preview")
+
+    settings = tile_settings()
+    union = {
+        "min_x": min(b["min_x"] for b in bounds),
+        "min_y": min(b["min_y"] for b in bounds),
+        "max_x": max(b["max_x"] for b in bounds),
+        "max_y": max(b["max_y"] for b in bounds),
+    }
+    pyramid = Pyramid.covering(union, settings.get("min_pixel_mm", DEFAULT_MIN_PIXEL_MM),
+                               settings.get("tile_size", TILE_SIZE))
+    tiles = _AnalysisTiles(pyramid=pyramid, layers=layers)
+    _remember(_analyses, analysis_id, tiles, _MAX_ANALYSES)
+    return tiles
+
+
+def _find_layer(tiles: _AnalysisTiles, layer: str) -> Tuple[DesignFile, str]:
+    """Layer of an analysis by design file ID, file type or file name."""
+    for df, key in tiles.layers:
+        if layer in (str(df.id), df.file_type, df.filename):
+            return df, key
+    raise LookupError(f"Layer {layer} not found")
+
+
+def _raster(df: DesignFile, key: str) -> LayerRaster:
+    raster = _recall(_rasters, key)
+    if raster is None:
+        result = load_geometries([df.file_path])[0]
+        if not result.get("success"):
+            raise LookupError(result.get("error", f"Layer {df.filename} cannot be read"))
+        raster = LayerRaster(LayerGeometry.from_result(result))
+        _remember(_rasters, key, raster, _MAX_RASTERS)
+    return raster
+
+
+def describe_layers(analysis_id: int) -> Dict[str, Any]:
+    """Pyramid and previewable layers of an analysis.
+
+    Args:
+        analysis_id: Analysis ID
+
+    Returns:
+        Dictionary with tile_size, max_zoom, extent (mm) and layers
+    """
+    try:
+        tiles = _analysis_tiles(analysis_id)
+    except LookupError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    pyramid = tiles.pyramid
+    return {
+        "success": True,
+        "tile_size": pyramid.tile_size,
+        "max_zoom": pyramid.max_zoom,
+        "extent": {
+            "min_x": pyramid.min_x,
+            "min_y": pyramid.min_y,
+            "max_x": pyramid.min_x + pyramid.size,
+            "max_y": pyramid.min_y + pyramid.size,
+        },
+        "layers": [
+            {"id": df.id, "filename": df.filename, "file_type": df.file_type,
+             "color": "#%02x%02x%02x" % layer_color(df.file_type)}
+            for df, _ in tiles.layers
+        ],
+    }
+
+
+def get_layer_tile(analysis_id: int, layer: str, z: int, x: int, y: int,
+                   cache_dir: Optional[str] = None) -> Tile:
+    """Get one PNG tile of a layer preview, drawing it on first request.
+
+    Args:
+        analysis_id: Analysis ID
+        layer: Design file ID, file type or file name
+        z: Zoom, 0 for the whole extent in one tile
+        x: Tile column from the left
+        y: Tile row from the top
+        cache_dir: Tile cache directory; by default from AGENT_CONFIG, None there to disable
+
+    Returns:
+        Tile
+
+    Raises:
+        LookupError: if the analysis, layer or tile does not exist
+    """
+    tiles = _analysis_tiles(analysis_id)
+    df, key = _find_layer(tiles, layer)
+    pyramid = tiles.pyramid
+    if not pyramid.contains(z, x, y):
+        raise LookupError(f"Tile {z}/{x}/{y} is outside the pyramid (zoom 0-{pyramid.max_zoom})")
+
+    color = layer_color(df.file_type)
+    variant = f"{pyramid.key}-{'%02x%02x%02x' % color}-r{RENDER_VERSION}"
+    etag = f'"{key.split("-")[0][:20]}-{variant}-{z}-{x}-{y}"'
+    cache_dir = cache_dir or tile_settings().get("path")
+    path = os.path.join(cache_dir, key, variant, str(z), str(x), f"{y}.png") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Recently used: the last to be pruned
+            os.utime(os.path.join(cache_dir, key, variant))
+            return Tile(data=data, etag=etag)
+        except OSError:
+            # Pruned meanwhile: draw it again
+            pass
+
+    data = encode_png(_raster(df, key).render_tile(pyramid, z, x, y), color)
+    if path:
+        _save_tile(cache_dir, path, data, os.path.join(cache_dir, key, variant))
+    return Tile(data=data, etag=etag)
+
+
+def _save_tile(cache_dir: str, path: str, data: bytes, variant_dir: str):
+    global _tile_bytes
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        os.utime(variant_dir)
+    except OSError:
+        # The tile cache is best effort; a prune may have removed the directory
+        return
+    max_mb = tile_settings().get("max_disk_mb")
+    max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+    with _lock:
+        first = _tile_bytes is None
+        if not first:
+            _tile_bytes += len(data)
+        over = max_bytes is not None and not first and _tile_bytes > max_bytes
+    if first or over:
+        prune_tiles(cache_dir, int(max_bytes * PRUNE_TO) if max_bytes is not None else None)
+
+
+def prune_tiles(cache_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> Dict[str, int]:
+    """Remove saved tiles of other versions, then the least recently used over max_bytes.
+
+    Tiles are removed a variant (one pyramid and colour of a layer) at a time.
+
+    Args:
+        cache_dir: Tile cache directory; by default from AGENT_CONFIG
+        max_bytes: Size to prune the tiles down to, or None for no limit
+
+    Returns:
+        Dictionary with removed_entries, freed_bytes and kept_bytes
+    """
+    global _tile_bytes
+    cache_dir = cache_dir or tile_settings().get("path")
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return {"removed_entries": 0, "freed_bytes": 0, "kept_bytes": 0}
+    layers = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+    variants = [os.path.join(layer, name) for layer in layers if os.path.isdir(layer) for name in os.listdir(layer)]
+
+    def current(variant_dir: str) -> bool:
+        return (is_current_key(os.path.basename(os.path.dirname(variant_dir)))
+                and variant_dir.endswith(f"-r{RENDER_VERSION}"))
+
+    result = prune_directories(variants, max_bytes, current)
+    for layer in layers:
+        try:
+            os.rmdir(layer)
+        except OSError:
+            # Not empty, or not a directory
+            pass
+    with _lock:
+        _tile_bytes = result["kept_bytes"]
+    return result
@@ -8,6 +8,7 @@ from .generate_design_summary import generate_design_summary
 from .perform_cam_analysis import perform_cam_analysis
 from .get_analysis_report import get_analysis_report
 from .get_analysis_history import get_analysis_history
+from .compare_analyses import compare_analyses
 
 __all__ = [
     'upload_design_files',
@@ -17,6 +18,7 @@ __all__ = [
     'generate_design_summary',
     'perform_cam_analysis',
     'get_analysis_report',
-    'get_analysis_history'
+    'get_analysis_history',
+    'compare_analyses'
 ]
 
@@ -5,6 +5,8 @@ from typing import Dict, Any, List
 import subprocess
 import json
 
+from ..layer_cache import cached_parse
+
 
 def analyze_gerber_file_with_llm(file_path: str, filename: str, file_type: str) -> Dict[str, Any]:
     """Analyze a Gerber file using LLM to understand its purpose and extract details.
@@ -24,32 +26,14 @@ def analyze_gerber_file_with_llm(file_path: str, filename: str, file_type: str)
                 "error": f"File not found: {file_path}"
             }
         
-        file_size = os.path.getsize(file_path)
+        statistics = cached_parse(file_path, "gerber_details", _file_statistics)
+        if not statistics.get("success"):
+            return statistics
         
         # Read file content (first 5000 characters for analysis)
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content_sample = f.read(5000)
         
-        # Read full file stats
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            full_content = f.read()
-            total_lines = len(full_content.split('\n'))
-            total_chars = len(full_content)
-        
-        # Extract key information from file
-        # Count commands
-        draw_commands = content_sample.count('D01') + content_sample.count('D02') + content_sample.count('D03')
-        flash_commands = content_sample.count('D03')
-        move_commands = content_sample.count('D02')
-        
-        # Check for format specifiers
-        has_format_spec = '%FS' in content_sample
-        has_units = '%MO' in content_sample
-        units = "MM" if '%MOMM' in content_sample else "IN" if '%MOIN' in content_sample else "Unknown"
-        
-        # Check for aperture definitions
-        aperture_defs = content_sample.count('%ADD')
-        
         # Use pattern-based analysis (more reliable than LLM for this)
         from .analyze_file_purpose import analyze_file_purpose
         llm_analysis = analyze_file_purpose(filename, file_type, content_sample)
@@ -59,18 +43,9 @@ def analyze_gerber_file_with_llm(file_path: str, filename: str, file_type: str)
             "success": True,
             "filename": filename,
             "file_type": file_type,
-            "file_size_bytes": file_size,
-            "file_size_kb": round(file_size / 1024, 2),
-            "total_lines": total_lines,
-            "total_characters": total_chars,
-            "format": "RS-274X" if has_format_spec else "Unknown",
-            "units": units,
-            "aperture_definitions": aperture_defs,
-            "draw_commands_sample": draw_commands,
-            "flash_commands": flash_commands,
-            "move_commands": move_commands,
-            "llm_analysis": llm_analysis,
         }
+        analysis.update((key, value) for key, value in statistics.items() if key != "success")
+        analysis["llm_analysis"] = llm_analysis
         
         return analysis
         
@@ -81,6 +56,48 @@ def analyze_gerber_file_with_llm(file_path: str, filename: str, file_type: str)
         }
 
 
+def _file_statistics(file_path: str) -> Dict[str, Any]:
+    """Count lines and commands of a Gerber file (cached by content)."""
+    file_size = os.path.getsize(file_path)
+    
+    # Read file content (first 5000 characters for analysis)
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content_sample = f.read(5000)
+    
+    # Read full file stats
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        full_content = f.read()
+        total_lines = len(full_content.split('\n'))
+        total_chars = len(full_content)
+    
+    # Extract key information from file
+    # Count commands
+    draw_commands = content_sample.count('D01') + content_sample.count('D02') + content_sample.count('D03')
+    flash_commands = content_sample.count('D03')
+    move_commands = content_sample.count('D02')
+    
+    # Check for format specifiers
+    has_format_spec = '%FS' in content_sample
+    units = "MM" if '%MOMM' in content_sample else "IN" if '%MOIN' in content_sample else "Unknown"
+    
+    # Check for aperture definitions
+    aperture_defs = content_sample.count('%ADD')
+    
+    return {
+        "success": True,
+        "file_size_bytes": file_size,
+        "file_size_kb": round(file_size / 1024, 2),
+        "total_lines": total_lines,
+        "total_characters": total_chars,
+        "format": "RS-274X" if has_format_spec else "Unknown",
+        "units": units,
+        "aperture_definitions": aperture_defs,
+        "draw_commands_sample": draw_commands,
+        "flash_commands": flash_commands,
+        "move_commands": move_commands,
+    }
+
+
 def analyze_all_files(analysis_id: int) -> Dict[str, Any]:
     """Analyze all files in an analysis with detailed LLM analysis.
     
@@ -0,0 +1,127 @@
+"""Tool for comparing two analyses."""
+
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from ..database import CamGerberDatabase
+from ..engine.compare import diff_drills, diff_layers
+from ..engine.drill import DrillHoles, load_drill_holes
+from ..engine.geometry import LayerGeometry, load_geometries
+
+
+def compare_analyses(analysis_id_a: int, analysis_id_b: int, max_changes: Optional[int] = None) -> Dict[str, Any]:
+    """Compare the layers and drills of two analyses, e.g. two board revisions.
+
+    Args:
+        analysis_id_a: Analysis ID of the older revision
+        analysis_id_b: Analysis ID of the newer revision
+        max_changes: Maximum number of changes listed per layer
+
+    Returns:
+        Per-layer counts of added, removed and re-apertured features, drill
+        hits added, removed and moved, and the changes with their coordinates
+    """
+    try:
+        db = CamGerberDatabase()
+
+        from ..config import AGENT_CONFIG
+        settings = AGENT_CONFIG.get("compare", {})
+        quantum = settings.get("tolerance_mm", 0.001)
+        tile = settings.get("tile_mm", 10.0)
+        if max_changes is None:
+            max_changes = settings.get("max_changes_listed", 200)
+
+        files = {}
+        for analysis_id in (analysis_id_a, analysis_id_b):
+            if not db.get_analysis(analysis_id):
+                return {
+                    "success": False,
+                    "error": f"Analysis {analysis_id} not found"
+                }
+            files[analysis_id] = db.get_design_files(analysis_id)
+        old_files, new_files = files[analysis_id_a], files[analysis_id_b]
+
+        # Match Gerber layers by file type, and by name where a type repeats
+        old_layers = _layer_files(old_files)
+        new_layers = _layer_files(new_files)
+        layers = {}
+        for name in sorted(set(old_layers) - set(new_layers)):
+            layers[name] = {"status": "removed"}
+        for name in sorted(set(new_layers) - set(old_layers)):
+            layers[name] = {"status": "added"}
+
+        # Layers whose files have the same content are identical
+        common = sorted(set(old_layers) & set(new_layers))
+        to_diff = []
+        for name in common:
+            old, new = old_layers[name], new_layers[name]
+            if old.sha256 and old.sha256 == new.sha256:
+                layers[name] = {"status": "identical"}
+            else:
+                to_diff.append(name)
+
+        paths = [old_layers[name].file_path for name in to_diff] + [new_layers[name].file_path for name in to_diff]
+        results = load_geometries(paths)
+        changes: List[Dict[str, Any]] = []
+        for k, name in enumerate(to_diff):
+            old, new = results[k], results[k + len(to_diff)]
+            if not (old.get("success") and new.get("success")):
+                layers[name] = {"status": "unreadable"}
+                continue
+            diff = diff_layers(LayerGeometry.from_result(old), LayerGeometry.from_result(new), quantum, tile)
+            layers[name] = {
+                "status": "identical" if diff.identical else "changed",
+                "tiles": diff.tiles,
+                "tiles_changed": diff.tiles_changed,
+                "added": len(diff.added),
+                "removed": len(diff.removed),
+                "aperture_changed": len(diff.aperture_changed),
+            }
+            layer_changes = ([dict(c, change="removed") for c in diff.removed]
+                             + [dict(c, change="added") for c in diff.added]
+                             + [dict(c, change="aperture_changed") for c in diff.aperture_changed])
+            changes.extend(dict(c, layer_name=name) for c in layer_changes[:max_changes])
+
+        # Drill hits of all drill files together
+        drills = diff_drills(_drill_holes(old_files), _drill_holes(new_files), quantum,
+                             settings.get("max_drill_move_mm", 1.0))
+        drill_changes = ([dict(c, change="drill_removed") for c in drills.removed]
+                         + [dict(c, change="drill_added") for c in drills.added]
+                         + [dict(c, change="drill_moved") for c in drills.moved])
+        changes.extend(drill_changes[:max_changes])
+
+        return {
+            "success": True,
+            "analysis_id_a": analysis_id_a,
+            "analysis_id_b": analysis_id_b,
+            "identical": drills.identical and all(layer["status"] == "identical" for layer in layers.values()),
+            "layers": layers,
+            "drills": {
+                "added": len(drills.added),
+                "removed": len(drills.removed),
+                "moved": len(drills.moved),
+            },
+            "changes": changes
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to compare analyses: {str(e)}"
+        }
+
+
+def _layer_files(design_files) -> Dict[str, Any]:
+    """Gerber files by layer key."""
+    gerber = [df for df in design_files if df.file_format == "gerber"]
+    repeated = Counter(df.file_type for df in gerber)
+    return {
+        df.file_type if repeated[df.file_type] == 1 else f"{df.file_type}:{df.filename}": df
+        for df in gerber
+    }
+
+
+def _drill_holes(design_files) -> List[DrillHoles]:
+    """Drill hits of the readable drill files."""
+    paths = [df.file_path for df in design_files if df.file_format == "drill"]
+    return [DrillHoles.from_result(result) for result in load_drill_holes(paths) if result.get("success")]
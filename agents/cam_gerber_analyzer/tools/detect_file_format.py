@@ -3,10 +3,15 @@
 import os
 from typing import Dict, Any
 
+from ..engine.attributes import classify_layer, read_attributes
+
 
 def detect_file_format(file_path: str = None, filename: str = None) -> Dict[str, Any]:
     """Automatically detect file format (Gerber vs ODB++).
     
+    A file carrying Gerber X2 attributes is identified by them, with the
+    layer's file_type; other files by their extension and content.
+    
     Args:
         file_path: Path to file (optional)
         filename: Filename (optional)
@@ -64,6 +69,18 @@ def detect_file_format(file_path: str = None, filename: str = None) -> Dict[str,
                 "note": "ZIP file (assuming Gerber contents)"
             }
         
+        # Gerber X2 (or X2 attributes in the comments of X1 and Excellon files)
+        if file_path and os.path.isfile(file_path):
+            attributes = read_attributes(file_path)
+            if attributes.x2:
+                return {
+                    "success": True,
+                    "format_type": "gerber",
+                    "confidence": "high",
+                    "file_type": classify_layer(attributes) or "other",
+                    "attributes": attributes.to_dict()
+                }
+        
         # ODB++ formats (non-ZIP)
         if name_lower.endswith(('.tgz', '.tar.gz', '.odb')):
             return {
@@ -4,16 +4,42 @@ import os
 import re
 from typing import Dict, Any, List, Optional
 
+from ..engine.drill import DrillHoles, load_drill_holes
+from ..engine.geometry import LayerGeometry, build_geometry, load_geometries
+from ..engine.registration import register_drills
+from ..engine.spatial_index import SpatialIndex, find_clearances
+from ..layer_cache import cached_parse, cached_parse_many
+from ..models import DesignFile
+
+# Clearances searched for (mm); the wider search runs only if nothing is closer
+SPACING_SEARCH_MM = (0.5, 2.0)
+
+# Closest different-net locations reported per layer
+SPACING_LOCATIONS = 10
+
 
 def extract_trace_widths_and_spacing(file_path: str) -> Dict[str, Any]:
     """Extract trace widths and spacing from Gerber file.
     
+    Results are cached by file content.
+    
     Args:
         file_path: Path to Gerber file
         
     Returns:
         Dictionary with trace width and spacing information
     """
+    try:
+        return cached_parse(file_path, "design_rules", _extract_trace_widths_and_spacing)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Failed to extract design rules: {str(e)}"
+        }
+
+
+def _extract_trace_widths_and_spacing(file_path: str) -> Dict[str, Any]:
+    """Extract trace widths and spacing without the cache."""
     try:
         if not os.path.exists(file_path):
             return {
@@ -94,45 +120,14 @@ def extract_trace_widths_and_spacing(file_path: str) -> Dict[str, Any]:
                 # Fallback: use difference between largest and smallest
                 annular_ring = (sorted_sizes[-1] - sorted_sizes[0]) / 2
         
-        # Calculate minimum spacing
-        # Method 1: Estimate from trace width (spacing is often 1-2x trace width)
-        min_spacing = None
-        if trace_width:
-            min_spacing = trace_width * 1.2  # Conservative estimate
-        
-        # Method 2: Calculate from coordinates (if available and reasonable)
-        coords_pattern = r'X([\d.]+)\s*Y([\d.]+)'
-        coordinates = re.findall(coords_pattern, content)
-        
-        if len(coordinates) > 10:
-            try:
-                coords_list = [(float(x), float(y)) for x, y in coordinates[:5000]]  # Limit for performance
-                min_distances = []
-                # Check distances between nearby coordinates
-                for i in range(min(500, len(coords_list))):
-                    for j in range(i+1, min(i+50, len(coords_list))):
-                        x1, y1 = coords_list[i]
-                        x2, y2 = coords_list[j]
-                        dist = ((x2-x1)**2 + (y2-y1)**2)**0.5
-                        # Convert to mm if needed
-                        if units == "IN":
-                            dist = dist * 25.4
-                        if 0.01 < dist < 5.0:  # Reasonable spacing range
-                            min_distances.append(dist)
-                if min_distances:
-                    calculated_spacing = min(min_distances)
-                    # Use the more conservative (smaller) estimate
-                    if min_spacing:
-                        min_spacing = min(min_spacing, calculated_spacing)
-                    else:
-                        min_spacing = calculated_spacing
-            except:
-                pass
+        # Calculate minimum spacing: true clearance between copper of different nets
+        min_spacing, spacing_locations = _measure_spacing(file_path)
         
         return {
             "success": True,
             "trace_width_mm": round(trace_width, 3) if trace_width else None,
-            "min_spacing_mm": round(min_spacing, 3) if min_spacing else None,
+            "min_spacing_mm": round(min_spacing, 3) if min_spacing is not None else None,
+            "min_spacing_locations": spacing_locations,
             "annular_ring_mm": round(annular_ring, 3) if annular_ring else None,
             "aperture_sizes_mm": sorted(set([round(s, 3) for s in valid_sizes])) if valid_sizes else [],
             "min_aperture_mm": round(min_aperture, 3) if min_aperture else None,
@@ -148,9 +143,74 @@ def extract_trace_widths_and_spacing(file_path: str) -> Dict[str, Any]:
         }
 
 
+def _measure_spacing(file_path: str):
+    """Measure the minimum clearance between copper of different nets.
+    
+    Nets are traced from touching copper on the layer itself. The reported
+    locations are the midpoints of the closest gaps, one per pair of nets.
+    
+    Args:
+        file_path: Path to Gerber file
+        
+    Returns:
+        Tuple of (minimum clearance in mm or None, list of locations)
+    """
+    features = build_geometry(file_path).copper_features()
+    if len(features) < 2:
+        return None, []
+    
+    index = SpatialIndex(features['x0'], features['y0'], features['x1'], features['y1'], features['radius'])
+    for distance in SPACING_SEARCH_MM:
+        clearances = find_clearances(index, distance, features['group'])
+        if len(clearances.clearance):
+            break
+    else:
+        return None, []
+    
+    closest = clearances.closest_per_net_pair()[:SPACING_LOCATIONS]
+    
+    locations = [
+        {"x": round(x, 3), "y": round(y, 3), "clearance_mm": round(clearance, 3)}
+        for x, y, clearance in zip(clearances.x[closest].tolist(), clearances.y[closest].tolist(),
+                                   clearances.clearance[closest].tolist())
+    ]
+    return clearances.minimum, locations
+
+
+def _measure_annular_rings(copper_layers: List[DesignFile], drill_files: List[DesignFile],
+                           min_ring: Optional[float]) -> Dict[str, Any]:
+    """Register the drill hits of every drill file to each copper layer's pads.
+    
+    Args:
+        copper_layers: Copper layer design files
+        drill_files: Drill design files
+        min_ring: Minimum annular ring in mm from the CAM rules
+        
+    Returns:
+        Dictionary of registration summaries by copper layer file type
+    """
+    drills = [
+        DrillHoles.from_result(result)
+        for result in load_drill_holes([df.file_path for df in drill_files]) if result.get("success")
+    ]
+    if not drills:
+        return {}
+    
+    summaries = {}
+    for df, result in zip(copper_layers, load_geometries([df.file_path for df in copper_layers])):
+        if result.get("success"):
+            geometry = LayerGeometry.from_result(result)
+            summaries[df.file_type] = register_drills(geometry, *drills).summary(min_ring)
+    return summaries
+
+
 def analyze_all_layers_for_design_rules(analysis_id: int) -> Dict[str, Any]:
     """Analyze all Gerber layers to find minimum design rules.
     
+    The annular ring of a layer is measured from the drill hits registered to
+    its pads when there are drill files, and estimated from aperture sizes
+    otherwise.
+    
     Args:
         analysis_id: Analysis ID
         
@@ -169,39 +229,57 @@ def analyze_all_layers_for_design_rules(analysis_id: int) -> Dict[str, Any]:
         
         layer_results = {}
         
-        for df in design_files:
-            # Analyze copper layers (elec files or inner_layer files)
-            is_copper_layer = (
-                df.file_format == "gerber" and 
-                ("elec" in df.file_type.lower() or "inner_layer" in df.file_type.lower())
-            )
-            
-            if is_copper_layer:
-                # Analyze copper layers for design rules
-                result = extract_trace_widths_and_spacing(df.file_path)
-                if result.get("success"):
-                    layer_results[df.file_type] = result
-                    trace = result.get("trace_width_mm")
-                    spacing = result.get("min_spacing_mm")
-                    annular = result.get("annular_ring_mm")
-                    
-                    if trace:
-                        all_trace_widths.append(trace)
-                    if spacing:
-                        all_spacings.append(spacing)
-                    if annular:
-                        all_annular_rings.append(annular)
+        # Analyze copper layers (elec files or inner_layer files)
+        copper_layers = [
+            df for df in design_files
+            if df.file_format == "gerber" and
+            ("elec" in df.file_type.lower() or "inner_layer" in df.file_type.lower())
+        ]
+        
+        # Layers not yet cached are analyzed in parallel
+        results = cached_parse_many([
+            (df.file_path, "design_rules", _extract_trace_widths_and_spacing) for df in copper_layers
+        ])
+        
+        # Annular rings measured from the drill hits on each layer's pads
+        from ..config import AGENT_CONFIG
+        drill_files = [df for df in design_files if df.file_format == "drill"]
+        registrations = _measure_annular_rings(
+            copper_layers, drill_files, AGENT_CONFIG.get("cam_rules", {}).get("min_annular_ring")
+        )
+        
+        for df, result in zip(copper_layers, results):
+            if result.get("success"):
+                trace = result.get("trace_width_mm")
+                spacing = result.get("min_spacing_mm")
+                annular = result.get("annular_ring_mm")
+                
+                registration = registrations.get(df.file_type)
+                if registration and registration["registered_hits"]:
+                    result = dict(result, drill_registration=registration)
+                    annular = registration["min_annular_ring_mm"]
+                layer_results[df.file_type] = result
+                
+                if trace:
+                    all_trace_widths.append(trace)
+                if spacing:
+                    all_spacings.append(spacing)
+                if annular is not None:
+                    all_annular_rings.append(annular)
         
         # Find overall minimums
         min_trace_width = min(all_trace_widths) if all_trace_widths else None
         min_spacing = min(all_spacings) if all_spacings else None
         min_annular_ring = min(all_annular_rings) if all_annular_rings else None
+        drill_breakouts = sum(r["breakouts"] for r in registrations.values())
         
         return {
             "success": True,
             "min_trace_width_mm": round(min_trace_width, 3) if min_trace_width else None,
             "min_spacing_mm": round(min_spacing, 3) if min_spacing else None,
-            "min_annular_ring_mm": round(min_annular_ring, 3) if min_annular_ring else None,
+            "min_annular_ring_mm": round(min_annular_ring, 3) if min_annular_ring is not None else None,
+            "annular_ring_measured": any(r["registered_hits"] for r in registrations.values()),
+            "drill_breakouts": drill_breakouts,
             "layer_results": layer_results
         }
         
@@ -1,5 +1,6 @@
 """Tool for generating PCB design summary."""
 
+import os
 import json
 from typing import Dict, Any
 from ..database import CamGerberDatabase
@@ -39,9 +40,9 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
         file_format = design_files[0].file_format if design_files else "gerber"
         
         # Parse all files and extract information
-        from .parse_gerber_file import parse_gerber_file
+        from .parse_gerber_file import parse_gerber_files
         from .parse_odbp_file import parse_odbp_file
-        from .parse_drill_file import parse_drill_file
+        from .parse_drill_file import parse_drill_files
         
         parsed_files = []
         board_dimensions = []
@@ -55,20 +56,33 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
         aperture_statistics = {}
         total_vias = 0
         total_pads = 0
+        # Boards per panel from each layer's step-and-repeat blocks
+        boards_per_panel = 1
+        
+        # Parse Gerber and drill layers up front, in parallel where not cached
+        gerber_layers = [i for i, df in enumerate(design_files) if df.file_format == "gerber"]
+        drill_layers = [i for i, df in enumerate(design_files) if df.file_format == "drill"]
+        parsed_layers = dict(zip(gerber_layers, parse_gerber_files(
+            [(design_files[i].file_path, design_files[i].file_type) for i in gerber_layers]
+        )))
+        parsed_layers.update(zip(drill_layers, parse_drill_files(
+            [design_files[i].file_path for i in drill_layers]
+        )))
         
-        for df in design_files:
+        for index, df in enumerate(design_files):
             file_types[df.file_type] = file_types.get(df.file_type, 0) + 1
             total_size += df.file_size
             
             # Parse file based on format
             if df.file_format == "gerber":
-                parsed = parse_gerber_file(df.file_path, df.file_type)
+                parsed = parsed_layers[index]
                 if parsed.get("success"):
                     parsed_files.append(parsed)
                     
                     # Store detailed layer information
                     layer_details[df.file_type] = {
                         "primitives_count": parsed.get("primitives_count", 0),
+                        "boards_per_panel": parsed.get("boards_per_panel", 1),
                         "apertures_count": parsed.get("apertures_count", 0),
                         "statements_count": parsed.get("statements_count", 0),
                         "lines_count": parsed.get("lines_count", 0),
@@ -93,9 +107,11 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
                     width = parsed.get("width")
                     height = parsed.get("height")
                     
-                    # If bounds available, use them for more accurate dimensions
-                    if parsed.get("bounds"):
-                        bounds = parsed["bounds"]
+                    # If bounds available, use them for more accurate dimensions;
+                    # a panel's board is one copy of its step-and-repeat blocks
+                    boards_per_panel = max(boards_per_panel, parsed.get("boards_per_panel", 1))
+                    if parsed.get("board_bounds") or parsed.get("bounds"):
+                        bounds = parsed.get("board_bounds") or parsed["bounds"]
                         if bounds.get("max_x") is not None and bounds.get("max_y") is not None:
                             width = abs(bounds["max_x"] - bounds.get("min_x", 0))
                             height = abs(bounds["max_y"] - bounds.get("min_y", 0))
@@ -115,7 +131,7 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
                         layer_count += 1
             elif df.file_format == "drill":
                 # Parse drill file
-                parsed = parse_drill_file(df.file_path)
+                parsed = parsed_layers[index]
                 if parsed.get("success"):
                     parsed_files.append(parsed)
                     drill_statistics[df.file_type] = {
@@ -129,9 +145,19 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
                     }
                     total_vias += parsed.get("total_holes", 0)
             elif df.file_format == "odbp":
-                parsed = parse_odbp_file(directory_path=df.file_path)
+                if os.path.isdir(df.file_path):
+                    parsed = parse_odbp_file(directory_path=df.file_path)
+                else:
+                    parsed = parse_odbp_file(archive_path=df.file_path)
                 if parsed.get("success"):
                     parsed_files.append(parsed)
+                    if parsed.get("board_width") and parsed.get("board_height"):
+                        board_dimensions.append({
+                            "width": parsed["board_width"],
+                            "height": parsed["board_height"],
+                            "file_type": df.file_type
+                        })
+                    layer_count += parsed.get("copper_layer_count", 0)
         
         # Calculate average board dimensions (use largest dimensions found)
         board_width = None
@@ -145,12 +171,11 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
                 board_width = round(max_width, 2)
                 board_height = round(max_height, 2)
         
-        # Detect panelization (multiple identical boards)
-        # Simple heuristic: if we have multiple files with same dimensions, might be panelized
-        is_panelized = False
-        panel_count = 1
-        boards_per_panel = 1
-        total_boards = 1
+        # Panelization: Gerber step-and-repeat blocks repeat the board on one panel;
+        # the number of panels is not in the files, so the stored one is kept
+        result = db.get_analysis_result(analysis_id) or AnalysisResult(analysis_id=analysis_id)
+        is_panelized = boards_per_panel > 1
+        total_boards = result.panel_count * boards_per_panel
         
         # Count copper layers to determine layer count
         # Count inner layers explicitly
@@ -178,7 +203,7 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
             "board_width": board_width,
             "board_height": board_height,
             "layer_count": layer_count if layer_count > 0 else None,
-            "panel_count": panel_count,
+            "panel_count": result.panel_count,
             "boards_per_panel": boards_per_panel,
             "total_boards": total_boards,
             "is_panelized": is_panelized,
@@ -193,19 +218,15 @@ def generate_design_summary(analysis_id: int) -> Dict[str, Any]:
             "total_holes": total_vias,  # Alias for vias
         }
         
-        # Save to database
-        result = AnalysisResult(
-            analysis_id=analysis_id,
-            board_width=board_width,
-            board_height=board_height,
-            layer_count=layer_count if layer_count > 0 else None,
-            panel_count=panel_count,
-            boards_per_panel=boards_per_panel,
-            total_boards=total_boards,
-            is_panelized=is_panelized,
-            total_vias=total_vias,
-            total_pads=total_pads,
-        )
+        # Save to database, keeping what the CAM analysis stored
+        result.board_width = board_width
+        result.board_height = board_height
+        result.layer_count = layer_count if layer_count > 0 else None
+        result.boards_per_panel = boards_per_panel
+        result.total_boards = total_boards
+        result.is_panelized = is_panelized
+        result.total_vias = total_vias
+        result.total_pads = total_pads
         db.save_analysis_result(result)
         
         # Get saved result for additional data
@@ -1,19 +1,50 @@
 """Tool for parsing drill files (Excellon format)."""
 
 import os
-import re
 from typing import Dict, Any, List
 
+from ..engine.drill import read_excellon
+from ..layer_cache import cached_parse_many
+
 
 def parse_drill_file(file_path: str) -> Dict[str, Any]:
     """Parse an Excellon drill file and extract drill information.
     
+    Results are cached by file content, so every tool can call this freely.
+    
     Args:
         file_path: Path to drill file (.exc, .drill, .txt)
         
     Returns:
         Parsed drill data dictionary
     """
+    return parse_drill_files([file_path])[0]
+
+
+def parse_drill_files(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """Parse several drill files, in parallel where they are not cached.
+    
+    Args:
+        file_paths: Paths to drill files
+        
+    Returns:
+        Parsed drill data dictionaries in the order of file_paths
+    """
+    try:
+        results = cached_parse_many([(file_path, "drill", _parse_drill_file) for file_path in file_paths])
+    except Exception as e:
+        return [{
+            "success": False,
+            "error": f"Failed to parse drill file: {str(e)}"
+        } for _ in file_paths]
+    for file_path, parsed in zip(file_paths, results):
+        if parsed.get("success"):
+            parsed["file_path"] = file_path
+    return results
+
+
+def _parse_drill_file(file_path: str) -> Dict[str, Any]:
+    """Parse an Excellon drill file without the cache."""
     try:
         if not os.path.exists(file_path):
             return {
@@ -22,84 +53,46 @@ def parse_drill_file(file_path: str) -> Dict[str, Any]:
             }
         
         file_size = os.path.getsize(file_path)
+        drills, header = read_excellon(file_path)
+        usage = drills.tool_usage()
         
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        # Parse Excellon format
-        # Format: T01C0.0250 (Tool number, diameter)
-        # Holes: X12345Y67890 (coordinates)
-        
-        # Extract tool definitions
-        tool_pattern = r'T(\d+)C([\d.]+)'
-        tools = {}
-        tool_matches = re.findall(tool_pattern, content)
-        for tool_num, diameter in tool_matches:
-            tools[tool_num] = float(diameter)
-        
-        # Extract hole coordinates
-        # Format: X12345Y67890 or X12345 Y67890
-        hole_pattern = r'X([\d.]+)\s*Y([\d.]+)'
-        holes = re.findall(hole_pattern, content)
-        
-        # Count holes by tool
-        tool_usage_pattern = r'T(\d+)'
-        tool_usage = {}
-        current_tool = None
-        
-        lines = content.split('\n')
-        for line in lines:
-            # Check for tool selection
-            tool_match = re.search(r'T(\d+)', line)
-            if tool_match:
-                current_tool = tool_match.group(1)
-                tool_usage[current_tool] = tool_usage.get(current_tool, 0)
-            
-            # Count holes for current tool
-            if current_tool and ('X' in line and 'Y' in line):
-                tool_usage[current_tool] = tool_usage.get(current_tool, 0) + 1
+        # Tool table in file units, as written in the header
+        tools = {
+            f"{tool:02d}": round(info["diameter_mm"] / header.mm_per_unit, 6)
+            for tool, info in usage.items() if info["diameter_mm"] is not None
+        }
         
-        # Calculate statistics
-        hole_sizes = []
+        # Holes per drill size, in mm
         hole_counts_by_size = {}
-        
-        for tool_num, diameter in tools.items():
-            count = tool_usage.get(tool_num, 0)
-            hole_sizes.append(diameter)
-            hole_counts_by_size[diameter] = hole_counts_by_size.get(diameter, 0) + count
-        
-        total_holes = len(holes)
-        min_hole_size = min(hole_sizes) if hole_sizes else None
-        max_hole_size = max(hole_sizes) if hole_sizes else None
-        
-        # Determine units (usually inches for Excellon)
-        units = "IN"  # Default
-        if "METRIC" in content.upper() or "MM" in content:
-            units = "MM"
-        
-        # Convert to mm if needed
-        if units == "IN" and min_hole_size:
-            min_hole_size_mm = min_hole_size * 25.4
-            max_hole_size_mm = max_hole_size * 25.4 if max_hole_size else None
-        else:
-            min_hole_size_mm = min_hole_size
-            max_hole_size_mm = max_hole_size
+        for info in usage.values():
+            if info["diameter_mm"] is not None and info["hits"]:
+                size = str(round(info["diameter_mm"], 4))
+                hole_counts_by_size[size] = hole_counts_by_size.get(size, 0) + info["hits"]
+        hole_sizes_mm = sorted({round(info["diameter_mm"], 4) for info in usage.values()
+                                if info["diameter_mm"] is not None})
         
         return {
             "success": True,
             "file_path": file_path,
             "file_size": file_size,
             "format": "Excellon",
-            "units": units,
+            "units": header.units,
+            "zero_suppression": header.zeros,
+            "coordinate_format": list(header.coordinate_digits),
             "tools_count": len(tools),
             "tools": tools,
-            "total_holes": total_holes,
-            "holes_by_tool": tool_usage,
-            "hole_sizes_mm": sorted(set([h * 25.4 if units == "IN" else h for h in hole_sizes])) if hole_sizes else [],
-            "min_hole_size_mm": min_hole_size_mm,
-            "max_hole_size_mm": max_hole_size_mm,
-            "hole_counts_by_size": {str(k): v for k, v in hole_counts_by_size.items()},
-            "unique_hole_sizes": len(set(hole_sizes)) if hole_sizes else 0,
+            "total_holes": len(drills.holes),
+            "holes_by_tool": {f"{tool:02d}": info["hits"] for tool, info in usage.items()},
+            "total_slots": len(drills.slots),
+            "slots_by_tool": {f"{tool:02d}": info["slots"] for tool, info in usage.items() if info["slots"]},
+            "routed_length_mm": round(float(sum(info["routed_length_mm"] for info in usage.values())), 4),
+            "routed_length_by_tool_mm": {f"{tool:02d}": round(info["routed_length_mm"], 4)
+                                         for tool, info in usage.items() if info["routed_length_mm"]},
+            "hole_sizes_mm": hole_sizes_mm,
+            "min_hole_size_mm": hole_sizes_mm[0] if hole_sizes_mm else None,
+            "max_hole_size_mm": hole_sizes_mm[-1] if hole_sizes_mm else None,
+            "hole_counts_by_size": hole_counts_by_size,
+            "unique_hole_sizes": len(hole_sizes_mm),
         }
         
     except Exception as e:
@@ -107,4 +100,3 @@ def parse_drill_file(file_path: str) -> Dict[str, Any]:
             "success": False,
             "error": f"Failed to parse drill file: {str(e)}"
         }
-
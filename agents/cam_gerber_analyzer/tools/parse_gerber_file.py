@@ -1,12 +1,17 @@
 """Tool for parsing Gerber files."""
 
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..engine.gerber_tokenizer import scan_gerber, summarize
+from ..layer_cache import cached_parse_many
 
 
 def parse_gerber_file(file_path: str, file_type: str = None) -> Dict[str, Any]:
     """Parse a Gerber file and extract layer information.
     
+    Results are cached by file content, so every tool can call this freely.
+    
     Args:
         file_path: Path to Gerber file
         file_type: Type of file (copper_top, copper_bottom, solder_mask_top, drill, etc.)
@@ -14,6 +19,33 @@ def parse_gerber_file(file_path: str, file_type: str = None) -> Dict[str, Any]:
     Returns:
         Parsed data dictionary
     """
+    return parse_gerber_files([(file_path, file_type)])[0]
+
+
+def parse_gerber_files(layers: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Parse several Gerber files, in parallel where they are not cached.
+    
+    Args:
+        layers: (file_path, file_type) per file
+        
+    Returns:
+        Parsed data dictionaries in the order of layers
+    """
+    try:
+        results = cached_parse_many([(file_path, "gerber", _parse_gerber_file) for file_path, _ in layers])
+    except Exception as e:
+        return [{
+            "success": False,
+            "error": f"Failed to parse Gerber file: {str(e)}"
+        } for _ in layers]
+    for (file_path, file_type), parsed in zip(layers, results):
+        if parsed.get("success"):
+            parsed.update({"file_path": file_path, "file_type": file_type})
+    return results
+
+
+def _parse_gerber_file(file_path: str) -> Dict[str, Any]:
+    """Parse a Gerber file without the cache."""
     try:
         if not os.path.exists(file_path):
             return {
@@ -35,7 +67,6 @@ def parse_gerber_file(file_path: str, file_type: str = None) -> Dict[str, Any]:
             parsed_data = {
                 "success": True,
                 "file_path": file_path,
-                "file_type": file_type,
                 "file_size": file_size,
                 "format": "RS-274X",
                 "parsed": True,
@@ -193,99 +224,16 @@ def parse_gerber_file(file_path: str, file_type: str = None) -> Dict[str, Any]:
             # If parsing fails, fall back to basic parsing
             pass
         
-        # Basic parsing fallback
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read(10000)  # Read first 10KB
-        
-        # Detect if it's RS-274X format
-        is_rs274x = '%FS' in content or '%MO' in content
-        
-        # Extract units
-        units = "MM" if '%MOMM*%' in content or '%MO MM*%' in content else "IN" if '%MOIN*%' in content or '%MO IN*%' in content else None
-        
-        # Extract format specifier
-        format_spec = None
-        if '%FS' in content:
-            fs_line = [line for line in content.split('\n') if '%FS' in line]
-            if fs_line:
-                format_spec = fs_line[0].strip()
-        
-        # Count basic commands
-        draw_commands = content.count('D01') + content.count('D02') + content.count('D03')
-        
-        # Try to extract board dimensions from coordinates
-        import re
-        width = None
-        height = None
-        
-        # Try combined X Y coordinates first (most common format)
-        # Exclude format specifiers (lines starting with %)
-        content_lines = [line for line in content.split('\n') if not line.strip().startswith('%')]
-        content_filtered = '\n'.join(content_lines)
-        
-        coords_xy = re.findall(r'X(\d+)Y(\d+)', content_filtered)
-        if coords_xy:
-            try:
-                x_coords = [int(c[0]) for c in coords_xy]
-                y_coords = [int(c[1]) for c in coords_xy]
-                if x_coords and y_coords:
-                    min_x = min(x_coords)
-                    max_x = max(x_coords)
-                    min_y = min(y_coords)
-                    max_y = max(y_coords)
-                    # Convert to mm (assuming 5 decimal places, divide by 100000)
-                    if units == "MM":
-                        width = abs(max_x - min_x) / 100000.0
-                        height = abs(max_y - min_y) / 100000.0
-                    elif units == "IN":
-                        width = abs(max_x - min_x) / 100000.0 * 25.4  # Convert inches to mm
-                        height = abs(max_y - min_y) / 100000.0 * 25.4
-                    else:
-                        # Default to MM if units not specified
-                        width = abs(max_x - min_x) / 100000.0
-                        height = abs(max_y - min_y) / 100000.0
-            except Exception:
-                pass
-        
-        # Fallback: try separate X and Y coordinates
-        if width is None or height is None:
-            coords_x = re.findall(r'X(\d+)', content_filtered)
-            coords_y = re.findall(r'Y(\d+)', content_filtered)
-            if coords_x and coords_y:
-                try:
-                    x_coords = [int(x) for x in coords_x]
-                    y_coords = [int(y) for y in coords_y]
-                    if x_coords and y_coords:
-                        min_x = min(x_coords)
-                        max_x = max(x_coords)
-                        min_y = min(y_coords)
-                        max_y = max(y_coords)
-                        # Convert to mm
-                        if units == "MM":
-                            width = abs(max_x - min_x) / 100000.0
-                            height = abs(max_y - min_y) / 100000.0
-                        elif units == "IN":
-                            width = abs(max_x - min_x) / 100000.0 * 25.4
-                            height = abs(max_y - min_y) / 100000.0 * 25.4
-                        else:
-                            width = abs(max_x - min_x) / 100000.0
-                            height = abs(max_y - min_y) / 100000.0
-                except Exception:
-                    pass
+        # Fallback: stream the whole file through the built-in tokenizer
+        summary = summarize(scan_gerber(file_path))
         
         return {
             "success": True,
             "file_path": file_path,
-            "file_type": file_type,
             "file_size": file_size,
-            "format": "RS-274X" if is_rs274x else "RS-274D",
-            "format_spec": format_spec,
-            "units": units,
-            "draw_commands": draw_commands,
-            "width": width,
-            "height": height,
+            **summary,
             "parsed": True,
-            "note": "Basic parsing completed. Install python-gerber for enhanced parsing."
+            "note": "Parsed with the built-in streaming RS-274X tokenizer. Install python-gerber for enhanced parsing."
         }
         
     except Exception as e:
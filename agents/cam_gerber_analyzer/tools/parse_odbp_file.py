@@ -1,81 +1,107 @@
 """Tool for parsing ODB++ files."""
 
 import os
-import tarfile
-import zipfile
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from ..engine.geometry import LayerGeometry
+from ..engine.odb import MATRIX, OdbJob, decode_features, decode_matrix, features_path, load_odb_geometries
 
+# Matrix layer types that carry copper
+COPPER_LAYER_TYPES = ('signal', 'power_ground', 'mixed')
 
-def parse_odbp_file(archive_path: str = None, directory_path: str = None) -> Dict[str, Any]:
+
+def parse_odbp_file(
+    archive_path: str = None,
+    directory_path: str = None,
+    step: Optional[str] = None,
+    layers: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """Parse an ODB++ archive and extract design information.
-    
+
+    The archive is read in place: only the matrix, the step profiles and the
+    requested layers' features are decompressed.
+
     Args:
         archive_path: Path to ODB++ archive (.tgz, .zip, .tar.gz)
         directory_path: Path to ODB++ directory structure
-        
+        step: Step to describe (default: the first in the matrix)
+        layers: Layers whose features to decode (default: none)
+
     Returns:
         Parsed data dictionary
     """
     try:
-        extracted_path = None
-        
-        # Extract archive if provided
         if archive_path and os.path.exists(archive_path):
-            # Create extraction directory
-            extract_dir = archive_path + "_extracted"
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            if archive_path.endswith('.zip'):
-                with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
-            elif archive_path.endswith(('.tgz', '.tar.gz')):
-                with tarfile.open(archive_path, 'r:gz') as tar_ref:
-                    tar_ref.extractall(extract_dir)
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported archive format: {archive_path}"
-                }
-            
-            extracted_path = extract_dir
-        
-        # Use directory path if provided
-        if directory_path and os.path.exists(directory_path):
-            extracted_path = directory_path
-        
-        if not extracted_path or not os.path.exists(extracted_path):
+            path = archive_path
+        elif directory_path and os.path.exists(directory_path):
+            path = directory_path
+        else:
             return {
                 "success": False,
                 "error": "No valid ODB++ path provided"
             }
-        
-        # TODO: Implement actual ODB++ parsing using PyOdbDesignLib
-        # For now, check for ODB++ structure files
-        
+
+        job = OdbJob.open(path)
+
+        # Matrix and every step profile in one read
+        contents = job.read(MATRIX, *(features_path(name) for name in job.steps))
+        matrix = decode_matrix(contents[MATRIX]) if MATRIX in contents else {"steps": [], "layers": []}
+        steps = [s["name"] for s in matrix["steps"] if s["name"] in job.steps] or job.steps
+        step = (step or (steps[0] if steps else '')).lower()
+        if step not in job.steps:
+            return {
+                "success": False,
+                "error": f"Step {step or '(none)'} not found in ODB++ job; steps: {', '.join(job.steps)}"
+            }
+
         structure_info = {
-            "extracted_path": extracted_path,
-            "has_steps": os.path.exists(os.path.join(extracted_path, "steps")),
-            "has_matrix": os.path.exists(os.path.join(extracted_path, "matrix")),
-            "has_layers": os.path.exists(os.path.join(extracted_path, "layers")),
+            "has_steps": bool(job.steps),
+            "has_matrix": MATRIX in contents,
+            "has_layers": bool(job.layers(step)),
         }
-        
-        # Count files
-        file_count = 0
-        for root, dirs, files in os.walk(extracted_path):
-            file_count += len(files)
-        
-        return {
+
+        board_layers = [layer for layer in matrix["layers"] if layer["context"] == "board"]
+        result = {
             "success": True,
-            "extracted_path": extracted_path,
-            "file_count": file_count,
+            "path": path,
+            "format": job.format,
+            "file_count": len(job.members),
             "structure": structure_info,
+            "steps": steps,
+            "step": step,
+            "layers": matrix["layers"] or [{"name": name} for name in job.layers(step)],
+            "copper_layer_count": sum(1 for layer in board_layers if layer["type"] in COPPER_LAYER_TYPES),
             "parsed": True,
-            "note": "Basic structure detection implemented. Full parsing requires PyOdbDesignLib library."
         }
-        
+
+        profile = features_path(step)
+        if profile in contents:
+            bounds = decode_features(contents[profile]).bounds
+            if bounds:
+                result["bounds"] = bounds
+                result["board_width"] = round(bounds["max_x"] - bounds["min_x"], 3)
+                result["board_height"] = round(bounds["max_y"] - bounds["min_y"], 3)
+
+        if layers:
+            layer_features = {}
+            for name, parsed in zip(layers, load_odb_geometries(path, step, [name.lower() for name in layers])):
+                if not parsed.get("success"):
+                    layer_features[name] = {"error": parsed.get("error")}
+                    continue
+                geometry = LayerGeometry.from_result(parsed)
+                layer_features[name] = {
+                    "lines": len(geometry.lines),
+                    "arcs": len(geometry.arcs),
+                    "pads": len(geometry.flashes),
+                    "surface_edges": len(geometry.regions),
+                    "symbols": len(parsed["symbols"]),
+                    "bounds": geometry.bounds,
+                }
+            result["layer_features"] = layer_features
+
+        return result
+
     except Exception as e:
         return {
             "success": False,
             "error": f"Failed to parse ODB++ file: {str(e)}"
         }
-
@@ -1,15 +1,37 @@
 """Tool for performing CAM analysis."""
 
-from typing import Dict, Any
+import json
+from dataclasses import asdict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+
 from ..database import CamGerberDatabase
+from ..engine.connectivity import Memo, extract_nets, no_memo, plated_drills
+from ..engine.copper_area import CopperCoverage, balance_issues, copper_coverage
+from ..engine.drc import Board, run_drc, violation_boards, violation_issues
+from ..engine.drill import DrillHoles, load_drill_holes
+from ..engine.geometry import LayerGeometry, load_geometries
+from ..layer_cache import cached_derived, file_digest
+
+# Solder mask layers and the copper layer each one covers
+MASK_LAYERS = {
+    "solder_mask_top": "copper_top",
+    "solder_mask_bottom": "copper_bottom",
+}
 
 
 def perform_cam_analysis(analysis_id: int, analysis_options: Dict[str, Any] = None) -> Dict[str, Any]:
     """Perform comprehensive CAM analysis.
     
+    Net links, design-rule checks and copper coverage are kept in the layer
+    cache by the digests of the files they read, so a revision that changes
+    one layer only recomputes what depends on it.
+    
     Args:
         analysis_id: Analysis ID
-        analysis_options: Analysis options dictionary
+        analysis_options: Analysis options dictionary; "incremental": False
+            recomputes everything
         
     Returns:
         Analysis results with issues and recommendations
@@ -37,51 +59,87 @@ def perform_cam_analysis(analysis_id: int, analysis_options: Dict[str, Any] = No
         from ..config import AGENT_CONFIG
         cam_rules = AGENT_CONFIG.get("cam_rules", {})
         
-        issues = []
+        # Load copper, solder mask and drill layers as arrays
+        board = Board()
+        copper_files = [df for df in design_files if df.file_format == "gerber" and _is_copper_layer(df.file_type)]
+        mask_files = [df for df in design_files if df.file_format == "gerber" and df.file_type in MASK_LAYERS]
+        outline_files = [df for df in design_files if df.file_format == "gerber" and df.file_type == "outline"]
+        drill_files = [df for df in design_files if df.file_format == "drill"]
+        
+        outline = None
+        # Content digest of every board input, by its name in the memo
+        digests = {}
+        geometries = load_geometries([df.file_path for df in copper_files + mask_files + outline_files])
+        for df, result in zip(copper_files + mask_files + outline_files, geometries):
+            if not result.get("success"):
+                continue
+            if df.file_type == "outline":
+                outline = LayerGeometry.from_result(result)
+                digests["outline"] = _digest(df)
+            elif df.file_type in MASK_LAYERS:
+                board.masks[MASK_LAYERS[df.file_type]] = LayerGeometry.from_result(result)
+                digests[f"mask:{MASK_LAYERS[df.file_type]}"] = _digest(df)
+            else:
+                board.copper[df.file_type] = LayerGeometry.from_result(result)
+                digests[f"copper:{df.file_type}"] = _digest(df)
+        for df, result in zip(drill_files, load_drill_holes([df.file_path for df in drill_files])):
+            if result.get("success"):
+                # Plated and non-plated drill files often share a file type
+                board.drills[df.filename] = DrillHoles.from_result(result)
+                digests[f"drill:{df.filename}"] = _digest(df)
         
-        # Parse files and perform analysis
-        from .parse_gerber_file import parse_gerber_file
+        counts = {"reused": 0, "computed": 0}
+        incremental = (analysis_options or {}).get("incremental", True)
+        memo = _memo(digests, counts) if incremental else no_memo
         
-        for df in design_files:
-            if df.file_format == "gerber":
-                parsed = parse_gerber_file(df.file_path, df.file_type)
-                if parsed.get("success"):
-                    # Check minimum trace width (if we can extract it)
-                    # This is a simplified check - full implementation would analyze all traces
-                    if parsed.get("width") and parsed.get("width") < cam_rules.get("min_trace_width", 0.1) * 1000:
-                        issues.append({
-                            "issue_type": "trace_width",
-                            "severity": "warning",
-                            "layer_name": df.file_type,
-                            "description": f"Potential trace width issue detected",
-                            "recommendation": f"Verify trace widths meet minimum requirement of {cam_rules.get('min_trace_width', 0.1)}mm"
-                        })
+        # Trace nets through the copper layers and plated holes
+        nets = extract_nets(board.copper, plated_drills(board.drills), memo)
+        
+        # Check every feature against the CAM rules, once per panel board
+        issues = []
+        for layer_name, violations in run_drc(board, cam_rules, nets, memo):
+            geometry = board.copper.get(layer_name)
+            boards = violation_boards(geometry, violations) if geometry is not None else None
+            issues.extend(violation_issues(layer_name, violations, boards=boards))
+        
+        # Measure copper area and balance over the board
+        coverages = _copper_coverages(board, outline, digests if incremental else None, counts)
+        issues.extend(balance_issues(coverages, cam_rules.get("max_copper_imbalance"),
+                                     cam_rules.get("max_copper_density_deviation")))
         
         # Count issues by severity
         critical_count = sum(1 for issue in issues if issue.get("severity") == "critical")
         warning_count = sum(1 for issue in issues if issue.get("severity") == "warning")
         info_count = sum(1 for issue in issues if issue.get("severity") == "info")
         
-        # Save issues to database
+        # Replace the issues of any earlier run in one batch
         from ..models import AnalysisIssue
-        for issue_data in issues:
-            issue = AnalysisIssue(
+        db.replace_analysis_issues(analysis_id, [
+            AnalysisIssue(
                 analysis_id=analysis_id,
                 issue_type=issue_data.get("issue_type", ""),
                 severity=issue_data.get("severity", "info"),
                 layer_name=issue_data.get("layer_name"),
+                location_x=issue_data.get("location_x"),
+                location_y=issue_data.get("location_y"),
                 description=issue_data.get("description", ""),
                 recommendation=issue_data.get("recommendation")
             )
-            db.save_analysis_issue(issue)
+            for issue_data in issues
+        ])
         
-        # Update analysis result with issue counts
-        result = db.get_analysis_result(analysis_id)
-        if result:
-            result.issues_critical = critical_count
-            result.issues_warning = warning_count
-            result.issues_info = info_count
-            db.save_analysis_result(result)
+        # Update analysis result with issue counts and copper area
+        from ..models import AnalysisResult
+        result = db.get_analysis_result(analysis_id) or AnalysisResult(analysis_id=analysis_id)
+        result.issues_critical = critical_count
+        result.issues_warning = warning_count
+        result.issues_info = info_count
+        if coverages:
+            # Average over the copper layers, as plating and etching see them
+            result.copper_area_percentage = round(
+                sum(c.percentage for c in coverages.values()) / len(coverages), 2)
+            result.copper_balance = json.dumps(_copper_balance(coverages))
+        db.save_analysis_result(result)
         
         return {
             "success": True,
@@ -90,6 +148,11 @@ def perform_cam_analysis(analysis_id: int, analysis_options: Dict[str, Any] = No
             "issues_critical": critical_count,
             "issues_warning": warning_count,
             "issues_info": info_count,
+            "copper_area_percentage": result.copper_area_percentage,
+            "copper_layers": {name: round(c.percentage, 2) for name, c in coverages.items()},
+            "nets": nets.summary(),
+            "reused_results": counts["reused"],
+            "computed_results": counts["computed"],
             "issues": issues[:10]  # Return first 10 issues
         }
         
@@ -99,3 +162,71 @@ def perform_cam_analysis(analysis_id: int, analysis_options: Dict[str, Any] = No
             "error": f"Failed to perform CAM analysis: {str(e)}"
         }
 
+
+def _is_copper_layer(file_type: str) -> bool:
+    """Whether a file type is a copper layer."""
+    file_type = file_type.lower()
+    return file_type in ("copper_top", "copper_bottom") or "inner_layer" in file_type or "elec" in file_type
+
+
+def _digest(design_file) -> str:
+    """SHA-256 of a design file, from its record where the upload store set it."""
+    return design_file.sha256 or file_digest(design_file.file_path)
+
+
+def _memo(digests: Dict[str, str], counts: Dict[str, int]) -> Memo:
+    """Memo keeping results in the layer cache by the digests of their inputs."""
+    def memo(name: str, inputs: Tuple[str, ...], compute: Callable[[], np.ndarray]) -> np.ndarray:
+        result, reused = cached_derived(name, [digests.get(i, i) for i in inputs],
+                                        lambda: {"success": True, "value": compute()})
+        counts["reused" if reused else "computed"] += 1
+        return result["value"]
+    return memo
+
+
+def _copper_coverages(board: Board, outline: Optional[LayerGeometry], digests: Optional[Dict[str, str]] = None,
+                      counts: Optional[Dict[str, int]] = None) -> Dict[str, CopperCoverage]:
+    """Copper coverage of every copper layer over the board outline's extent.
+
+    Without an outline, the extent of all copper layers stands in for it.
+    On a panel, the extent is that of one board (see
+    LayerGeometry.board_bounds). With digests, coverages are kept in the
+    layer cache by layer, extent and settings.
+    """
+    from ..config import AGENT_CONFIG
+    settings = AGENT_CONFIG.get("copper_area", {})
+
+    bounds = outline.board_bounds if outline is not None else None
+    if bounds is None:
+        boxes = [b for b in (geometry.board_bounds for geometry in board.copper.values()) if b is not None]
+        if not boxes:
+            return {}
+        bounds = {
+            "min_x": min(b["min_x"] for b in boxes),
+            "min_y": min(b["min_y"] for b in boxes),
+            "max_x": max(b["max_x"] for b in boxes),
+            "max_y": max(b["max_y"] for b in boxes),
+        }
+    if digests is None:
+        return {name: copper_coverage(geometry, bounds, **settings) for name, geometry in board.copper.items()}
+
+    coverages = {}
+    resolution = [settings.get("pixel_mm"), settings.get("cell_mm")]
+    for name, geometry in board.copper.items():
+        result, reused = cached_derived("copper_coverage", [digests[f"copper:{name}"], bounds, resolution],
+                                        lambda: dict(asdict(copper_coverage(geometry, bounds, **settings)),
+                                                     success=True))
+        result.pop("success")
+        coverages[name] = CopperCoverage(**result)
+        counts["reused" if reused else "computed"] += 1
+    return coverages
+
+
+def _copper_balance(coverages: Dict[str, CopperCoverage]) -> Dict[str, Any]:
+    """Per-layer copper area and density grids, for AnalysisResult.copper_balance."""
+    any_coverage = next(iter(coverages.values()))
+    return {
+        "cell_mm": round(any_coverage.cell_size, 4),
+        "origin": {"x": any_coverage.min_x, "y": any_coverage.max_y},
+        "layers": {name: coverage.to_dict() for name, coverage in coverages.items()},
+    }
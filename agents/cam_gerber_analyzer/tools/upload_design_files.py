@@ -1,27 +1,120 @@
 """Tool for uploading design files."""
 
 import os
+import io
+import re
 import base64
+import hashlib
 import zipfile
-import tempfile
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+from ..archive import ArchiveLimitError, extract_members
+from ..blob_store import get_blob_store
 from ..database import CamGerberDatabase
+from ..engine.attributes import FileAttributes, classify_layer, read_attributes
 from ..models import DesignFile
 
+# Members of uploaded ZIP archives that are extracted
+GERBER_EXTENSIONS = ('.ger', '.gbr', '.art', '.drill', '.exc', '.txt')
+
+
+def _detect_member_type(member_name: str) -> str:
+    """Determine a layer's file type from its name in an archive."""
+    zip_lower = member_name.lower()
+    if 'top' in zip_lower and ('copper' in zip_lower or 'elec' in zip_lower):
+        return "copper_top"
+    elif 'bottom' in zip_lower and ('copper' in zip_lower or 'elec' in zip_lower):
+        return "copper_bottom"
+    elif 'top' in zip_lower and 'silk' in zip_lower:
+        return "silk_top"
+    elif 'bottom' in zip_lower and 'silk' in zip_lower:
+        return "silk_bottom"
+    elif 'top' in zip_lower and ('stop' in zip_lower or 'mask' in zip_lower):
+        return "solder_mask_top"
+    elif ('bottom' in zip_lower or 'bot' in zip_lower) and ('stop' in zip_lower or 'mask' in zip_lower):
+        return "solder_mask_bottom"
+    elif 'top' in zip_lower and 'paste' in zip_lower:
+        return "paste_top"
+    elif 'drill' in zip_lower or zip_lower.endswith('.exc'):
+        return "drill"
+    elif 'routing' in zip_lower or 'outline' in zip_lower:
+        return "outline"
+    elif 'plating' in zip_lower:
+        return "plating"
+    elif 'elec' in zip_lower or 'inner' in zip_lower:
+        # Try to extract layer number
+        layer_match = re.search(r'elec(\d+)', zip_lower)
+        if layer_match:
+            return f"inner_layer_{layer_match.group(1)}"
+        return "inner_layer"
+    return "other"
+
+
+def _classify(file_path: str, given_type: str, name_type: str = "other") -> Tuple[str, str, FileAttributes]:
+    """File type of an uploaded layer, how it was found, and the file's attributes.
+
+    Gerber X2 attributes in the file decide; failing them the type detected
+    from the name, then the type given with the upload.
+    """
+    attributes = read_attributes(file_path)
+    attribute_type = classify_layer(attributes)
+    if attribute_type:
+        return attribute_type, "attributes", attributes
+    if name_type != "other":
+        return name_type, "filename", attributes
+    return given_type, "given", attributes
+
+
+def _inherited_type(file_type: str, classified_by: str, filename: str,
+                    parent_types: Dict[str, str]) -> Tuple[str, str]:
+    """File type of a revision's file, and how it was found, given the parent's types by file name.
+
+    A file classified only by the given type "other" that replaces a parent
+    file by name keeps the parent file's type.
+    """
+    if classified_by == "given" and file_type == "other" and filename in parent_types:
+        return parent_types[filename], "parent"
+    return file_type, classified_by
+
+
+def _coordinate_warning(attributes: List[Optional[str]]) -> Optional[str]:
+    """Warning where uploaded files declare different .SameCoordinates identifiers."""
+    identifiers = sorted({a for a in attributes if a})
+    if len(identifiers) > 1:
+        return f"Files declare {len(identifiers)} different coordinate systems (.SameCoordinates): " \
+               + ", ".join(identifiers)
+    return None
+
 
 def upload_design_files(
     files: List[Dict[str, Any]],
     project_name: str = None,
     board_name: str = None,
-    user_id: str = "default"
+    user_id: str = "default",
+    parent_analysis_id: int = None
 ) -> Dict[str, Any]:
     """Upload and store Gerber or ODB++ files for analysis.
     
+    Files are kept in the content-addressed upload store: a file uploaded
+    before is linked to the stored copy, and its parse results are reused.
+    
+    Layers are classified by their Gerber X2 file attributes
+    (%TF.FileFunction), read from the head of each file; the filename
+    and the given file_type are the fallback.
+    
+    With a parent analysis, the upload is the next revision of it: only the
+    changed files need uploading, and the parent's other files are carried
+    over. An uploaded file replaces the parent's file of the same name, or
+    of the same type where the parent has one file of that type. A file
+    replacing one by name that neither its attributes nor its name
+    classify takes the replaced file's type.
+    
     Args:
         files: List of file objects with 'filename', 'content' (base64), 'file_type'
-        project_name: Project name (optional)
-        board_name: Board name (optional)
+        project_name: Project name (optional, the parent's by default)
+        board_name: Board name (optional, the parent's by default)
         user_id: User identifier
+        parent_analysis_id: Analysis this upload revises (optional)
         
     Returns:
         Dictionary with analysis_id and uploaded files info
@@ -30,18 +123,26 @@ def upload_design_files(
         # Initialize database
         db = CamGerberDatabase()
         
+        parent = None
+        if parent_analysis_id is not None:
+            parent = db.get_analysis(parent_analysis_id)
+            if not parent:
+                return {
+                    "success": False,
+                    "error": f"Analysis {parent_analysis_id} not found"
+                }
+            project_name = project_name or parent.project_name
+            board_name = board_name or parent.board_name
+        
         # Create analysis session
-        analysis_id = db.create_analysis(user_id, project_name, board_name)
+        analysis_id = db.create_analysis(user_id, project_name, board_name, parent_analysis_id)
         
-        # Get upload directory from config
-        upload_dir = os.path.join(
-            os.path.dirname(__file__),
-            '../../../data/cam_gerber_analyzer/uploads',
-            str(analysis_id)
-        )
-        os.makedirs(upload_dir, exist_ok=True)
+        parent_files = db.get_design_files(parent.id) if parent is not None else []
+        parent_types = {df.filename: df.file_type for df in parent_files}
         
+        store = get_blob_store()
         uploaded_files = []
+        coordinates = []
         
         # Process each file
         for file_data in files:
@@ -60,18 +161,14 @@ def upload_design_files(
             
             # Check if file is a ZIP archive
             if filename.lower().endswith('.zip'):
-                # Extract ZIP file and process all contents
+                # Stream the Gerber and drill members into the store
                 try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_zip:
-                        tmp_zip.write(file_bytes)
-                        tmp_zip_path = tmp_zip.name
-                    
-                    with zipfile.ZipFile(tmp_zip_path, 'r') as zip_ref:
-                        zip_file_list = zip_ref.namelist()
-                        
+                    with zipfile.ZipFile(io.BytesIO(file_bytes), 'r') as zip_ref, store.staging() as staging_dir:
                         # Filter for Gerber and drill files
-                        gerber_extensions = ('.ger', '.gbr', '.art', '.drill', '.exc', '.txt')
-                        relevant_files = [f for f in zip_file_list if f.lower().endswith(gerber_extensions)]
+                        relevant_files = [
+                            info for info in zip_ref.infolist()
+                            if not info.is_dir() and info.filename.lower().endswith(GERBER_EXTENSIONS)
+                        ]
                         
                         if not relevant_files:
                             return {
@@ -79,88 +176,56 @@ def upload_design_files(
                                 "error": f"ZIP file {filename} does not contain any Gerber or drill files"
                             }
                         
-                        # Extract and process each file
-                        for zip_filename in relevant_files:
-                            # Skip directories
-                            if zip_filename.endswith('/'):
-                                continue
-                            
-                            # Extract file content
-                            file_content = zip_ref.read(zip_filename)
-                            
-                            # Determine file type from filename
-                            detected_type = "other"
-                            zip_lower = zip_filename.lower()
-                            if 'top' in zip_lower and ('copper' in zip_lower or 'elec' in zip_lower):
-                                detected_type = "copper_top"
-                            elif 'bottom' in zip_lower and ('copper' in zip_lower or 'elec' in zip_lower):
-                                detected_type = "copper_bottom"
-                            elif 'top' in zip_lower and 'silk' in zip_lower:
-                                detected_type = "silk_top"
-                            elif 'bottom' in zip_lower and 'silk' in zip_lower:
-                                detected_type = "silk_bottom"
-                            elif 'top' in zip_lower and ('stop' in zip_lower or 'mask' in zip_lower):
-                                detected_type = "solder_mask_top"
-                            elif ('bottom' in zip_lower or 'bot' in zip_lower) and ('stop' in zip_lower or 'mask' in zip_lower):
-                                detected_type = "solder_mask_bottom"
-                            elif 'top' in zip_lower and 'paste' in zip_lower:
-                                detected_type = "paste_top"
-                            elif 'drill' in zip_lower or zip_lower.endswith('.exc'):
-                                detected_type = "drill"
-                            elif 'routing' in zip_lower or 'outline' in zip_lower:
-                                detected_type = "outline"
-                            elif 'plating' in zip_lower:
-                                detected_type = "plating"
-                            elif 'elec' in zip_lower or 'inner' in zip_lower:
-                                # Try to extract layer number
-                                import re
-                                layer_match = re.search(r'elec(\d+)', zip_lower)
-                                if layer_match:
-                                    layer_num = layer_match.group(1)
-                                    detected_type = f"inner_layer_{layer_num}"
-                                else:
-                                    detected_type = "inner_layer"
-                            
-                            # Save extracted file
-                            safe_filename = os.path.basename(zip_filename)
-                            file_path = os.path.join(upload_dir, safe_filename)
-                            with open(file_path, 'wb') as f:
-                                f.write(file_content)
-                            
-                            # Detect file format
-                            file_format = "gerber"
-                            if safe_filename.lower().endswith(('.exc', '.drill')):
-                                file_format = "drill"
-                            elif safe_filename.lower().endswith(('.gbr', '.ger', '.art', '.txt')):
-                                file_format = "gerber"
-                            
-                            # Create design file record
-                            design_file = DesignFile(
-                                analysis_id=analysis_id,
-                                filename=safe_filename,
-                                file_format=file_format,
-                                file_type=detected_type if detected_type != "other" else file_type,
-                                file_path=file_path,
-                                file_size=len(file_content)
-                            )
-                            
-                            file_id = db.save_design_file(design_file)
-                            uploaded_files.append({
-                                "id": file_id,
-                                "filename": safe_filename,
-                                "file_format": file_format,
-                                "file_type": detected_type,
-                                "file_size": len(file_content)
-                            })
+                        members = extract_members(zip_ref, relevant_files, staging_dir)
+                        stored = [store.add(member.path, member.sha256) for member in members]
                     
-                    # Clean up temp file
-                    os.unlink(tmp_zip_path)
+                    for member, (blob_path, existing) in zip(members, stored):
+                        safe_filename = os.path.basename(member.path)
+                        detected_type, classified_by, attributes = _classify(
+                            blob_path, file_type, _detect_member_type(member.name))
+                        detected_type, classified_by = _inherited_type(
+                            detected_type, classified_by, safe_filename, parent_types)
+                        coordinates.append(attributes.same_coordinates)
+                        
+                        # Detect file format
+                        file_format = "gerber"
+                        if safe_filename.lower().endswith(('.exc', '.drill')) or attributes.format == "drill":
+                            file_format = "drill"
+                        
+                        # Create design file record
+                        design_file = DesignFile(
+                            analysis_id=analysis_id,
+                            filename=safe_filename,
+                            file_format=file_format,
+                            file_type=detected_type,
+                            file_path=blob_path,
+                            file_size=member.size,
+                            sha256=member.sha256
+                        )
+                        
+                        file_id = db.save_design_file(design_file)
+                        uploaded_files.append({
+                            "id": file_id,
+                            "filename": safe_filename,
+                            "file_format": file_format,
+                            "file_type": detected_type,
+                            "classified_by": classified_by,
+                            "attributes": attributes.to_dict() if attributes.x2 else None,
+                            "file_size": member.size,
+                            "sha256": member.sha256,
+                            "deduplicated": existing
+                        })
                     
                 except zipfile.BadZipFile:
                     return {
                         "success": False,
                         "error": f"File {filename} is not a valid ZIP archive"
                     }
+                except ArchiveLimitError as e:
+                    return {
+                        "success": False,
+                        "error": f"ZIP file {filename} rejected: {str(e)}"
+                    }
                 except Exception as e:
                     return {
                         "success": False,
@@ -169,16 +234,25 @@ def upload_design_files(
             else:
                 # Regular file (not ZIP)
                 # Save file
-                file_path = os.path.join(upload_dir, filename)
-                with open(file_path, 'wb') as f:
-                    f.write(file_bytes)
+                digest = hashlib.sha256(file_bytes).hexdigest()
+                with store.staging() as staging_dir:
+                    staged_path = os.path.join(staging_dir, 'upload')
+                    with open(staged_path, 'wb') as f:
+                        f.write(file_bytes)
+                    file_path, existing = store.add(staged_path, digest)
                 
                 # Detect file format
                 file_format = "gerber"
                 if filename.endswith(('.tgz', '.tar.gz', '.odb')):
                     file_format = "odbp"
-                elif filename.endswith(('.gbr', '.ger', '.art', '.drill', '.txt', '.exc')):
-                    file_format = "gerber"
+                    classified_by, attributes = "given", FileAttributes()
+                else:
+                    file_type, classified_by, attributes = _classify(file_path, file_type,
+                                                                     _detect_member_type(filename))
+                    coordinates.append(attributes.same_coordinates)
+                    if attributes.format == "drill":
+                        file_format = "drill"
+                file_type, classified_by = _inherited_type(file_type, classified_by, filename, parent_types)
                 
                 # Create design file record
                 design_file = DesignFile(
@@ -187,7 +261,8 @@ def upload_design_files(
                     file_format=file_format,
                     file_type=file_type,
                     file_path=file_path,
-                    file_size=len(file_bytes)
+                    file_size=len(file_bytes),
+                    sha256=digest
                 )
                 
                 file_id = db.save_design_file(design_file)
@@ -195,14 +270,36 @@ def upload_design_files(
                     "id": file_id,
                     "filename": filename,
                     "file_format": file_format,
-                    "file_size": len(file_bytes)
+                    "file_type": file_type,
+                    "classified_by": classified_by,
+                    "attributes": attributes.to_dict() if attributes.x2 else None,
+                    "file_size": len(file_bytes),
+                    "sha256": digest,
+                    "deduplicated": existing
                 })
         
+        # Carry the parent's unchanged files over to the new revision
+        carried = []
+        if parent is not None:
+            carried = _unreplaced_files(parent_files, db.get_design_files(analysis_id))
+            for design_file in carried:
+                design_file.id = None
+                design_file.analysis_id = analysis_id
+                db.save_design_file(design_file)
+        
+        deduplicated = sum(1 for f in uploaded_files if f["deduplicated"])
+        warning = _coordinate_warning(coordinates)
         return {
             "success": True,
             "analysis_id": analysis_id,
+            "parent_analysis_id": parent_analysis_id,
             "uploaded_files": uploaded_files,
+            "carried_files": [df.filename for df in carried],
+            "deduplicated_files": deduplicated,
+            "warnings": [warning] if warning else [],
             "message": f"Successfully uploaded {len(uploaded_files)} file(s)"
+                       + (f", {deduplicated} already stored" if deduplicated else "")
+                       + (f", {len(carried)} carried over from analysis {parent_analysis_id}" if carried else "")
         }
         
     except Exception as e:
@@ -211,3 +308,14 @@ def upload_design_files(
             "error": f"Failed to upload files: {str(e)}"
         }
 
+
+def _unreplaced_files(parent_files: List[DesignFile], new_files: List[DesignFile]) -> List[DesignFile]:
+    """The parent's files that no file of the new revision replaces."""
+    parent_types = Counter(df.file_type for df in parent_files)
+    new_names = {df.filename for df in new_files}
+    new_types = {df.file_type for df in new_files}
+    return [
+        df for df in parent_files
+        if df.filename not in new_names
+        and not (df.file_type in new_types and df.file_type != "other" and parent_types[df.file_type] == 1)
+    ]
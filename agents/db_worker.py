@@ -0,0 +1,153 @@
+"""Dedicated SQLite thread shared by agent databases.
+
+Every database file gets one worker thread that owns its connection. Callers
+submit operations (plain functions taking a cursor) to the worker's queue:
+sync code blocks on the returned future, async code awaits it without stalling
+the event loop. The worker drains whatever is queued and runs it as one
+transaction with one commit, so concurrent conversations share commits
+instead of each paying for their own.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_BATCH = 64
+
+_STOP = object()
+
+
+class DatabaseWorker:
+    """Thread owning one SQLite connection and executing queued operations."""
+
+    def __init__(self, db_path: str, max_batch: int = DEFAULT_MAX_BATCH):
+        """Open the connection and start the worker thread.
+
+        Args:
+            db_path: Path to SQLite database
+            max_batch: Maximum number of operations committed together
+        """
+        self.db_path = db_path
+        self.max_batch = max_batch
+        # Autocommit mode: transactions are managed explicitly per batch
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"db-worker:{os.path.basename(db_path)}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, operation: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue an operation.
+
+        Args:
+            operation: Function called as operation(cursor, *args, **kwargs)
+
+        Returns:
+            Future resolved with the operation's result once it is committed
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Database operations must not submit nested operations")
+        future: Future = Future()
+        self._queue.put((operation, args, kwargs, future))
+        return future
+
+    def call(self, operation: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run an operation and block until it is committed."""
+        return self.submit(operation, *args, **kwargs).result()
+
+    async def run(self, operation: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run an operation without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(operation, *args, **kwargs))
+
+    def close(self):
+        """Finish queued operations, stop the thread and close the connection."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        """Worker loop: execute queued operations in batched transactions."""
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if _STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+
+            if batch:
+                self._execute_batch(batch)
+
+        self._conn.close()
+
+    def _execute_batch(self, batch):
+        """Run a batch in one transaction, isolating failures per operation."""
+        cursor = self._conn.cursor()
+        outcomes = []
+        try:
+            cursor.execute('BEGIN')
+            for operation, args, kwargs, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute('SAVEPOINT operation')
+                try:
+                    result = operation(cursor, *args, **kwargs)
+                    cursor.execute('RELEASE operation')
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    # Undo only this operation; the rest of the batch commits
+                    cursor.execute('ROLLBACK TO operation')
+                    cursor.execute('RELEASE operation')
+                    outcomes.append((future, None, e))
+            cursor.execute('COMMIT')
+        except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Results become visible to callers only after the commit succeeded
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+_workers: Dict[str, DatabaseWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(db_path: str, init: Optional[Callable[[sqlite3.Cursor], Any]] = None) -> DatabaseWorker:
+    """Get the process-wide worker for a database file.
+
+    Args:
+        db_path: Path to SQLite database
+        init: Schema initialization operation, run once when the worker is created
+
+    Returns:
+        DatabaseWorker for db_path
+    """
+    key = os.path.abspath(db_path)
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            worker = DatabaseWorker(key)
+            if init is not None:
+                worker.call(init)
+            _workers[key] = worker
+        return worker
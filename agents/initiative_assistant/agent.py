@@ -140,24 +140,59 @@ class InitiativeAssistantAgent:
         
         try:
             result = tool_map[tool_name](**args)
-            # Convert to expected format
-            if result.get("success"):
-                return {
-                    "ok": True,
-                    "output": result.get("message", "Success"),
-                    "data": result
-                }
-            else:
-                return {
-                    "ok": False,
-                    "error": result.get("error", "Unknown error")
-                }
+            return self._tool_result(result)
         except Exception as e:
             return {
                 "ok": False,
                 "error": str(e)
             }
     
+    async def execute_tool_async(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an agent tool without blocking the event loop.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            args: Tool arguments
+            
+        Returns:
+            Tool execution result
+        """
+        tool_map = {
+            "save_initiative": tools.save_initiative_async,
+            "search_similar_initiatives": tools.search_similar_initiatives_async,
+            "get_initiative_details": tools.get_initiative_details_async,
+            "save_feedback": tools.save_feedback_async
+        }
+        
+        if tool_name not in tool_map:
+            return {
+                "ok": False,
+                "error": f"Unknown tool: {tool_name}"
+            }
+        
+        try:
+            result = await tool_map[tool_name](**args)
+            return self._tool_result(result)
+        except Exception as e:
+            return {
+                "ok": False,
+                "error": str(e)
+            }
+    
+    def _tool_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a tool's return value to the expected format."""
+        if result.get("success"):
+            return {
+                "ok": True,
+                "output": result.get("message", "Success"),
+                "data": result
+            }
+        else:
+            return {
+                "ok": False,
+                "error": result.get("error", "Unknown error")
+            }
+    
     def find_function_call_parts(self, response: types.GenerateContentResponse) -> Optional[tuple]:
         """Extract function call from Gemini response.
         
@@ -320,7 +355,7 @@ class InitiativeAssistantAgent:
             function_name, function_args = func_call
             
             # Execute tool
-            tool_result = self.execute_tool(function_name, function_args)
+            tool_result = await self.execute_tool_async(function_name, function_args)
             
             # Track function call
             function_calls.append({
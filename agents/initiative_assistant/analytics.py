@@ -0,0 +1,154 @@
+"""Precomputed aggregates for the initiative admin dashboard.
+
+Counts live in the initiative_stats summary table as (dimension, bucket, count)
+rows. Writes adjust them in the same transaction as the change itself, so
+reading the dashboard never scans initiatives or feedback. rebuild_stats
+recomputes everything from the source tables.
+
+Rebuild from the command line:
+    python -m agents.initiative_assistant.analytics [db_path]
+"""
+
+import sqlite3
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Aggregated dimensions and the SQL expression each one groups initiatives by
+INITIATIVE_DIMENSIONS = {
+    'total': "''",
+    'status': "COALESCE(status, '')",
+    'department': "COALESCE(creator_department, '')",
+    'month': "COALESCE(substr(created_at, 1, 7), '')",
+}
+FEEDBACK_DIMENSIONS = {
+    'feedback_total': "''",
+    'feedback_type': "COALESCE(feedback_type, '')",
+}
+
+DEFAULT_TOP_LIMIT = 5
+
+
+def create_schema(cursor: sqlite3.Cursor):
+    """Create the summary table, filling it if it did not exist yet."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'initiative_stats'"
+    )
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS initiative_stats (
+            dimension TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, bucket)
+        ) WITHOUT ROWID
+    ''')
+    # Top-feedback list reads the head of this index
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_feedback_count
+        ON initiatives(feedback_count, id)
+    ''')
+    if not exists:
+        rebuild_stats(cursor)
+
+
+def initiative_buckets(row: Optional[sqlite3.Row]) -> Iterable[Tuple[str, str]]:
+    """Get the (dimension, bucket) pairs an initiatives row is counted in.
+
+    Args:
+        row: Row with status, creator_department and created_at, or None
+    """
+    if row is None:
+        return []
+    created_at = str(row['created_at'] or '')
+    return [
+        ('total', ''),
+        ('status', row['status'] or ''),
+        ('department', row['creator_department'] or ''),
+        ('month', created_at[:7]),
+    ]
+
+
+def feedback_buckets(feedback_type: Optional[str]) -> Iterable[Tuple[str, str]]:
+    """Get the (dimension, bucket) pairs a feedback entry is counted in."""
+    return [('feedback_total', ''), ('feedback_type', feedback_type or '')]
+
+
+def adjust_stats(cursor: sqlite3.Cursor, deltas: Counter):
+    """Apply count changes to the summary table.
+
+    Args:
+        cursor: Cursor inside the writing transaction
+        deltas: Counter mapping (dimension, bucket) to the change in count
+    """
+    changes = [(dimension, bucket, delta) for (dimension, bucket), delta in deltas.items() if delta]
+    if not changes:
+        return
+    cursor.executemany('''
+        INSERT INTO initiative_stats (dimension, bucket, count) VALUES (?, ?, ?)
+        ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count
+    ''', changes)
+    cursor.execute('DELETE FROM initiative_stats WHERE count <= 0')
+
+
+def rebuild_stats(cursor: sqlite3.Cursor):
+    """Recompute the summary table from initiatives and feedback."""
+    cursor.execute('DELETE FROM initiative_stats')
+    for table, dimensions in (('initiatives', INITIATIVE_DIMENSIONS), ('feedback', FEEDBACK_DIMENSIONS)):
+        for dimension, expression in dimensions.items():
+            cursor.execute(f'''
+                INSERT INTO initiative_stats (dimension, bucket, count)
+                SELECT ?, {expression}, COUNT(*) FROM {table}
+                GROUP BY {expression}
+            ''', (dimension,))
+
+
+def read_stats(cursor: sqlite3.Cursor, top_limit: int = DEFAULT_TOP_LIMIT) -> Dict[str, Any]:
+    """Read the dashboard aggregates.
+
+    Args:
+        cursor: Database cursor
+        top_limit: Number of initiatives in the top-feedback list
+
+    Returns:
+        Dictionary with totals, per-dimension counts and top-feedback initiatives
+    """
+    stats: Dict[str, Dict[str, int]] = {
+        dimension: {} for dimension in (*INITIATIVE_DIMENSIONS, *FEEDBACK_DIMENSIONS)
+    }
+    cursor.execute('SELECT dimension, bucket, count FROM initiative_stats')
+    for row in cursor.fetchall():
+        stats.setdefault(row['dimension'], {})[row['bucket']] = row['count']
+
+    cursor.execute('''
+        SELECT id, title, feedback_count FROM initiatives
+        WHERE feedback_count > 0
+        ORDER BY feedback_count DESC, id DESC
+        LIMIT ?
+    ''', (top_limit,))
+    top_feedback = [dict(row) for row in cursor.fetchall()]
+
+    return {
+        'total_initiatives': stats['total'].get('', 0),
+        'total_feedback': stats['feedback_total'].get('', 0),
+        'by_status': stats['status'],
+        'by_department': stats['department'],
+        'by_month': dict(sorted(stats['month'].items())),
+        'by_feedback_type': stats['feedback_type'],
+        'top_feedback': top_feedback,
+    }
+
+
+def main():
+    """Rebuild the summary table of the configured (or given) database."""
+    from .database import InitiativeDatabase
+
+    db = InitiativeDatabase(sys.argv[1] if len(sys.argv) > 1 else None)
+    db.rebuild_analytics()
+    analytics = db.get_analytics()
+    print(f"Rebuilt analytics for {db.db_path}: "
+          f"{analytics['total_initiatives']} initiatives, {analytics['total_feedback']} feedback")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Benchmarks for Initiative Assistant Agent."""
@@ -0,0 +1,115 @@
+"""Benchmark the admin initiative listing at 50k rows.
+
+Compares the old full listing (get_all_initiatives with limit=1000 plus a
+dict per row) against keyset pages from list_initiatives_page.
+
+Usage:
+    python -m agents.initiative_assistant.benchmarks.bench_admin_listing [rows]
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.initiative_assistant.database import InitiativeDatabase
+
+STATUSES = ['proposed', 'in_progress', 'completed', 'cancelled']
+DEPARTMENTS = ['Production', 'Quality', 'Sales', 'R&D', 'Logistics', 'HR']
+
+
+def populate(db_path: str, rows: int):
+    """Insert synthetic initiatives spread over the last few years."""
+    start = datetime(2022, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO initiatives (
+            title, description, creator_name, creator_department, creator_email,
+            goals, related_processes, expected_outcomes, status, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        (
+            f"Initiative {i}",
+            f"Description of initiative {i} " * 10,
+            f"User {i % 500}",
+            DEPARTMENTS[i % len(DEPARTMENTS)],
+            f"user{i % 500}@aspocomp.com",
+            "Goals " * 20,
+            "Processes " * 10,
+            "Outcomes " * 20,
+            STATUSES[i % len(STATUSES)],
+            (start + timedelta(minutes=37 * i)).strftime('%Y-%m-%d %H:%M:%S'),
+            (start + timedelta(minutes=37 * i)).strftime('%Y-%m-%d %H:%M:%S'),
+        )
+        for i in range(rows)
+    ))
+    conn.commit()
+    conn.close()
+
+
+def timed(label: str, fn, repeat: int = 20):
+    """Run fn repeatedly and print the best wall time."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<45} {best * 1000:8.2f} ms")
+
+
+def old_listing(db: InitiativeDatabase):
+    """The listing as it was before keyset pagination."""
+    initiatives = db.get_all_initiatives(include_personal=True, limit=1000)
+    return [init.to_dict(include_personal=True) for init in initiatives]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db = InitiativeDatabase(os.path.join(temp_dir, 'bench.db'))
+        populate(db.db_path, rows)
+        print(f"{rows} initiatives\n")
+
+        timed("old: get_all_initiatives(limit=1000)", lambda: old_listing(db), repeat=5)
+        timed("keyset: first page (50)", lambda: db.list_initiatives_page(limit=50))
+
+        # Walk to a page deep in the listing to show the cost stays flat
+        cursor = None
+        for _ in range(rows // 100):
+            _, cursor = db.list_initiatives_page(limit=50, cursor=cursor)
+        timed("keyset: page at 50% depth", lambda: db.list_initiatives_page(limit=50, cursor=cursor))
+
+        timed("keyset: status filter",
+              lambda: db.list_initiatives_page(limit=50, status='completed'))
+        timed("keyset: status + department filter",
+              lambda: db.list_initiatives_page(limit=50, status='completed', department='Sales'))
+        timed("etag check (version counter only)", db.get_version)
+
+        print("\nQuery plans:")
+        conn = sqlite3.connect(db.db_path)
+        for label, where, params in [
+            ("no filter", "(created_at, id) < (?, ?)", ('2023-01-01 00:00:00', 1)),
+            ("status", "status = ? AND (created_at, id) < (?, ?)", ('completed', '2023-01-01 00:00:00', 1)),
+            ("department", "creator_department = ? AND (created_at, id) < (?, ?)",
+             ('Sales', '2023-01-01 00:00:00', 1)),
+        ]:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM initiatives WHERE {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT 51", params
+            ).fetchall()
+            print(f"  {label}: " + "; ".join(row[-1] for row in plan))
+        conn.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
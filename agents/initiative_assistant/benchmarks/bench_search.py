@@ -0,0 +1,84 @@
+"""Benchmark initiative similarity search at 20k rows.
+
+Compares the old LIKE scan over title and description against the trigram
+index used by search_similar.
+
+Usage:
+    python -m agents.initiative_assistant.benchmarks.bench_search [rows]
+"""
+
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import tempfile
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.models import Initiative
+from agents.initiative_assistant.benchmarks.bench_admin_listing import timed
+
+PREFIXES = ['tuotannon', 'laadun', 'varaston', 'huollon', 'myynnin', 'porauksen', 'laminoinnin',
+            'pinnoituksen', 'syövytyksen', 'testauksen', 'hankinnan', 'kunnossapidon']
+SUBJECTS = ['suunnittelu', 'seuranta', 'ohjaus', 'raportointi', 'automaatio', 'mittaus',
+            'optimointi', 'kalibrointi', 'dokumentointi', 'koulutus']
+SUFFIXES = ['järjestelmä', 'prosessi', 'työkalu', 'malli', 'ohje', 'sovellus', 'kokeilu']
+WORDS = ['linja', 'kone', 'levy', 'paneeli', 'reikä', 'kupari', 'maski', 'kamera', 'robotti',
+         'uuni', 'kemikaali', 'tilaus', 'asiakas', 'toimittaja', 'varasto', 'energia', 'jäte',
+         'turvallisuus', 'ergonomia', 'data', 'raportti', 'hälytys', 'huolto', 'vika']
+
+
+def populate(db: InitiativeDatabase, rows: int):
+    """Save synthetic Finnish compound-word initiatives through the database API."""
+    rng = random.Random(1)
+    for i in range(rows):
+        compound = rng.choice(PREFIXES) + rng.choice(SUBJECTS) + rng.choice(SUFFIXES)
+        words = " ".join(rng.sample(WORDS, 6))
+        db.save_initiative(Initiative(
+            title=f"{compound.capitalize()} {i}",
+            description=f"{words} {rng.randrange(10 ** 6)}",
+            creator_name=f"User {i % 500}"
+        ))
+
+
+def like_scan(db_path: str, title: str):
+    """The search as it was before the trigram index: LIKE per whole word."""
+    terms = [term for term in title.lower().split() if len(term) > 2][:5]
+    conditions = " OR ".join("(LOWER(title) LIKE ? OR LOWER(description) LIKE ?)" for _ in terms)
+    params = [p for term in terms for p in (f"%{term}%", f"%{term}%")]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        f"SELECT * FROM initiatives WHERE {conditions} ORDER BY created_at DESC LIMIT 5", params
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db = InitiativeDatabase(os.path.join(temp_dir, 'bench.db'))
+        populate(db, rows)
+        print(f"{rows} initiatives\n")
+
+        for label, query in [
+            ("common terms", "Laadun seuranta"),
+            ("no match", "Röntgenkuvaus"),
+        ]:
+            timed(f"old: LIKE scan ({label})", lambda: like_scan(db.db_path, query))
+            timed(f"trigram index ({label})", lambda: db.search_similar(query, ""))
+
+        print("\nTop matches for compound part 'seurantajärjestelmä':")
+        for initiative in db.search_similar("seurantajärjestelmä", "", limit=3):
+            print(f"  {initiative.title}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Read-through cache for initiative lookups."""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Optional, Tuple
+
+from .models import Initiative
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class InitiativeCache:
+    """Bounded LRU cache of initiatives keyed by ID and projection.
+
+    Every entry belongs to the database version it was read at. Writes bump the
+    version counter stored in the database, so a process that observes a newer
+    version than its own drops all entries before serving a lookup. This keeps
+    the cache correct across processes sharing the same database file.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of cached projections
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, bool], Initiative]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, initiative_id: int, include_personal: bool, version: int) -> Optional[Initiative]:
+        """Look up an initiative projection.
+
+        Args:
+            initiative_id: ID of initiative
+            include_personal: Which projection to return
+            version: Current database version counter
+
+        Returns:
+            Copy of the cached initiative, or None on a miss
+        """
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+                return None
+
+            key = (initiative_id, include_personal)
+            initiative = self._entries.get(key)
+            if initiative is None:
+                return None
+
+            self._entries.move_to_end(key)
+            # Callers are free to mutate what they get back (the admin API does)
+            return replace(initiative)
+
+    def put(self, initiative: Initiative, include_personal: bool, version: int):
+        """Store an initiative projection read at the given database version.
+
+        Args:
+            initiative: Initiative to cache
+            include_personal: Which projection the initiative represents
+            version: Database version counter the initiative was read at
+        """
+        with self._lock:
+            if version != self._version:
+                if self._version is not None and version < self._version:
+                    # Read raced with a newer write; don't cache stale data
+                    return
+                self._entries.clear()
+                self._version = version
+
+            key = (initiative.id, include_personal)
+            self._entries[key] = replace(initiative)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, initiative_id: int, new_version: int):
+        """Invalidate one initiative after a write made by this process.
+
+        If the cache was current right before the write, only the written
+        initiative is dropped and the cache advances to the new version.
+        Otherwise everything is dropped.
+
+        Args:
+            initiative_id: ID of written initiative
+            new_version: Database version counter after the write
+        """
+        with self._lock:
+            if self._version == new_version - 1:
+                self._entries.pop((initiative_id, True), None)
+                self._entries.pop((initiative_id, False), None)
+            else:
+                self._entries.clear()
+            self._version = new_version
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: Dict[str, InitiativeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(db_path: str, max_entries: int = DEFAULT_CACHE_SIZE) -> InitiativeCache:
+    """Get the process-wide cache for a database file.
+
+    Args:
+        db_path: Path to SQLite database
+        max_entries: Cache size used when the cache is first created
+
+    Returns:
+        InitiativeCache shared by all InitiativeDatabase instances for db_path
+    """
+    key = os.path.abspath(db_path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = InitiativeCache(max_entries)
+            _caches[key] = cache
+        return cache
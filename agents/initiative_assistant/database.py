@@ -1,319 +1,706 @@
-"""Database operations for Initiative Assistant Agent."""
+"""Database operations for Initiative Assistant Agent.
+
+All SQL runs on the database's worker thread (see agents.db_worker).
+InitiativeDatabase is the blocking API for sync callers; AsyncInitiativeDatabase
+exposes the same operations as coroutines for the async agent.
+"""
 
 import sqlite3
 import os
-from typing import List, Optional
+import base64
+from collections import Counter
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from .models import Initiative, Feedback, SimilarityMatch
+from .cache import get_cache, InitiativeCache, DEFAULT_CACHE_SIZE
+from .text_search import trigrams, SIMILARITY_THRESHOLD, MAX_QUERY_TRIGRAMS
+from . import analytics
+from ..db_worker import get_worker
+
+# Columns returned by the admin listing (the table view needs nothing else)
+LIST_COLUMNS = (
+    'id', 'title', 'description', 'status', 'creator_name',
+    'creator_department', 'created_at', 'feedback_count'
+)
+
+
+def _default_db_path() -> str:
+    """Get the configured database path, creating its directory."""
+    from .config import AGENT_CONFIG
+
+    db_path = AGENT_CONFIG["database"]["path"]
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    return db_path
 
 
 class InitiativeDatabase:
     """Database operations for Initiative Assistant."""
-    
-    def __init__(self, db_path: str = None):
+
+    def __init__(self, db_path: str = None, cache_size: int = DEFAULT_CACHE_SIZE):
         """Initialize database connection.
-        
+
         Args:
-            db_path: Path to SQLite database. If None, uses default development path.
+            db_path: Path to SQLite database. If None, uses the path from AGENT_CONFIG.
+            cache_size: Maximum number of initiatives in the shared lookup cache
         """
         if db_path is None:
-            # Default to development database
-            data_dir = os.path.join(
-                os.path.dirname(__file__),
-                '../../data/initiative_assistant'
-            )
-            os.makedirs(data_dir, exist_ok=True)
-            db_path = os.path.join(data_dir, 'initiatives.db')
-        
+            db_path = _default_db_path()
+
         self.db_path = db_path
-        self._init_database()
-    
-    def _init_database(self):
-        """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Initiatives table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS initiatives (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                creator_name TEXT NOT NULL,
-                creator_department TEXT,
-                creator_email TEXT,
-                creator_contact TEXT,
-                goals TEXT,
-                related_processes TEXT,
-                expected_outcomes TEXT,
-                status TEXT DEFAULT 'proposed',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                feedback_count INTEGER DEFAULT 0,
-                similarity_checked BOOLEAN DEFAULT 0
-            )
-        ''')
-        
-        # Feedback table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                initiative_id INTEGER NOT NULL,
-                feedback_text TEXT NOT NULL,
-                feedback_type TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (initiative_id) REFERENCES initiatives(id)
-            )
-        ''')
-        
-        # Similarity matches table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS similarity_matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                initiative_id INTEGER NOT NULL,
-                similar_to_id INTEGER NOT NULL,
-                similarity_score REAL,
-                similarity_reasons TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (initiative_id) REFERENCES initiatives(id),
-                FOREIGN KEY (similar_to_id) REFERENCES initiatives(id)
-            )
-        ''')
-        
-        # Create indexes for better performance
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_initiatives_title 
-            ON initiatives(title)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_initiatives_status 
-            ON initiatives(status)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_feedback_initiative_id 
-            ON feedback(initiative_id)
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        self._worker = get_worker(db_path, init=_init_schema)
+        self.cache = get_cache(db_path, cache_size)
+
     def save_initiative(self, initiative: Initiative) -> int:
         """Save initiative to database.
-        
+
         Args:
             initiative: Initiative object to save
-            
+
         Returns:
             ID of saved initiative
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        if initiative.id is None:
-            # Insert new initiative
-            cursor.execute('''
-                INSERT INTO initiatives (
-                    title, description, creator_name, creator_department,
-                    creator_email, creator_contact, goals, related_processes,
-                    expected_outcomes, status, feedback_count, similarity_checked
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                initiative.title,
-                initiative.description,
-                initiative.creator_name,
-                initiative.creator_department,
-                initiative.creator_email,
-                initiative.creator_contact,
-                initiative.goals,
-                initiative.related_processes,
-                initiative.expected_outcomes,
-                initiative.status,
-                initiative.feedback_count,
-                1 if initiative.similarity_checked else 0
-            ))
-            initiative_id = cursor.lastrowid
-        else:
-            # Update existing initiative
-            cursor.execute('''
-                UPDATE initiatives SET
-                    title = ?, description = ?, creator_name = ?,
-                    creator_department = ?, creator_email = ?, creator_contact = ?,
-                    goals = ?, related_processes = ?, expected_outcomes = ?,
-                    status = ?, updated_at = CURRENT_TIMESTAMP,
-                    feedback_count = ?, similarity_checked = ?
-                WHERE id = ?
-            ''', (
-                initiative.title,
-                initiative.description,
-                initiative.creator_name,
-                initiative.creator_department,
-                initiative.creator_email,
-                initiative.creator_contact,
-                initiative.goals,
-                initiative.related_processes,
-                initiative.expected_outcomes,
-                initiative.status,
-                initiative.feedback_count,
-                1 if initiative.similarity_checked else 0,
-                initiative.id
-            ))
-            initiative_id = initiative.id
-        
-        conn.commit()
-        conn.close()
+        initiative_id, version = self._worker.call(_save_initiative, initiative)
+        self.cache.invalidate(initiative_id, version)
         return initiative_id
-    
+
+    def get_version(self) -> int:
+        """Get the current cache version counter.
+
+        Returns:
+            Version counter, incremented by every write
+        """
+        return self._worker.call(_read_version)
+
     def get_initiative(self, initiative_id: int, include_personal: bool = False) -> Optional[Initiative]:
         """Get initiative by ID.
-        
+
         Args:
             initiative_id: ID of initiative
             include_personal: If True, include personal information
-            
+
         Returns:
             Initiative object or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM initiatives WHERE id = ?', (initiative_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row is None:
-            return None
-        
-        data = dict(row)
-        # Convert boolean
-        data['similarity_checked'] = bool(data['similarity_checked'])
-        
-        return Initiative.from_dict(data)
-    
+        return self._worker.call(_get_initiative, initiative_id, include_personal, self.cache)
+
     def search_similar(self, title: str, description: str, limit: int = 5) -> List[Initiative]:
         """Search for similar initiatives.
-        
-        Uses keyword matching on title and description.
-        Personal information is excluded from results.
-        
+
+        Candidates come from the trigram index and are ranked by the share of
+        the query's trigrams they contain; those below SIMILARITY_THRESHOLD
+        are dropped. Personal information is excluded from results.
+
         Args:
             title: Initiative title to search for
             description: Initiative description to search for
             limit: Maximum number of results
-            
+
         Returns:
             List of similar initiatives (without personal information)
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Simple keyword-based search
-        # Split title and description into keywords
-        search_terms = []
-        if title:
-            search_terms.extend(title.lower().split())
-        if description:
-            search_terms.extend(description.lower().split())
-        
-        # Remove common words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        search_terms = [term for term in search_terms if term not in stop_words and len(term) > 2]
-        
-        if not search_terms:
-            conn.close()
-            return []
-        
-        # Build query with LIKE conditions
-        conditions = []
-        params = []
-        for term in search_terms[:5]:  # Limit to 5 terms
-            conditions.append("(LOWER(title) LIKE ? OR LOWER(description) LIKE ?)")
-            params.extend([f"%{term}%", f"%{term}%"])
-        
-        query = f'''
-            SELECT * FROM initiatives
-            WHERE {' OR '.join(conditions)}
-            ORDER BY created_at DESC
-            LIMIT ?
-        '''
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        initiatives = []
-        for row in rows:
-            data = dict(row)
-            data['similarity_checked'] = bool(data['similarity_checked'])
-            initiative = Initiative.from_dict(data)
-            initiatives.append(initiative)
-        
-        return initiatives
-    
+        return self._worker.call(_search_similar, title, description, limit)
+
     def save_feedback(self, feedback: Feedback) -> int:
         """Save feedback to database.
-        
+
         Args:
             feedback: Feedback object to save
-            
+
         Returns:
             ID of saved feedback
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO feedback (initiative_id, feedback_text, feedback_type)
-            VALUES (?, ?, ?)
-        ''', (
-            feedback.initiative_id,
-            feedback.feedback_text,
-            feedback.feedback_type
-        ))
-        
-        feedback_id = cursor.lastrowid
-        
-        # Update feedback count
-        cursor.execute('''
-            UPDATE initiatives
-            SET feedback_count = feedback_count + 1
-            WHERE id = ?
-        ''', (feedback.initiative_id,))
-        
-        conn.commit()
-        conn.close()
+        feedback_id, version = self._worker.call(_save_feedback, feedback)
+        self.cache.invalidate(feedback.initiative_id, version)
         return feedback_id
-    
+
+    def delete_initiative(self, initiative_id: int) -> bool:
+        """Delete an initiative.
+
+        Args:
+            initiative_id: ID of initiative
+
+        Returns:
+            True if an initiative was deleted
+        """
+        deleted, version = self._worker.call(_delete_initiative, initiative_id)
+        if deleted:
+            self.cache.invalidate(initiative_id, version)
+        return deleted
+
     def get_all_initiatives(self, include_personal: bool = False, limit: int = 100) -> List[Initiative]:
         """Get all initiatives.
-        
+
         Args:
             include_personal: If True, include personal information
             limit: Maximum number of results
-            
+
         Returns:
             List of initiatives
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+        return self._worker.call(_get_all_initiatives, limit)
+
+    def get_analytics(self, top_limit: int = analytics.DEFAULT_TOP_LIMIT) -> Dict[str, Any]:
+        """Get precomputed dashboard aggregates.
+
+        Reads the summary table maintained by writes, so the cost does not
+        depend on the number of initiatives or feedback entries.
+
+        Args:
+            top_limit: Number of initiatives in the top-feedback list
+
+        Returns:
+            Dictionary with totals, per-dimension counts and top-feedback initiatives
+        """
+        return self._worker.call(analytics.read_stats, top_limit)
+
+    def rebuild_analytics(self):
+        """Recompute dashboard aggregates from the initiatives and feedback tables."""
+        self._worker.call(analytics.rebuild_stats)
+
+    def list_initiatives_page(
+        self,
+        limit: int = 50,
+        cursor: str = None,
+        status: str = None,
+        department: str = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of initiatives for the admin listing, newest first.
+
+        Uses keyset pagination over (created_at, id), so every page costs the
+        same regardless of how deep into the listing it is.
+
+        Args:
+            limit: Maximum number of rows on the page
+            cursor: Cursor returned with the previous page, None for first page
+            status: Only include initiatives with this status (optional)
+            department: Only include initiatives from this department (optional)
+
+        Returns:
+            Tuple of (rows with LIST_COLUMNS, cursor for the next page or None)
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        # Decode before queueing so a bad cursor never reaches the worker
+        position = decode_page_cursor(cursor) if cursor else None
+        return self._worker.call(_list_initiatives_page, limit, position, status, department)
+
+
+class AsyncInitiativeDatabase:
+    """Async counterpart of InitiativeDatabase.
+
+    Operations are queued to the same worker thread and awaited, so database
+    I/O never blocks the event loop. Shares the lookup cache with
+    InitiativeDatabase instances for the same file.
+    """
+
+    def __init__(self, db_path: str = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        """Initialize database access.
+
+        Args:
+            db_path: Path to SQLite database. If None, uses the path from AGENT_CONFIG.
+            cache_size: Maximum number of initiatives in the shared lookup cache
+        """
+        if db_path is None:
+            db_path = _default_db_path()
+
+        self.db_path = db_path
+        self._worker = get_worker(db_path, init=_init_schema)
+        self.cache = get_cache(db_path, cache_size)
+
+    async def save_initiative(self, initiative: Initiative) -> int:
+        """Save initiative to database. See InitiativeDatabase.save_initiative."""
+        initiative_id, version = await self._worker.run(_save_initiative, initiative)
+        self.cache.invalidate(initiative_id, version)
+        return initiative_id
+
+    async def get_version(self) -> int:
+        """Get the current cache version counter."""
+        return await self._worker.run(_read_version)
+
+    async def get_initiative(self, initiative_id: int, include_personal: bool = False) -> Optional[Initiative]:
+        """Get initiative by ID. See InitiativeDatabase.get_initiative."""
+        return await self._worker.run(_get_initiative, initiative_id, include_personal, self.cache)
+
+    async def search_similar(self, title: str, description: str, limit: int = 5) -> List[Initiative]:
+        """Search for similar initiatives. See InitiativeDatabase.search_similar."""
+        return await self._worker.run(_search_similar, title, description, limit)
+
+    async def save_feedback(self, feedback: Feedback) -> int:
+        """Save feedback to database. See InitiativeDatabase.save_feedback."""
+        feedback_id, version = await self._worker.run(_save_feedback, feedback)
+        self.cache.invalidate(feedback.initiative_id, version)
+        return feedback_id
+
+    async def delete_initiative(self, initiative_id: int) -> bool:
+        """Delete an initiative. See InitiativeDatabase.delete_initiative."""
+        deleted, version = await self._worker.run(_delete_initiative, initiative_id)
+        if deleted:
+            self.cache.invalidate(initiative_id, version)
+        return deleted
+
+    async def get_all_initiatives(self, include_personal: bool = False, limit: int = 100) -> List[Initiative]:
+        """Get all initiatives. See InitiativeDatabase.get_all_initiatives."""
+        return await self._worker.run(_get_all_initiatives, limit)
+
+    async def get_analytics(self, top_limit: int = analytics.DEFAULT_TOP_LIMIT) -> Dict[str, Any]:
+        """Get precomputed dashboard aggregates. See InitiativeDatabase.get_analytics."""
+        return await self._worker.run(analytics.read_stats, top_limit)
+
+    async def rebuild_analytics(self):
+        """Recompute dashboard aggregates. See InitiativeDatabase.rebuild_analytics."""
+        await self._worker.run(analytics.rebuild_stats)
+
+    async def list_initiatives_page(
+        self,
+        limit: int = 50,
+        cursor: str = None,
+        status: str = None,
+        department: str = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of the admin listing. See InitiativeDatabase.list_initiatives_page."""
+        position = decode_page_cursor(cursor) if cursor else None
+        return await self._worker.run(_list_initiatives_page, limit, position, status, department)
+
+
+# Operations executed on the worker thread. Each takes the worker's cursor as
+# its first argument and runs inside the worker's batch transaction.
+
+def _init_schema(cursor: sqlite3.Cursor):
+    """Initialize database schema."""
+    # Initiatives table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS initiatives (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            creator_name TEXT NOT NULL,
+            creator_department TEXT,
+            creator_email TEXT,
+            creator_contact TEXT,
+            goals TEXT,
+            related_processes TEXT,
+            expected_outcomes TEXT,
+            status TEXT DEFAULT 'proposed',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            feedback_count INTEGER DEFAULT 0,
+            similarity_checked BOOLEAN DEFAULT 0
+        )
+    ''')
+
+    # Feedback table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            initiative_id INTEGER NOT NULL,
+            feedback_text TEXT NOT NULL,
+            feedback_type TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (initiative_id) REFERENCES initiatives(id)
+        )
+    ''')
+
+    # Similarity matches table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS similarity_matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            initiative_id INTEGER NOT NULL,
+            similar_to_id INTEGER NOT NULL,
+            similarity_score REAL,
+            similarity_reasons TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (initiative_id) REFERENCES initiatives(id),
+            FOREIGN KEY (similar_to_id) REFERENCES initiatives(id)
+        )
+    ''')
+
+    # Version counter bumped by every write, used to keep lookup caches
+    # of other processes coherent
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO cache_version (id, version) VALUES (1, 0)')
+
+    # Trigram inverted index over title and description for similarity search
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'initiative_trigrams'"
+    )
+    trigrams_exist = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS initiative_trigrams (
+            trigram TEXT NOT NULL,
+            initiative_id INTEGER NOT NULL,
+            PRIMARY KEY (trigram, initiative_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiative_trigrams_initiative_id
+        ON initiative_trigrams(initiative_id)
+    ''')
+    if not trigrams_exist:
+        # Databases created before the index existed
+        cursor.execute('SELECT id, title, description FROM initiatives')
+        for row in cursor.fetchall():
+            _index_trigrams(cursor, row['id'], row['title'], row['description'])
+
+    # Dashboard aggregates
+    analytics.create_schema(cursor)
+
+    # Create indexes for better performance
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_title
+        ON initiatives(title)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_status
+        ON initiatives(status)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_initiative_id
+        ON feedback(initiative_id)
+    ''')
+
+    # Composite indexes for keyset pagination over (created_at, id)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_created_id
+        ON initiatives(created_at, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_status_created_id
+        ON initiatives(status, created_at, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_initiatives_department_created_id
+        ON initiatives(creator_department, created_at, id)
+    ''')
+
+
+def _bump_version(cursor: sqlite3.Cursor) -> int:
+    """Increment the cache version counter inside the current transaction.
+
+    Returns:
+        New version counter value
+    """
+    cursor.execute('UPDATE cache_version SET version = version + 1 WHERE id = 1')
+    return _read_version(cursor)
+
+
+def _read_version(cursor: sqlite3.Cursor) -> int:
+    """Read the cache version counter."""
+    cursor.execute('SELECT version FROM cache_version WHERE id = 1')
+    return cursor.fetchone()[0]
+
+
+def _stats_row(cursor: sqlite3.Cursor, initiative_id: int) -> Optional[sqlite3.Row]:
+    """Read the columns an initiative is aggregated by."""
+    cursor.execute(
+        'SELECT status, creator_department, created_at FROM initiatives WHERE id = ?',
+        (initiative_id,)
+    )
+    return cursor.fetchone()
+
+
+def _row_to_initiative(row: sqlite3.Row) -> Initiative:
+    """Convert an initiatives row to an Initiative."""
+    data = dict(row)
+    # Convert boolean
+    data['similarity_checked'] = bool(data['similarity_checked'])
+    return Initiative.from_dict(data)
+
+
+def _save_initiative(cursor: sqlite3.Cursor, initiative: Initiative) -> Tuple[int, int]:
+    """Insert or update an initiative.
+
+    Returns:
+        Tuple of (initiative ID, new version counter)
+    """
+    deltas = Counter()
+    if initiative.id is not None:
+        for bucket in analytics.initiative_buckets(_stats_row(cursor, initiative.id)):
+            deltas[bucket] -= 1
+
+    if initiative.id is None:
+        # Insert new initiative
+        cursor.execute('''
+            INSERT INTO initiatives (
+                title, description, creator_name, creator_department,
+                creator_email, creator_contact, goals, related_processes,
+                expected_outcomes, status, feedback_count, similarity_checked
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            initiative.title,
+            initiative.description,
+            initiative.creator_name,
+            initiative.creator_department,
+            initiative.creator_email,
+            initiative.creator_contact,
+            initiative.goals,
+            initiative.related_processes,
+            initiative.expected_outcomes,
+            initiative.status,
+            initiative.feedback_count,
+            1 if initiative.similarity_checked else 0
+        ))
+        initiative_id = cursor.lastrowid
+    else:
+        # Update existing initiative
         cursor.execute('''
-            SELECT * FROM initiatives
-            ORDER BY created_at DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        initiatives = []
-        for row in rows:
-            data = dict(row)
-            data['similarity_checked'] = bool(data['similarity_checked'])
-            initiatives.append(Initiative.from_dict(data))
-        
-        return initiatives
+            UPDATE initiatives SET
+                title = ?, description = ?, creator_name = ?,
+                creator_department = ?, creator_email = ?, creator_contact = ?,
+                goals = ?, related_processes = ?, expected_outcomes = ?,
+                status = ?, updated_at = CURRENT_TIMESTAMP,
+                feedback_count = ?, similarity_checked = ?
+            WHERE id = ?
+        ''', (
+            initiative.title,
+            initiative.description,
+            initiative.creator_name,
+            initiative.creator_department,
+            initiative.creator_email,
+            initiative.creator_contact,
+            initiative.goals,
+            initiative.related_processes,
+            initiative.expected_outcomes,
+            initiative.status,
+            initiative.feedback_count,
+            1 if initiative.similarity_checked else 0,
+            initiative.id
+        ))
+        initiative_id = initiative.id
+
+    for bucket in analytics.initiative_buckets(_stats_row(cursor, initiative_id)):
+        deltas[bucket] += 1
+    analytics.adjust_stats(cursor, deltas)
+
+    _index_trigrams(cursor, initiative_id, initiative.title, initiative.description)
+    return initiative_id, _bump_version(cursor)
+
+
+def _get_initiative(
+    cursor: sqlite3.Cursor,
+    initiative_id: int,
+    include_personal: bool,
+    cache: InitiativeCache
+) -> Optional[Initiative]:
+    """Get an initiative through the lookup cache."""
+    version = _read_version(cursor)
+
+    cached = cache.get(initiative_id, include_personal, version)
+    if cached is not None:
+        return cached
+
+    cursor.execute('SELECT * FROM initiatives WHERE id = ?', (initiative_id,))
+    row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    data = dict(row)
+    # Convert boolean
+    data['similarity_checked'] = bool(data['similarity_checked'])
+
+    if not include_personal:
+        for key in ('creator_name', 'creator_department', 'creator_email', 'creator_contact'):
+            data.pop(key, None)
+
+    initiative = Initiative.from_dict(data)
+    cache.put(initiative, include_personal, version)
+    return initiative
+
+
+def _search_similar(cursor: sqlite3.Cursor, title: str, description: str, limit: int) -> List[Initiative]:
+    """Rank initiatives by trigram overlap with the query."""
+    query_grams = sorted(trigrams(f"{title or ''} {description or ''}"))
+    if not query_grams:
+        return []
+    if len(query_grams) > MAX_QUERY_TRIGRAMS:
+        query_grams = _rarest_trigrams(cursor, query_grams, MAX_QUERY_TRIGRAMS)
+
+    # Each matching (trigram, initiative) pair is a primary key lookup
+    min_hits = max(1, int(len(query_grams) * SIMILARITY_THRESHOLD + 0.999))
+    cursor.execute(f'''
+        SELECT initiative_id, COUNT(*) AS hits FROM initiative_trigrams
+        WHERE trigram IN ({', '.join('?' * len(query_grams))})
+        GROUP BY initiative_id
+        HAVING hits >= ?
+        ORDER BY hits DESC, initiative_id DESC
+        LIMIT ?
+    ''', (*query_grams, min_hits, limit))
+    ranked = [row['initiative_id'] for row in cursor.fetchall()]
+    if not ranked:
+        return []
+
+    cursor.execute(
+        f"SELECT * FROM initiatives WHERE id IN ({', '.join('?' * len(ranked))})",
+        ranked
+    )
+    by_id = {row['id']: _row_to_initiative(row) for row in cursor.fetchall()}
+    return [by_id[initiative_id] for initiative_id in ranked if initiative_id in by_id]
+
+
+def _rarest_trigrams(cursor: sqlite3.Cursor, grams: List[str], count: int) -> List[str]:
+    """The count trigrams of grams indexed for the fewest initiatives.
+
+    Rare trigrams tell candidates apart; ones not in the index at all match
+    nothing, so they come last.
+    """
+    frequency = {}
+    for start in range(0, len(grams), count):
+        chunk = grams[start:start + count]
+        cursor.execute(f'''
+            SELECT trigram, COUNT(*) AS initiatives FROM initiative_trigrams
+            WHERE trigram IN ({', '.join('?' * len(chunk))})
+            GROUP BY trigram
+        ''', chunk)
+        frequency.update((row['trigram'], row['initiatives']) for row in cursor.fetchall())
+    return sorted(grams, key=lambda gram: (gram not in frequency, frequency.get(gram, 0), gram))[:count]
+
+
+def _index_trigrams(cursor: sqlite3.Cursor, initiative_id: int, title: str, description: str):
+    """Replace an initiative's entries in the trigram index."""
+    cursor.execute('DELETE FROM initiative_trigrams WHERE initiative_id = ?', (initiative_id,))
+    cursor.executemany(
+        'INSERT INTO initiative_trigrams (trigram, initiative_id) VALUES (?, ?)',
+        [(gram, initiative_id) for gram in trigrams(f"{title or ''} {description or ''}")]
+    )
+
+
+def _save_feedback(cursor: sqlite3.Cursor, feedback: Feedback) -> Tuple[int, int]:
+    """Insert feedback and update the initiative's feedback count.
+
+    Returns:
+        Tuple of (feedback ID, new version counter)
+    """
+    cursor.execute('''
+        INSERT INTO feedback (initiative_id, feedback_text, feedback_type)
+        VALUES (?, ?, ?)
+    ''', (
+        feedback.initiative_id,
+        feedback.feedback_text,
+        feedback.feedback_type
+    ))
+
+    feedback_id = cursor.lastrowid
+
+    # Update feedback count
+    cursor.execute('''
+        UPDATE initiatives
+        SET feedback_count = feedback_count + 1
+        WHERE id = ?
+    ''', (feedback.initiative_id,))
+
+    analytics.adjust_stats(cursor, Counter(analytics.feedback_buckets(feedback.feedback_type)))
+    return feedback_id, _bump_version(cursor)
+
+
+def _delete_initiative(cursor: sqlite3.Cursor, initiative_id: int) -> Tuple[bool, int]:
+    """Delete an initiative.
+
+    The version counter only advances if a row was deleted.
+
+    Returns:
+        Tuple of (whether a row was deleted, version counter)
+    """
+    deltas = Counter()
+    for bucket in analytics.initiative_buckets(_stats_row(cursor, initiative_id)):
+        deltas[bucket] -= 1
+
+    # Feedback goes with its initiative
+    cursor.execute('SELECT feedback_type FROM feedback WHERE initiative_id = ?', (initiative_id,))
+    for row in cursor.fetchall():
+        for bucket in analytics.feedback_buckets(row['feedback_type']):
+            deltas[bucket] -= 1
+    cursor.execute('DELETE FROM feedback WHERE initiative_id = ?', (initiative_id,))
+
+    cursor.execute('DELETE FROM initiatives WHERE id = ?', (initiative_id,))
+    deleted = cursor.rowcount > 0
+    cursor.execute('DELETE FROM initiative_trigrams WHERE initiative_id = ?', (initiative_id,))
+    if not deleted:
+        return False, _read_version(cursor)
+    analytics.adjust_stats(cursor, deltas)
+    return True, _bump_version(cursor)
+
+
+def _get_all_initiatives(cursor: sqlite3.Cursor, limit: int) -> List[Initiative]:
+    """Get the newest initiatives."""
+    cursor.execute('''
+        SELECT * FROM initiatives
+        ORDER BY created_at DESC
+        LIMIT ?
+    ''', (limit,))
+    return [_row_to_initiative(row) for row in cursor.fetchall()]
+
+
+def _list_initiatives_page(
+    cursor: sqlite3.Cursor,
+    limit: int,
+    position: Optional[Tuple[str, int]],
+    status: Optional[str],
+    department: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get one keyset page of LIST_COLUMNS after position."""
+    conditions = []
+    params = []
+
+    if status:
+        conditions.append('status = ?')
+        params.append(status)
+    if department:
+        conditions.append('creator_department = ?')
+        params.append(department)
+    if position:
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend(position)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f'''
+        SELECT {', '.join(LIST_COLUMNS)} FROM initiatives
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    '''
+    # Fetch one extra row to know whether another page exists
+    params.append(limit + 1)
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_page_cursor(last['created_at'], last['id'])
+
+    page = []
+    for row in rows:
+        data = dict(row)
+        if data['created_at']:
+            data['created_at'] = data['created_at'].replace(' ', 'T')
+        page.append(data)
+
+    return page, next_cursor
+
+
+def encode_page_cursor(created_at: str, initiative_id: int) -> str:
+    """Encode a keyset position as an opaque cursor string."""
+    raw = f"{created_at}|{initiative_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_page_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor created by encode_page_cursor.
 
+    Raises:
+        ValueError: If cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, initiative_id = raw.rsplit('|', 1)
+        return created_at, int(initiative_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
@@ -0,0 +1,152 @@
+"""Concurrency tests for the async database layer."""
+
+import asyncio
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+
+# Add project root to path
+project_root = os.path.join(os.path.dirname(__file__), '../../..')
+sys.path.insert(0, os.path.abspath(project_root))
+
+from agents.db_worker import DatabaseWorker
+from agents.initiative_assistant.agent import InitiativeAssistantAgent
+from agents.initiative_assistant.config import AGENT_CONFIG
+from agents.initiative_assistant.database import AsyncInitiativeDatabase
+from agents.cam_gerber_analyzer.database import AsyncCamGerberDatabase
+from agents.cam_gerber_analyzer.models import AnalysisIssue
+
+CONVERSATIONS = 200
+
+
+class TestConcurrentConversations(unittest.IsolatedAsyncioTestCase):
+    """Simulate many conversations calling agent tools at the same time."""
+
+    def setUp(self):
+        """Point the agent at a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_db_path = os.path.join(self.temp_dir, 'test_initiatives.db')
+        self.original_path = AGENT_CONFIG["database"]["path"]
+        AGENT_CONFIG["database"]["path"] = self.test_db_path
+        self.agent = InitiativeAssistantAgent(AGENT_CONFIG)
+
+    def tearDown(self):
+        """Restore configuration and remove temporary files."""
+        AGENT_CONFIG["database"]["path"] = self.original_path
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def conversation(self, n: int) -> int:
+        """Run one conversation's tool calls: search, save, read back, give feedback."""
+        search = await self.agent.execute_tool_async(
+            "search_similar_initiatives", {"title": f"Reduce scrap on line {n}"}
+        )
+        self.assertTrue(search["ok"], search)
+
+        saved = await self.agent.execute_tool_async("save_initiative", {
+            "title": f"Reduce scrap on line {n}",
+            "description": f"Tune lamination press {n}",
+            "creator_name": f"User {n}"
+        })
+        self.assertTrue(saved["ok"], saved)
+        initiative_id = saved["data"]["initiative_id"]
+
+        details = await self.agent.execute_tool_async("get_initiative_details", {"initiative_id": initiative_id})
+        self.assertTrue(details["ok"], details)
+        self.assertEqual(details["data"]["initiative"]["title"], f"Reduce scrap on line {n}")
+
+        for _ in range(2):
+            feedback = await self.agent.execute_tool_async("save_feedback", {
+                "initiative_id": initiative_id,
+                "feedback_text": "Good idea"
+            })
+            self.assertTrue(feedback["ok"], feedback)
+
+        return initiative_id
+
+    async def test_simultaneous_conversations(self):
+        """Test 200 conversations complete correctly without stalling the event loop."""
+        max_gap = 0.0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal max_gap
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                max_gap = max(max_gap, now - last)
+                last = now
+
+        beat = asyncio.create_task(heartbeat())
+        ids = await asyncio.gather(*(self.conversation(n) for n in range(CONVERSATIONS)))
+        done.set()
+        await beat
+
+        self.assertEqual(len(set(ids)), CONVERSATIONS)
+
+        db = AsyncInitiativeDatabase(self.test_db_path)
+        for initiative_id in ids:
+            initiative = await db.get_initiative(initiative_id)
+            self.assertEqual(initiative.feedback_count, 2)
+
+        # Database work happens on the worker thread, so the loop keeps ticking
+        self.assertLess(max_gap, 0.5)
+
+    async def test_cam_database_async(self):
+        """Test concurrent async writes to the CAM database."""
+        db = AsyncCamGerberDatabase(os.path.join(self.temp_dir, 'analyses.db'))
+        analysis_id = await db.create_analysis("user", project_name="Project")
+
+        await asyncio.gather(*(
+            db.save_analysis_issue(AnalysisIssue(
+                analysis_id=analysis_id,
+                issue_type="spacing",
+                severity="warning",
+                description=f"Issue {n}"
+            ))
+            for n in range(50)
+        ))
+
+        issues = await db.get_analysis_issues(analysis_id)
+        self.assertEqual(len(issues), 50)
+
+
+class TestDatabaseWorker(unittest.TestCase):
+    """Test batching behaviour of the database worker."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.worker = DatabaseWorker(os.path.join(self.temp_dir, 'worker.db'))
+        self.worker.call(lambda cursor: cursor.execute('CREATE TABLE items (value INTEGER UNIQUE)'))
+
+    def tearDown(self):
+        self.worker.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_failed_operation_does_not_roll_back_batch(self):
+        """Test one failing operation in a batch leaves the others committed."""
+        def insert(cursor, value):
+            cursor.execute('INSERT INTO items (value) VALUES (?)', (value,))
+
+        futures = [self.worker.submit(insert, value) for value in (1, 2, 2, 3)]
+
+        self.assertIsNone(futures[0].result())
+        self.assertIsNone(futures[1].result())
+        with self.assertRaises(Exception):
+            futures[2].result()
+        self.assertIsNone(futures[3].result())
+
+        values = self.worker.call(lambda cursor: [row[0] for row in cursor.execute('SELECT value FROM items')])
+        self.assertEqual(sorted(values), [1, 2, 3])
+
+    def test_nested_submit_rejected(self):
+        """Test operations cannot wait on the worker they run on."""
+        with self.assertRaises(RuntimeError):
+            self.worker.call(lambda cursor: self.worker.submit(lambda c: None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -91,6 +91,81 @@ class TestInitiativeAssistantAgent(unittest.TestCase):
         self.assertNotIn("creator_email", data_dict)
         self.assertNotIn("creator_contact", data_dict)
     
+    def test_get_initiative_uses_cache(self):
+        """Test repeated lookups are served from the cache."""
+        db = InitiativeDatabase(self.test_db_path)
+        initiative_id = db.save_initiative(Initiative(
+            title="Cached Initiative",
+            description="Cached description",
+            creator_name="Test User",
+            creator_email="test@example.com"
+        ))
+
+        first = db.get_initiative(initiative_id, include_personal=True)
+        self.assertEqual(len(db.cache), 1)
+
+        # Mutating a returned object must not leak into the cache
+        first.title = "Changed locally"
+        second = db.get_initiative(initiative_id, include_personal=True)
+        self.assertEqual(second.title, "Cached Initiative")
+        self.assertEqual(second.creator_email, "test@example.com")
+
+        # Non-personal projection is cached separately and has no personal info
+        public = db.get_initiative(initiative_id, include_personal=False)
+        self.assertEqual(len(db.cache), 2)
+        self.assertEqual(public.creator_name, "")
+        self.assertIsNone(public.creator_email)
+
+    def test_cache_invalidated_by_writes(self):
+        """Test saves, feedback and deletes invalidate cached lookups."""
+        from agents.initiative_assistant.models import Feedback
+
+        db = InitiativeDatabase(self.test_db_path)
+        initiative_id = db.save_initiative(Initiative(
+            title="Original", description="Description", creator_name="Test User"
+        ))
+        other_id = db.save_initiative(Initiative(
+            title="Other", description="Description", creator_name="Test User"
+        ))
+        db.get_initiative(other_id)
+
+        initiative = db.get_initiative(initiative_id, include_personal=True)
+        initiative.title = "Updated"
+        db.save_initiative(initiative)
+        self.assertEqual(db.get_initiative(initiative_id).title, "Updated")
+        # Writes from this process only drop the written initiative
+        self.assertEqual(len(db.cache), 2)
+
+        db.save_feedback(Feedback(initiative_id=initiative_id, feedback_text="Good"))
+        self.assertEqual(db.get_initiative(initiative_id).feedback_count, 1)
+
+        self.assertTrue(db.delete_initiative(initiative_id))
+        self.assertIsNone(db.get_initiative(initiative_id))
+        # Deleting a missing initiative leaves the version and the cache alone
+        version = db.get_version()
+        cached = len(db.cache)
+        self.assertFalse(db.delete_initiative(initiative_id))
+        self.assertEqual((db.get_version(), len(db.cache)), (version, cached))
+
+    def test_cache_coherent_across_processes(self):
+        """Test writes made elsewhere are seen through the version counter."""
+        import sqlite3
+
+        db = InitiativeDatabase(self.test_db_path)
+        initiative_id = db.save_initiative(Initiative(
+            title="Original", description="Description", creator_name="Test User"
+        ))
+        self.assertEqual(db.get_initiative(initiative_id).title, "Original")
+
+        # Simulate another process writing to the same database file
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute("UPDATE initiatives SET title = 'Remote' WHERE id = ?", (initiative_id,))
+        conn.execute("UPDATE cache_version SET version = version + 1")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(db.get_initiative(initiative_id).title, "Remote")
+
     def test_search_similar_initiatives(self):
         """Test searching for similar initiatives."""
         db = InitiativeDatabase(self.test_db_path)
@@ -107,7 +182,100 @@ class TestInitiativeAssistantAgent(unittest.TestCase):
         similar = db.search_similar("Work Instructions Automation", "Automate updates", limit=5)
         self.assertIsInstance(similar, list)
         self.assertGreater(len(similar), 0)
-    
+
+    def test_search_similar_matches_compound_parts(self):
+        """Test Finnish compound words match their parts through trigrams."""
+        db = InitiativeDatabase(self.test_db_path)
+        compound_id = db.save_initiative(Initiative(
+            title="Tuotannonsuunnittelujärjestelmän uudistus",
+            description="Korvataan vanha järjestelmä",
+            creator_name="User 1"
+        ))
+        db.save_initiative(Initiative(
+            title="Kahvinkeittimen huolto",
+            description="Säännöllinen kalkinpoisto",
+            creator_name="User 2"
+        ))
+
+        similar = db.search_similar("Suunnittelu", "", limit=5)
+        self.assertEqual([i.id for i in similar], [compound_id])
+
+        # Unrelated queries stay below the similarity threshold
+        self.assertEqual(db.search_similar("Laser drilling calibration", ""), [])
+
+    def test_long_query_keeps_rare_trigrams(self):
+        """Test a query over the trigram limit looks up the trigrams that tell initiatives apart."""
+        db = InitiativeDatabase(self.test_db_path)
+        # More distinct trigrams than MAX_QUERY_TRIGRAMS, shared by every initiative
+        common = ' '.join(a + b + c for a in 'abcdefg' for b in 'abcdefg' for c in 'abcdefg')
+        target_id = db.save_initiative(Initiative(
+            title="Zyzzyva", description=common, creator_name="User 1"
+        ))
+        for i in range(2):
+            db.save_initiative(Initiative(title="Other", description=common, creator_name="User 2"))
+
+        similar = db.search_similar("Zyzzyva", common, limit=3)
+        self.assertEqual(similar[0].id, target_id)
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """Test the trigram index is maintained on save and delete."""
+        db = InitiativeDatabase(self.test_db_path)
+        initiative_id = db.save_initiative(Initiative(
+            title="Solder mask inspection", description="Camera based", creator_name="User"
+        ))
+        initiative = db.get_initiative(initiative_id, include_personal=True)
+        initiative.title = "Lamination press tuning"
+        db.save_initiative(initiative)
+
+        self.assertEqual(db.search_similar("Solder mask", ""), [])
+        self.assertEqual(len(db.search_similar("Lamination", "")), 1)
+
+        db.delete_initiative(initiative_id)
+        self.assertEqual(db.search_similar("Lamination", ""), [])
+
+    def test_analytics_match_rebuild(self):
+        """Test incrementally maintained aggregates equal a full rebuild."""
+        from agents.initiative_assistant.models import Feedback
+
+        db = InitiativeDatabase(self.test_db_path)
+        ids = [
+            db.save_initiative(Initiative(
+                title=f"Initiative {i}", description="Description", creator_name="User",
+                creator_department=['Production', 'Quality'][i % 2],
+                status=['proposed', 'in_progress', 'completed'][i % 3]
+            ))
+            for i in range(6)
+        ]
+        for i, initiative_id in enumerate(ids):
+            for _ in range(i):
+                db.save_feedback(Feedback(
+                    initiative_id=initiative_id, feedback_text="Feedback",
+                    feedback_type=['positive', 'question'][i % 2]
+                ))
+        initiative = db.get_initiative(ids[0], include_personal=True)
+        initiative.status = 'cancelled'
+        db.save_initiative(initiative)
+        db.delete_initiative(ids[5])
+
+        incremental = db.get_analytics()
+        self.assertEqual(incremental['total_initiatives'], 5)
+        self.assertEqual(incremental['total_feedback'], 10)
+        self.assertEqual(incremental['top_feedback'][0]['id'], ids[4])
+
+        db.rebuild_analytics()
+        self.assertEqual(db.get_analytics(), incremental)
+
+    def test_stop_words_are_language_aware(self):
+        """Test stop words are removed for the detected language only."""
+        from agents.initiative_assistant.text_search import detect_language, tokenize
+
+        self.assertEqual(detect_language("Parannetaan tarkastusta ja lisätään kameroita"), 'fi')
+        self.assertEqual(detect_language("Improve the inspection with cameras"), 'en')
+        self.assertEqual(tokenize("Parannetaan tarkastusta ja myös kameroita"),
+                         ['parannetaan', 'tarkastusta', 'kameroita'])
+        self.assertEqual(tokenize("Improve the inspection with cameras"),
+                         ['improve', 'inspection', 'cameras'])
+
     def test_tool_save_initiative(self):
         """Test save_initiative tool."""
         # Temporarily override database path
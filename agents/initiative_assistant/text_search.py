@@ -0,0 +1,96 @@
+"""Text processing for initiative similarity search.
+
+Initiatives are indexed by character trigrams of their words. Finnish titles
+are dominated by long compounds ("tuotannonsuunnittelujärjestelmä") whose parts
+never match on whole words, but share most of their trigrams with them.
+"""
+
+import re
+from typing import Dict, FrozenSet, List, Set
+
+# Minimum share of the query's trigrams a candidate must contain
+SIMILARITY_THRESHOLD = 0.3
+
+# Upper bound on trigrams looked up per query (long descriptions); the ones
+# indexed for the fewest initiatives are kept
+MAX_QUERY_TRIGRAMS = 256
+
+STOP_WORDS: Dict[str, FrozenSet[str]] = {
+    'en': frozenset({
+        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+        'with', 'by', 'from', 'into', 'this', 'that', 'these', 'those', 'is', 'are',
+        'was', 'were', 'be', 'been', 'it', 'its', 'as', 'our', 'we', 'can', 'will',
+        'should', 'would', 'more', 'all', 'new', 'use', 'using'
+    }),
+    'fi': frozenset({
+        'ja', 'tai', 'sekä', 'mutta', 'kuin', 'kun', 'jos', 'että', 'joka', 'jotka',
+        'mikä', 'mitkä', 'se', 'ne', 'sen', 'niiden', 'tämä', 'nämä', 'tämän', 'on',
+        'ovat', 'oli', 'olla', 'ei', 'myös', 'vain', 'jo', 'nyt', 'kanssa', 'ilman',
+        'mukaan', 'kautta', 'avulla', 'varten', 'meidän', 'me', 'voi', 'pitää', 'uusi',
+        'uuden', 'kaikki', 'enemmän'
+    })
+}
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_FINNISH_CHARS = set('äöå')
+
+
+def detect_language(text: str) -> str:
+    """Guess whether text is Finnish or English.
+
+    Args:
+        text: Text to inspect
+
+    Returns:
+        'fi' or 'en'
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 'en'
+
+    finnish = sum(1 for word in words if word in STOP_WORDS['fi'] or _FINNISH_CHARS & set(word))
+    english = sum(1 for word in words if word in STOP_WORDS['en'])
+    return 'fi' if finnish > english else 'en'
+
+
+def tokenize(text: str, language: str = None) -> List[str]:
+    """Split text into lowercase search terms without stop words.
+
+    Args:
+        text: Text to tokenize
+        language: 'fi' or 'en'. If None, detected from the text.
+
+    Returns:
+        Terms longer than two characters, in order of appearance
+    """
+    if not text:
+        return []
+
+    if language is None:
+        language = detect_language(text)
+    stop_words = STOP_WORDS.get(language, STOP_WORDS['en'])
+
+    return [
+        word for word in _WORD_RE.findall(text.lower())
+        if len(word) > 2 and word not in stop_words
+    ]
+
+
+def trigrams(text: str, language: str = None) -> Set[str]:
+    """Get the character trigrams of a text's search terms.
+
+    Trigrams never span word boundaries, so a compound part matches the
+    compound it appears in.
+
+    Args:
+        text: Text to index or search for
+        language: 'fi' or 'en'. If None, detected from the text.
+
+    Returns:
+        Set of three-character strings
+    """
+    grams = set()
+    for term in tokenize(text, language):
+        for i in range(len(term) - 2):
+            grams.add(term[i:i + 3])
+    return grams
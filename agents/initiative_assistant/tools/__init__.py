@@ -1,14 +1,17 @@
 """Tools for Initiative Assistant Agent."""
 
-from .save_initiative import save_initiative
-from .search_similar import search_similar_initiatives
-from .get_initiative import get_initiative_details
-from .save_feedback import save_feedback
+from .save_initiative import save_initiative, save_initiative_async
+from .search_similar import search_similar_initiatives, search_similar_initiatives_async
+from .get_initiative import get_initiative_details, get_initiative_details_async
+from .save_feedback import save_feedback, save_feedback_async
 
 __all__ = [
     'save_initiative',
     'search_similar_initiatives',
     'get_initiative_details',
-    'save_feedback'
+    'save_feedback',
+    'save_initiative_async',
+    'search_similar_initiatives_async',
+    'get_initiative_details_async',
+    'save_feedback_async'
 ]
-
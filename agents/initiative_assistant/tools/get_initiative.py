@@ -8,7 +8,8 @@ from typing import Dict, Any, Optional
 project_root = os.path.join(os.path.dirname(__file__), '../../..')
 sys.path.insert(0, os.path.abspath(project_root))
 
-from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.database import InitiativeDatabase, AsyncInitiativeDatabase
+from agents.initiative_assistant.models import Initiative
 
 
 def get_initiative_details(
@@ -28,20 +29,23 @@ def get_initiative_details(
     try:
         db = InitiativeDatabase()
         initiative = db.get_initiative(initiative_id, include_personal=False)
-        
-        if initiative is None:
-            return {
-                "success": False,
-                "error": f"Initiative with ID {initiative_id} not found"
-            }
-        
-        # Convert to dictionary without personal information
-        data = initiative.to_dict(include_personal=False)
-        
+        return _details_result(initiative_id, initiative)
+    
+    except Exception as e:
         return {
-            "success": True,
-            "initiative": data
+            "success": False,
+            "error": f"Failed to get initiative: {str(e)}"
         }
+
+
+async def get_initiative_details_async(
+    initiative_id: int
+) -> Dict[str, Any]:
+    """Async variant of get_initiative_details for use inside the event loop."""
+    try:
+        db = AsyncInitiativeDatabase()
+        initiative = await db.get_initiative(initiative_id, include_personal=False)
+        return _details_result(initiative_id, initiative)
     
     except Exception as e:
         return {
@@ -49,3 +53,19 @@ def get_initiative_details(
             "error": f"Failed to get initiative: {str(e)}"
         }
 
+
+def _details_result(initiative_id: int, initiative: Optional[Initiative]) -> Dict[str, Any]:
+    """Build the tool result for a looked up initiative."""
+    if initiative is None:
+        return {
+            "success": False,
+            "error": f"Initiative with ID {initiative_id} not found"
+        }
+    
+    # Convert to dictionary without personal information
+    data = initiative.to_dict(include_personal=False)
+    
+    return {
+        "success": True,
+        "initiative": data
+    }
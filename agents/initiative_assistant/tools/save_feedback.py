@@ -9,7 +9,7 @@ from datetime import datetime
 project_root = os.path.join(os.path.dirname(__file__), '../../..')
 sys.path.insert(0, os.path.abspath(project_root))
 
-from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.database import InitiativeDatabase, AsyncInitiativeDatabase
 from agents.initiative_assistant.models import Feedback
 
 
@@ -30,26 +30,32 @@ def save_feedback(
     """
     try:
         if not feedback_text:
-            return {
-                "success": False,
-                "error": "Feedback text is required"
-            }
-        
-        feedback = Feedback(
-            initiative_id=initiative_id,
-            feedback_text=feedback_text,
-            feedback_type=feedback_type,
-            created_at=datetime.now()
-        )
+            return _missing_text_result()
         
         db = InitiativeDatabase()
-        feedback_id = db.save_feedback(feedback)
-        
+        feedback_id = db.save_feedback(_build_feedback(initiative_id, feedback_text, feedback_type))
+        return _saved_result(feedback_id)
+    
+    except Exception as e:
         return {
-            "success": True,
-            "feedback_id": feedback_id,
-            "message": f"Feedback saved successfully"
+            "success": False,
+            "error": f"Failed to save feedback: {str(e)}"
         }
+
+
+async def save_feedback_async(
+    initiative_id: int,
+    feedback_text: str,
+    feedback_type: str = None
+) -> Dict[str, Any]:
+    """Async variant of save_feedback for use inside the event loop."""
+    try:
+        if not feedback_text:
+            return _missing_text_result()
+        
+        db = AsyncInitiativeDatabase()
+        feedback_id = await db.save_feedback(_build_feedback(initiative_id, feedback_text, feedback_type))
+        return _saved_result(feedback_id)
     
     except Exception as e:
         return {
@@ -57,3 +63,27 @@ def save_feedback(
             "error": f"Failed to save feedback: {str(e)}"
         }
 
+
+def _build_feedback(initiative_id: int, feedback_text: str, feedback_type: str) -> Feedback:
+    """Create the Feedback object to save."""
+    return Feedback(
+        initiative_id=initiative_id,
+        feedback_text=feedback_text,
+        feedback_type=feedback_type,
+        created_at=datetime.now()
+    )
+
+
+def _missing_text_result() -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": "Feedback text is required"
+    }
+
+
+def _saved_result(feedback_id: int) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "feedback_id": feedback_id,
+        "message": f"Feedback saved successfully"
+    }
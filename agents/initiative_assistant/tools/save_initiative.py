@@ -8,7 +8,7 @@ from typing import Dict, Any
 project_root = os.path.join(os.path.dirname(__file__), '../../..')
 sys.path.insert(0, os.path.abspath(project_root))
 
-from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.database import InitiativeDatabase, AsyncInitiativeDatabase
 from agents.initiative_assistant.models import Initiative
 from datetime import datetime
 
@@ -49,36 +49,52 @@ def save_initiative(
     try:
         # Validate required fields
         if not title or not description or not creator_name:
-            return {
-                "success": False,
-                "error": "Title, description, and creator_name are required"
-            }
+            return _missing_fields_result()
         
-        # Create initiative object
-        initiative = Initiative(
-            title=title,
-            description=description,
-            creator_name=creator_name,
-            creator_department=creator_department,
-            creator_email=creator_email,
-            creator_contact=creator_contact,
-            goals=goals,
-            related_processes=related_processes,
-            expected_outcomes=expected_outcomes,
-            status=status,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
+        initiative = _build_initiative(
+            title, description, creator_name, creator_department, creator_email,
+            creator_contact, goals, related_processes, expected_outcomes, status
         )
         
         # Save to database
         db = InitiativeDatabase()
         initiative_id = db.save_initiative(initiative)
-        
+        return _saved_result(title, initiative_id)
+    
+    except Exception as e:
         return {
-            "success": True,
-            "initiative_id": initiative_id,
-            "message": f"Initiative '{title}' saved successfully with ID {initiative_id}"
+            "success": False,
+            "error": f"Failed to save initiative: {str(e)}"
         }
+
+
+async def save_initiative_async(
+    title: str,
+    description: str,
+    creator_name: str,
+    creator_department: str = None,
+    creator_email: str = None,
+    creator_contact: str = None,
+    goals: str = None,
+    related_processes: str = None,
+    expected_outcomes: str = None,
+    status: str = "proposed"
+) -> Dict[str, Any]:
+    """Async variant of save_initiative for use inside the event loop."""
+    try:
+        # Validate required fields
+        if not title or not description or not creator_name:
+            return _missing_fields_result()
+        
+        initiative = _build_initiative(
+            title, description, creator_name, creator_department, creator_email,
+            creator_contact, goals, related_processes, expected_outcomes, status
+        )
+        
+        # Save to database
+        db = AsyncInitiativeDatabase()
+        initiative_id = await db.save_initiative(initiative)
+        return _saved_result(title, initiative_id)
     
     except Exception as e:
         return {
@@ -86,3 +102,38 @@ def save_initiative(
             "error": f"Failed to save initiative: {str(e)}"
         }
 
+
+def _build_initiative(
+    title, description, creator_name, creator_department, creator_email,
+    creator_contact, goals, related_processes, expected_outcomes, status
+) -> Initiative:
+    """Create the Initiative object to save."""
+    return Initiative(
+        title=title,
+        description=description,
+        creator_name=creator_name,
+        creator_department=creator_department,
+        creator_email=creator_email,
+        creator_contact=creator_contact,
+        goals=goals,
+        related_processes=related_processes,
+        expected_outcomes=expected_outcomes,
+        status=status,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+
+
+def _missing_fields_result() -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": "Title, description, and creator_name are required"
+    }
+
+
+def _saved_result(title: str, initiative_id: int) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "initiative_id": initiative_id,
+        "message": f"Initiative '{title}' saved successfully with ID {initiative_id}"
+    }
@@ -8,7 +8,8 @@ from typing import Dict, Any, List
 project_root = os.path.join(os.path.dirname(__file__), '../../..')
 sys.path.insert(0, os.path.abspath(project_root))
 
-from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.database import InitiativeDatabase, AsyncInitiativeDatabase
+from agents.initiative_assistant.models import Initiative
 
 
 def search_similar_initiatives(
@@ -32,27 +33,32 @@ def search_similar_initiatives(
     """
     try:
         if not title:
-            return {
-                "success": False,
-                "error": "Title is required for search"
-            }
+            return _missing_title_result()
         
         db = InitiativeDatabase()
         similar = db.search_similar(title, description or "", limit)
-        
-        # Convert to dictionaries without personal information
-        results = []
-        for initiative in similar:
-            # Exclude personal information
-            data = initiative.to_dict(include_personal=False)
-            results.append(data)
-        
+        return _search_result(similar)
+    
+    except Exception as e:
         return {
-            "success": True,
-            "count": len(results),
-            "similar_initiatives": results,
-            "message": f"Found {len(results)} similar initiative(s)"
+            "success": False,
+            "error": f"Failed to search initiatives: {str(e)}"
         }
+
+
+async def search_similar_initiatives_async(
+    title: str,
+    description: str = None,
+    limit: int = 5
+) -> Dict[str, Any]:
+    """Async variant of search_similar_initiatives for use inside the event loop."""
+    try:
+        if not title:
+            return _missing_title_result()
+        
+        db = AsyncInitiativeDatabase()
+        similar = await db.search_similar(title, description or "", limit)
+        return _search_result(similar)
     
     except Exception as e:
         return {
@@ -60,3 +66,26 @@ def search_similar_initiatives(
             "error": f"Failed to search initiatives: {str(e)}"
         }
 
+
+def _missing_title_result() -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": "Title is required for search"
+    }
+
+
+def _search_result(similar: List[Initiative]) -> Dict[str, Any]:
+    """Build the tool result for found initiatives."""
+    # Convert to dictionaries without personal information
+    results = []
+    for initiative in similar:
+        # Exclude personal information
+        data = initiative.to_dict(include_personal=False)
+        results.append(data)
+    
+    return {
+        "success": True,
+        "count": len(results),
+        "similar_initiatives": results,
+        "message": f"Found {len(results)} similar initiative(s)"
+    }
@@ -0,0 +1,130 @@
+"""Tests for initiative admin endpoints."""
+
+import pytest
+from unittest.mock import patch
+from web_chat.backend.app import create_app
+from web_chat.backend.auth import create_session
+from agents.initiative_assistant.database import InitiativeDatabase
+from agents.initiative_assistant.models import Initiative
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Create a temporary initiative database."""
+    return InitiativeDatabase(str(tmp_path / 'initiatives.db'))
+
+
+@pytest.fixture
+def client(db):
+    """Create test client with admin routes pointed at the temporary database."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with patch('web_chat.backend.config.is_azure_auth_configured', return_value=True), \
+         patch('agents.initiative_assistant.database.InitiativeDatabase', lambda: db):
+        yield app.test_client()
+
+
+@pytest.fixture
+def headers():
+    """Create an authenticated admin session."""
+    token = create_session({'name': 'Admin'}, 'access-token')
+    return {'X-Session-Token': token}
+
+
+def save(db, title, status='proposed', department=None):
+    return db.save_initiative(Initiative(
+        title=title,
+        description=f"{title} description",
+        creator_name="Test User",
+        creator_department=department,
+        status=status
+    ))
+
+
+def test_list_initiatives_paginates_with_cursor(client, db, headers):
+    """Test that pages follow next_cursor until the listing is exhausted."""
+    ids = [save(db, f"Initiative {i}") for i in range(5)]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': 2}
+        if cursor:
+            params['cursor'] = cursor
+        data = client.get('/admin/api/initiatives', query_string=params, headers=headers).get_json()
+        assert data['success']
+        seen.extend(row['id'] for row in data['initiatives'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_list_initiatives_returns_projected_columns(client, db, headers):
+    """Test that the listing omits columns the table view does not need."""
+    save(db, "Projected")
+    data = client.get('/admin/api/initiatives', headers=headers).get_json()
+    row = data['initiatives'][0]
+    assert row['title'] == "Projected"
+    assert 'goals' not in row
+    assert 'creator_email' not in row
+
+
+def test_list_initiatives_filters_server_side(client, db, headers):
+    """Test filtering by status and department."""
+    save(db, "A", status='proposed', department='Production')
+    save(db, "B", status='completed', department='Production')
+    save(db, "C", status='completed', department='Sales')
+
+    data = client.get('/admin/api/initiatives',
+                      query_string={'status': 'completed', 'department': 'Production'},
+                      headers=headers).get_json()
+    assert [row['title'] for row in data['initiatives']] == ["B"]
+
+
+def test_list_initiatives_etag_returns_304_until_changed(client, db, headers):
+    """Test that an unchanged page costs a 304 and writes change the ETag."""
+    save(db, "First")
+    response = client.get('/admin/api/initiatives', headers=headers)
+    etag = response.headers['ETag']
+
+    response = client.get('/admin/api/initiatives', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    save(db, "Second")
+    response = client.get('/admin/api/initiatives', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 2
+
+
+def test_list_initiatives_rejects_bad_cursor(client, headers):
+    """Test that a malformed cursor is a 400."""
+    response = client.get('/admin/api/initiatives', query_string={'cursor': 'bogus'}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_analytics_follow_admin_updates_and_deletes(client, db, headers):
+    """Test aggregates are maintained by the admin update and delete routes."""
+    from agents.initiative_assistant.models import Feedback
+
+    first = save(db, "First", department='Production')
+    second = save(db, "Second", department='Sales')
+    db.save_feedback(Feedback(initiative_id=second, feedback_text="Nice", feedback_type='positive'))
+
+    analytics = client.get('/admin/api/analytics', headers=headers).get_json()['analytics']
+    assert analytics['total_initiatives'] == 2
+    assert analytics['by_status'] == {'proposed': 2}
+    assert analytics['by_department'] == {'Production': 1, 'Sales': 1}
+    assert analytics['by_feedback_type'] == {'positive': 1}
+    assert [row['id'] for row in analytics['top_feedback']] == [second]
+
+    client.put(f'/admin/api/initiatives/{first}', json={'status': 'completed'}, headers=headers)
+    client.delete(f'/admin/api/initiatives/{second}', headers=headers)
+
+    analytics = client.get('/admin/api/analytics', headers=headers).get_json()['analytics']
+    assert analytics['total_initiatives'] == 1
+    assert analytics['by_status'] == {'completed': 1}
+    assert analytics['by_department'] == {'Production': 1}
+    assert analytics['total_feedback'] == 0
+    assert analytics['top_feedback'] == []
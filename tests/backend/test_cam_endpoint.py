@@ -0,0 +1,68 @@
+"""Tests for CAM preview and comparison endpoints."""
+
+import pytest
+from unittest.mock import patch
+from web_chat.backend.app import create_app
+from web_chat.backend.auth import create_session
+from agents.cam_gerber_analyzer.config import AGENT_CONFIG
+from agents.cam_gerber_analyzer.database import CamGerberDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Point the CAM agent at a temporary database."""
+    original = AGENT_CONFIG["database"]["path"]
+    AGENT_CONFIG["database"]["path"] = str(tmp_path / 'cam.db')
+    yield CamGerberDatabase()
+    AGENT_CONFIG["database"]["path"] = original
+
+
+@pytest.fixture
+def client(db):
+    """Create test client."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with patch('web_chat.backend.config.is_azure_auth_configured', return_value=True):
+        yield app.test_client()
+
+
+@pytest.fixture
+def headers():
+    """Create a session for user-1."""
+    token = create_session({'id': 'user-1', 'name': 'User One'}, 'access-token')
+    return {'X-Session-Token': token}
+
+
+def test_layers_only_for_the_owner(client, db, headers):
+    """Test another user's analysis is not found."""
+    own = db.create_analysis('user-1', 'Own board')
+    other = db.create_analysis('user-2', 'Other board')
+    with patch('agents.cam_gerber_analyzer.tiles.describe_layers', return_value={'success': True, 'layers': []}):
+        assert client.get(f'/api/cam/{own}/layers', headers=headers).status_code == 200
+        assert client.get(f'/api/cam/{other}/layers', headers=headers).status_code == 404
+        assert client.get(f'/api/cam/{other + 1}/layers', headers=headers).status_code == 404
+
+
+def test_tiles_only_for_the_owner(client, db, headers):
+    """Test tiles of another user's analysis are not rendered."""
+    other = db.create_analysis('user-2', 'Other board')
+    with patch('agents.cam_gerber_analyzer.tiles.get_layer_tile') as get_layer_tile:
+        response = client.get(f'/api/cam/{other}/layers/copper_top/tiles/0/0/0.png', headers=headers)
+    assert response.status_code == 404
+    get_layer_tile.assert_not_called()
+
+
+def test_compare_only_own_analyses(client, db, headers):
+    """Test both compared analyses must belong to the session user."""
+    first = db.create_analysis('user-1', 'Rev A')
+    second = db.create_analysis('user-1', 'Rev B')
+    other = db.create_analysis('user-2', 'Other board')
+    with patch('agents.cam_gerber_analyzer.tools.compare_analyses.compare_analyses',
+               return_value={'success': True, 'layers': []}) as compare:
+        assert client.get(f'/api/cam/compare/{first}/{second}', headers=headers).status_code == 200
+        assert client.get(f'/api/cam/compare/{first}/{other}', headers=headers).status_code == 404
+        assert client.get(f'/api/cam/compare/{other}/{first}', headers=headers).status_code == 404
+        response = client.get(f'/api/cam/compare/{first}/{second}', query_string={'max_changes': -1},
+                              headers=headers)
+        assert response.status_code == 400
+    assert compare.call_count == 1
@@ -179,6 +179,8 @@ def create_app():
             # Add files to context if present
             if files:
                 context['files'] = files
+            # Analyses created by the agent belong to the session user
+            context['user_id'] = (request.user_info or {}).get('id', '')
             
             # Get agent from registry
             registry = get_registry()
@@ -225,39 +227,87 @@ def create_app():
     @app.route('/admin/api/initiatives', methods=['GET'])
     @require_auth_api
     def admin_list_initiatives():
-        """List all initiatives for admin."""
+        """List initiatives for admin, one keyset-paginated page at a time.
+        
+        Query parameters: limit, cursor, status, department. Responses carry
+        an ETag derived from the database version counter, so re-fetching an
+        unchanged page costs a 304 without touching the initiatives table.
+        """
         try:
+            import hashlib
             from agents.initiative_assistant.database import InitiativeDatabase
             
+            try:
+                limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+            except ValueError:
+                raise InvalidRequestError("limit must be an integer")
+            cursor = request.args.get('cursor') or None
+            status = request.args.get('status') or None
+            department = request.args.get('department') or None
+            
             db = InitiativeDatabase()
-            initiatives = db.get_all_initiatives(include_personal=True, limit=1000)
-            
-            # Convert to dict format
-            initiatives_list = []
-            for init in initiatives:
-                initiatives_list.append({
-                    'id': init.id,
-                    'title': init.title,
-                    'description': init.description,
-                    'creator_name': init.creator_name,
-                    'creator_department': init.creator_department,
-                    'creator_email': init.creator_email,
-                    'creator_contact': init.creator_contact,
-                    'goals': init.goals,
-                    'related_processes': init.related_processes,
-                    'expected_outcomes': init.expected_outcomes,
-                    'status': init.status,
-                    'created_at': init.created_at.isoformat() if init.created_at else None,
-                    'updated_at': init.updated_at.isoformat() if init.updated_at else None,
-                    'feedback_count': init.feedback_count,
-                    'similarity_checked': init.similarity_checked
+            
+            etag_source = f"{db.get_version()}|{limit}|{cursor}|{status}|{department}"
+            etag = hashlib.sha1(etag_source.encode('utf-8')).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                try:
+                    initiatives_list, next_cursor = db.list_initiatives_page(
+                        limit=limit, cursor=cursor, status=status, department=department
+                    )
+                except ValueError as e:
+                    raise InvalidRequestError(str(e))
+                
+                response = jsonify({
+                    'success': True,
+                    'initiatives': initiatives_list,
+                    'count': len(initiatives_list),
+                    'next_cursor': next_cursor
                 })
             
-            return jsonify({
-                'success': True,
-                'initiatives': initiatives_list,
-                'count': len(initiatives_list)
-            })
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        except APIError as e:
+            raise e
+        except Exception as e:
+            raise APIError(str(e), "INTERNAL_ERROR", 500)
+    
+    @app.route('/admin/api/analytics', methods=['GET'])
+    @require_auth_api
+    def admin_analytics():
+        """Get dashboard aggregates for initiatives and feedback.
+        
+        Served from summary tables maintained on every write, with the same
+        version-counter ETag as the listing.
+        """
+        try:
+            import hashlib
+            from agents.initiative_assistant.database import InitiativeDatabase
+            
+            try:
+                top_limit = min(max(int(request.args.get('top', 5)), 1), 50)
+            except ValueError:
+                raise InvalidRequestError("top must be an integer")
+            
+            db = InitiativeDatabase()
+            
+            etag_source = f"analytics|{db.get_version()}|{top_limit}"
+            etag = hashlib.sha1(etag_source.encode('utf-8')).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = jsonify({
+                    'success': True,
+                    'analytics': db.get_analytics(top_limit=top_limit)
+                })
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        except APIError as e:
+            raise e
         except Exception as e:
             raise APIError(str(e), "INTERNAL_ERROR", 500)
     
@@ -353,22 +403,14 @@ def create_app():
     def admin_delete_initiative(initiative_id):
         """Delete an initiative."""
         try:
-            import sqlite3
             from agents.initiative_assistant.database import InitiativeDatabase
             
             db = InitiativeDatabase()
-            initiative = db.get_initiative(initiative_id, include_personal=True)
             
-            if not initiative:
+            # Delete from database (also invalidates cached lookups)
+            if not db.delete_initiative(initiative_id):
                 raise APIError(f"Initiative {initiative_id} not found", "NOT_FOUND", 404)
             
-            # Delete from database
-            conn = sqlite3.connect(db.db_path)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM initiatives WHERE id = ?', (initiative_id,))
-            conn.commit()
-            conn.close()
-            
             return jsonify({
                 'success': True,
                 'message': 'Initiative deleted successfully'
@@ -751,7 +793,71 @@ def create_app():
                 'error': str(e),
                 'error_code': 'DOWNLOAD_ERROR'
             }), 500
-    
+
+    def require_own_analysis(analysis_id):
+        """Raise a 404 unless the session user owns the CAM analysis."""
+        from agents.cam_gerber_analyzer.database import CamGerberDatabase
+        user_id = (request.user_info or {}).get('id')
+        analysis = CamGerberDatabase().get_analysis(analysis_id)
+        if analysis is None or not user_id or analysis.user_id != user_id:
+            raise APIError(f"Analysis {analysis_id} not found", "NOT_FOUND", 404)
+
+    # CAM layer previews
+    @app.route('/api/cam/<int:analysis_id>/layers', methods=['GET'])
+    @require_auth_api
+    def cam_layers(analysis_id):
+        """Describe the preview pyramid and layers of a CAM analysis."""
+        from agents.cam_gerber_analyzer.tiles import describe_layers
+        require_own_analysis(analysis_id)
+        try:
+            result = describe_layers(analysis_id)
+        except Exception as e:
+            raise APIError(str(e), "INTERNAL_ERROR", 500)
+        if not result.get('success'):
+            raise APIError(result.get('error', 'No layers'), "NOT_FOUND", 404)
+        return jsonify(result)
+
+    @app.route('/api/cam/<int:analysis_id>/layers/<layer>/tiles/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+    @require_auth_api
+    def cam_layer_tile(analysis_id, layer, z, x, y):
+        """Serve one PNG tile of a CAM layer preview."""
+        from agents.cam_gerber_analyzer.tiles import get_layer_tile, tile_settings
+        require_own_analysis(analysis_id)
+        try:
+            tile = get_layer_tile(analysis_id, layer, z, x, y)
+        except LookupError as e:
+            raise APIError(str(e), "NOT_FOUND", 404)
+        except Exception as e:
+            raise APIError(str(e), "INTERNAL_ERROR", 500)
+
+        # Tiles never change for a given ETag
+        if tile.etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = make_response(tile.data)
+            response.headers['Content-Type'] = 'image/png'
+        response.headers['ETag'] = tile.etag
+        response.headers['Cache-Control'] = f"private, max-age={tile_settings().get('max_age_seconds', 86400)}"
+        return response
+
+    @app.route('/api/cam/compare/<int:analysis_id_a>/<int:analysis_id_b>', methods=['GET'])
+    @require_auth_api
+    def cam_compare(analysis_id_a, analysis_id_b):
+        """Compare the layers and drills of two CAM analyses."""
+        from agents.cam_gerber_analyzer.tools.compare_analyses import compare_analyses
+        require_own_analysis(analysis_id_a)
+        require_own_analysis(analysis_id_b)
+        max_changes = request.args.get('max_changes', type=int)
+        if max_changes is not None and max_changes < 0:
+            raise InvalidRequestError("max_changes must not be negative")
+        result = compare_analyses(analysis_id_a, analysis_id_b, max_changes)
+        if not result.get('success'):
+            error = result.get('error', 'Comparison failed')
+            if error.endswith('not found'):
+                raise APIError(error, "NOT_FOUND", 404)
+            raise APIError(error, "INTERNAL_ERROR", 500)
+        return jsonify(result)
+
     return app
 
 
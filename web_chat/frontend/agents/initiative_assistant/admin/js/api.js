@@ -93,11 +93,63 @@ async function logout() {
     }
 }
 
+// Last response per URL, revalidated with If-None-Match
+const responseCache = new Map();
+
+/**
+ * GET an endpoint, reusing the cached body when the server answers 304
+ */
+async function conditionalGet(endpoint) {
+    const cached = responseCache.get(endpoint);
+    const token = getSessionToken();
+    const headers = {};
+    if (token) {
+        headers['X-Session-Token'] = token;
+    }
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    
+    const response = await fetch(`${API_BASE}${endpoint}`, { headers, cache: 'no-store' });
+    
+    if (response.status === 401) {
+        clearSessionToken();
+        window.location.reload();
+        throw new Error('Authentication required');
+    }
+    
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag && data.success) {
+        responseCache.set(endpoint, { etag, data });
+    }
+    return data;
+}
+
+/**
+ * Get one page of initiatives
+ *
+ * @param {Object} params - limit, cursor, status, department
+ */
+async function getInitiatives(params = {}) {
+    const query = new URLSearchParams();
+    for (const [key, value] of Object.entries(params)) {
+        if (value !== null && value !== undefined && value !== '') {
+            query.set(key, value);
+        }
+    }
+    return conditionalGet(`/initiatives?${query.toString()}`);
+}
+
 /**
- * Get all initiatives
+ * Get dashboard aggregates
  */
-async function getInitiatives() {
-    return apiRequest('/initiatives');
+async function getAnalytics() {
+    return conditionalGet('/analytics');
 }
 
 /**
@@ -2,6 +2,9 @@
 
 let currentInitiatives = [];
 let currentInitiativeId = null;
+let nextCursor = null;
+
+const PAGE_SIZE = 50;
 
 // DOM Elements
 const elements = {
@@ -16,10 +19,14 @@ const elements = {
     noInitiatives: document.getElementById('no-initiatives'),
     searchInput: document.getElementById('search-input'),
     statusFilter: document.getElementById('status-filter'),
+    departmentFilter: document.getElementById('department-filter'),
+    loadMoreBtn: document.getElementById('load-more-btn'),
     totalInitiatives: document.getElementById('total-initiatives'),
     proposedInitiatives: document.getElementById('proposed-initiatives'),
     inProgressInitiatives: document.getElementById('in-progress-initiatives'),
     completedInitiatives: document.getElementById('completed-initiatives'),
+    totalFeedback: document.getElementById('total-feedback'),
+    topFeedbackList: document.getElementById('top-feedback-list'),
     initiativeModal: document.getElementById('initiative-modal'),
     modalTitle: document.getElementById('modal-title'),
     modalBody: document.getElementById('modal-body'),
@@ -53,7 +60,9 @@ async function init() {
     elements.loginForm.addEventListener('submit', handleLogin);
     elements.logoutBtn.addEventListener('click', handleLogout);
     elements.searchInput.addEventListener('input', filterInitiatives);
-    elements.statusFilter.addEventListener('change', filterInitiatives);
+    elements.statusFilter.addEventListener('change', () => loadInitiatives());
+    elements.departmentFilter.addEventListener('change', () => loadInitiatives());
+    elements.loadMoreBtn.addEventListener('click', () => loadInitiatives(true));
     elements.modalClose.addEventListener('click', closeModal);
     elements.cancelModalBtn.addEventListener('click', closeModal);
     elements.saveInitiativeBtn.addEventListener('click', handleSaveInitiative);
@@ -125,19 +134,33 @@ async function handleLogout() {
 
 /**
  * Load initiatives from API
+ *
+ * Status and department are filtered server-side. With append=true the next
+ * page is fetched using the cursor of the previous one.
  */
-async function loadInitiatives() {
+async function loadInitiatives(append = false) {
     elements.loadingIndicator.style.display = 'block';
-    elements.initiativesList.innerHTML = '';
     elements.noInitiatives.style.display = 'none';
+    if (!append) {
+        elements.initiativesList.innerHTML = '';
+        currentInitiatives = [];
+        nextCursor = null;
+    }
     
     try {
-        const result = await getInitiatives();
+        const result = await getInitiatives({
+            limit: PAGE_SIZE,
+            cursor: append ? nextCursor : null,
+            status: elements.statusFilter.value,
+            department: elements.departmentFilter.value.trim()
+        });
         
         if (result.success) {
-            currentInitiatives = result.initiatives || [];
+            currentInitiatives = currentInitiatives.concat(result.initiatives || []);
+            nextCursor = result.next_cursor || null;
+            elements.loadMoreBtn.style.display = nextCursor ? 'inline-block' : 'none';
             updateStats();
-            renderInitiatives(currentInitiatives);
+            filterInitiatives();
         }
     } catch (error) {
         console.error('Error loading initiatives:', error);
@@ -149,17 +172,34 @@ async function loadInitiatives() {
 
 /**
  * Update statistics
+ *
+ * Counts come from the server-side aggregates, so they cover all initiatives
+ * rather than only the pages loaded so far.
  */
-function updateStats() {
-    const total = currentInitiatives.length;
-    const proposed = currentInitiatives.filter(i => i.status === 'proposed').length;
-    const inProgress = currentInitiatives.filter(i => i.status === 'in_progress').length;
-    const completed = currentInitiatives.filter(i => i.status === 'completed').length;
-    
-    elements.totalInitiatives.textContent = total;
-    elements.proposedInitiatives.textContent = proposed;
-    elements.inProgressInitiatives.textContent = inProgress;
-    elements.completedInitiatives.textContent = completed;
+async function updateStats() {
+    try {
+        const result = await getAnalytics();
+        if (!result.success) {
+            return;
+        }
+        const analytics = result.analytics;
+        const byStatus = analytics.by_status || {};
+        
+        elements.totalInitiatives.textContent = analytics.total_initiatives;
+        elements.proposedInitiatives.textContent = byStatus.proposed || 0;
+        elements.inProgressInitiatives.textContent = byStatus.in_progress || 0;
+        elements.completedInitiatives.textContent = byStatus.completed || 0;
+        elements.totalFeedback.textContent = analytics.total_feedback;
+        
+        elements.topFeedbackList.innerHTML = (analytics.top_feedback || []).map(item => `
+            <li>
+                <span>${escapeHtml(item.title)}</span>
+                <span class="top-feedback__count">${item.feedback_count}</span>
+            </li>
+        `).join('');
+    } catch (error) {
+        console.error('Error loading analytics:', error);
+    }
 }
 
 /**
@@ -208,11 +248,10 @@ function renderInitiatives(initiatives) {
 }
 
 /**
- * Filter initiatives
+ * Filter loaded initiatives by search term
  */
 function filterInitiatives() {
     const searchTerm = elements.searchInput.value.toLowerCase();
-    const statusFilter = elements.statusFilter.value;
     
     let filtered = currentInitiatives;
     
@@ -224,10 +263,6 @@ function filterInitiatives() {
         );
     }
     
-    if (statusFilter) {
-        filtered = filtered.filter(init => init.status === statusFilter);
-    }
-    
     renderInitiatives(filtered);
 }
 